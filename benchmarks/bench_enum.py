@@ -0,0 +1,96 @@
+"""Benchmark of creating enum classes and looking up enum values.
+
+The enum classes are created the way pyspotify does it at import time, and
+the old implementations, which scanned ``dir(lib)`` for each enum class and
+probed the class with ``hasattr()`` on each lookup, are measured too.
+
+Run with::
+
+    python benchmarks/bench_enum.py --number 1000000
+"""
+
+from __future__ import unicode_literals
+
+import spotify
+from spotify import lib, utils
+
+import benchutils
+
+
+NUMBER = 1000000
+
+PREFIXES = [
+    'SP_ALBUMTYPE_', 'SP_ARTISTBROWSE_', 'SP_BITRATE_', 'SP_SAMPLETYPE_',
+    'SP_CONNECTION_RULE_', 'SP_CONNECTION_STATE_', 'SP_CONNECTION_TYPE_',
+    'SP_ERROR_', 'SP_IMAGE_FORMAT_', 'SP_IMAGE_SIZE_', 'SP_LINKTYPE_',
+    'SP_PLAYLIST_OFFLINE_STATUS_', 'SP_PLAYLIST_TYPE_', 'SP_SEARCH_',
+    'SP_SCROBBLING_STATE_', 'SP_SOCIAL_PROVIDER_', 'SP_TOPLIST_REGION_',
+    'SP_TOPLIST_TYPE_', 'SP_TRACK_AVAILABILITY_', 'SP_TRACK_OFFLINE_',
+]
+
+
+class OldIntEnum(int):
+
+    def __new__(cls, value):
+        if not hasattr(cls, '_values'):
+            cls._values = {}
+        if value not in cls._values:
+            cls._values[value] = int.__new__(cls, value)
+        return cls._values[value]
+
+
+class OldErrorType(OldIntEnum):
+    pass
+
+
+def old_make_enum(lib_prefix):
+    def wrapper(cls):
+        for attr in dir(lib):
+            if attr.startswith(lib_prefix):
+                setattr(cls, attr.replace(lib_prefix, ''), getattr(lib, attr))
+        return cls
+    return wrapper
+
+
+def old_maybe_raise(error_type, ignores=None):
+    ignores = set(ignores or [])
+    ignores.add(spotify.ErrorType.OK)
+    if error_type not in ignores:
+        raise spotify.LibError(error_type)
+
+
+def make_enums():
+    # A fresh scan of the library, as on import
+    utils._lib_constants = None
+    for prefix in PREFIXES:
+        utils.make_enum(prefix)(type(str('Enum'), (utils.IntEnum,), {}))
+
+
+def old_make_enums():
+    for prefix in PREFIXES:
+        old_make_enum(prefix)(type(str('Enum'), (OldIntEnum,), {}))
+
+
+def run(number):
+    enum_number = max(1, number // 1000)
+    error_type = spotify.ErrorType
+    maybe_raise = spotify.Error.maybe_raise
+    ok = int(spotify.ErrorType.OK)
+    return [
+        ('make_enum, all enums', benchutils.measure(
+            make_enums, enum_number)),
+        ('make_enum, all enums (old)', benchutils.measure(
+            old_make_enums, enum_number)),
+        ('ErrorType(0)', benchutils.measure(
+            lambda: error_type(ok), number)),
+        ('ErrorType(0) (old)', benchutils.measure(
+            lambda: OldErrorType(ok), number)),
+        ('Error.maybe_raise(OK)', benchutils.measure(
+            lambda: maybe_raise(ok), number)),
+        ('Error.maybe_raise(OK) (old)', benchutils.measure(
+            lambda: old_maybe_raise(ok), number)),
+    ]
+
+
+if __name__ == '__main__':
+    benchutils.main(run, __doc__.splitlines()[0], NUMBER)
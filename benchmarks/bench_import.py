@@ -0,0 +1,41 @@
+"""Benchmark of the time it takes to ``import spotify``.
+
+The package is imported in a fresh Python process for each measurement, and
+only the import itself is timed, not the interpreter's startup.
+
+Run with::
+
+    python benchmarks/bench_import.py --number 10
+"""
+
+from __future__ import unicode_literals
+
+import os
+import subprocess
+import sys
+
+import benchutils
+
+
+NUMBER = 10
+
+SCRIPT = (
+    'import time; started_at = time.time(); import spotify; '
+    'print(time.time() - started_at)')
+
+
+def measure_import():
+    env = dict(os.environ)
+    env['PYTHONPATH'] = os.pathsep.join(sys.path)
+    output = subprocess.check_output([sys.executable, '-c', SCRIPT], env=env)
+    return float(output.decode('ascii').strip().splitlines()[-1])
+
+
+def run(number):
+    return [
+        ('import spotify', min(measure_import() for _ in range(number))),
+    ]
+
+
+if __name__ == '__main__':
+    benchutils.main(run, __doc__.splitlines()[0], NUMBER)
@@ -0,0 +1,66 @@
+"""Benchmark of converting links to URIs with :attr:`spotify.Link.uri`.
+
+libspotify's ``sp_link_as_string()`` is replaced by a Python function writing
+a typical track URI to the buffer, so the benchmark measures pyspotify's
+overhead, and runs without a session or a Spotify account. For comparison,
+the old buffer handling, which started with a fresh 10 byte buffer for each
+call, is measured too.
+
+Run with::
+
+    python benchmarks/bench_link.py --number 1000000
+"""
+
+from __future__ import unicode_literals
+
+import mock
+
+import spotify
+from spotify import ffi, utils
+
+import benchutils
+
+
+NUMBER = 1000000
+
+URI = b'spotify:track:2Foc5Q5nqNiosCNqttzHof'
+
+
+def sp_link_as_string(sp_link, buffer_, buffer_size):
+    length = min(len(URI), buffer_size - 1)
+    ffi.buffer(buffer_, length)[:] = URI[:length]
+    buffer_[length] = b'\0'
+    return len(URI)
+
+
+def old_get_with_growing_buffer(func, *args):
+    actual_length = 10
+    buffer_length = actual_length
+    while actual_length >= buffer_length:
+        buffer_length = actual_length + 1
+        buffer_ = ffi.new('char[]', buffer_length)
+        actual_length = func(*(args + (buffer_, buffer_length)))
+    if actual_length == -1:
+        return None
+    return utils.to_unicode(buffer_)
+
+
+def run(number):
+    link = spotify.Link.__new__(spotify.Link)
+    link._sp_link = ffi.new('int *')
+    results = []
+    with mock.patch('spotify.link.lib') as lib_mock:
+        lib_mock.sp_link_as_string = sp_link_as_string
+        results.append(
+            ('Link.uri', benchutils.measure(lambda: link.uri, number)))
+        with mock.patch.object(
+                utils, 'get_with_growing_buffer',
+                old_get_with_growing_buffer):
+            results.append((
+                'Link.uri (old buffer handling)',
+                benchutils.measure(lambda: link.uri, number)))
+    return results
+
+
+if __name__ == '__main__':
+    benchutils.main(run, __doc__.splitlines()[0], NUMBER)
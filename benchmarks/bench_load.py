@@ -0,0 +1,62 @@
+"""Benchmark of waiting for objects to load with :func:`utils.load`.
+
+The session is a stand-in that loads the object on the first call to
+:meth:`~spotify.Session.process_events`, so the benchmark measures how long
+pyspotify takes to notice that an object is loaded, and runs without a
+session or a Spotify account.
+
+Run with::
+
+    python benchmarks/bench_load.py --number 100000
+"""
+
+from __future__ import unicode_literals
+
+import spotify
+from spotify import utils
+
+import benchutils
+
+
+NUMBER = 100000
+
+
+class Loadable(object):
+
+    def __init__(self, is_loaded):
+        self.is_loaded = is_loaded
+        self.error = spotify.ErrorType.OK
+
+
+class Session(object):
+
+    user = 'alice'
+    loadable = None
+
+    def process_events(self):
+        self.loadable.is_loaded = True
+        return 0
+
+
+def run(number):
+    session = Session()
+
+    def load_after_process_events():
+        session.loadable = Loadable(is_loaded=False)
+        utils.load(session.loadable)
+
+    spotify.session_instance = session
+    try:
+        return [
+            ('load() of loaded object', benchutils.measure(
+                lambda: utils.load(Loadable(is_loaded=True)), number)),
+            ('load() of object loaded by process_events()',
+                benchutils.measure(
+                    load_after_process_events, max(1, number // 1000))),
+        ]
+    finally:
+        spotify.session_instance = None
+
+
+if __name__ == '__main__':
+    benchutils.main(run, __doc__.splitlines()[0], NUMBER)
@@ -0,0 +1,55 @@
+"""Benchmark of the ``music_delivery`` session callback.
+
+The callback is called through its C function pointer, like libspotify does,
+with a chunk of 2048 frames of 44.1 kHz stereo audio, and a listener that
+consumes all frames. The session is a bare :class:`spotify.Session` without a
+libspotify session, so the benchmark measures pyspotify's overhead per chunk,
+and runs without a Spotify account.
+
+Run with::
+
+    python benchmarks/bench_music_delivery.py --number 100000
+"""
+
+from __future__ import unicode_literals
+
+import spotify
+from spotify import ffi, utils
+
+import benchutils
+
+
+NUMBER = 100000
+
+NUM_FRAMES = 2048
+
+
+def run(number):
+    sp_audioformat = ffi.new('sp_audioformat *', {
+        'sample_type': int(spotify.SampleType.INT16_NATIVE_ENDIAN),
+        'sample_rate': 44100,
+        'channels': 2,
+    })
+    frames = ffi.new('int16_t[]', NUM_FRAMES * 2)
+    callback = spotify.session._SessionCallbacks.music_delivery
+
+    session = spotify.Session.__new__(spotify.Session)
+    utils.EventEmitter.__init__(session)
+    session._metrics = spotify.Metrics()
+    session.on(
+        spotify.SessionEvent.MUSIC_DELIVERY,
+        lambda session, audio_format, frames, num_frames: num_frames)
+
+    spotify.session_instance = session
+    try:
+        return [
+            ('music_delivery, 2048 frames', benchutils.measure(
+                lambda: callback(ffi.NULL, sp_audioformat, frames, NUM_FRAMES),
+                number)),
+        ]
+    finally:
+        spotify.session_instance = None
+
+
+if __name__ == '__main__':
+    benchutils.main(run, __doc__.splitlines()[0], NUMBER)
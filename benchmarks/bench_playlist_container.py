@@ -0,0 +1,73 @@
+"""Benchmark of iterating over a :class:`PlaylistContainer` with folders.
+
+libspotify's playlist container functions are replaced by Python functions
+describing a container of 100 items, where every tenth item starts a folder
+and the item before the next folder ends it. The benchmark measures
+pyspotify's overhead for creating the :class:`Playlist` and
+:class:`PlaylistFolder` objects, and runs without a session or a Spotify
+account.
+
+Run with::
+
+    python benchmarks/bench_playlist_container.py --number 1000
+"""
+
+from __future__ import unicode_literals
+
+import mock
+
+import spotify
+from spotify import ffi
+
+import benchutils
+
+
+NUMBER = 1000
+
+LENGTH = 100
+
+FOLDER_NAME = b'Folder'
+
+
+def sp_playlistcontainer_playlist_type(sp_playlistcontainer, index):
+    if index % 10 == 0:
+        return int(spotify.PlaylistType.START_FOLDER)
+    elif index % 10 == 9:
+        return int(spotify.PlaylistType.END_FOLDER)
+    return int(spotify.PlaylistType.PLAYLIST)
+
+
+def sp_playlistcontainer_playlist_folder_name(
+        sp_playlistcontainer, index, buffer_, buffer_size):
+    ffi.buffer(buffer_, len(FOLDER_NAME))[:] = FOLDER_NAME
+    buffer_[len(FOLDER_NAME)] = b'\0'
+    return 0
+
+
+def run(number):
+    sp_playlist = ffi.cast('sp_playlist *', 0x1000)
+
+    with mock.patch('spotify.playlist.lib') as lib_mock:
+        lib_mock.sp_playlistcontainer_add_ref = lambda *args: 0
+        lib_mock.sp_playlistcontainer_release = lambda *args: 0
+        lib_mock.sp_playlist_add_ref = lambda *args: 0
+        lib_mock.sp_playlist_release = lambda *args: 0
+        lib_mock.sp_playlistcontainer_num_playlists = lambda *args: LENGTH
+        lib_mock.sp_playlistcontainer_playlist_type = (
+            sp_playlistcontainer_playlist_type)
+        lib_mock.sp_playlistcontainer_playlist = lambda *args: sp_playlist
+        lib_mock.sp_playlistcontainer_playlist_folder_id = (
+            lambda sp_playlistcontainer, index: index)
+        lib_mock.sp_playlistcontainer_playlist_folder_name = (
+            sp_playlistcontainer_playlist_folder_name)
+
+        container = spotify.PlaylistContainer(
+            ffi.cast('sp_playlistcontainer *', 0x2000))
+        return [
+            ('list(PlaylistContainer), 100 items',
+                benchutils.measure(lambda: list(container), number)),
+        ]
+
+
+if __name__ == '__main__':
+    benchutils.main(run, __doc__.splitlines()[0], NUMBER)
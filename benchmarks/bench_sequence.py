@@ -0,0 +1,42 @@
+"""Benchmark of indexing, iterating over, and slicing :class:`utils.Sequence`.
+
+libspotify's length and item functions are replaced by Python functions
+returning the index, so the benchmark measures pyspotify's overhead for a
+sequence of 100 items, like the tracks of a playlist, and runs without a
+session or a Spotify account.
+
+Run with::
+
+    python benchmarks/bench_sequence.py --number 10000
+"""
+
+from __future__ import unicode_literals
+
+from spotify import ffi, utils
+
+import benchutils
+
+
+NUMBER = 10000
+
+LENGTH = 100
+
+
+def run(number):
+    sequence = utils.Sequence(
+        sp_obj=ffi.new('int *'),
+        add_ref_func=lambda sp_obj: None,
+        release_func=lambda sp_obj: None,
+        len_func=lambda sp_obj: LENGTH,
+        getitem_func=lambda sp_obj, key: key)
+    return [
+        ('Sequence[i]', benchutils.measure(lambda: sequence[50], number)),
+        ('list(Sequence), 100 items',
+            benchutils.measure(lambda: list(sequence), number)),
+        ('Sequence[10:20]',
+            benchutils.measure(lambda: sequence[10:20], number)),
+    ]
+
+
+if __name__ == '__main__':
+    benchutils.main(run, __doc__.splitlines()[0], NUMBER)
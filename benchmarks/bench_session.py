@@ -0,0 +1,53 @@
+"""Benchmark of common session operations against a simulated libspotify.
+
+libspotify is replaced by :class:`spotify.SimulatedLib` with no latency, so
+the benchmark measures pyspotify's overhead for whole operations, like
+looking up and loading a track or searching, and runs without a network or a
+Spotify account.
+
+Run with::
+
+    python benchmarks/bench_session.py --number 10000
+"""
+
+from __future__ import unicode_literals
+
+import spotify
+
+import benchutils
+
+
+NUMBER = 10000
+
+URI = 'spotify:track:2Foc5Q5nqNiosCNqttzHof'
+
+
+def run(number):
+    config = spotify.SessionConfig()
+    config.application_key = b'\0' * 321
+    results = []
+    with spotify.SimulatedLib(latency=0, seed=0):
+        session = spotify.Session(config)
+        try:
+            session.login('alice', 'secret')
+            while session.user is None:
+                session.process_events()
+            spotify.Track(URI).load()
+
+            results.append((
+                'Session.process_events()',
+                benchutils.measure(session.process_events, number)))
+            results.append((
+                'Track(uri).name',
+                benchutils.measure(lambda: spotify.Track(URI).name, number)))
+            results.append((
+                'Session.search(query).load()',
+                benchutils.measure(
+                    lambda: session.search('abba').load(), number)))
+        finally:
+            spotify.session_instance = None
+    return results
+
+
+if __name__ == '__main__':
+    benchutils.main(run, __doc__.splitlines()[0], NUMBER)
@@ -0,0 +1,44 @@
+"""Benchmark of converting strings with ``to_unicode()`` and ``to_bytes()``.
+
+Text, bytes, and C char arrays are converted with :func:`utils.to_unicode`
+and :func:`utils.to_bytes`, like pyspotify does for every string passed to or
+returned from libspotify.
+
+Run with::
+
+    python benchmarks/bench_strings.py --number 1000000
+"""
+
+from __future__ import unicode_literals
+
+from spotify import ffi, utils
+
+import benchutils
+
+
+NUMBER = 1000000
+
+TEXT = 'Bohemian Rhapsody - Remastered 2011'
+BYTES = TEXT.encode('utf-8')
+
+
+def run(number):
+    char_array = ffi.new('char[]', BYTES)
+    return [
+        ('to_unicode(text)',
+            benchutils.measure(lambda: utils.to_unicode(TEXT), number)),
+        ('to_unicode(bytes)',
+            benchutils.measure(lambda: utils.to_unicode(BYTES), number)),
+        ('to_unicode(char[])',
+            benchutils.measure(lambda: utils.to_unicode(char_array), number)),
+        ('to_bytes(text)',
+            benchutils.measure(lambda: utils.to_bytes(TEXT), number)),
+        ('to_bytes(bytes)',
+            benchutils.measure(lambda: utils.to_bytes(BYTES), number)),
+        ('to_bytes(char[])',
+            benchutils.measure(lambda: utils.to_bytes(char_array), number)),
+    ]
+
+
+if __name__ == '__main__':
+    benchutils.main(run, __doc__.splitlines()[0], NUMBER)
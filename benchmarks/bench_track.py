@@ -0,0 +1,52 @@
+"""Benchmark of reading the properties of a loaded :class:`spotify.Track`.
+
+libspotify's track functions are replaced by Python functions returning the
+data of a loaded track, so the benchmark measures pyspotify's overhead per
+property read, and runs without a session or a Spotify account.
+
+Run with::
+
+    python benchmarks/bench_track.py --number 1000000
+"""
+
+from __future__ import unicode_literals
+
+import mock
+
+import spotify
+from spotify import ffi
+
+import benchutils
+
+
+NUMBER = 1000000
+
+
+def run(number):
+    name = ffi.new('char[]', b'Bohemian Rhapsody')
+
+    with mock.patch('spotify.track.lib') as lib_mock:
+        lib_mock.sp_track_add_ref = lambda sp_track: 0
+        lib_mock.sp_track_release = lambda sp_track: 0
+        lib_mock.sp_track_is_loaded = lambda sp_track: 1
+        lib_mock.sp_track_error = lambda sp_track: 0
+        lib_mock.sp_track_name = lambda sp_track: name
+        lib_mock.sp_track_duration = lambda sp_track: 354000
+        lib_mock.sp_track_popularity = lambda sp_track: 75
+        lib_mock.sp_track_index = lambda sp_track: 1
+
+        track = spotify.Track(sp_track=ffi.cast('sp_track *', 0x1000))
+        return [
+            ('Track.is_loaded',
+                benchutils.measure(lambda: track.is_loaded, number)),
+            ('Track.name', benchutils.measure(lambda: track.name, number)),
+            ('Track.duration',
+                benchutils.measure(lambda: track.duration, number)),
+            ('Track.popularity',
+                benchutils.measure(lambda: track.popularity, number)),
+            ('Track.index', benchutils.measure(lambda: track.index, number)),
+        ]
+
+
+if __name__ == '__main__':
+    benchutils.main(run, __doc__.splitlines()[0], NUMBER)
@@ -0,0 +1,29 @@
+"""Helpers shared by the micro-benchmarks in this directory."""
+
+from __future__ import print_function, unicode_literals
+
+import argparse
+import timeit
+
+
+def measure(func, number, repeat=3):
+    """Call ``func`` ``number`` times, ``repeat`` times over, and return the
+    best time per call in seconds."""
+    timer = timeit.Timer(func)
+    return min(timer.repeat(repeat=repeat, number=number)) / number
+
+
+def report(name, seconds_per_call):
+    print('%-40s %10.1f ns/call' % (name, seconds_per_call * 1e9))
+
+
+def main(run, description, default_number):
+    """Parse the command line and print the results of ``run(number)``,
+    which must return a list of ``(name, seconds_per_call)`` tuples."""
+    parser = argparse.ArgumentParser(description=description)
+    parser.add_argument(
+        '-n', '--number', type=int, default=default_number,
+        help='number of calls per measurement (default: %(default)s)')
+    args = parser.parse_args()
+    for name, seconds_per_call in run(args.number):
+        report(name, seconds_per_call)
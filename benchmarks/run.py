@@ -0,0 +1,187 @@
+"""Run all benchmarks and store the results for the current commit.
+
+Each ``bench_*.py`` module in this directory is run with its default number
+of calls per measurement, scaled by ``--scale``. The results are printed and
+stored as JSON in ``benchmarks/results/<commit>.json``, with ``-dirty``
+appended to the commit if the working tree has uncommitted changes.
+
+To see if a change helps or hurts, run the benchmarks before and after the
+change, and compare the results with the results of another commit::
+
+    git checkout master
+    python benchmarks/run.py
+    git checkout my-branch
+    python benchmarks/run.py --compare master
+
+The comparison lists the change of each benchmark, and the command exits
+with status 1 if any benchmark is more than ``--threshold`` percent slower.
+
+The ``spotify`` package in the checkout the runner is in is benchmarked, even
+if another version of pyspotify is installed.
+"""
+
+from __future__ import print_function, unicode_literals
+
+import argparse
+import glob
+import importlib
+import io
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+import traceback
+
+import benchutils
+
+
+BENCHMARKS_DIR = os.path.dirname(os.path.abspath(__file__))
+
+ROOT_DIR = os.path.dirname(BENCHMARKS_DIR)
+
+RESULTS_DIR = os.path.join(BENCHMARKS_DIR, 'results')
+
+
+def find_modules(names=None):
+    """Get the names of the benchmark modules, optionally only those in
+    ``names``."""
+    modules = sorted(
+        os.path.splitext(os.path.basename(path))[0]
+        for path in glob.glob(os.path.join(BENCHMARKS_DIR, 'bench_*.py')))
+    if names:
+        modules = [
+            module for module in modules
+            if module in names or module[len('bench_'):] in names]
+    return modules
+
+
+def git(*args):
+    output = subprocess.check_output(('git',) + args, cwd=BENCHMARKS_DIR)
+    return output.decode('utf-8').strip()
+
+
+def current_commit():
+    """Get the current commit, with ``-dirty`` appended if the working tree
+    has uncommitted changes."""
+    commit = git('rev-parse', 'HEAD')
+    if git('status', '--porcelain', '--untracked-files=no'):
+        commit += '-dirty'
+    return commit
+
+
+def run_modules(modules, scale):
+    """Run the benchmark modules and return a dict mapping module names to
+    dicts mapping benchmark names to seconds per call."""
+    results = {}
+    for name in modules:
+        module = importlib.import_module(name)
+        number = max(1, int(module.NUMBER * scale))
+        print('%s (number=%d)' % (name, number))
+        try:
+            module_results = module.run(number)
+        except Exception:
+            # One broken benchmark shouldn't stop the others from running
+            traceback.print_exc()
+            continue
+        for benchmark, seconds_per_call in module_results:
+            benchutils.report(benchmark, seconds_per_call)
+        results[name] = dict(module_results)
+    return results
+
+
+def results_path(commit):
+    return os.path.join(RESULTS_DIR, '%s.json' % commit)
+
+
+def save_results(commit, results):
+    """Save the results for ``commit``, keeping the results of modules that
+    weren't run this time."""
+    path = results_path(commit)
+    if os.path.isfile(path):
+        with io.open(path, encoding='utf-8') as fh:
+            results = dict(json.load(fh)['results'], **results)
+    elif not os.path.isdir(RESULTS_DIR):
+        os.makedirs(RESULTS_DIR)
+    data = {
+        'commit': commit,
+        'time': time.time(),
+        'python': platform.python_version(),
+        'implementation': platform.python_implementation(),
+        'platform': platform.platform(),
+        'results': results,
+    }
+    with io.open(path, 'w', encoding='utf-8') as fh:
+        fh.write(json.dumps(data, indent=2, sort_keys=True))
+    return path
+
+
+def load_results(ref):
+    """Load the results of the commit ``ref``, which may be any git
+    revision, or the path to a results file."""
+    if os.path.isfile(ref):
+        path = ref
+    else:
+        path = results_path(git('rev-parse', ref))
+    with io.open(path, encoding='utf-8') as fh:
+        return json.load(fh)['results']
+
+
+def compare(old_results, new_results, threshold):
+    """Print the change from ``old_results`` to ``new_results`` and return
+    the number of benchmarks that are more than ``threshold`` percent
+    slower."""
+    regressions = 0
+    for module in sorted(new_results):
+        for benchmark in sorted(new_results[module]):
+            old = old_results.get(module, {}).get(benchmark)
+            new = new_results[module][benchmark]
+            if not old:
+                print('%-40s %10s' % (benchmark, 'new'))
+                continue
+            change = (new - old) / old * 100
+            marker = ''
+            if change > threshold:
+                marker = '  REGRESSION'
+                regressions += 1
+            print('%-40s %+9.1f%%%s' % (benchmark, change, marker))
+    return regressions
+
+
+def main():
+    # Only this script's directory is on the path when run as a script. The
+    # import benchmark passes the path on to its subprocesses.
+    sys.path.insert(0, ROOT_DIR)
+
+    parser = argparse.ArgumentParser(
+        description=__doc__.splitlines()[0])
+    parser.add_argument(
+        'modules', nargs='*',
+        help='benchmark modules to run, e.g. "link" (default: all)')
+    parser.add_argument(
+        '-s', '--scale', type=float, default=1.0,
+        help='scale the number of calls per measurement (default: 1.0)')
+    parser.add_argument(
+        '-c', '--compare', metavar='REF',
+        help='compare with the results of a commit or results file')
+    parser.add_argument(
+        '-t', '--threshold', type=float, default=10.0,
+        help='percent slower to count as a regression (default: 10)')
+    args = parser.parse_args()
+
+    commit = current_commit()
+    # Loaded before running, in case the results are about to be replaced
+    old_results = load_results(args.compare) if args.compare else None
+    results = run_modules(find_modules(args.modules), args.scale)
+    print('Results saved to %s' % save_results(commit, results))
+
+    if old_results is not None:
+        print()
+        print('Compared with %s:' % args.compare)
+        if compare(old_results, results, args.threshold):
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -29,6 +29,15 @@ logging.getLogger('spotify').addHandler(logging.NullHandler())
 _lock = threading.RLock()
 
 
+class _LockOwner(threading.local):
+    # Number of nested libspotify calls the current thread is in, and thus
+    # whether it holds _lock because of a libspotify call.
+    depth = 0
+
+
+_lock_owner = _LockOwner()
+
+
 # Mapping between keys and objects that should be kept alive as long as the key
 # is alive. May be used to keep objects alive when there isn't a more
 # convenient place to keep a reference to it. The keys are weakrefs, so entries
@@ -45,15 +54,30 @@ weak_key_dict = weakref.WeakKeyDictionary()
 session_instance = None
 
 
+# Reference to the active spotify.trace.Tracer instance, if any. Checked on
+# each call to libspotify, so that tracing costs nothing when it's off.
+_tracer = None
+
+
 def serialized(f):
     """Acquires the global lock while calling the wrapped function.
 
+    If a :class:`~spotify.trace.Tracer` is active, the call is traced.
+
     Internal function.
     """
     @functools.wraps(f)
     def wrapper(*args, **kwargs):
         with _lock:
-            return f(*args, **kwargs)
+            _lock_owner.depth += 1
+            try:
+                if _tracer is None:
+                    return f(*args, **kwargs)
+                return _tracer._trace_call(f, args, kwargs)
+            finally:
+                _lock_owner.depth -= 1
+    # Python 2's functools.wraps() doesn't set __wrapped__
+    wrapper.__wrapped__ = f
     return wrapper
 
 
@@ -96,15 +120,24 @@ from spotify.album import *  # noqa
 from spotify.artist import *  # noqa
 from spotify.audio import *  # noqa
 from spotify.connection import *  # noqa
+from spotify.crawl import *  # noqa
+from spotify.dispatcher import *  # noqa
 from spotify.error import *  # noqa
 from spotify.image import *  # noqa
+from spotify.imagecache import *  # noqa
 from spotify.inbox import *  # noqa
 from spotify.link import *  # noqa
+from spotify.metadatastore import *  # noqa
+from spotify.metrics import *  # noqa
 from spotify.offline import *  # noqa
 from spotify.playlist import *  # noqa
+from spotify.scheduler import *  # noqa
 from spotify.search import *  # noqa
 from spotify.session import *  # noqa
+from spotify.simulator import *  # noqa
 from spotify.social import *  # noqa
 from spotify.toplist import *  # noqa
+from spotify.trace import *  # noqa
 from spotify.track import *  # noqa
+from spotify.uri import *  # noqa
 from spotify.user import *  # noqa
@@ -31,7 +31,7 @@ class Album(object):
         assert uri or sp_album, 'uri or sp_album is required'
 
         if uri is not None:
-            album = spotify.Link(uri).as_album()
+            album = spotify.link._resolve(uri, 'album')
             if album is None:
                 raise ValueError(
                     'Failed to get album from Spotify URI: %r' % uri)
@@ -44,10 +44,15 @@ class Album(object):
     def __repr__(self):
         return 'Album(%r)' % self.link.uri
 
+    _loaded = False
+
     @property
     def is_loaded(self):
         """Whether the album's data is loaded."""
-        return bool(lib.sp_album_is_loaded(self._sp_album))
+        # Once loaded, the album stays loaded, so we stop asking libspotify
+        if not self._loaded:
+            self._loaded = bool(lib.sp_album_is_loaded(self._sp_album))
+        return self._loaded
 
     def load(self, timeout=None):
         """Block until the album's data is loaded.
@@ -188,6 +193,8 @@ class AlbumBrowser(object):
             # the callback is called?
             self._callback_handles.add(handle)
 
+            self._requested_at = spotify.metrics._request_started(
+                'AlbumBrowser')
             sp_albumbrowse = lib.sp_albumbrowse_create(
                 spotify.session_instance._sp_session, album._sp_album,
                 _albumbrowse_complete_callback, handle)
@@ -202,6 +209,8 @@ class AlbumBrowser(object):
     """:class:`threading.Event` that is set when the album browser is loaded.
     """
 
+    _requested_at = None
+
     def __repr__(self):
         if self.is_loaded:
             return 'AlbumBrowser(%r)' % self.album.link.uri
@@ -326,6 +335,8 @@ def _albumbrowse_complete_callback(sp_albumbrowse, handle):
         return
     (callback, album_browser) = ffi.from_handle(handle)
     album_browser._callback_handles.remove(handle)
+    spotify.metrics._request_completed(
+        'AlbumBrowser', album_browser._requested_at)
     album_browser.complete_event.set()
     if callback is not None:
         callback(album_browser)
@@ -31,7 +31,7 @@ class Artist(object):
         assert uri or sp_artist, 'uri or sp_artist is required'
 
         if uri is not None:
-            artist = spotify.Link(uri).as_artist()
+            artist = spotify.link._resolve(uri, 'artist')
             if artist is None:
                 raise ValueError(
                     'Failed to get artist from Spotify URI: %r' % uri)
@@ -53,10 +53,15 @@ class Artist(object):
         name = utils.to_unicode(lib.sp_artist_name(self._sp_artist))
         return name if name else None
 
+    _loaded = False
+
     @property
     def is_loaded(self):
         """Whether the artist's data is loaded."""
-        return bool(lib.sp_artist_is_loaded(self._sp_artist))
+        # Once loaded, the artist stays loaded, so we stop asking libspotify
+        if not self._loaded:
+            self._loaded = bool(lib.sp_artist_is_loaded(self._sp_artist))
+        return self._loaded
 
     def load(self, timeout=None):
         """Block until the artist's data is loaded.
@@ -108,7 +113,7 @@ class Artist(object):
         sp_link = lib.sp_link_create_from_artist(self._sp_artist)
         return spotify.Link(sp_link=sp_link, add_ref=False)
 
-    def browse(self, type=None, callback=None):
+    def browse(self, type=None, callback=None, fields=None):
         """Get an :class:`ArtistBrowser` for the artist.
 
         If ``type`` is :class:`None`, it defaults to
@@ -118,9 +123,18 @@ class Artist(object):
         that accepts a single argument, an :class:`ArtistBrowser` instance,
         when the browser is done loading.
 
+        If ``fields`` is given instead of ``type``, it is expected to be a
+        list of the :class:`ArtistBrowser` attributes you're going to use,
+        e.g. ``['albums', 'similar_artists']``. The cheapest
+        :class:`ArtistBrowserType` that includes the attributes is then used.
+        If you later use :attr:`~ArtistBrowser.albums` or
+        :attr:`~ArtistBrowser.tracks` anyway, the browser blocks while it
+        browses the artist again with a type that includes them.
+
         Can be created without the artist being loaded.
         """
-        return spotify.ArtistBrowser(artist=self, type=type, callback=callback)
+        return spotify.ArtistBrowser(
+            artist=self, type=type, callback=callback, fields=fields)
 
 
 class ArtistBrowser(object):
@@ -137,7 +151,7 @@ class ArtistBrowser(object):
     """
 
     def __init__(
-            self, artist=None, type=None, callback=None,
+            self, artist=None, type=None, callback=None, fields=None,
             sp_artistbrowse=None, add_ref=True):
 
         assert artist or sp_artistbrowse, (
@@ -147,8 +161,12 @@ class ArtistBrowser(object):
         self._callback_handles = set()
 
         if sp_artistbrowse is None:
+            if type is None and fields is not None:
+                type = _browser_type_for_fields(fields)
+                self._upgrade_artist = artist
             if type is None:
                 type = ArtistBrowserType.FULL
+            self._type = type
 
             handle = ffi.new_handle((callback, self))
             # TODO Think through the life cycle of the handle object. Can it
@@ -156,6 +174,8 @@ class ArtistBrowser(object):
             # the callback is called?
             self._callback_handles.add(handle)
 
+            self._requested_at = spotify.metrics._request_started(
+                'ArtistBrowser')
             sp_artistbrowse = lib.sp_artistbrowse_create(
                 spotify.session_instance._sp_session, artist._sp_artist,
                 int(type), _artistbrowse_complete_callback, handle)
@@ -170,6 +190,11 @@ class ArtistBrowser(object):
     """:class:`threading.Event` that is set when the artist browser is loaded.
     """
 
+    _requested_at = None
+
+    _type = None
+    _upgrade_artist = None
+
     def __repr__(self):
         if self.is_loaded:
             return 'ArtistBrowser(%r)' % self.artist.link.uri
@@ -251,12 +276,14 @@ class ArtistBrowser(object):
 
         Will be an empty list if the browser was created with a ``type`` of
         :attr:`ArtistBrowserType.NO_TRACKS` or
-        :attr:`ArtistBrowserType.NO_ALBUMS`.
+        :attr:`ArtistBrowserType.NO_ALBUMS`, unless it was created with
+        ``fields``, in which case the artist is browsed again.
 
         Will always return an empty list if the artist browser isn't loaded.
         """
         if not self.is_loaded:
             return []
+        self._upgrade(ArtistBrowserType.FULL)
 
         def get_track(sp_artistbrowse, key):
             return spotify.Track(
@@ -295,12 +322,14 @@ class ArtistBrowser(object):
         """The artist's albums.
 
         Will be an empty list if the browser was created with a ``type`` of
-        :attr:`ArtistBrowserType.NO_ALBUMS`.
+        :attr:`ArtistBrowserType.NO_ALBUMS`, unless it was created with
+        ``fields``, in which case the artist is browsed again.
 
         Will always return an empty list if the artist browser isn't loaded.
         """
         if not self.is_loaded:
             return []
+        self._upgrade(ArtistBrowserType.NO_TRACKS)
 
         def get_album(sp_artistbrowse, key):
             return spotify.Album(
@@ -334,6 +363,21 @@ class ArtistBrowser(object):
             len_func=lib.sp_artistbrowse_num_similar_artists,
             getitem_func=get_artist)
 
+    def _upgrade(self, type):
+        # ArtistBrowserType values are ordered from the fullest to the
+        # cheapest browse.
+        if self._upgrade_artist is None or self._type <= type:
+            return
+        logger.debug(
+            'Browsing artist again with type %r instead of %r',
+            type, self._type)
+        browser = ArtistBrowser(artist=self._upgrade_artist, type=type)
+        browser.load()
+        self._sp_artistbrowse = browser._sp_artistbrowse
+        self._type = type
+        if type == ArtistBrowserType.FULL:
+            self._upgrade_artist = None
+
     @property
     def biography(self):
         """A biography of the artist.
@@ -353,6 +397,8 @@ def _artistbrowse_complete_callback(sp_artistbrowse, handle):
         return
     (callback, artist_browser) = ffi.from_handle(handle)
     artist_browser._callback_handles.remove(handle)
+    spotify.metrics._request_completed(
+        'ArtistBrowser', artist_browser._requested_at)
     artist_browser.complete_event.set()
     if callback is not None:
         callback(artist_browser)
@@ -361,3 +407,23 @@ def _artistbrowse_complete_callback(sp_artistbrowse, handle):
 @utils.make_enum('SP_ARTISTBROWSE_')
 class ArtistBrowserType(utils.IntEnum):
     pass
+
+
+_FIELD_BROWSER_TYPES = {
+    'artist': ArtistBrowserType.NO_ALBUMS,
+    'portraits': ArtistBrowserType.NO_ALBUMS,
+    'tophit_tracks': ArtistBrowserType.NO_ALBUMS,
+    'similar_artists': ArtistBrowserType.NO_ALBUMS,
+    'biography': ArtistBrowserType.NO_ALBUMS,
+    'albums': ArtistBrowserType.NO_TRACKS,
+    'tracks': ArtistBrowserType.FULL,
+}
+
+
+def _browser_type_for_fields(fields):
+    types = [ArtistBrowserType.NO_ALBUMS]
+    for field in fields:
+        if field not in _FIELD_BROWSER_TYPES:
+            raise ValueError('Unknown artist browser field: %r' % field)
+        types.append(_FIELD_BROWSER_TYPES[field])
+    return min(types)
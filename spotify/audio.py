@@ -1,6 +1,9 @@
 from __future__ import unicode_literals
 
 import collections
+import logging
+import threading
+import time
 
 from spotify import utils
 
@@ -9,9 +12,12 @@ __all__ = [
     'AudioBufferStats',
     'AudioFormat',
     'Bitrate',
+    'BitrateController',
     'SampleType',
 ]
 
+logger = logging.getLogger(__name__)
+
 
 class AudioBufferStats(collections.namedtuple(
         'AudioBufferStats', ['samples', 'stutter'])):
@@ -62,3 +68,150 @@ class AudioFormat(object):
             return 2 * self.channels
         else:
             raise ValueError('Unknown sample type: %d', self.sample_type)
+
+
+class BitrateController(object):
+    """Adapts the streaming :class:`Bitrate` to how well playback keeps up.
+
+    Assign an instance to :attr:`Session.bitrate_controller` to enable it::
+
+        >>> session.bitrate_controller = spotify.BitrateController()
+
+    The session feeds the controller with the
+    :attr:`~SessionEvent.GET_AUDIO_BUFFER_STATS` results, the frames consumed
+    by the :attr:`~SessionEvent.MUSIC_DELIVERY` listener, and the
+    :attr:`~SessionEvent.STREAMING_ERROR` events. For the buffer stats to be
+    available, you must listen to :attr:`~SessionEvent.GET_AUDIO_BUFFER_STATS`.
+
+    The controller steps down to the next lower bitrate in ``bitrates`` when
+    there are ``stutter_threshold`` or more stutters within ``window``
+    seconds, or when there is a streaming error. It steps up to the next
+    higher bitrate when playback has had headroom for ``upgrade_after``
+    seconds: no stutters or streaming errors, at least ``min_buffer`` seconds
+    of audio in the buffer every time the buffer stats were queried, and
+    audio delivered at least as fast as it is played. Stepping up takes much
+    longer than stepping down, so the bitrate doesn't flap between two
+    levels on a connection that is just about fast enough for the higher one.
+
+    A new bitrate is set with :meth:`Session.preferred_bitrate` from
+    :meth:`Session.process_events`, and libspotify uses it for the next track
+    that is loaded.
+
+    :param bitrates: the bitrates to choose between, from lowest to highest
+    :type bitrates: sequence of :class:`Bitrate`
+    :param initial: the bitrate to start with, the highest by default
+    :type initial: :class:`Bitrate` or :class:`None`
+    """
+
+    def __init__(
+            self, bitrates=None, initial=None, stutter_threshold=3,
+            window=30, upgrade_after=120, min_buffer=1.0):
+        if bitrates is None:
+            bitrates = (
+                Bitrate.BITRATE_96k, Bitrate.BITRATE_160k,
+                Bitrate.BITRATE_320k)
+        self.bitrates = tuple(bitrates)
+        if not self.bitrates:
+            raise ValueError('At least one bitrate is required')
+        if initial is None:
+            initial = self.bitrates[-1]
+        self.stutter_threshold = stutter_threshold
+        self.window = window
+        self.upgrade_after = upgrade_after
+        self.min_buffer = min_buffer
+
+        self._lock = threading.Lock()
+        self._index = self.bitrates.index(initial)
+        self._applied = None
+        self._sample_rate = 44100
+        self._reset(time.time())
+
+    bitrates = None
+    """The bitrates to choose between, from lowest to highest."""
+
+    stutter_threshold = None
+    """Number of stutters within :attr:`window` seconds that makes the
+    controller step down. Defaults to 3."""
+
+    window = None
+    """Number of seconds stutters are counted over. Defaults to 30."""
+
+    upgrade_after = None
+    """Number of seconds of headroom needed before the controller steps up.
+    Defaults to 120."""
+
+    min_buffer = None
+    """Minimum number of seconds of buffered audio to count as headroom.
+    Defaults to 1.0."""
+
+    @property
+    def bitrate(self):
+        """The :class:`Bitrate` the controller has chosen."""
+        return self.bitrates[self._index]
+
+    def buffer_stats(self, stats):
+        """Observe the application's :class:`AudioBufferStats`."""
+        now = time.time()
+        with self._lock:
+            if stats.stutter > 0:
+                self._stutters.extend([now] * stats.stutter)
+                while self._stutters and self._stutters[0] < now - self.window:
+                    self._stutters.popleft()
+                if len(self._stutters) >= self.stutter_threshold:
+                    self._step(-1, now, '%d stutters in %d seconds' % (
+                        len(self._stutters), self.window))
+                else:
+                    self._restart_headroom(now)
+            elif stats.samples < self.min_buffer * self._sample_rate:
+                self._restart_headroom(now)
+            else:
+                self._maybe_step_up(now)
+
+    def music_delivered(self, num_frames, sample_rate):
+        """Observe that ``num_frames`` frames at ``sample_rate`` were
+        delivered to the application."""
+        with self._lock:
+            self._sample_rate = sample_rate
+            self._frames += num_frames
+
+    def streaming_error(self, error_type):
+        """Observe a streaming error of the given :class:`ErrorType`."""
+        with self._lock:
+            self._step(-1, time.time(), 'streaming error %s' % error_type)
+
+    def _reset(self, now):
+        self._stutters = collections.deque()
+        self._restart_headroom(now)
+
+    def _restart_headroom(self, now):
+        self._headroom_since = now
+        self._frames = 0
+
+    def _maybe_step_up(self, now):
+        elapsed = now - self._headroom_since
+        if elapsed < self.upgrade_after:
+            return
+        # With a full buffer, audio is delivered exactly as fast as it is
+        # played, so allow some slack for changes in the buffer level.
+        if self._frames >= 0.95 * elapsed * self._sample_rate:
+            self._step(1, now, 'headroom for %d seconds' % elapsed)
+        else:
+            self._restart_headroom(now)
+
+    def _step(self, direction, now, reason):
+        index = self._index + direction
+        if 0 <= index < len(self.bitrates):
+            logger.info(
+                'Changing bitrate from %s to %s: %s',
+                self.bitrates[self._index], self.bitrates[index], reason)
+            self._index = index
+        self._reset(now)
+
+    def _maybe_apply(self, session):
+        """Set the chosen bitrate on ``session`` if it has changed since it
+        was last set."""
+        bitrate = self.bitrate
+        if bitrate == self._applied:
+            return
+        session.preferred_bitrate(bitrate)
+        self._applied = bitrate
@@ -0,0 +1,328 @@
+from __future__ import unicode_literals
+
+import collections
+import json
+import logging
+import os
+import time
+
+import spotify
+from spotify import utils
+
+
+__all__ = [
+    'ArtistGraphCrawler',
+]
+
+logger = logging.getLogger(__name__)
+
+
+class ArtistGraphCrawler(object):
+    """A breadth-first crawler of the artist similarity graph.
+
+    Starting from one or more seed artists, the crawler browses each artist
+    and follows :attr:`ArtistBrowser.similar_artists` until it reaches
+    ``max_depth`` hops from the seeds, or has found ``max_artists`` artists::
+
+        >>> crawler = spotify.ArtistGraphCrawler(
+        ...     session, max_depth=2, output='graph.jsonl')
+        >>> crawler.crawl(['spotify:artist:22xRIphSN7IkPVbErICu7s'])
+        >>> crawler.artists
+        377
+
+    Each artist is browsed at most once. At most ``max_in_flight`` browse
+    requests are in progress at the same time, and if ``max_rate`` is set,
+    at most ``max_rate`` browse requests are started per second.
+
+    If ``expand_albums`` is :class:`True`, the artists' albums are included
+    in the graph. If ``expand_tracks`` is :class:`True`, each album is also
+    browsed with :class:`AlbumBrowser` to include its tracks.
+
+    The graph is emitted as dicts, called records, with a ``kind`` of either
+    ``node`` or ``edge``::
+
+        {"kind": "node", "type": "artist", "uri": ..., "name": ...,
+         "depth": 0}
+        {"kind": "edge", "type": "similar", "from": ..., "to": ...}
+        {"kind": "node", "type": "album", "uri": ..., "name": ...}
+        {"kind": "edge", "type": "album", "from": ..., "to": ...}
+        {"kind": "node", "type": "track", "uri": ..., "name": ...}
+        {"kind": "edge", "type": "track", "from": ..., "to": ...}
+
+    If ``callback`` isn't :class:`None`, it is called with each record. If
+    ``output`` is a file object or a path, each record is written to it as a
+    line of JSON. Files given by path are appended to, so that the output of
+    a resumed crawl continues where it stopped.
+
+    The crawl's progress can be saved with :meth:`save_checkpoint` and
+    restored with :meth:`load_checkpoint`. If ``checkpoint_path`` is set, a
+    checkpoint is saved there every ``checkpoint_interval`` browsed artists
+    and when the crawl ends. Artists and albums that were being browsed when
+    the checkpoint was saved are browsed again when the crawl is resumed, so
+    their records may be emitted twice.
+    """
+
+    def __init__(
+            self, session, max_depth=2, max_artists=1000, max_in_flight=4,
+            max_rate=None, expand_albums=False, expand_tracks=False,
+            callback=None, output=None, checkpoint_path=None,
+            checkpoint_interval=100):
+
+        if max_in_flight < 1:
+            raise ValueError('max_in_flight must be 1 or higher')
+        self._session = session
+        self.max_depth = max_depth
+        self.max_artists = max_artists
+        self.max_in_flight = max_in_flight
+        self.max_rate = max_rate
+        self.expand_albums = expand_albums or expand_tracks
+        self.expand_tracks = expand_tracks
+        self.callback = callback
+        self.output = output
+        self.checkpoint_path = checkpoint_path
+        self.checkpoint_interval = checkpoint_interval
+
+        self.artists = 0
+        self.albums = 0
+        self.errors = 0
+
+        self._seen_artists = set()
+        self._seen_albums = set()
+        self._artist_queue = collections.deque()
+        self._album_queue = collections.deque()
+        self._in_flight = {}
+        self._completed = collections.deque()
+        self._next_start = 0
+        self._checkpointed_artists = 0
+        self._file = None
+
+    artists = None
+    """Number of artists browsed so far."""
+
+    albums = None
+    """Number of albums browsed so far."""
+
+    errors = None
+    """Number of browse requests that failed."""
+
+    def crawl(self, seeds=(), timeout=None):
+        """Crawl the graph from the given seed artists.
+
+        ``seeds`` is an iterable of :class:`Artist` objects or artist URIs.
+        When resuming a crawl from a checkpoint, no seeds are needed.
+
+        Blocks until the crawl is complete. After ``timeout`` seconds
+        :exc:`~spotify.Timeout` is raised. The crawl can then be continued by
+        calling :meth:`crawl` again.
+        """
+        for seed in seeds:
+            if isinstance(seed, utils.string_types):
+                uri = utils.to_unicode(seed)
+            else:
+                uri = seed.link.uri
+            self._enqueue_artist(uri, 0)
+
+        deadline = None if timeout is None else time.time() + timeout
+        if isinstance(self.output, utils.string_types):
+            self._file = open(self.output, 'a')
+        else:
+            self._file = self.output
+        try:
+            while self._artist_queue or self._album_queue or self._in_flight:
+                self._start_browses()
+                if self._completed:
+                    while self._completed:
+                        self._browsed(*self._completed.popleft())
+                    if self.checkpoint_path is not None and (
+                            self.artists - self._checkpointed_artists >=
+                            self.checkpoint_interval):
+                        self.save_checkpoint(self.checkpoint_path)
+                    continue
+                if deadline is not None and time.time() > deadline:
+                    raise spotify.Timeout(timeout)
+                self._session.process_events()
+                time.sleep(0.001)
+        finally:
+            if self._file is not self.output:
+                self._file.close()
+            self._file = None
+        if self.checkpoint_path is not None:
+            self.save_checkpoint(self.checkpoint_path)
+
+    def save_checkpoint(self, path):
+        """Save the crawl's progress as JSON to the file at ``path``."""
+        artist_queue = [
+            [job[1], job[2]] for job in self._in_flight
+            if job[0] == 'artist']
+        artist_queue.extend([uri, depth] for _, uri, depth in (
+            self._artist_queue))
+        album_queue = [
+            [job[1], job[2]] for job in self._in_flight if job[0] == 'album']
+        album_queue.extend([uri, artist] for _, uri, artist in (
+            self._album_queue))
+        checkpoint = {
+            'version': 1,
+            'artists': self.artists,
+            'albums': self.albums,
+            'errors': self.errors,
+            'seen_artists': sorted(self._seen_artists),
+            'seen_albums': sorted(self._seen_albums),
+            'artist_queue': artist_queue,
+            'album_queue': album_queue,
+        }
+        tmp_path = '%s.tmp' % path
+        with open(tmp_path, 'w') as fh:
+            json.dump(checkpoint, fh)
+        if os.name == 'nt' and os.path.exists(path):
+            os.remove(path)
+        os.rename(tmp_path, path)
+        self._checkpointed_artists = self.artists
+        logger.debug('Saved crawl checkpoint to %s', path)
+
+    def load_checkpoint(self, path):
+        """Restore the crawl's progress from a file saved by
+        :meth:`save_checkpoint`.
+
+        Call :meth:`crawl` to continue the crawl.
+        """
+        with open(path) as fh:
+            checkpoint = json.load(fh)
+        if checkpoint.get('version') != 1:
+            raise ValueError(
+                'Unknown crawl checkpoint version: %r' %
+                checkpoint.get('version'))
+        self.artists = checkpoint['artists']
+        self.albums = checkpoint['albums']
+        self.errors = checkpoint['errors']
+        self._seen_artists = set(checkpoint['seen_artists'])
+        self._seen_albums = set(checkpoint['seen_albums'])
+        self._artist_queue = collections.deque(
+            ('artist', uri, depth)
+            for uri, depth in checkpoint['artist_queue'])
+        self._album_queue = collections.deque(
+            ('album', uri, artist)
+            for uri, artist in checkpoint['album_queue'])
+        self._in_flight = {}
+        self._completed = collections.deque()
+        self._checkpointed_artists = self.artists
+
+    def _enqueue_artist(self, uri, depth):
+        if uri in self._seen_artists:
+            return
+        if len(self._seen_artists) >= self.max_artists:
+            return
+        self._seen_artists.add(uri)
+        self._artist_queue.append(('artist', uri, depth))
+
+    def _enqueue_album(self, uri, artist_uri):
+        if uri in self._seen_albums:
+            return
+        self._seen_albums.add(uri)
+        self._album_queue.append(('album', uri, artist_uri))
+
+    def _start_browses(self):
+        while len(self._in_flight) < self.max_in_flight and (
+                self._album_queue or self._artist_queue):
+            if self.max_rate is not None:
+                now = time.time()
+                if now < self._next_start:
+                    return
+                self._next_start = now + 1.0 / self.max_rate
+            # Finish the albums of browsed artists before going deeper.
+            if self._album_queue:
+                job = self._album_queue.popleft()
+            else:
+                job = self._artist_queue.popleft()
+            self._start(job)
+
+    def _start(self, job):
+        def callback(browser):
+            self._completed.append((job, browser))
+
+        try:
+            if job[0] == 'artist':
+                fields = ['artist', 'similar_artists']
+                if self.expand_albums:
+                    fields.append('albums')
+                browser = spotify.Artist(job[1]).browse(
+                    fields=fields, callback=callback)
+            else:
+                browser = spotify.Album(job[1]).browse(callback=callback)
+        except ValueError as exc:
+            logger.warning('Failed to browse %s: %s', job[1], exc)
+            self.errors += 1
+            return
+        # Keep the browser alive until its callback has been called.
+        self._in_flight[job] = browser
+
+    def _browsed(self, job, browser):
+        try:
+            if browser.error != spotify.ErrorType.OK:
+                logger.warning(
+                    'Failed to browse %s: %r', job[1], browser.error)
+                self.errors += 1
+            elif job[0] == 'artist':
+                self._artist_browsed(job[1], job[2], browser)
+            else:
+                self._album_browsed(job[1], job[2], browser)
+        except BaseException:
+            # Browse it again if the crawl is continued or resumed.
+            if job[0] == 'artist':
+                self._artist_queue.appendleft(job)
+            else:
+                self._album_queue.appendleft(job)
+            raise
+        finally:
+            del self._in_flight[job]
+
+    def _artist_browsed(self, uri, depth, browser):
+        artist = browser.artist
+        self._emit({
+            'kind': 'node', 'type': 'artist', 'uri': uri,
+            'name': artist.name if artist is not None else None,
+            'depth': depth,
+        })
+        for similar_artist in browser.similar_artists:
+            similar_uri = similar_artist.link.uri
+            self._emit({
+                'kind': 'edge', 'type': 'similar',
+                'from': uri, 'to': similar_uri,
+            })
+            if depth < self.max_depth:
+                self._enqueue_artist(similar_uri, depth + 1)
+        if self.expand_albums:
+            for album in browser.albums:
+                album_uri = album.link.uri
+                if album_uri not in self._seen_albums:
+                    self._emit({
+                        'kind': 'node', 'type': 'album', 'uri': album_uri,
+                        'name': album.name,
+                    })
+                self._emit({
+                    'kind': 'edge', 'type': 'album',
+                    'from': uri, 'to': album_uri,
+                })
+                if self.expand_tracks:
+                    self._enqueue_album(album_uri, uri)
+                else:
+                    self._seen_albums.add(album_uri)
+        self.artists += 1
+
+    def _album_browsed(self, uri, artist_uri, browser):
+        for track in browser.tracks:
+            track_uri = track.link.uri
+            self._emit({
+                'kind': 'node', 'type': 'track', 'uri': track_uri,
+                'name': track.name,
+            })
+            self._emit({
+                'kind': 'edge', 'type': 'track',
+                'from': uri, 'to': track_uri,
+            })
+        self.albums += 1
+
+    def _emit(self, record):
+        if self.callback is not None:
+            self.callback(record)
+        if self._file is not None:
+            self._file.write(json.dumps(record) + '\n')
@@ -0,0 +1,229 @@
+from __future__ import unicode_literals
+
+import collections
+import logging
+import threading
+import time
+
+import spotify
+
+
+__all__ = [
+    'EventDispatcher',
+    'OverflowPolicy',
+]
+
+logger = logging.getLogger(__name__)
+
+
+class OverflowPolicy(object):
+    """What an :class:`EventDispatcher` does with a new event when its queue
+    is full."""
+
+    DROP_OLDEST = 'drop_oldest'
+    """Drop the oldest event in the queue to make room for the new event."""
+
+    COALESCE = 'coalesce'
+    """Drop the new event if an event of the same kind is already in the
+    queue, as the listeners will be called for that event soon anyway.
+    Otherwise, drop the oldest event in the queue.
+
+    Works well for events that only tell that something has changed, like
+    :attr:`SessionEvent.METADATA_UPDATED`.
+    """
+
+    BLOCK = 'block'
+    """Block the thread emitting the event until there is room in the queue.
+
+    If the emitting thread is inside a libspotify call, like the session
+    callbacks called from :meth:`Session.process_events` are, the oldest
+    event is dropped instead. Blocking would deadlock with any listener
+    calling libspotify, as the listener would wait for the emitting thread to
+    return from its libspotify call.
+    """
+
+
+class EventDispatcher(object):
+    """Calls event listeners from a worker thread instead of from the thread
+    emitting the event.
+
+    libspotify calls most :class:`Session` callbacks from its own internal
+    threads, and pyspotify calls your event listeners right away from those
+    threads. A slow listener thus stalls libspotify's networking and audio.
+    To avoid this, set :attr:`Session.dispatcher` to a started dispatcher::
+
+        >>> session = spotify.Session()
+        >>> session.dispatcher = spotify.EventDispatcher(max_size=1000)
+        >>> session.dispatcher.start()
+
+    All events emitted by the session are then put in a queue of at most
+    ``max_size`` events, and the listeners are called from the dispatcher's
+    worker thread, in the order the events were emitted. The session's
+    :attr:`~SessionEvent.MUSIC_DELIVERY` and
+    :attr:`~SessionEvent.GET_AUDIO_BUFFER_STATS` listeners are still called
+    right away, as libspotify needs their return values.
+
+    The ``overflow`` :class:`OverflowPolicy` decides what happens when an
+    event is emitted while the queue is full. It defaults to
+    :attr:`OverflowPolicy.DROP_OLDEST`.
+    """
+
+    def __init__(self, max_size=1000, overflow=OverflowPolicy.DROP_OLDEST):
+        if max_size < 1:
+            raise ValueError('max_size must be 1 or higher')
+        if overflow not in (
+                OverflowPolicy.DROP_OLDEST, OverflowPolicy.COALESCE,
+                OverflowPolicy.BLOCK):
+            raise ValueError('Unknown overflow policy: %r' % overflow)
+        self.max_size = max_size
+        self.overflow = overflow
+
+        self.delivered = 0
+        self.dropped = 0
+        self.coalesced = 0
+        self.max_queue_depth = 0
+
+        self._queue = collections.deque()
+        self._unfinished = 0
+        self._cond = threading.Condition(threading.Lock())
+        self._latencies = collections.deque(maxlen=1000)
+        self._thread = None
+        self._stopping = False
+
+    delivered = None
+    """Number of events delivered to listeners."""
+
+    dropped = None
+    """Number of events dropped because the queue was full."""
+
+    coalesced = None
+    """Number of events dropped because an event of the same kind was already
+    in the queue. Only used with :attr:`OverflowPolicy.COALESCE`."""
+
+    max_queue_depth = None
+    """The highest number of events waiting in the queue so far."""
+
+    @property
+    def queue_depth(self):
+        """Number of events waiting to be delivered."""
+        with self._cond:
+            return len(self._queue)
+
+    @property
+    def is_running(self):
+        """Whether the worker thread is running."""
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        """Start the worker thread delivering the events."""
+        with self._cond:
+            if self.is_running:
+                return
+            self._stopping = False
+            self._thread = threading.Thread(
+                target=self._run, name='SpotifyEventDispatcher')
+            self._thread.daemon = True
+            self._thread.start()
+
+    def stop(self, timeout=None):
+        """Stop the worker thread after it has delivered the events already
+        in the queue.
+
+        Waits up to ``timeout`` seconds for the worker thread to stop. If
+        ``timeout`` is :class:`None`, waits until it has stopped.
+        """
+        with self._cond:
+            thread = self._thread
+            self._stopping = True
+            self._cond.notify_all()
+        if thread is not None and thread is not threading.current_thread():
+            thread.join(timeout)
+
+    def flush(self, timeout=None):
+        """Block until all events in the queue have been delivered.
+
+        Returns :class:`True` if the queue was emptied, or :class:`False` if
+        ``timeout`` seconds passed first.
+        """
+        deadline = None if timeout is None else time.time() + timeout
+        with self._cond:
+            while self._unfinished:
+                remaining = None
+                if deadline is not None:
+                    remaining = deadline - time.time()
+                    if remaining <= 0:
+                        return False
+                self._cond.wait(remaining)
+            return True
+
+    def latency_percentiles(self, percentiles=(50, 90, 99)):
+        """Percentiles of the time in seconds from an event is put in the
+        queue until its listeners have been called.
+
+        Computed from the last 1000 delivered events. Returns a dict mapping
+        each percentile to a value, or to :class:`None` if no events has been
+        delivered yet.
+        """
+        with self._cond:
+            return spotify.scheduler._percentiles(
+                self._latencies, percentiles)
+
+    def put(self, event, func, args):
+        """Put ``event`` in the queue, to call ``func(event, *args)`` from the
+        worker thread.
+
+        Internal method.
+        """
+        with self._cond:
+            if len(self._queue) >= self.max_size:
+                if not self._make_room(event):
+                    return
+            self._queue.append((event, func, args, time.time()))
+            self._unfinished += 1
+            self.max_queue_depth = max(
+                self.max_queue_depth, len(self._queue))
+            self._cond.notify_all()
+
+    def _make_room(self, event):
+        # Called with the lock held. Returns whether the new event should be
+        # put in the queue.
+        if self.overflow == OverflowPolicy.BLOCK and not _holds_lib_lock():
+            # Listeners emitting events would wait for themselves forever
+            if threading.current_thread() is not self._thread:
+                while len(self._queue) >= self.max_size and self.is_running:
+                    self._cond.wait(0.1)
+            return True
+        if self.overflow == OverflowPolicy.COALESCE and any(
+                queued[0] == event for queued in self._queue):
+            self.coalesced += 1
+            return False
+        self._queue.popleft()
+        self._unfinished -= 1
+        self.dropped += 1
+        self._cond.notify_all()
+        return True
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._queue and not self._stopping:
+                    self._cond.wait()
+                if not self._queue:
+                    self._thread = None
+                    return
+                event, func, args, enqueued_at = self._queue.popleft()
+                self._cond.notify_all()
+            try:
+                func(event, *args)
+            except Exception:
+                logger.exception('Event listener for %r failed', event)
+            with self._cond:
+                self._latencies.append(time.time() - enqueued_at)
+                self.delivered += 1
+                self._unfinished -= 1
+                self._cond.notify_all()
+
+
+def _holds_lib_lock():
+    """Whether the current thread is inside a libspotify call."""
+    return spotify._lock_owner.depth > 0
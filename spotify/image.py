@@ -1,6 +1,7 @@
 from __future__ import unicode_literals
 
 import base64
+import collections
 import logging
 import threading
 
@@ -32,7 +33,7 @@ class Image(object):
     def __init__(self, uri=None, sp_image=None, add_ref=True):
         assert uri or sp_image, 'uri or sp_image is required'
         if uri is not None:
-            image = spotify.Link(uri).as_image()
+            image = spotify.link._resolve(uri, 'image')
             if image is None:
                 raise ValueError(
                     'Failed to get image from Spotify URI: %r' % uri)
@@ -42,7 +43,7 @@ class Image(object):
             lib.sp_image_add_ref(sp_image)
         self._sp_image = ffi.gc(sp_image, lib.sp_image_release)
         self.load_event = threading.Event()
-        self._callback_handles = set()
+        self._load_callbacks = collections.OrderedDict()
 
     def __repr__(self):
         return 'Image(%r)' % self.link.uri
@@ -50,31 +51,63 @@ class Image(object):
     load_event = None
     """:class:`threading.Event` that is set when the image is loaded."""
 
+    _load_handle = None
+
     def add_load_callback(self, callback):
         """Add callback to be called when the image data has loaded.
 
+        The callback is called with the :class:`Image` as its only argument.
+
         Returns a callback handle that can be used to remove the callback
         again.
 
-        Callbacks added after the image is loaded is called immediately.
+        Callbacks added after the image is loaded are called immediately, and
+        only once.
         """
-        # FIXME Currently, callbacks added before load doesn't seem to be
-        # called at all, while callbacks added after load is called
-        # immediately.
-        handle = ffi.new_handle((callback, self))
-        # TODO Think through the life cycle of the handle object. Can it happen
-        # that we GC the image and handle object, and then later the callback
-        # is called?
-        self._callback_handles.add(handle)
-        spotify.Error.maybe_raise(lib.sp_image_add_load_callback(
-            self._sp_image, _image_load_callback, handle))
+        handle = object()
+        with spotify._lock:
+            if not self.load_event.is_set():
+                if self.is_loaded:
+                    self._load_completed()
+                else:
+                    self._load_callbacks[handle] = callback
+                    self._add_native_load_callback()
+                    return handle
+        callback(self)
         return handle
 
     def remove_load_callback(self, handle):
         """Remove a callback which was added with :meth:`add_load_callback`."""
-        self._callback_handles.remove(handle)
-        spotify.Error.maybe_raise(lib.sp_image_remove_load_callback(
+        with spotify._lock:
+            del self._load_callbacks[handle]
+
+    def _add_native_load_callback(self):
+        # A single libspotify load callback is registered per image, and it
+        # calls all the callbacks added from Python. The image is kept alive
+        # by _loading_images until libspotify has called the load callback.
+        if self._load_handle is not None:
+            return
+        handle = ffi.new_handle(self)
+        spotify.Error.maybe_raise(lib.sp_image_add_load_callback(
             self._sp_image, _image_load_callback, handle))
+        self._load_handle = handle
+        _loading_images.add(handle)
+
+    def _load_completed(self):
+        with spotify._lock:
+            handle, self._load_handle = self._load_handle, None
+            if handle is not None:
+                _loading_images.discard(handle)
+                error = spotify.ErrorType(lib.sp_image_remove_load_callback(
+                    self._sp_image, _image_load_callback, handle))
+                if error != spotify.ErrorType.OK:
+                    logger.warning(
+                        'Failed to remove image load callback: %r', error)
+            self.load_event.set()
+            callbacks = list(self._load_callbacks.values())
+            self._load_callbacks.clear()
+        for callback in callbacks:
+            callback(self)
 
     @property
     def is_loaded(self):
@@ -97,7 +130,10 @@ class Image(object):
 
         The method returns ``self`` to allow for chaining of calls.
         """
-        return utils.load(self, timeout=timeout)
+        with spotify._lock:
+            if not self.load_event.is_set() and not self.is_loaded:
+                self._add_native_load_callback()
+        return utils.load(self, timeout=timeout, event=self.load_event)
 
     @property
     def format(self):
@@ -113,30 +149,81 @@ class Image(object):
     def data(self):
         """The raw image data as a bytestring.
 
+        This copies the image data on every access. If you only need to read
+        or write out the data, consider using :attr:`data_view` or
+        :meth:`write_to` instead.
+
         Will always return :class:`None` if the image isn't loaded.
         """
         if not self.is_loaded:
             return None
-        data_size_ptr = ffi.new('size_t *')
-        data = lib.sp_image_data(self._sp_image, data_size_ptr)
-        buffer_ = ffi.buffer(data, data_size_ptr[0])
+        buffer_ = self._get_data_buffer()
         data_bytes = buffer_[:]
-        assert len(data_bytes) == data_size_ptr[0], '%r == %r' % (
-            len(data_bytes), data_size_ptr[0])
+        assert len(data_bytes) == len(buffer_), '%r == %r' % (
+            len(data_bytes), len(buffer_))
         return data_bytes
 
+    @property
+    def data_view(self):
+        """The raw image data as a :class:`memoryview`.
+
+        The view points directly into libspotify's copy of the image data,
+        and keeps the image alive for as long as the view is in use.
+
+        Will always return :class:`None` if the image isn't loaded.
+        """
+        if not self.is_loaded:
+            return None
+        return memoryview(self._get_data_buffer())
+
+    def write_to(self, fileobj_or_path):
+        """Write the raw image data to a file.
+
+        ``fileobj_or_path`` is either a file object opened in binary mode, or
+        the path of a file to create or overwrite. The data is written
+        directly from libspotify's copy of the image data.
+
+        Returns the number of bytes written. Raises :exc:`RuntimeError` if the
+        image isn't loaded.
+        """
+        if not self.is_loaded:
+            raise RuntimeError('Image must be loaded to write it to a file')
+        buffer_ = self._get_data_buffer()
+        if isinstance(fileobj_or_path, utils.string_types):
+            with open(fileobj_or_path, 'wb') as fh:
+                fh.write(buffer_)
+        else:
+            fileobj_or_path.write(buffer_)
+        return len(buffer_)
+
+    def _get_data_buffer(self):
+        data_size_ptr = ffi.new('size_t *')
+        data = lib.sp_image_data(self._sp_image, data_size_ptr)
+        # The data is owned by the sp_image, so we keep a reference to it
+        # from the data pointer, which is in turn kept alive by the buffer.
+        sp_image = self._sp_image
+        data = ffi.gc(data, lambda _: sp_image)
+        return ffi.buffer(data, data_size_ptr[0])
+
     @property
     def data_uri(self):
         """The raw image data as a data: URI.
 
+        The URI is only built once per image.
+
         Will always return :class:`None` if the image isn't loaded.
         """
+        if self._data_uri is not None:
+            return self._data_uri
         if not self.is_loaded:
             return None
         if self.format is not ImageFormat.JPEG:
             raise ValueError('Unknown image format: %r' % self.format)
-        return 'data:image/jpeg;base64,%s' % (
-            base64.b64encode(self.data).decode('ascii'))
+        self._data_uri = 'data:image/jpeg;base64,%s' % (
+            base64.b64encode(self.data_view).decode('ascii'))
+        return self._data_uri
+
+    _data_uri = None
 
     @property
     def link(self):
@@ -145,16 +232,18 @@ class Image(object):
             sp_link=lib.sp_link_create_from_image(self._sp_image))
 
 
+# Handles of images waiting for their load callback to be called.
+_loading_images = set()
+
+
 @ffi.callback('void(sp_image *, void *)')
 def _image_load_callback(sp_image, handle):
     logger.debug('image_load_callback called')
     if handle is ffi.NULL:
         logger.warning('image_load_callback called without userdata')
         return
-    (callback, image) = ffi.from_handle(handle)
-    image._callback_handles.remove(handle)
-    if callback is not None:
-        callback(image)
+    image = ffi.from_handle(handle)
+    image._load_completed()
 
 
 @utils.make_enum('SP_IMAGE_FORMAT_')
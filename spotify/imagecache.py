@@ -0,0 +1,325 @@
+from __future__ import unicode_literals
+
+import binascii
+import collections
+import logging
+import os
+import re
+import tempfile
+import threading
+import time
+
+import spotify
+from spotify import ffi, lib, utils
+
+
+__all__ = [
+    'ImageCache',
+    'ImagePipeline',
+]
+
+logger = logging.getLogger(__name__)
+
+_IMAGE_ID_RE = re.compile(r'^[0-9a-f]{40}$')
+
+
+class ImageCache(object):
+    """An on-disk cache of image data.
+
+    Images are stored in the directory ``path``, one file per image, named
+    by the hex encoded 20 byte image ID libspotify uses to identify the
+    image. The directory may be shared by several processes.
+
+    The cache holds at most ``max_bytes`` of image data. When full, the least
+    recently used images are removed. Use is tracked by the files'
+    modification times, so the order survives restarts.
+    """
+
+    def __init__(self, path, max_bytes=50 * 1024 * 1024):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.size = 0
+
+        self._lock = threading.Lock()
+        self._entries = collections.OrderedDict()
+        self._scan()
+
+    hits = None
+    """Number of :meth:`get` calls that found the image in the cache."""
+
+    misses = None
+    """Number of :meth:`get` calls that didn't find the image in the
+    cache."""
+
+    size = None
+    """Total size in bytes of the images in the cache."""
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, image_id):
+        return _to_hex(image_id) in self._entries
+
+    def get(self, image_id):
+        """Get the data of the image with the given 20 byte ``image_id``.
+
+        Returns :class:`None` if the image isn't in the cache.
+        """
+        key = _to_hex(image_id)
+        path = self._get_path(key)
+        with self._lock:
+            if key not in self._entries:
+                self.misses += 1
+                return None
+            try:
+                with open(path, 'rb') as fh:
+                    data = fh.read()
+            except (IOError, OSError):
+                # Removed by another process sharing the directory
+                self.size -= self._entries.pop(key)
+                self.misses += 1
+                return None
+            self._entries[key] = self._entries.pop(key)
+            self.hits += 1
+        try:
+            os.utime(path, None)
+        except OSError:
+            pass
+        return data
+
+    def put(self, image_id, data):
+        """Store ``data`` for the image with the given 20 byte ``image_id``.
+        """
+        key = _to_hex(image_id)
+        path = self._get_path(key)
+        dirname = os.path.dirname(path)
+        if not os.path.isdir(dirname):
+            try:
+                os.makedirs(dirname)
+            except OSError:
+                if not os.path.isdir(dirname):
+                    raise
+        fd, tmp_path = tempfile.mkstemp(dir=dirname, suffix='.tmp')
+        with os.fdopen(fd, 'wb') as fh:
+            fh.write(data)
+        if os.name == 'nt' and os.path.exists(path):
+            os.remove(path)
+        os.rename(tmp_path, path)
+        with self._lock:
+            self.size += len(data) - self._entries.pop(key, 0)
+            self._entries[key] = len(data)
+            self._evict()
+
+    def clear(self):
+        """Remove all images from the cache."""
+        with self._lock:
+            while self._entries:
+                self._remove(*self._entries.popitem())
+
+    def _get_path(self, key):
+        return os.path.join(self.path, key[:2], key)
+
+    def _scan(self):
+        if not os.path.isdir(self.path):
+            os.makedirs(self.path)
+        entries = []
+        for dirpath, _, filenames in os.walk(self.path):
+            for filename in filenames:
+                if not _IMAGE_ID_RE.match(filename):
+                    continue
+                stat = os.stat(os.path.join(dirpath, filename))
+                entries.append((stat.st_mtime, filename, stat.st_size))
+        for _, key, size in sorted(entries):
+            self._entries[key] = size
+            self.size += size
+        with self._lock:
+            self._evict()
+
+    def _evict(self):
+        while self.size > self.max_bytes and self._entries:
+            self._remove(*self._entries.popitem(last=False))
+
+    def _remove(self, key, size):
+        self.size -= size
+        try:
+            os.remove(self._get_path(key))
+        except OSError:
+            pass
+
+
+class ImagePipeline(object):
+    """Fetches many images with bounded concurrency.
+
+    ``session`` is the :class:`Session` to use. If ``cache`` is an
+    :class:`ImageCache`, images are looked up in the cache before they're
+    loaded from libspotify, and images loaded from libspotify are added to
+    the cache. At most ``max_in_flight`` images are loaded from libspotify
+    at the same time. ``image_size`` is the :class:`ImageSize` of album
+    covers and artist portraits, by default :attr:`ImageSize.NORMAL`.
+
+    To fetch the covers of a list of albums::
+
+        >>> cache = spotify.ImageCache('/tmp/covers')
+        >>> pipeline = spotify.ImagePipeline(session, cache=cache)
+        >>> for album, data in pipeline.fetch(albums):
+        ...     print(album.name, len(data))
+    """
+
+    def __init__(self, session, cache=None, max_in_flight=8, image_size=None):
+        if max_in_flight < 1:
+            raise ValueError('max_in_flight must be 1 or higher')
+        if image_size is None:
+            image_size = spotify.ImageSize.NORMAL
+        self._session = session
+        self.cache = cache
+        self.max_in_flight = max_in_flight
+        self.image_size = image_size
+
+    def fetch(self, items, timeout=None):
+        """Fetch the image data for each item in ``items``.
+
+        ``items`` may contain :class:`Album` and :class:`Artist` objects, for
+        which the cover or portrait is fetched, :class:`Image` objects, and
+        image, album and artist URIs.
+
+        Returns a generator that yields ``(item, data)`` tuples in the order
+        the images are fetched. Images found in the cache are yielded without
+        using libspotify at all. ``data`` is :class:`None` if the album or
+        artist has no image, if the image failed to load, or if it wasn't
+        fetched within ``timeout`` seconds.
+
+        The generator calls :meth:`Session.process_events` while waiting for
+        images to load, so it must be consumed from the thread you use for
+        accessing Spotify.
+        """
+        targets = [(item, self._to_target(item)) for item in items]
+        return self._fetch(targets, timeout)
+
+    def _to_target(self, item):
+        if isinstance(item, utils.string_types):
+            uri = utils.to_unicode(item)
+            if uri.startswith('spotify:image:'):
+                hex_id = uri[len('spotify:image:'):]
+                if not _IMAGE_ID_RE.match(hex_id):
+                    raise ValueError('Invalid image URI: %r' % item)
+                return binascii.unhexlify(hex_id.encode('ascii'))
+            elif uri.startswith('spotify:album:'):
+                return spotify.Album(uri)
+            elif uri.startswith('spotify:artist:'):
+                return spotify.Artist(uri)
+            raise ValueError('Not an image, album or artist URI: %r' % item)
+        if isinstance(item, (spotify.Album, spotify.Artist, spotify.Image)):
+            return item
+        raise TypeError(
+            'Expected album, artist, image or URI, got %r' % (item,))
+
+    def _get_image_id(self, target):
+        """Returns the image ID, :class:`None` if there is no image, or
+        ``False`` if the album or artist isn't loaded yet."""
+        if isinstance(target, bytes):
+            return target
+        if isinstance(target, spotify.Image):
+            image_id = lib.sp_image_image_id(target._sp_image)
+        elif not target.is_loaded:
+            return False
+        elif isinstance(target, spotify.Album):
+            image_id = lib.sp_album_cover(
+                target._sp_album, int(self.image_size))
+        else:
+            image_id = lib.sp_artist_portrait(
+                target._sp_artist, int(self.image_size))
+        if image_id == ffi.NULL:
+            return None
+        return ffi.buffer(image_id, 20)[:]
+
+    def _create_image(self, image_id):
+        sp_image = lib.sp_image_create(
+            self._session._sp_session,
+            ffi.new('byte[]', list(bytearray(image_id))))
+        return spotify.Image(sp_image=sp_image, add_ref=False)
+
+    def _fetch(self, targets, timeout):
+        deadline = None if timeout is None else time.time() + timeout
+        unresolved = collections.deque(targets)
+        waiting = collections.OrderedDict()
+        in_flight = collections.OrderedDict()
+        loaded = collections.deque()
+
+        while unresolved or waiting or in_flight:
+            progress = False
+
+            for _ in range(len(unresolved)):
+                item, target = unresolved.popleft()
+                image_id = self._get_image_id(target)
+                if image_id is False:
+                    unresolved.append((item, target))
+                    continue
+                progress = True
+                if image_id is None:
+                    yield (item, None)
+                elif image_id in in_flight:
+                    in_flight[image_id][1].append(item)
+                elif image_id in waiting:
+                    waiting[image_id].append(item)
+                else:
+                    data = None
+                    if self.cache is not None:
+                        data = self.cache.get(image_id)
+                    if data is not None:
+                        yield (item, data)
+                    else:
+                        waiting[image_id] = [item]
+
+            while waiting and len(in_flight) < self.max_in_flight:
+                image_id, items = waiting.popitem(last=False)
+                image = self._create_image(image_id)
+                in_flight[image_id] = (image, items)
+                image.add_load_callback(
+                    lambda image, image_id=image_id: loaded.append(image_id))
+
+            # Also check the images directly, in case an image fails to load
+            # without libspotify calling its load callback.
+            done = list(loaded)
+            loaded.clear()
+            for image_id, (image, _) in in_flight.items():
+                if image.is_loaded or image.error not in (
+                        spotify.ErrorType.OK, spotify.ErrorType.IS_LOADING):
+                    done.append(image_id)
+
+            for image_id in done:
+                if image_id not in in_flight:
+                    continue
+                progress = True
+                image, items = in_flight.pop(image_id)
+                data = None
+                if image.is_loaded and image.error == spotify.ErrorType.OK:
+                    data = image.data
+                    if self.cache is not None:
+                        self.cache.put(image_id, data)
+                else:
+                    logger.warning(
+                        'Failed to load image %s: %r',
+                        _to_hex(image_id), image.error)
+                for item in items:
+                    yield (item, data)
+
+            if progress:
+                continue
+            if deadline is not None and time.time() > deadline:
+                for image, items in in_flight.values():
+                    for item in items:
+                        yield (item, None)
+                for items in waiting.values():
+                    for item in items:
+                        yield (item, None)
+                for item, _ in unresolved:
+                    yield (item, None)
+                return
+            self._session.process_events()
+            time.sleep(0.001)
+
+
+def _to_hex(image_id):
+    return binascii.hexlify(image_id).decode('ascii')
@@ -1,5 +1,7 @@
 from __future__ import unicode_literals
 
+import collections
+
 import spotify
 from spotify import ffi, lib, utils
 
@@ -7,6 +9,7 @@ from spotify import ffi, lib, utils
 __all__ = [
     'Link',
     'LinkType',
+    'UriCache',
 ]
 
 
@@ -32,6 +35,10 @@ class Link(object):
         Link('spotify:track:2Foc5Q5nqNiosCNqttzHof')
 
     You must create a :class:`Session` before you can create links.
+
+    Strings that obviously aren't Spotify URIs are rejected without calling
+    libspotify. To validate or classify URIs without creating links, use
+    :func:`parse_uri`.
     """
 
     def __init__(self, uri=None, sp_link=None, add_ref=True):
@@ -41,6 +48,9 @@ class Link(object):
             raise RuntimeError('Session must be initialized to create links')
 
         if uri is not None:
+            if not spotify.uri._could_be_uri(uri):
+                raise ValueError(
+                    'Failed to get link from Spotify URI: %r' % uri)
             sp_link = lib.sp_link_create_from_string(
                 ffi.new('char[]', utils.to_bytes(uri)))
             if sp_link == ffi.NULL:
@@ -120,3 +130,106 @@ class Link(object):
 @utils.make_enum('SP_LINKTYPE_')
 class LinkType(utils.IntEnum):
     pass
+
+
+class UriCache(object):
+    """A cache of objects resolved from URIs.
+
+    Assign an instance to :attr:`Session.uri_cache` to make
+    :class:`Track`, :class:`Album`, :class:`Artist`, :class:`Image`,
+    :class:`Playlist` and :class:`User` objects created from URIs, and
+    :meth:`Session.resolve_many`, reuse the libspotify objects of earlier
+    lookups of the same URIs::
+
+        >>> session.uri_cache = spotify.UriCache(max_size=5000)
+
+    Without a cache, each lookup creates and releases a :class:`Link`.
+
+    The cache keeps a reference to each libspotify object it holds, which is
+    released when the object is dropped from the cache. ``max_size`` is the
+    maximum number of objects to keep. When the cache is full, the least
+    recently used object is dropped.
+    """
+
+    def __init__(self, max_size=1000):
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._entries = collections.OrderedDict()
+
+    hits = None
+    """Number of lookups served from the cache."""
+
+    misses = None
+    """Number of lookups that had to go through a :class:`Link`."""
+
+    def __len__(self):
+        return len(self._entries)
+
+    def clear(self):
+        """Remove all objects from the cache."""
+        with spotify._lock:
+            self._entries.clear()
+
+    def resolve(self, uri, type):
+        """Get the object of the given ``type`` for ``uri``.
+
+        ``type`` is one of ``track``, ``album``, ``artist``, ``image``,
+        ``playlist`` and ``user``. Returns :class:`None` if the URI can't be
+        resolved to an object of that type.
+        """
+        key = (type, utils.to_unicode(uri))
+        with spotify._lock:
+            obj = self._entries.pop(key, None)
+            if obj is not None:
+                self._entries[key] = obj
+                self.hits += 1
+                return obj
+            self.misses += 1
+            obj = _resolve_uncached(uri, type)
+            if obj is not None:
+                self._entries[key] = obj
+                while len(self._entries) > self.max_size:
+                    self._entries.popitem(last=False)
+            return obj
+
+
+_URI_TYPES = {
+    LinkType.TRACK: 'track',
+    LinkType.ALBUM: 'album',
+    LinkType.ARTIST: 'artist',
+    LinkType.IMAGE: 'image',
+    LinkType.PLAYLIST: 'playlist',
+    LinkType.PROFILE: 'user',
+}
+
+
+def _resolve(uri, type):
+    """Resolve ``uri`` to an object of the given ``type``, using
+    :attr:`Session.uri_cache` if it is set."""
+    cache = getattr(spotify.session_instance, 'uri_cache', None)
+    if cache is not None:
+        return cache.resolve(uri, type)
+    return _resolve_uncached(uri, type)
+
+
+def _resolve_uncached(uri, type):
+    return getattr(spotify.Link(uri), 'as_%s' % type)()
+
+
+def _resolve_many(uris, cache):
+    result = []
+    with spotify._lock:
+        for uri in uris:
+            obj = None
+            type = _URI_TYPES.get(spotify.uri_type(uri))
+            if type is not None:
+                try:
+                    if cache is not None:
+                        obj = cache.resolve(uri, type)
+                    else:
+                        obj = _resolve_uncached(uri, type)
+                except ValueError:
+                    pass
+            result.append(obj)
+    return result
@@ -0,0 +1,270 @@
+from __future__ import unicode_literals
+
+import collections
+import json
+import logging
+import sqlite3
+import threading
+import time
+
+import spotify
+
+
+__all__ = [
+    'MetadataStore',
+]
+
+logger = logging.getLogger(__name__)
+
+
+class MetadataStore(object):
+    """A persistent store of track, album, artist and user metadata.
+
+    The store keeps snapshots of loaded :class:`Track`, :class:`Album`,
+    :class:`Artist` and :class:`User` objects in an SQLite database at
+    ``path``, keyed by URI. It is meant for warm restarts, where you want to
+    serve metadata right away instead of waiting for libspotify to load
+    everything again::
+
+        >>> store = spotify.MetadataStore('/var/cache/metadata.db', session)
+        >>> snapshots = store.get_many(uris)
+        >>> snapshots['spotify:track:2Foc5Q5nqNiosCNqttzHof']['name']
+        u'Get Lucky'
+
+    A snapshot is a dict with the object's ``uri``, its ``type``, the time it
+    was ``fetched`` at, as seconds since the epoch, and a selection of the
+    object's attributes. A snapshot is stale when it's older than ``ttl``
+    seconds.
+
+    Snapshots are written in batches of ``batch_size``. Call :meth:`flush` or
+    :meth:`close` to write any remaining snapshots.
+
+    If ``session`` is given, objects that are revalidated are stored when
+    the session emits :attr:`~SessionEvent.METADATA_UPDATED` after they're
+    loaded. Otherwise, you must call :meth:`process` yourself. Objects that
+    aren't loaded within ``revalidate_timeout`` seconds, or that fail to
+    load, are given up on until they're revalidated again.
+    """
+
+    def __init__(
+            self, path, session=None, ttl=24 * 60 * 60, batch_size=100,
+            revalidate_timeout=60):
+        self.path = path
+        self.ttl = ttl
+        self.batch_size = batch_size
+        self.revalidate_timeout = revalidate_timeout
+
+        self._lock = threading.RLock()
+        self._pending_writes = collections.OrderedDict()
+        self._revalidating = {}
+
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._connection.execute('PRAGMA journal_mode=WAL')
+        self._connection.execute('PRAGMA synchronous=NORMAL')
+        self._connection.execute(
+            'CREATE TABLE IF NOT EXISTS metadata ('
+            'uri TEXT PRIMARY KEY, '
+            'type TEXT NOT NULL, '
+            'fetched REAL NOT NULL, '
+            'data TEXT NOT NULL)')
+        self._connection.commit()
+
+        if session is not None:
+            session.on(
+                spotify.SessionEvent.METADATA_UPDATED, self._metadata_updated)
+
+    def put(self, obj):
+        """Store a snapshot of a loaded :class:`Track`, :class:`Album`,
+        :class:`Artist` or :class:`User`.
+
+        Returns the snapshot.
+        """
+        snapshot = _make_snapshot(obj)
+        with self._lock:
+            self._pending_writes[snapshot['uri']] = snapshot
+            if len(self._pending_writes) >= self.batch_size:
+                self.flush()
+        return snapshot
+
+    def get(self, uri):
+        """Get the snapshot for ``uri``, or :class:`None` if there is none.
+        """
+        return self.get_many([uri], revalidate=False).get(uri)
+
+    def get_many(self, uris, revalidate=True):
+        """Get the snapshots for many URIs at once.
+
+        Returns a dict mapping URIs to snapshots. URIs without a snapshot are
+        left out.
+
+        If ``revalidate`` is :class:`True`, objects that are missing or have
+        stale snapshots are loaded from libspotify in the background, and
+        their snapshots updated. See :meth:`revalidate`.
+        """
+        uris = list(uris)
+        result = {}
+        with self._lock:
+            remaining = []
+            for uri in uris:
+                if uri in self._pending_writes:
+                    result[uri] = self._pending_writes[uri]
+                else:
+                    remaining.append(uri)
+            # Stay below SQLite's default limit of 999 query parameters
+            for i in range(0, len(remaining), 500):
+                chunk = remaining[i:i + 500]
+                rows = self._connection.execute(
+                    'SELECT data FROM metadata WHERE uri IN (%s)' %
+                    ', '.join('?' * len(chunk)), chunk)
+                for (data,) in rows:
+                    snapshot = json.loads(data)
+                    result[snapshot['uri']] = snapshot
+        if revalidate:
+            self.revalidate(
+                uri for uri in uris
+                if uri not in result or self.is_stale(result[uri]))
+        return result
+
+    def is_stale(self, snapshot):
+        """Whether the snapshot is older than the store's ``ttl``."""
+        return time.time() - snapshot['fetched'] > self.ttl
+
+    def revalidate(self, uris):
+        """Load the objects with the given URIs from libspotify, and store
+        new snapshots when they're loaded.
+
+        Does not block. The snapshots are stored by :meth:`process`.
+        """
+        # The store's lock is never held while calling libspotify, as the
+        # METADATA_UPDATED listener is called with libspotify's lock held.
+        with self._lock:
+            uris = [uri for uri in uris if uri not in self._revalidating]
+        now = time.time()
+        for uri in uris:
+            try:
+                obj = _from_uri(uri)
+            except ValueError as exc:
+                logger.debug('Cannot revalidate %s: %s', uri, exc)
+                continue
+            with self._lock:
+                self._revalidating.setdefault(uri, (obj, now))
+        self.process()
+
+    def process(self):
+        """Store snapshots of revalidated objects that have been loaded.
+
+        Returns the number of objects still waiting to be loaded.
+        """
+        now = time.time()
+        with self._lock:
+            revalidating = list(self._revalidating.items())
+        for uri, entry in revalidating:
+            obj, started_at = entry
+            if obj.is_loaded:
+                if not self._stop_revalidating(uri, entry):
+                    continue
+                try:
+                    self.put(obj)
+                except spotify.LibError as exc:
+                    logger.debug('Cannot revalidate %s: %s', uri, exc)
+            elif now - started_at > self.revalidate_timeout:
+                if not self._stop_revalidating(uri, entry):
+                    continue
+                logger.debug(
+                    'Cannot revalidate %s: Not loaded in %d seconds',
+                    uri, self.revalidate_timeout)
+        with self._lock:
+            return len(self._revalidating)
+
+    def _stop_revalidating(self, uri, entry):
+        # Returns False if another thread got to the entry first
+        with self._lock:
+            if self._revalidating.get(uri) is not entry:
+                return False
+            del self._revalidating[uri]
+            return True
+
+    def flush(self):
+        """Write all pending snapshots to the database."""
+        with self._lock:
+            if not self._pending_writes:
+                return
+            rows = [
+                (uri, snapshot['type'], snapshot['fetched'],
+                    json.dumps(snapshot))
+                for uri, snapshot in self._pending_writes.items()]
+            with self._connection:
+                self._connection.executemany(
+                    'INSERT OR REPLACE INTO metadata '
+                    '(uri, type, fetched, data) VALUES (?, ?, ?, ?)', rows)
+            self._pending_writes.clear()
+            logger.debug('Wrote %d metadata snapshots', len(rows))
+
+    def close(self):
+        """Write all pending snapshots and close the database."""
+        with self._lock:
+            self.flush()
+            self._connection.close()
+
+    def _metadata_updated(self, session):
+        self.process()
+
+
+_URI_TYPES = {
+    spotify.LinkType.TRACK: 'track',
+    spotify.LinkType.ALBUM: 'album',
+    spotify.LinkType.ARTIST: 'artist',
+    spotify.LinkType.PROFILE: 'user',
+}
+
+
+def _from_uri(uri):
+    link_type = spotify.uri_type(uri)
+    if link_type not in _URI_TYPES:
+        raise ValueError('Unsupported link type: %r' % link_type)
+    obj = spotify.link._resolve(uri, _URI_TYPES[link_type])
+    if obj is None:
+        raise ValueError('Failed to get object from Spotify URI: %r' % uri)
+    return obj
+
+
+def _make_snapshot(obj):
+    if not obj.is_loaded:
+        raise ValueError('Only loaded objects can be stored: %r' % obj)
+    snapshot = {'uri': obj.link.uri, 'fetched': time.time()}
+    if isinstance(obj, spotify.Track):
+        album = obj.album
+        snapshot.update({
+            'type': 'track',
+            'name': obj.name,
+            'duration': obj.duration,
+            'popularity': obj.popularity,
+            'disc': obj.disc,
+            'index': obj.index,
+            'artists': [artist.link.uri for artist in obj.artists],
+            'album': album.link.uri if album is not None else None,
+        })
+    elif isinstance(obj, spotify.Album):
+        artist = obj.artist
+        snapshot.update({
+            'type': 'album',
+            'name': obj.name,
+            'year': obj.year,
+            'album_type': int(obj.type) if obj.type is not None else None,
+            'is_available': obj.is_available,
+            'artist': artist.link.uri if artist is not None else None,
+        })
+    elif isinstance(obj, spotify.Artist):
+        snapshot.update({
+            'type': 'artist',
+            'name': obj.name,
+        })
+    elif isinstance(obj, spotify.User):
+        snapshot.update({
+            'type': 'user',
+            'canonical_name': obj.canonical_name,
+            'display_name': obj.display_name,
+        })
+    else:
+        raise TypeError('Unsupported object type: %r' % obj)
+    return snapshot
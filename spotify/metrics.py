@@ -0,0 +1,191 @@
+from __future__ import unicode_literals
+
+import bisect
+import contextlib
+import threading
+import time
+
+import spotify
+
+
+__all__ = [
+    'Histogram',
+    'Metrics',
+]
+
+
+LATENCY_BUCKETS = (
+    0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0, float('inf'))
+"""Default upper bounds in seconds of the buckets of a :class:`Histogram`."""
+
+
+class Histogram(object):
+    """A histogram counting observed values in fixed buckets.
+
+    ``buckets`` is a sorted sequence of upper bounds. A value is counted in
+    the first bucket with an upper bound greater than or equal to the value.
+    Values larger than the last upper bound are only counted in :attr:`count`
+    and :attr:`sum`. By default, :data:`LATENCY_BUCKETS` is used.
+
+    The histogram is not thread safe on its own. :class:`Metrics` serializes
+    access to its histograms.
+    """
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * len(self.buckets)
+        self.count = 0
+        self.sum = 0.0
+
+    buckets = None
+    """The upper bounds of the buckets."""
+
+    counts = None
+    """The number of values counted in each bucket."""
+
+    count = None
+    """The number of observed values."""
+
+    sum = None
+    """The sum of all observed values."""
+
+    def observe(self, value):
+        """Count ``value`` in the histogram."""
+        index = bisect.bisect_left(self.buckets, value)
+        if index < len(self.counts):
+            self.counts[index] += 1
+        self.count += 1
+        self.sum += value
+
+    def snapshot(self):
+        """Get the histogram's state as a dict."""
+        return {
+            'buckets': list(zip(self.buckets, self.counts)),
+            'count': self.count,
+            'sum': self.sum,
+        }
+
+
+class Metrics(object):
+    """A collection of named counters and histograms.
+
+    Each :class:`Session` keeps its metrics in a :class:`Metrics` instance,
+    and :meth:`Session.metrics` returns a snapshot of it. Metrics are plain
+    counters and :class:`Histogram` instances, which are cheap enough to
+    always be enabled.
+
+    The counters and histograms are created the first time they are used.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters = {}
+        self._histograms = {}
+        self._started_at = self._exported_at = time.time()
+
+    def increment(self, name, value=1):
+        """Add ``value`` to the counter ``name``."""
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + value
+
+    def decrement(self, name, value=1):
+        """Subtract ``value`` from the counter ``name``."""
+        self.increment(name, -value)
+
+    def observe(self, name, value, buckets=LATENCY_BUCKETS):
+        """Count ``value`` in the histogram ``name``.
+
+        If the histogram doesn't exist yet, it is created with the given
+        ``buckets``.
+        """
+        with self._lock:
+            histogram = self._histograms.get(name)
+            if histogram is None:
+                histogram = self._histograms[name] = Histogram(buckets)
+            histogram.observe(value)
+
+    @contextlib.contextmanager
+    def timer(self, name, buckets=LATENCY_BUCKETS):
+        """Context manager counting the seconds spent in the ``with`` block in
+        the histogram ``name``."""
+        started_at = time.time()
+        try:
+            yield
+        finally:
+            self.observe(name, time.time() - started_at, buckets)
+
+    def snapshot(self):
+        """Get the current value of all metrics.
+
+        Returns a dict with the keys ``counters``, which maps counter names to
+        values, ``histograms``, which maps histogram names to the result of
+        :meth:`Histogram.snapshot`, ``time``, the time of the snapshot, and
+        ``uptime``, the number of seconds the metrics have been collected.
+        """
+        with self._lock:
+            now = time.time()
+            return {
+                'counters': dict(self._counters),
+                'histograms': dict(
+                    (name, histogram.snapshot())
+                    for name, histogram in self._histograms.items()),
+                'time': now,
+                'uptime': now - self._started_at,
+            }
+
+    def _maybe_export(self, exporter, interval):
+        """Call ``exporter`` with a :meth:`snapshot` if it's more than
+        ``interval`` seconds since the last export."""
+        now = time.time()
+        with self._lock:
+            if now - self._exported_at < interval:
+                return
+            self._exported_at = now
+        exporter(self.snapshot())
+
+    def reset(self):
+        """Reset all metrics."""
+        with self._lock:
+            self._counters.clear()
+            self._histograms.clear()
+            self._started_at = time.time()
+
+
+def _get_metrics():
+    """Get the current session's :class:`Metrics`, or :class:`None` if there
+    is no session."""
+    return getattr(spotify.session_instance, '_metrics', None)
+
+
+def _increment(name, value=1):
+    metrics = _get_metrics()
+    if metrics is not None:
+        metrics.increment(name, value)
+
+
+def _request_started(kind):
+    """Record that a request of the given ``kind`` was sent to libspotify.
+
+    Returns the time the request was started, to be passed to
+    :func:`_request_completed`.
+    """
+    _increment('requests.in_flight.' + kind)
+    return time.time()
+
+
+def _request_completed(kind, started_at):
+    """Record that a request of the given ``kind`` started at ``started_at``
+    is completed."""
+    metrics = _get_metrics()
+    if metrics is not None and started_at is not None:
+        metrics.decrement('requests.in_flight.' + kind)
+        metrics.observe(
+            'requests.latency.' + kind, time.time() - started_at)
+
+
+def _request_cancelled(kind, started_at):
+    """Record that a request of the given ``kind`` started at ``started_at``
+    was given up on before it completed."""
+    metrics = _get_metrics()
+    if metrics is not None and started_at is not None:
+        metrics.decrement('requests.in_flight.' + kind)
@@ -36,7 +36,7 @@ class Playlist(object):
     def __init__(self, uri=None, sp_playlist=None, add_ref=True):
         assert uri or sp_playlist, 'uri or sp_playlist is required'
         if uri is not None:
-            playlist = spotify.Link(uri).as_playlist()
+            playlist = spotify.link._resolve(uri, 'playlist')
             if playlist is None:
                 raise spotify.Error(
                     'Failed to get playlist from Spotify URI: %r' % uri)
@@ -435,14 +435,23 @@ class PlaylistContainer(collections.MutableSequence):
         # Required by collections.Sequence
 
         if isinstance(key, slice):
-            return list(self).__getitem__(key)
+            return [
+                self._get_item(i)
+                for i in range(*key.indices(self.__len__()))]
         if not isinstance(key, int):
             raise TypeError(
                 'list indices must be int or slice, not %s' %
                 key.__class__.__name__)
         if not 0 <= key < self.__len__():
             raise IndexError('list index out of range')
+        return self._get_item(key)
+
+    def __iter__(self):
+        # Get the length from libspotify once, instead of once per item
+        for i in range(self.__len__()):
+            yield self._get_item(i)
 
+    def _get_item(self, key):
         playlist_type = PlaylistType(lib.sp_playlistcontainer_playlist_type(
             self._sp_playlistcontainer, key))
 
@@ -597,7 +606,8 @@ class PlaylistContainer(collections.MutableSequence):
         """
         item = self[index]
         if isinstance(item, PlaylistFolder):
-            indexes = self._find_folder_indexes(self, item.id, recursive)
+            indexes = self._find_folder_indexes(
+                self._iter_folder_markers(), item.id, recursive)
         else:
             indexes = [index]
         for i in reversed(sorted(indexes)):
@@ -605,6 +615,27 @@ class PlaylistContainer(collections.MutableSequence):
                 lib.sp_playlistcontainer_remove_playlist(
                     self._sp_playlistcontainer, i))
 
+    def _iter_folder_markers(self):
+        """Iterate over the container, yielding a :class:`PlaylistFolder`
+        without a name for each folder start and end, and :class:`None` for
+        each playlist.
+
+        This is enough for :meth:`_find_folder_indexes`, and saves creating a
+        :class:`Playlist` and getting a folder name for each item.
+        """
+        for i in range(self.__len__()):
+            playlist_type = PlaylistType(
+                lib.sp_playlistcontainer_playlist_type(
+                    self._sp_playlistcontainer, i))
+            if playlist_type in (
+                    PlaylistType.START_FOLDER, PlaylistType.END_FOLDER):
+                yield PlaylistFolder(
+                    id=lib.sp_playlistcontainer_playlist_folder_id(
+                        self._sp_playlistcontainer, i),
+                    name=None, type=playlist_type)
+            else:
+                yield None
+
     @staticmethod
     def _find_folder_indexes(container, folder_id, recursive):
         indexes = []
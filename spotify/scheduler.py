@@ -0,0 +1,302 @@
+from __future__ import unicode_literals
+
+import collections
+import heapq
+import itertools
+import logging
+import threading
+import time
+
+import spotify
+from spotify import utils
+
+
+__all__ = [
+    'BrowseRequest',
+    'BrowseScheduler',
+]
+
+logger = logging.getLogger(__name__)
+
+
+class BrowseScheduler(object):
+    """A scheduler for album and artist browse requests.
+
+    :meth:`Album.browse` and :meth:`Artist.browse` start a browse request
+    right away. If you browse a lot, e.g. from both a user facing service and
+    a background crawler, you may use a :class:`BrowseScheduler` instead::
+
+        >>> scheduler = spotify.BrowseScheduler(max_in_flight=4)
+        >>> request = scheduler.browse_album(album, priority=10)
+        >>> request.load().browser
+        AlbumBrowser(u'spotify:album:6wXDbHLesy6zWqQawAa91d')
+
+    At most ``max_in_flight`` browse requests are sent to libspotify at the
+    same time. The rest are queued, and started in order of ``priority``,
+    highest first. Requests with the same priority are started in the order
+    they were made.
+
+    Completed browsers are cached by the URI of the album or artist. The
+    cache holds at most ``max_cache_size`` browsers, and drops the least
+    recently used browser when full. Cached browsers are reused for ``ttl``
+    seconds. If ``ttl`` is :class:`None`, they never expire. Browsers that
+    complete with an error are not cached.
+
+    The scheduler's queue is worked through as browse requests complete, so
+    you must keep calling :meth:`Session.process_events` as usual.
+    """
+
+    def __init__(self, max_in_flight=4, max_cache_size=500, ttl=3600):
+        if max_in_flight < 1:
+            raise ValueError('max_in_flight must be 1 or higher')
+        self.max_in_flight = max_in_flight
+        self.max_cache_size = max_cache_size
+        self.ttl = ttl
+
+        self.hits = 0
+        self.misses = 0
+        self.max_queue_depth = 0
+
+        self._queue = []
+        self._counter = itertools.count()
+        self._requests = {}
+        self._in_flight = 0
+        self._cache = collections.OrderedDict()
+        self._latencies = collections.deque(maxlen=1000)
+        self._backend_request_durations = collections.deque(maxlen=1000)
+
+    hits = None
+    """Number of browse requests served from the cache."""
+
+    misses = None
+    """Number of browse requests not served from the cache."""
+
+    max_queue_depth = None
+    """The highest number of browse requests waiting in the queue so far."""
+
+    @property
+    def queue_depth(self):
+        """Number of browse requests waiting to be started."""
+        with spotify._lock:
+            return len(self._requests) - self._in_flight
+
+    @property
+    def in_flight(self):
+        """Number of browse requests in progress in libspotify."""
+        return self._in_flight
+
+    def browse_album(self, album, callback=None, priority=0):
+        """Schedule browsing of an :class:`Album`.
+
+        Returns a :class:`BrowseRequest`. If ``callback`` isn't
+        :class:`None`, it is called with the :class:`AlbumBrowser` when the
+        browser is done loading, or with :class:`None` if the browser
+        couldn't be created.
+        """
+        return self._schedule(
+            key=('album', album.link.uri),
+            create=lambda cb: spotify.AlbumBrowser(album=album, callback=cb),
+            callback=callback, priority=priority)
+
+    def browse_artist(self, artist, type=None, callback=None, priority=0):
+        """Schedule browsing of an :class:`Artist`.
+
+        ``type`` is an :class:`ArtistBrowserType`, by default
+        :attr:`ArtistBrowserType.FULL`.
+
+        Returns a :class:`BrowseRequest`. If ``callback`` isn't
+        :class:`None`, it is called with the :class:`ArtistBrowser` when the
+        browser is done loading, or with :class:`None` if the browser
+        couldn't be created.
+        """
+        if type is None:
+            type = spotify.ArtistBrowserType.FULL
+        return self._schedule(
+            key=('artist', artist.link.uri, int(type)),
+            create=lambda cb: spotify.ArtistBrowser(
+                artist=artist, type=type, callback=cb),
+            callback=callback, priority=priority)
+
+    def clear_cache(self):
+        """Remove all browsers from the cache."""
+        with spotify._lock:
+            self._cache.clear()
+
+    def latency_percentiles(self, percentiles=(50, 90, 99)):
+        """Percentiles of the time in seconds from a browse request is made
+        until it completes, including time spent in the queue.
+
+        Computed from the last 1000 completed requests that wasn't served
+        from the cache. Returns a dict mapping each percentile to a value, or
+        to :class:`None` if no requests has completed yet.
+        """
+        with spotify._lock:
+            return _percentiles(self._latencies, percentiles)
+
+    def backend_request_duration_percentiles(self, percentiles=(50, 90, 99)):
+        """Percentiles of the browsers' ``backend_request_duration`` in ms.
+
+        Computed from the last 1000 completed requests that wasn't served
+        from libspotify's local cache. Returns a dict mapping each
+        percentile to a value, or to :class:`None` if no requests has
+        completed yet.
+        """
+        with spotify._lock:
+            return _percentiles(self._backend_request_durations, percentiles)
+
+    def _schedule(self, key, create, callback, priority):
+        failed = []
+        with spotify._lock:
+            entry = self._cache.pop(key, None)
+            if entry is not None and (
+                    self.ttl is None or time.time() - entry[1] <= self.ttl):
+                self._cache[key] = entry
+                self.hits += 1
+                request = BrowseRequest(key, priority)
+                request.browser = entry[0]
+                request.complete_event.set()
+            else:
+                self.misses += 1
+                request = self._requests.get(key)
+                if request is None:
+                    request = BrowseRequest(key, priority)
+                    request._create = create
+                    request._created = time.time()
+                    self._requests[key] = request
+                    self._push(request)
+                elif request.browser is None and priority > request.priority:
+                    # Bump the queued request. The old queue entry is
+                    # skipped when it reaches the head of the queue.
+                    request.priority = priority
+                    self._push(request)
+                if callback is not None:
+                    request._callbacks.append(callback)
+                    callback = None
+                failed = self._dispatch()
+
+        if callback is not None:
+            callback(request.browser)
+        self._call_failed(failed)
+        return request
+
+    def _push(self, request):
+        heapq.heappush(
+            self._queue, (-request.priority, next(self._counter), request))
+        self.max_queue_depth = max(self.max_queue_depth, self.queue_depth)
+
+    def _dispatch(self):
+        # Called with the lock held. Returns the requests whose browser
+        # couldn't be created, to be passed to _call_failed() when the lock
+        # is released.
+        failed = []
+        while self._queue and self._in_flight < self.max_in_flight:
+            neg_priority, _, request = heapq.heappop(self._queue)
+            if request.browser is not None or -neg_priority != (
+                    request.priority):
+                continue  # Already started, or bumped to higher priority
+            self._in_flight += 1
+            try:
+                request.browser = request._create(
+                    lambda browser, request=request: self._complete(
+                        request, browser))
+            except Exception as exc:
+                logger.warning('Failed to browse %s: %s', request.key[1], exc)
+                self._in_flight -= 1
+                self._requests.pop(request.key, None)
+                request._error = getattr(
+                    exc, 'error_type', spotify.ErrorType.OTHER_PERMANENT)
+                request.complete_event.set()
+                failed.append(request)
+        return failed
+
+    def _call_failed(self, failed):
+        for request in failed:
+            callbacks = request._callbacks
+            request._callbacks = []
+            for callback in callbacks:
+                callback(None)
+
+    def _complete(self, request, browser):
+        with spotify._lock:
+            self._in_flight -= 1
+            self._requests.pop(request.key, None)
+            self._latencies.append(time.time() - request._created)
+            if browser.error is spotify.ErrorType.OK:
+                duration = browser.backend_request_duration
+                if duration is not None and duration >= 0:
+                    self._backend_request_durations.append(duration)
+                self._cache.pop(request.key, None)
+                self._cache[request.key] = (browser, time.time())
+                while len(self._cache) > self.max_cache_size:
+                    self._cache.popitem(last=False)
+            request.complete_event.set()
+            callbacks = request._callbacks
+            request._callbacks = []
+            failed = self._dispatch()
+        for callback in callbacks:
+            callback(browser)
+        self._call_failed(failed)
+
+
+class BrowseRequest(object):
+    """A browse request made through a :class:`BrowseScheduler`.
+
+    You'll never need to create an instance of this class yourself.
+    """
+
+    def __init__(self, key, priority):
+        self.key = key
+        self.priority = priority
+        self.browser = None
+        self.complete_event = threading.Event()
+        self._callbacks = []
+        self._error = None
+
+    browser = None
+    """The :class:`AlbumBrowser` or :class:`ArtistBrowser`, or
+    :class:`None` if the request is still waiting in the queue or the
+    browser couldn't be created."""
+
+    complete_event = None
+    """:class:`threading.Event` that is set when the browser is loaded."""
+
+    def __repr__(self):
+        return 'BrowseRequest(%r, priority=%d)' % (
+            self.key[1], self.priority)
+
+    @property
+    def is_loaded(self):
+        """Whether the browser's data is loaded."""
+        return self.browser is not None and self.browser.is_loaded
+
+    @property
+    def error(self):
+        """The browser's :class:`ErrorType`, or
+        :attr:`ErrorType.IS_LOADING` if the request is still queued."""
+        if self._error is not None:
+            return self._error
+        if self.browser is None:
+            return spotify.ErrorType.IS_LOADING
+        return self.browser.error
+
+    def load(self, timeout=None):
+        """Block until the browser's data is loaded.
+
+        After ``timeout`` seconds with no results :exc:`~spotify.Timeout` is
+        raised. If ``timeout`` is :class:`None` the default timeout is used.
+
+        The method returns ``self`` to allow for chaining of calls.
+        """
+        return utils.load(self, timeout=timeout)
+
+
+def _percentiles(values, percentiles):
+    values = sorted(values)
+    result = {}
+    for percentile in percentiles:
+        if not values:
+            result[percentile] = None
+            continue
+        index = int(percentile / 100.0 * (len(values) - 1) + 0.5)
+        result[percentile] = values[index]
+    return result
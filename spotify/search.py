@@ -3,6 +3,7 @@ from __future__ import unicode_literals
 import collections
 import logging
 import threading
+import time
 
 import spotify
 from spotify import ffi, lib, utils
@@ -10,6 +11,7 @@ from spotify import ffi, lib, utils
 
 __all__ = [
     'Search',
+    'SearchCache',
     'SearchPlaylist',
     'SearchType',
 ]
@@ -30,12 +32,20 @@ class Search(object):
             album_offset=0, album_count=20,
             artist_offset=0, artist_count=20,
             playlist_offset=0, playlist_count=20,
-            search_type=None,
+            search_type=None, want=None,
             sp_search=None, add_ref=True):
 
         assert query or sp_search, 'query or sp_search is required'
 
+        if want is not None:
+            want = tuple(want)
+            track_count, album_count, artist_count, playlist_count = (
+                _project(
+                    want, track_count, album_count, artist_count,
+                    playlist_count))
+
         self.callback = callback
+        self._query = query if sp_search is None else None
         self.track_offset = track_offset
         self.track_count = track_count
         self.album_offset = album_offset
@@ -47,9 +57,11 @@ class Search(object):
         if search_type is None:
             search_type = SearchType.STANDARD
         self.search_type = search_type
+        self.want = want
 
         self.complete_event = threading.Event()
         self._callback_handles = set()
+        self._pending_callbacks = []
 
         if sp_search is None:
             query = ffi.new('char[]', utils.to_bytes(query))
@@ -60,6 +72,7 @@ class Search(object):
             # the callback is called?
             self._callback_handles.add(handle)
 
+            self._requested_at = spotify.metrics._request_started('Search')
             sp_search = lib.sp_search_create(
                 spotify.session_instance._sp_session, query,
                 track_offset, track_count,
@@ -76,9 +89,52 @@ class Search(object):
     complete_event = None
     """:class:`threading.Event` that is set when the search is completed."""
 
+    want = None
+    """The result categories requested, e.g. ``('tracks',)``, or
+    :class:`None` if all categories was requested.
+
+    See :meth:`Session.search`.
+    """
+
     def __repr__(self):
         return 'Search(%r)' % self.link.uri
 
+    def _add_complete_callback(self, callback):
+        """Call ``callback`` with the search when it completes.
+
+        If the search has already completed, ``callback`` is called
+        immediately.
+
+        Internal method.
+        """
+        with spotify._lock:
+            if not self.complete_event.is_set():
+                self._pending_callbacks.append(callback)
+                return
+        callback(self)
+
+    def _cancel(self):
+        """Drop all callbacks and release the libspotify search object.
+
+        The search cannot be used after it has been cancelled.
+
+        Internal method.
+        """
+        with spotify._lock:
+            if not self._cancelled and not self.complete_event.is_set():
+                spotify.metrics._request_cancelled(
+                    'Search', self._requested_at)
+            # Don't count the request as completed if libspotify still
+            # calls the search complete callback
+            self._requested_at = None
+            self._cancelled = True
+            self._pending_callbacks = []
+            self._sp_search = None
+
+    _cancelled = False
+
+    _requested_at = None
+
     @property
     def is_loaded(self):
         """Whether the search's data is loaded."""
@@ -266,12 +322,12 @@ class Search(object):
     def more(
             self, callback=None,
             track_count=None, album_count=None, artist_count=None,
-            playlist_count=None):
+            playlist_count=None, want=None):
         """Get the next page of search results for the same query.
 
-        If called without arguments, the ``callback`` and ``*_count`` arguments
-        from the original search is reused. If anything other than
-        :class:`None` is specified, the value is used instead.
+        If called without arguments, the ``callback``, ``*_count``, and
+        ``want`` arguments from the original search is reused. If anything
+        other than :class:`None` is specified, the value is used instead.
         """
         callback = callback or self.callback
         track_offset = self.track_offset + self.track_count
@@ -283,13 +339,105 @@ class Search(object):
         playlist_offset = self.playlist_offset + self.playlist_count
         playlist_count = playlist_count or self.playlist_count
 
+        # Reuse the query we were created with, if any, so that the next page
+        # can be requested before this page has finished loading.
+        query = self._query or self.query
+
+        if want is None:
+            want = self.want
+
         return Search(
-            query=self.query, callback=callback,
+            query=query, callback=callback,
             track_offset=track_offset, track_count=track_count,
             album_offset=album_offset, album_count=album_count,
             artist_offset=artist_offset, artist_count=artist_count,
             playlist_offset=playlist_offset, playlist_count=playlist_count,
-            search_type=self.search_type)
+            search_type=self.search_type, want=want)
+
+    def iter_tracks(self, page_size=None, prefetch=1, timeout=None):
+        """Iterate over all tracks matching the search query, across pages.
+
+        The tracks of this search are yielded first. Further pages are
+        requested with :meth:`more` as the iteration progresses, until
+        :attr:`track_total` tracks have been yielded.
+
+        ``page_size`` is the number of tracks to request per page. If
+        :class:`None`, the ``track_count`` of this search is reused.
+
+        ``prefetch`` is the number of pages to request ahead of the page
+        currently being consumed. The default of 1 requests page N+1 when
+        iteration over page N starts. If set to 0, the next page isn't
+        requested before the current page is exhausted.
+
+        Each page is loaded with :meth:`load`, using the given ``timeout``.
+        """
+        return self._iter_pages('track', page_size, prefetch, timeout)
+
+    def iter_albums(self, page_size=None, prefetch=1, timeout=None):
+        """Iterate over all albums matching the search query, across pages.
+
+        See :meth:`iter_tracks` for a description of the arguments.
+        """
+        return self._iter_pages('album', page_size, prefetch, timeout)
+
+    def iter_artists(self, page_size=None, prefetch=1, timeout=None):
+        """Iterate over all artists matching the search query, across pages.
+
+        See :meth:`iter_tracks` for a description of the arguments.
+        """
+        return self._iter_pages('artist', page_size, prefetch, timeout)
+
+    def iter_playlists(self, page_size=None, prefetch=1, timeout=None):
+        """Iterate over all playlists matching the search query, across pages.
+
+        See :meth:`iter_tracks` for a description of the arguments.
+        """
+        return self._iter_pages('playlist', page_size, prefetch, timeout)
+
+    def _iter_pages(self, kind, page_size, prefetch, timeout):
+        if page_size is not None and page_size < 1:
+            raise ValueError('page_size must be 1 or higher')
+        if prefetch < 0:
+            raise ValueError('prefetch must be 0 or higher')
+        return self._generate_pages(kind, page_size, prefetch, timeout)
+
+    def _generate_pages(self, kind, page_size, prefetch, timeout):
+        # Only ask for the kind of results we're iterating over on the
+        # following pages.
+        more_kwargs = {'%s_count' % kind: page_size, 'want': ['%ss' % kind]}
+
+        def has_more(search, total):
+            offset = getattr(search, '%s_offset' % kind)
+            count = getattr(search, '%s_count' % kind)
+            return count > 0 and offset + count < total
+
+        self.load(timeout=timeout)
+        total = getattr(self, '%s_total' % kind)
+        position = getattr(self, '%s_offset' % kind)
+        search = last = self
+        pending = collections.deque()
+
+        while True:
+            while len(pending) < prefetch and has_more(last, total):
+                last = last.more(**more_kwargs)
+                pending.append(last)
+
+            search.load(timeout=timeout)
+            results = getattr(search, '%ss' % kind)
+            if len(results) == 0:
+                return
+            for result in results:
+                if position >= total:
+                    return
+                yield result
+                position += 1
+
+            if not pending and has_more(last, total):
+                last = last.more(**more_kwargs)
+                pending.append(last)
+            if not pending:
+                return
+            search = pending.popleft()
 
     @property
     def link(self):
@@ -306,9 +454,276 @@ def _search_complete_callback(sp_search, handle):
         return
     (callback, search_result) = ffi.from_handle(handle)
     search_result._callback_handles.remove(handle)
-    search_result.complete_event.set()
+    spotify.metrics._request_completed('Search', search_result._requested_at)
+    if search_result._cancelled:
+        return
+    with spotify._lock:
+        search_result.complete_event.set()
+        pending_callbacks = search_result._pending_callbacks
+        search_result._pending_callbacks = []
     if callback is not None:
         callback(search_result)
+    for pending_callback in pending_callbacks:
+        pending_callback(search_result)
+
+
+_SEARCH_CATEGORIES = ('tracks', 'albums', 'artists', 'playlists')
+
+
+def _project(want, track_count, album_count, artist_count, playlist_count):
+    """Zero the counts of the search result categories not in ``want``.
+
+    Internal function.
+    """
+    unknown = set(want) - set(_SEARCH_CATEGORIES)
+    if unknown:
+        raise ValueError(
+            'Unknown search result categories: %s' %
+            ', '.join(sorted(unknown)))
+    counts = (track_count, album_count, artist_count, playlist_count)
+    return tuple(
+        count if category in want else 0
+        for category, count in zip(_SEARCH_CATEGORIES, counts))
+
+
+class SearchCache(object):
+    """A cache of search results.
+
+    Assign an instance to :attr:`Session.search_cache` to make
+    :meth:`Session.search` reuse the results of earlier identical searches::
+
+        >>> session.search_cache = spotify.SearchCache(max_size=500, ttl=60)
+
+    Searches are identical if they have the same query, offsets, counts, and
+    search type. A search that is still in progress is shared by all callers
+    asking for it, and all their callbacks are called when it completes.
+    Searches that complete with an error are removed from the cache.
+
+    ``max_size`` is the maximum number of searches to keep. When the cache is
+    full, the least recently used search is dropped.
+
+    ``ttl`` is the number of seconds a search is reused after it was created.
+    If :class:`None`, searches never expire.
+    """
+
+    def __init__(self, max_size=100, ttl=300):
+        self.max_size = max_size
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self._entries = collections.OrderedDict()
+
+    hits = None
+    """Number of searches served from a completed search in the cache."""
+
+    misses = None
+    """Number of searches that had to be sent to Spotify."""
+
+    coalesced = None
+    """Number of searches that joined an identical search in progress."""
+
+    def __len__(self):
+        return len(self._entries)
+
+    def clear(self):
+        """Remove all searches from the cache."""
+        with spotify._lock:
+            self._entries.clear()
+
+    def search(
+            self, query, callback=None,
+            track_offset=0, track_count=20,
+            album_offset=0, album_count=20,
+            artist_offset=0, artist_count=20,
+            playlist_offset=0, playlist_count=20,
+            search_type=None, want=None):
+        """Get a :class:`Search` from the cache, or create it if needed.
+
+        Takes the same arguments as :meth:`Session.search`. If the search is
+        already completed, ``callback`` is called immediately.
+        """
+        if want is not None:
+            want = tuple(want)
+            track_count, album_count, artist_count, playlist_count = (
+                _project(
+                    want, track_count, album_count, artist_count,
+                    playlist_count))
+        if search_type is None:
+            search_type = SearchType.STANDARD
+        key = (
+            utils.to_unicode(query),
+            track_offset, track_count,
+            album_offset, album_count,
+            artist_offset, artist_count,
+            playlist_offset, playlist_count,
+            int(search_type))
+
+        with spotify._lock:
+            entry = self._entries.pop(key, None)
+            if entry is not None and self._is_expired(entry):
+                entry = None
+            if entry is not None:
+                self._entries[key] = entry
+                search = entry[0]
+                if search.complete_event.is_set():
+                    self.hits += 1
+                else:
+                    self.coalesced += 1
+            else:
+                self.misses += 1
+                # The search is shared, so the caller's callback must not be
+                # stored on it, where more() would pick it up
+                search = Search(
+                    query=query, callback=None,
+                    track_offset=track_offset, track_count=track_count,
+                    album_offset=album_offset, album_count=album_count,
+                    artist_offset=artist_offset, artist_count=artist_count,
+                    playlist_offset=playlist_offset,
+                    playlist_count=playlist_count,
+                    search_type=search_type, want=want)
+                self._entries[key] = (search, time.time())
+                search._add_complete_callback(
+                    lambda search: self._search_completed(key, search))
+                while len(self._entries) > self.max_size:
+                    self._entries.popitem(last=False)
+
+        if callback is not None:
+            search._add_complete_callback(callback)
+        return search
+
+    def _discard(self, search):
+        """Remove ``search`` from the cache, so identical searches create a
+        new search."""
+        with spotify._lock:
+            for key, entry in list(self._entries.items()):
+                if entry[0] is search:
+                    del self._entries[key]
+
+    def _is_expired(self, entry):
+        return self.ttl is not None and time.time() - entry[1] > self.ttl
+
+    def _search_completed(self, key, search):
+        if search.error is spotify.ErrorType.OK:
+            return
+        with spotify._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] is search:
+                del self._entries[key]
+
+
+class _Suggester(object):
+    """Debounced :attr:`SearchType.SUGGEST` searches for
+    :meth:`Session.suggest`.
+
+    Internal class.
+    """
+
+    def __init__(self, max_results=100, ttl=60):
+        self.max_results = max_results
+        self.ttl = ttl
+        self._states = {}
+        self._results = collections.OrderedDict()
+
+    def suggest(self, key, prefix, callback, delay, reuse, kwargs):
+        prefix = utils.to_unicode(prefix)
+        options = tuple(sorted(kwargs.items()))
+
+        with spotify._lock:
+            state = self._states.get(key)
+            if state is None:
+                state = self._states[key] = _SuggestState(key)
+            state.generation += 1
+            generation = state.generation
+            if state.timer is not None:
+                state.timer.cancel()
+                state.timer = None
+            if state.search is not None:
+                state.search._cancel()
+                state.search = None
+
+            cached = exact = None
+            if reuse:
+                cached, exact = self._find_result(prefix, options)
+
+            if not exact:
+                if delay:
+                    state.timer = threading.Timer(
+                        delay, self._start,
+                        (state, generation, prefix, callback, kwargs))
+                    state.timer.daemon = True
+                    state.timer.start()
+                else:
+                    self._start(state, generation, prefix, callback, kwargs)
+            self._drop_if_idle(state)
+
+        if cached is not None:
+            callback(cached)
+
+    def _find_result(self, prefix, options):
+        # Returns a cached search for the prefix itself, or else for the
+        # shortest longer prefix, e.g. when the user has deleted characters.
+        best = None
+        for (cached_prefix, cached_options), (search, created) in list(
+                self._results.items()):
+            if self.ttl is not None and time.time() - created > self.ttl:
+                del self._results[(cached_prefix, cached_options)]
+                continue
+            if cached_options != options:
+                continue
+            if cached_prefix == prefix:
+                self._results[(prefix, options)] = self._results.pop(
+                    (prefix, options))
+                return search, True
+            if cached_prefix.startswith(prefix) and (
+                    best is None or len(cached_prefix) < len(best[0])):
+                best = (cached_prefix, search)
+        return (best[1] if best else None), False
+
+    def _start(self, state, generation, prefix, callback, kwargs):
+        with spotify._lock:
+            if state.generation != generation:
+                return
+            state.timer = None
+            state.search = Search(
+                query=prefix,
+                callback=lambda search: self._complete(
+                    state, search, prefix, callback, kwargs),
+                search_type=SearchType.SUGGEST, **kwargs)
+
+    def _complete(self, state, search, prefix, callback, kwargs):
+        with spotify._lock:
+            if state.search is not search:
+                return
+            state.search = None
+            self._drop_if_idle(state)
+            if search.error is spotify.ErrorType.OK:
+                key = (prefix, tuple(sorted(kwargs.items())))
+                self._results.pop(key, None)
+                self._results[key] = (search, time.time())
+                while len(self._results) > self.max_results:
+                    self._results.popitem(last=False)
+        callback(search)
+
+    def _drop_if_idle(self, state):
+        # Forget keys without a pending search, so the states don't pile up
+        # when suggest() is called with many different keys.
+        if state.timer is None and state.search is None:
+            if self._states.get(state.key) is state:
+                del self._states[state.key]
+
+
+class _SuggestState(object):
+    """The latest suggest search for a :meth:`Session.suggest` key.
+
+    Internal class.
+    """
+
+    def __init__(self, key):
+        self.key = key
+        self.generation = 0
+        self.timer = None
+        self.search = None
 
 
 class SearchPlaylist(collections.namedtuple(
@@ -1,11 +1,13 @@
 from __future__ import unicode_literals
 
+import collections
 import functools
 import logging
 import operator
+import time
 
 import spotify
-from spotify import ffi, lib, utils
+from spotify import ffi, lib, trace, utils
 
 
 __all__ = [
@@ -263,6 +265,9 @@ class Session(utils.EventEmitter):
         self.offline = Offline(self)
         self.player = Player(self)
         self.social = Social(self)
+        self._metadata_generation = 0
+        self._metrics = spotify.Metrics()
+        self._connection_state = None
         spotify.session_instance = self
 
     offline = None
@@ -276,6 +281,93 @@ class Session(utils.EventEmitter):
     """A :class:`~spotify.session.Social` instance for controlling social
     sharing."""
 
+    search_cache = None
+    """A :class:`SearchCache` used by :meth:`search`, or :class:`None` to not
+    cache searches.
+
+    Defaults to :class:`None`.
+    """
+
+    uri_cache = None
+    """A :class:`UriCache` used when creating objects from URIs, or
+    :class:`None` to create a new :class:`Link` for each lookup.
+
+    Defaults to :class:`None`.
+    """
+
+    dispatcher = None
+    """An :class:`EventDispatcher` used to call event listeners from its
+    worker thread, or :class:`None` to call them from the thread emitting the
+    event.
+
+    Defaults to :class:`None`.
+    """
+
+    bitrate_controller = None
+    """A :class:`BitrateController` used to adapt the streaming bitrate to
+    stutters and buffer levels, or :class:`None` to keep the bitrate set
+    with :meth:`preferred_bitrate`.
+
+    Defaults to :class:`None`.
+    """
+
+    metrics_exporter = None
+    """A function called with :meth:`metrics` every
+    :attr:`metrics_export_interval` seconds, or :class:`None` to not export
+    metrics.
+
+    The function is called from :meth:`process_events`, so it should return
+    quickly, e.g. by handing the metrics over to another thread.
+
+    Defaults to :class:`None`.
+    """
+
+    metrics_export_interval = 10
+    """Minimum number of seconds between each call to
+    :attr:`metrics_exporter`.
+
+    Defaults to 10.
+    """
+
+    def metrics(self):
+        """Get a snapshot of the session's metrics.
+
+        Returns a dict as described in :meth:`Metrics.snapshot`. The counters
+        and histograms include:
+
+        - ``events.<event>``: number of each :class:`SessionEvent` emitted.
+        - ``process_events.calls`` and the histogram
+          ``process_events.duration``: calls to :meth:`process_events` and
+          their duration in seconds. Divide the calls by ``uptime`` to get the
+          call rate.
+        - ``loads.pending.<type>``, ``loads.completed.<type>``, and
+          ``loads.timeouts.<type>``: calls to ``load()`` on objects of each
+          type.
+        - ``requests.in_flight.<type>`` and the histogram
+          ``requests.latency.<type>``: :class:`Search`, :class:`Toplist`,
+          :class:`AlbumBrowser` and :class:`ArtistBrowser` requests waiting
+          for libspotify, and their completion latency in seconds.
+        - ``music_delivery.frames`` and ``music_delivery.bytes``: audio
+          consumed by the :attr:`~SessionEvent.MUSIC_DELIVERY` listener.
+        - ``connection_state.<from>-><to>``: number of each
+          :class:`ConnectionState` transition.
+        """
+        return self._metrics.snapshot()
+
+    def emit(self, event, *event_args):
+        """Call the registered listeners for ``event``.
+
+        If :attr:`dispatcher` is set, the event is put in the dispatcher's
+        queue, and the listeners are called later from its worker thread.
+        """
+        self._metrics.increment('events.' + event)
+        dispatcher = self.dispatcher
+        if dispatcher is None:
+            return super(Session, self).emit(event, *event_args)
+        if not self._listeners.get(event):
+            return
+        dispatcher.put(event, super(Session, self).emit, event_args)
+
     def login(self, username, password=None, remember_me=False, blob=None):
         """Authenticate to Spotify's servers.
 
@@ -387,8 +479,17 @@ class Session(utils.EventEmitter):
         """
         next_timeout = ffi.new('int *')
 
-        spotify.Error.maybe_raise(lib.sp_session_process_events(
-            self._sp_session, next_timeout))
+        with self._metrics.timer('process_events.duration'):
+            spotify.Error.maybe_raise(lib.sp_session_process_events(
+                self._sp_session, next_timeout))
+        self._metrics.increment('process_events.calls')
+
+        if self.metrics_exporter is not None:
+            self._metrics._maybe_export(
+                self.metrics_exporter, self.metrics_export_interval)
+
+        if self.bitrate_controller is not None:
+            self.bitrate_controller._maybe_apply(self)
 
         return next_timeout[0]
 
@@ -461,7 +562,10 @@ class Session(utils.EventEmitter):
         return spotify.PlaylistContainer(sp_playlistcontainer, add_ref=False)
 
     def preferred_bitrate(self, bitrate):
-        """Set preferred :class:`Bitrate` for music streaming."""
+        """Set preferred :class:`Bitrate` for music streaming.
+
+        If :attr:`bitrate_controller` is set, it changes the bitrate as
+        needed, overriding the bitrate set here."""
         spotify.Error.maybe_raise(lib.sp_session_preferred_bitrate(
             self._sp_session, bitrate))
 
@@ -502,7 +606,7 @@ class Session(utils.EventEmitter):
             album_offset=0, album_count=20,
             artist_offset=0, artist_count=20,
             playlist_offset=0, playlist_count=20,
-            search_type=None):
+            search_type=None, want=None):
         """
         Search Spotify for tracks, albums, artists, and playlists matching
         ``query``.
@@ -529,14 +633,191 @@ class Session(utils.EventEmitter):
 
         ``search_type`` is a :class:`SearchType` value. It defaults to
         :attr:`SearchType.STANDARD`.
+
+        ``want`` can be used to only request some of the result categories,
+        as a list containing one or more of ``'tracks'``, ``'albums'``,
+        ``'artists'``, and ``'playlists'``. The ``*_count`` of the other
+        categories is then set to 0, which makes the search both smaller and
+        faster. The ``want`` projection is kept by :meth:`Search.more`. If
+        ``want`` is :class:`None`, all categories are requested.
+
+        If :attr:`search_cache` is set, identical searches are served from the
+        cache. The ``callback`` is then called immediately if the cached
+        search has already completed.
         """
+        if self.search_cache is not None:
+            return self.search_cache.search(
+                query=query, callback=callback,
+                track_offset=track_offset, track_count=track_count,
+                album_offset=album_offset, album_count=album_count,
+                artist_offset=artist_offset, artist_count=artist_count,
+                playlist_offset=playlist_offset,
+                playlist_count=playlist_count,
+                search_type=search_type, want=want)
         return spotify.Search(
             query=query, callback=callback,
             track_offset=track_offset, track_count=track_count,
             album_offset=album_offset, album_count=album_count,
             artist_offset=artist_offset, artist_count=artist_count,
             playlist_offset=playlist_offset, playlist_count=playlist_count,
-            search_type=search_type)
+            search_type=search_type, want=want)
+
+    def suggest(
+            self, session_key, prefix, callback, delay=0.1, reuse=True,
+            **kwargs):
+        """Get search suggestions for a ``prefix`` typed by a user.
+
+        This is meant for autocompletion, where a new prefix arrives on every
+        keystroke. Only the latest prefix for each ``session_key`` is
+        searched for, using :attr:`SearchType.SUGGEST`. The ``session_key``
+        can be any hashable value identifying the input field, e.g. an HTTP
+        session ID.
+
+        The search is started ``delay`` seconds after the call, unless a new
+        prefix arrives for the same ``session_key`` in the meantime. This
+        debounces bursts of keystrokes. If ``delay`` is 0, the search is
+        started immediately.
+
+        When a new prefix arrives, any search still in progress for an older
+        prefix is released, and its result is never delivered.
+
+        ``callback`` is called with the completed :class:`Search`. If
+        ``reuse`` is :class:`True`, suggestions fetched earlier for the same
+        prefix are passed to ``callback`` immediately, without searching
+        again. If there are earlier suggestions for a longer prefix, e.g.
+        because the user deleted characters, they're passed to ``callback``
+        immediately, and again when the search for the new prefix completes.
+
+        Any other keyword arguments, like ``track_count``, are passed on to
+        :class:`Search`.
+        """
+        if self._suggester is None:
+            self._suggester = spotify.search._Suggester()
+        self._suggester.suggest(
+            session_key, prefix, callback, delay, reuse, kwargs)
+
+    _suggester = None
+
+    def resolve_many(self, uris):
+        """Resolve many URIs to objects at once.
+
+        Returns a list with a :class:`Track`, :class:`Album`,
+        :class:`Artist`, :class:`Image`, :class:`Playlist` or :class:`User`
+        for each URI in ``uris``, depending on the URI's type. If a URI is
+        invalid or can't be resolved, its object is :class:`None`.
+
+        If :attr:`uri_cache` is set, objects are reused from the cache.
+        """
+        return spotify.link._resolve_many(uris, self.uri_cache)
+
+    def search_many(
+            self, queries, max_in_flight=10, retries=1, timeout=None,
+            **kwargs):
+        """Search for each query in ``queries``, with at most
+        ``max_in_flight`` searches in progress at the same time.
+
+        Returns a generator that yields ``(query, search)`` tuples in the
+        order the searches complete. ``queries`` may be any iterable, and is
+        only consumed as searches complete, so memory use is bounded by
+        ``max_in_flight`` and not by the number of queries.
+
+        A search that completes with an error is retried up to ``retries``
+        times before it's yielded with its :attr:`~Search.error` set. A
+        search that hasn't completed within ``timeout`` seconds is also
+        retried. If it's out of retries, ``(query, None)`` is yielded. If
+        ``timeout`` is :class:`None`, searches never time out.
+
+        Any other keyword arguments, like ``track_count`` or
+        ``search_type``, are passed on to :meth:`search`.
+
+        The generator calls :meth:`process_events` while waiting for searches
+        to complete, so it must be consumed from the thread you use for
+        accessing Spotify.
+        """
+        if max_in_flight < 1:
+            raise ValueError('max_in_flight must be 1 or higher')
+        if retries < 0:
+            raise ValueError('retries must be 0 or higher')
+        return self._search_many(
+            iter(queries), max_in_flight, retries, timeout, kwargs)
+
+    def _search_many(self, queries, max_in_flight, retries, timeout, kwargs):
+        # Each job is a list of [query, search, attempts, deadline, owned],
+        # where owned is whether the search was created for this job only,
+        # and not shared through the search cache.
+        in_flight = []
+        completed = collections.deque()
+
+        def start(job):
+            def callback(search):
+                completed.append((job, search))
+
+            if job[1] is None:
+                job[1] = self.search(job[0], callback=callback, **kwargs)
+                job[4] = self.search_cache is None
+            else:
+                # A retry must not get the failed or timed out search back
+                # from the search cache
+                stop(job)
+                job[1] = spotify.Search(
+                    query=job[0], callback=callback, **kwargs)
+                job[4] = True
+            job[2] += 1
+            if timeout is not None:
+                job[3] = time.time() + timeout
+
+        def stop(job):
+            search = job[1]
+            if self.search_cache is not None:
+                self.search_cache._discard(search)
+            # A shared search may still be waited for by others
+            if job[4] and not search.complete_event.is_set():
+                search._cancel()
+
+        exhausted = False
+        while True:
+            while not exhausted and len(in_flight) < max_in_flight:
+                try:
+                    query = next(queries)
+                except StopIteration:
+                    exhausted = True
+                    break
+                job = [query, None, 0, None, False]
+                in_flight.append(job)
+                start(job)
+
+            if not in_flight:
+                return
+
+            progress = False
+            while completed:
+                job, search = completed.popleft()
+                if job[1] is not search or job not in in_flight:
+                    continue  # Search replaced after a timeout
+                progress = True
+                if (search.error is not spotify.ErrorType.OK and
+                        job[2] <= retries):
+                    start(job)
+                    continue
+                in_flight.remove(job)
+                yield (job[0], search)
+
+            if timeout is not None:
+                now = time.time()
+                for job in list(in_flight):
+                    if job[3] > now:
+                        continue
+                    progress = True
+                    if job[2] <= retries:
+                        start(job)
+                    else:
+                        stop(job)
+                        in_flight.remove(job)
+                        yield (job[0], None)
+
+            if not progress:
+                self.process_events()
+                time.sleep(0.001)
 
 
 class Offline(object):
@@ -975,11 +1256,33 @@ class SessionEvent(object):
     """
 
 
+def _enum_name(value):
+    return getattr(value, '_name', '%d' % value)
+
+
+def _nobody_listens(event):
+    """Whether a frequent ``event`` can be dropped without emitting it.
+
+    That is the case if the session has no listeners for the event, and debug
+    logging, which would log the event, is disabled. A dropped event is still
+    counted in the session's metrics, like :meth:`Session.emit` would have
+    done.
+    """
+    session = spotify.session_instance
+    # Any dead weak listeners are removed by emit(), so they are counted as
+    # listeners here to avoid building a list of the live listeners.
+    if session._listeners.get(event) or logger.isEnabledFor(logging.DEBUG):
+        return False
+    session._metrics.increment('events.' + event)
+    return True
+
+
 class _SessionCallbacks(object):
     """Internal class."""
 
     @staticmethod
     @ffi.callback('void(sp_session *, sp_error)')
+    @trace.traced_callback
     def logged_in(sp_session, sp_error):
         if not spotify.session_instance:
             return
@@ -993,6 +1296,7 @@ class _SessionCallbacks(object):
 
     @staticmethod
     @ffi.callback('void(sp_session *)')
+    @trace.traced_callback
     def logged_out(sp_session):
         if not spotify.session_instance:
             return
@@ -1002,15 +1306,22 @@ class _SessionCallbacks(object):
 
     @staticmethod
     @ffi.callback('void(sp_session *)')
+    @trace.traced_callback
     def metadata_updated(sp_session):
         if not spotify.session_instance:
             return
+        # Invalidates metadata cached until the next update, like
+        # Track.availability and Track.offline_status
+        spotify.session_instance._metadata_generation += 1
+        if _nobody_listens(SessionEvent.METADATA_UPDATED):
+            return
         logger.debug('Metadata updated')
         spotify.session_instance.emit(
             SessionEvent.METADATA_UPDATED, spotify.session_instance)
 
     @staticmethod
     @ffi.callback('void(sp_session *, sp_error)')
+    @trace.traced_callback
     def connection_error(sp_session, sp_error):
         if not spotify.session_instance:
             return
@@ -1022,6 +1333,7 @@ class _SessionCallbacks(object):
 
     @staticmethod
     @ffi.callback('void(sp_session *, const char *)')
+    @trace.traced_callback
     def message_to_user(sp_session, data):
         if not spotify.session_instance:
             return
@@ -1032,9 +1344,12 @@ class _SessionCallbacks(object):
 
     @staticmethod
     @ffi.callback('void(sp_session *)')
+    @trace.traced_callback
     def notify_main_thread(sp_session):
         if not spotify.session_instance:
             return
+        if _nobody_listens(SessionEvent.NOTIFY_MAIN_THREAD):
+            return
         logger.debug('Notify main thread')
         spotify.session_instance.emit(
             SessionEvent.NOTIFY_MAIN_THREAD, spotify.session_instance)
@@ -1042,6 +1357,7 @@ class _SessionCallbacks(object):
     @staticmethod
     @ffi.callback(
         'int(sp_session *, const sp_audioformat *, const void *, int)')
+    @trace.traced_callback
     def music_delivery(sp_session, sp_audioformat, frames, num_frames):
         if not spotify.session_instance:
             return 0
@@ -1054,12 +1370,23 @@ class _SessionCallbacks(object):
         buffer_ = ffi.buffer(
             frames, audio_format.frame_size() * num_frames)
         frames_bytes = buffer_[:]
-        return spotify.session_instance.call(
+        consumed_frames = spotify.session_instance.call(
             SessionEvent.MUSIC_DELIVERY,
             spotify.session_instance, audio_format, frames_bytes, num_frames)
+        metrics = spotify.session_instance._metrics
+        metrics.increment('music_delivery.frames', consumed_frames)
+        metrics.increment(
+            'music_delivery.bytes',
+            consumed_frames * audio_format.frame_size())
+        bitrate_controller = spotify.session_instance.bitrate_controller
+        if bitrate_controller is not None:
+            bitrate_controller.music_delivered(
+                consumed_frames, audio_format.sample_rate)
+        return consumed_frames
 
     @staticmethod
     @ffi.callback('void(sp_session *)')
+    @trace.traced_callback
     def play_token_lost(sp_session):
         if not spotify.session_instance:
             return
@@ -1069,9 +1396,12 @@ class _SessionCallbacks(object):
 
     @staticmethod
     @ffi.callback('void(sp_session *, const char *)')
+    @trace.traced_callback
     def log_message(sp_session, data):
         if not spotify.session_instance:
             return
+        if _nobody_listens(SessionEvent.LOG_MESSAGE):
+            return
         data = utils.to_unicode(data).strip()
         logger.debug('Log message from Spotify: %s', data)
         spotify.session_instance.emit(
@@ -1079,6 +1409,7 @@ class _SessionCallbacks(object):
 
     @staticmethod
     @ffi.callback('void(sp_session *)')
+    @trace.traced_callback
     def end_of_track(sp_session):
         if not spotify.session_instance:
             return
@@ -1088,17 +1419,22 @@ class _SessionCallbacks(object):
 
     @staticmethod
     @ffi.callback('void(sp_session *, sp_error)')
+    @trace.traced_callback
     def streaming_error(sp_session, sp_error):
         if not spotify.session_instance:
             return
         error_type = spotify.ErrorType(sp_error)
         logger.error('Streaming error: %s', error_type)
+        bitrate_controller = spotify.session_instance.bitrate_controller
+        if bitrate_controller is not None:
+            bitrate_controller.streaming_error(error_type)
         spotify.session_instance.emit(
             SessionEvent.STREAMING_ERROR,
             spotify.session_instance, error_type)
 
     @staticmethod
     @ffi.callback('void(sp_session *)')
+    @trace.traced_callback
     def user_info_updated(sp_session):
         if not spotify.session_instance:
             return
@@ -1108,6 +1444,7 @@ class _SessionCallbacks(object):
 
     @staticmethod
     @ffi.callback('void(sp_session *)')
+    @trace.traced_callback
     def start_playback(sp_session):
         if not spotify.session_instance:
             return
@@ -1117,6 +1454,7 @@ class _SessionCallbacks(object):
 
     @staticmethod
     @ffi.callback('void(sp_session *)')
+    @trace.traced_callback
     def stop_playback(sp_session):
         if not spotify.session_instance:
             return
@@ -1126,6 +1464,7 @@ class _SessionCallbacks(object):
 
     @staticmethod
     @ffi.callback('void(sp_session *, sp_audio_buffer_stats *)')
+    @trace.traced_callback
     def get_audio_buffer_stats(sp_session, sp_audio_buffer_stats):
         if not spotify.session_instance:
             return
@@ -1138,9 +1477,13 @@ class _SessionCallbacks(object):
             SessionEvent.GET_AUDIO_BUFFER_STATS, spotify.session_instance)
         sp_audio_buffer_stats.samples = stats.samples
         sp_audio_buffer_stats.stutter = stats.stutter
+        bitrate_controller = spotify.session_instance.bitrate_controller
+        if bitrate_controller is not None:
+            bitrate_controller.buffer_stats(stats)
 
     @staticmethod
     @ffi.callback('void(sp_session *)')
+    @trace.traced_callback
     def offline_status_updated(sp_session):
         if not spotify.session_instance:
             return
@@ -1150,6 +1493,7 @@ class _SessionCallbacks(object):
 
     @staticmethod
     @ffi.callback('void(sp_session *, const char *)')
+    @trace.traced_callback
     def credentials_blob_updated(sp_session, data):
         if not spotify.session_instance:
             return
@@ -1161,16 +1505,23 @@ class _SessionCallbacks(object):
 
     @staticmethod
     @ffi.callback('void(sp_session *)')
+    @trace.traced_callback
     def connection_state_updated(sp_session):
         if not spotify.session_instance:
             return
         logger.debug('Connection state updated')
+        session = spotify.session_instance
+        state = _enum_name(session.connection_state)
+        session._metrics.increment('connection_state.%s->%s' % (
+            session._connection_state, state))
+        session._connection_state = state
         spotify.session_instance.emit(
             SessionEvent.CONNECTION_STATE_UPDATED,
             spotify.session_instance)
 
     @staticmethod
     @ffi.callback('void(sp_session *, sp_error)')
+    @trace.traced_callback
     def scrobble_error(sp_session, sp_error):
         if not spotify.session_instance:
             return
@@ -1182,6 +1533,7 @@ class _SessionCallbacks(object):
 
     @staticmethod
     @ffi.callback('void(sp_session *, bool)')
+    @trace.traced_callback
     def private_session_mode_changed(sp_session, is_private):
         if not spotify.session_instance:
             return
@@ -0,0 +1,1013 @@
+from __future__ import unicode_literals
+
+import binascii
+import functools
+import hashlib
+import heapq
+import itertools
+import random
+import threading
+import time
+
+import spotify
+from spotify import ffi, utils
+
+
+__all__ = [
+    'SimulatedLib',
+]
+
+
+class SimulatedLib(object):
+    """A simulated libspotify for running pyspotify without a network.
+
+    The simulator implements the parts of libspotify used by pyspotify for
+    sessions, tracks, albums, artists, users, playlists, searches, toplists,
+    album and artist browsing, images, links, and music delivery. The data is
+    made up, but it is the same every time a URI or search query is looked
+    up with the same ``seed``.
+
+    Install the simulator in :attr:`spotify.lib` to use it, e.g. to benchmark
+    pyspotify without the noise of the Spotify servers::
+
+        >>> config = spotify.SessionConfig()
+        >>> config.application_key = b'\\0' * 321
+        >>> with spotify.SimulatedLib(latency=0.01):
+        ...     session = spotify.Session(config)
+        ...     session.login('alice', 'secret')
+        ...     track = session.get_track(
+        ...         'spotify:track:2Foc5Q5nqNiosCNqttzHof').load()
+
+    Loading works as in libspotify: objects start loading when they are
+    created, and are loaded by :meth:`Session.process_events` once the
+    simulated latency has passed. The ``notify_main_thread`` callback is
+    called from a background thread when there are objects ready to be
+    loaded.
+
+    ``latency`` is the number of seconds it takes to load an object or log
+    in. Each load takes between half and one and a half times the latency.
+
+    ``failure_rate`` is the fraction of loads that fail with
+    :attr:`ErrorType.OTHER_PERMANENT`.
+
+    ``callback_delay`` is the number of seconds between an object being
+    ready and the ``notify_main_thread`` callback being called.
+
+    ``realtime_audio`` makes the music delivery thread deliver audio at the
+    speed it would be played at, instead of as fast as it is consumed.
+
+    ``seed`` is used for making up data, latencies and failures.
+
+    The simulator only gives out fake pointers to its objects, which must
+    never be passed to the real libspotify. Functions that aren't simulated
+    raise :exc:`NotImplementedError`.
+    """
+
+    def __init__(
+            self, latency=0.05, failure_rate=0.0, callback_delay=0.0,
+            realtime_audio=False, seed=None):
+        self.latency = latency
+        self.failure_rate = failure_rate
+        self.callback_delay = callback_delay
+        self.realtime_audio = realtime_audio
+        self.seed = seed
+        self.calls = 0
+
+        self._random = random.Random(seed)
+        self._lock = threading.RLock()
+        self._condition = threading.Condition(self._lock)
+        self._objects = {}
+        self._catalog = {}
+        self._addresses = itertools.count(_FAKE_ADDRESS, 16)
+        self._pending = []
+        self._sequence = itertools.count()
+        self._notified = False
+        self._notifier = None
+        self._originals = {}
+
+        self._session = None
+        self._callbacks = None
+        self._username = None
+        self._remembered_user = None
+        self._connection_state = int(spotify.ConnectionState.LOGGED_OUT)
+
+        self._player_track = None
+        self._player_position = 0
+        self._player_stop = None
+
+    latency = None
+    """Number of seconds it takes to load an object."""
+
+    failure_rate = None
+    """The fraction of loads that fail."""
+
+    callback_delay = None
+    """Number of seconds from an object is ready until the
+    ``notify_main_thread`` callback is called."""
+
+    realtime_audio = None
+    """Whether audio is delivered at the speed it would be played at."""
+
+    calls = None
+    """Number of calls to simulated libspotify functions."""
+
+    def install(self):
+        """Replace the libspotify functions in :attr:`spotify.lib` with the
+        simulator."""
+        for name in dir(spotify.lib):
+            if not name.startswith('sp_') or name in self._originals:
+                continue
+            if name in _PASSTHROUGH:
+                continue
+            self._originals[name] = getattr(spotify.lib, name)
+            setattr(
+                spotify.lib, name, spotify.serialized(self._function(name)))
+        return self
+
+    def uninstall(self):
+        """Stop the simulator's threads and restore the original libspotify
+        functions in :attr:`spotify.lib`."""
+        self._stop_threads()
+        for name, func in self._originals.items():
+            setattr(spotify.lib, name, func)
+        self._originals = {}
+
+    def __enter__(self):
+        return self.install()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.uninstall()
+
+    def _function(self, name):
+        try:
+            func = getattr(self, name)
+        except AttributeError:
+            def func(*args):
+                raise NotImplementedError(
+                    '%s is not supported by the simulator' % name)
+            func.__name__ = str(name)
+            return func
+
+        def wrapper(*args):
+            self.calls += 1
+            return func(*args)
+        wrapper.__name__ = str(name)
+        return wrapper
+
+    def __getattr__(self, name):
+        if name in _GETTERS:
+            attr = _GETTERS[name]
+
+            def func(sp_obj, *args):
+                return getattr(self._get(sp_obj), attr)
+        elif name in _COUNTS:
+            attr = _COUNTS[name]
+
+            def func(sp_obj):
+                return len(getattr(self._get(sp_obj), attr))
+        elif name in _ITEMS:
+            attr, kind = _ITEMS[name]
+
+            def func(sp_obj, index):
+                item = getattr(self._get(sp_obj), attr)[index]
+                if kind is None:
+                    return item
+                return self._entity(kind, item).ptr
+        elif name in _CONSTANTS:
+            value = _CONSTANTS[name]
+
+            def func(*args):
+                return value
+        elif name.endswith('_add_ref'):
+            func = self._add_ref
+        elif name.endswith('_release'):
+            func = self._release
+        elif name in _NO_OPS:
+            def func(*args):
+                return _OK
+        else:
+            raise AttributeError(name)
+        func = functools.partial(func)
+        func.__name__ = str(name)
+        return func
+
+    # Objects
+
+    def _new(self, kind, **attrs):
+        obj = _Object(kind, **attrs)
+        address = next(self._addresses)
+        obj.ptr = ffi.cast('sp_%s *' % kind, address)
+        with self._lock:
+            self._objects[address] = obj
+        return obj
+
+    def _get(self, sp_obj):
+        return self._objects[int(ffi.cast('uintptr_t', sp_obj))]
+
+    def _add_ref(self, sp_obj):
+        self._get(sp_obj).refs += 1
+        return _OK
+
+    def _release(self, sp_obj):
+        address = int(ffi.cast('uintptr_t', sp_obj))
+        with self._lock:
+            obj = self._objects.get(address)
+            if obj is None:
+                return _OK
+            obj.refs -= 1
+            if obj.refs <= 0 and obj.kind in _TRANSIENT_KINDS:
+                del self._objects[address]
+        return _OK
+
+    def _entity(self, kind, id_, **attrs):
+        """Get the catalog object of ``kind`` with ``id_``, creating it and
+        starting to load it if needed."""
+        key = (kind, id_)
+        obj = self._catalog.get(key)
+        if obj is None:
+            obj = self._new(kind, id=id_, **attrs)
+            getattr(self, '_make_%s' % kind)(obj, self._rng(kind, id_))
+            self._catalog[key] = obj
+            self._load_later(obj)
+        return obj
+
+    def _make_track(self, obj, rng):
+        obj.name = _string('Track %s' % obj.id[:6])
+        obj.duration = rng.randint(90, 420) * 1000
+        obj.popularity = rng.randint(0, 100)
+        obj.disc = 1
+        obj.index = rng.randint(1, 12)
+        obj.starred = False
+        obj.album = self._make_id('album', obj.id)
+        obj.artists = [
+            self._make_id('artist', obj.id, i)
+            for i in range(rng.randint(1, 2))]
+
+    def _make_album(self, obj, rng):
+        obj.name = _string('Album %s' % obj.id[:6])
+        obj.year = rng.randint(1960, 2014)
+        obj.artist = self._make_id('artist', obj.id)
+        obj.cover = self._make_image_id('album', obj.id)
+        obj.tracks = [
+            self._make_id('track', obj.id, i)
+            for i in range(rng.randint(8, 14))]
+
+    def _make_artist(self, obj, rng):
+        obj.name = _string('Artist %s' % obj.id[:6])
+        obj.portrait = self._make_image_id('artist', obj.id)
+
+    def _make_user(self, obj, rng):
+        obj.canonical_name = _string(obj.id)
+        obj.display_name = _string(obj.id.title())
+
+    def _make_playlist(self, obj, rng):
+        obj.name = _string('Playlist %s' % obj.id[:6])
+        obj.description = _string('')
+        obj.tracks = [
+            self._make_id('track', obj.id, i)
+            for i in range(rng.randint(10, 100))]
+
+    def _make_playlistcontainer(self, obj, rng):
+        obj.playlists = [
+            self._make_id('playlist', obj.id, i)
+            for i in range(rng.randint(5, 20))]
+
+    def _make_image(self, obj, rng):
+        image_id = binascii.unhexlify(obj.id)
+        obj.image_id = ffi.new('byte[]', image_id)
+        data = b'\xff\xd8' + image_id * (_IMAGE_SIZE // len(image_id))
+        obj.data = ffi.new('char[]', data)
+        obj.data_size = len(data)
+        obj.load_callbacks = []
+        obj.on_loaded = self._image_done
+
+    def _digest(self, *parts):
+        key = ':'.join(utils.to_unicode('%s' % part) for part in parts)
+        return hashlib.sha1(utils.to_bytes('%s:%s' % (self.seed, key)))
+
+    def _make_id(self, *parts):
+        return spotify.uri.bytes_to_id(self._digest(*parts).digest()[:16])
+
+    def _make_image_id(self, *parts):
+        return self._digest('image', *parts).digest()
+
+    def _rng(self, *parts):
+        return random.Random(int(self._digest(*parts).hexdigest(), 16))
+
+    # Loading
+
+    def _load_later(self, obj):
+        delay = self.latency * self._random.uniform(0.5, 1.5)
+        self._call_later(delay, functools.partial(self._load, obj))
+
+    def _call_later(self, delay, func):
+        with self._condition:
+            heapq.heappush(
+                self._pending,
+                (time.time() + delay, next(self._sequence), func))
+            self._condition.notify_all()
+
+    def _load(self, obj):
+        if self._random.random() < self.failure_rate:
+            obj.error = int(spotify.ErrorType.OTHER_PERMANENT)
+            # Requests are done even if they failed, metadata is not
+            obj.is_loaded = obj.kind not in _METADATA_KINDS
+        else:
+            obj.error = _OK
+            obj.is_loaded = True
+        if obj.on_loaded is not None:
+            obj.on_loaded(obj)
+        return obj.kind in _METADATA_KINDS
+
+    def _request_done(self, obj):
+        obj.backend_request_duration = int(
+            (time.time() - obj.requested_at) * 1000)
+        if obj.callback != ffi.NULL:
+            obj.callback(obj.ptr, obj.userdata)
+
+    def _image_done(self, obj):
+        for callback, userdata in list(obj.load_callbacks):
+            callback(obj.ptr, userdata)
+
+    def _callback(self, name, *args):
+        if self._callbacks is None:
+            return 0
+        func = getattr(self._callbacks, name)
+        if func == ffi.NULL:
+            return 0
+        return func(*args)
+
+    def _start_notifier(self):
+        with self._condition:
+            self._notifier = threading.Thread(
+                target=self._run_notifier, name='SimulatedLibNotifier')
+            self._notifier.daemon = True
+            self._notifier.start()
+
+    def _run_notifier(self):
+        notifier = threading.current_thread()
+        while True:
+            with self._condition:
+                while self._notifier is notifier and not self._has_work():
+                    self._condition.wait(self._time_until_work())
+                if self._notifier is not notifier:
+                    return
+                self._notified = True
+            if self.callback_delay:
+                time.sleep(self.callback_delay)
+            self._callback('notify_main_thread', self._session.ptr)
+
+    def _has_work(self):
+        return (
+            not self._notified and bool(self._pending) and
+            self._pending[0][0] <= time.time())
+
+    def _time_until_work(self):
+        if self._notified or not self._pending:
+            return None
+        return max(0, self._pending[0][0] - time.time())
+
+    def _stop_threads(self):
+        with self._condition:
+            self._notifier = None
+            self._condition.notify_all()
+        self._stop_player()
+
+    # Sessions
+
+    def sp_session_create(self, sp_session_config, sp_session_ptr):
+        self._session = self._new('session')
+        self._callbacks = sp_session_config.callbacks
+        sp_session_ptr[0] = self._session.ptr
+        self._start_notifier()
+        return _OK
+
+    def sp_session_release(self, sp_session):
+        self._stop_threads()
+        self._callbacks = None
+        return _OK
+
+    def sp_session_process_events(self, sp_session, next_timeout):
+        now = time.time()
+        due = []
+        with self._condition:
+            while self._pending and self._pending[0][0] <= now:
+                due.append(heapq.heappop(self._pending)[2])
+            self._notified = False
+            self._condition.notify_all()
+            if self._pending:
+                timeout = int((self._pending[0][0] - now) * 1000)
+            else:
+                timeout = _IDLE_TIMEOUT
+        next_timeout[0] = max(0, timeout)
+        metadata_updated = False
+        for func in due:
+            metadata_updated = bool(func()) or metadata_updated
+        if metadata_updated:
+            self._callback('metadata_updated', self._session.ptr)
+        return _OK
+
+    def sp_session_login(
+            self, sp_session, username, password, remember_me, blob):
+        username = utils.to_unicode(username)
+        if remember_me:
+            self._remembered_user = username
+        self._call_later(
+            self.latency, functools.partial(self._logged_in, username))
+        return _OK
+
+    def _logged_in(self, username):
+        self._username = username
+        self._connection_state = int(spotify.ConnectionState.LOGGED_IN)
+        self._callback('logged_in', self._session.ptr, _OK)
+        self._callback('connectionstate_updated', self._session.ptr)
+
+    def sp_session_relogin(self, sp_session):
+        if self._remembered_user is None:
+            return int(spotify.ErrorType.NO_CREDENTIALS)
+        return self.sp_session_login(
+            sp_session, self._remembered_user, None, True, None)
+
+    def sp_session_remembered_user(self, sp_session, buffer_, buffer_size):
+        if self._remembered_user is None:
+            return -1
+        return _write_string(self._remembered_user, buffer_, buffer_size)
+
+    def sp_session_forget_me(self, sp_session):
+        self._remembered_user = None
+        return _OK
+
+    def sp_session_logout(self, sp_session):
+        self._call_later(self.latency, self._logged_out)
+        return _OK
+
+    def _logged_out(self):
+        self._username = None
+        self._connection_state = int(spotify.ConnectionState.LOGGED_OUT)
+        self._callback('logged_out', self._session.ptr)
+        self._callback('connectionstate_updated', self._session.ptr)
+
+    def sp_session_connectionstate(self, sp_session):
+        return self._connection_state
+
+    def sp_session_user(self, sp_session):
+        if self._username is None:
+            return ffi.NULL
+        return self._entity('user', self._username).ptr
+
+    def sp_session_user_name(self, sp_session):
+        return _string(self._username or '')
+
+    def sp_session_user_country(self, sp_session):
+        return ord('S') << 8 | ord('E')
+
+    def sp_session_playlistcontainer(self, sp_session):
+        if self._username is None:
+            return ffi.NULL
+        return self._entity(
+            'playlistcontainer', self._username, owner=self._username).ptr
+
+    def sp_session_publishedcontainer_for_user_create(
+            self, sp_session, username):
+        username = utils.to_unicode(ffi.string(username))
+        return self._entity(
+            'playlistcontainer', username, owner=username).ptr
+
+    def sp_session_starred_create(self, sp_session):
+        if self._username is None:
+            return ffi.NULL
+        return self._starred(self._username).ptr
+
+    def sp_session_starred_for_user_create(self, sp_session, username):
+        return self._starred(utils.to_unicode(ffi.string(username))).ptr
+
+    def _starred(self, username):
+        return self._entity(
+            'playlist', 'starred:%s' % username, owner=username,
+            uri='spotify:user:%s:starred' % username)
+
+    # Player
+
+    def sp_session_player_load(self, sp_session, sp_track):
+        track = self._get(sp_track)
+        if not track.is_loaded:
+            return int(spotify.ErrorType.IS_LOADING)
+        self._stop_player()
+        with self._lock:
+            self._player_track = track
+            self._player_position = 0
+        return _OK
+
+    def sp_session_player_seek(self, sp_session, offset):
+        with self._lock:
+            self._player_position = offset * _SAMPLE_RATE // 1000
+        return _OK
+
+    def sp_session_player_play(self, sp_session, play):
+        if not play:
+            self._stop_player()
+            return _OK
+        with self._lock:
+            if self._player_track is None or self._player_stop is not None:
+                return _OK
+            self._player_stop = threading.Event()
+            thread = threading.Thread(
+                target=self._deliver_music,
+                args=(self._player_track, self._player_stop),
+                name='SimulatedLibMusicDelivery')
+            thread.daemon = True
+            thread.start()
+        return _OK
+
+    def sp_session_player_unload(self, sp_session):
+        self._stop_player()
+        with self._lock:
+            self._player_track = None
+        return _OK
+
+    def _stop_player(self):
+        # The thread isn't joined, as it may be waiting for a music
+        # delivery listener that is waiting for the caller.
+        with self._lock:
+            if self._player_stop is not None:
+                self._player_stop.set()
+                self._player_stop = None
+
+    def _deliver_music(self, track, stop):
+        sp_audioformat = ffi.new('sp_audioformat *', {
+            'sample_type': int(spotify.SampleType.INT16_NATIVE_ENDIAN),
+            'sample_rate': _SAMPLE_RATE,
+            'channels': _CHANNELS,
+        })
+        frames = ffi.new('int16_t[]', _FRAMES_PER_DELIVERY * _CHANNELS)
+        end = track.duration * _SAMPLE_RATE // 1000
+        while not stop.is_set():
+            with self._lock:
+                position = self._player_position
+            if position >= end:
+                self._callback('end_of_track', self._session.ptr)
+                return
+            num_frames = min(_FRAMES_PER_DELIVERY, end - position)
+            consumed = self._callback(
+                'music_delivery', self._session.ptr, sp_audioformat,
+                frames, num_frames)
+            if consumed == 0:
+                # The audio buffer is full, try again later
+                stop.wait(_DELIVERY_RETRY_DELAY)
+                continue
+            with self._lock:
+                if self._player_position == position:
+                    self._player_position = position + consumed
+            if self.realtime_audio:
+                stop.wait(float(consumed) / _SAMPLE_RATE)
+
+    # Tracks, albums, artists, and users
+
+    def sp_track_album(self, sp_track):
+        return self._entity('album', self._get(sp_track).album).ptr
+
+    def sp_track_get_playable(self, sp_session, sp_track):
+        return sp_track
+
+    def sp_track_set_starred(self, sp_session, sp_tracks, num_tracks, star):
+        for i in range(num_tracks):
+            self._get(sp_tracks[i]).starred = bool(star)
+        return _OK
+
+    def sp_album_artist(self, sp_album):
+        return self._entity('artist', self._get(sp_album).artist).ptr
+
+    def sp_album_cover(self, sp_album, image_size):
+        return self._image_id(self._get(sp_album).cover)
+
+    def sp_artist_portrait(self, sp_artist, image_size):
+        return self._image_id(self._get(sp_artist).portrait)
+
+    def _image_id(self, image_id):
+        return self._entity('image', _hex(image_id)).image_id
+
+    # Playlists
+
+    def sp_playlist_create(self, sp_session, sp_link):
+        link = self._get(sp_link)
+        if link.link_type == int(spotify.LinkType.STARRED):
+            return self._starred(link.user).ptr
+        if link.link_type != int(spotify.LinkType.PLAYLIST):
+            return ffi.NULL
+        return self._playlist(link.id, link.user).ptr
+
+    def _playlist(self, id_, owner):
+        return self._entity(
+            'playlist', id_, owner=owner,
+            uri='spotify:user:%s:playlist:%s' % (owner, id_))
+
+    def sp_playlist_owner(self, sp_playlist):
+        return self._entity('user', self._get(sp_playlist).owner).ptr
+
+    def sp_playlistcontainer_owner(self, sp_playlistcontainer):
+        return self._entity(
+            'user', self._get(sp_playlistcontainer).owner).ptr
+
+    def sp_playlistcontainer_playlist(self, sp_playlistcontainer, index):
+        container = self._get(sp_playlistcontainer)
+        return self._playlist(container.playlists[index], container.owner).ptr
+
+    # Searches, toplists, and browsing
+
+    def _request(self, kind, callback, userdata, **attrs):
+        obj = self._new(
+            kind, refs=1, callback=callback, userdata=userdata,
+            requested_at=time.time(), backend_request_duration=0,
+            on_loaded=self._request_done, **attrs)
+        self._load_later(obj)
+        return obj.ptr
+
+    def _make_ids(self, kind, key, offset, count, total):
+        return [
+            self._make_id(kind, key, i)
+            for i in range(offset, min(offset + count, total))]
+
+    def sp_search_create(
+            self, sp_session, query, track_offset, track_count,
+            album_offset, album_count, artist_offset, artist_count,
+            playlist_offset, playlist_count, search_type, callback,
+            userdata):
+        query = utils.to_unicode(query)
+        rng = self._rng('search', query)
+        totals = dict(
+            (kind, rng.randint(0, _SEARCH_MAX_TOTAL))
+            for kind in ('track', 'album', 'artist', 'playlist'))
+        playlists = self._make_ids(
+            'playlist', query, playlist_offset, playlist_count,
+            totals['playlist'])
+        return self._request(
+            'search', callback, userdata,
+            query=_string(query),
+            did_you_mean=_string(''),
+            tracks=self._make_ids(
+                'track', query, track_offset, track_count, totals['track']),
+            albums=self._make_ids(
+                'album', query, album_offset, album_count, totals['album']),
+            artists=self._make_ids(
+                'artist', query, artist_offset, artist_count,
+                totals['artist']),
+            playlist_names=[
+                _string('Playlist %s' % id_[:6]) for id_ in playlists],
+            playlist_uris=[
+                _string('spotify:user:%s:playlist:%s' % (query, id_))
+                for id_ in playlists],
+            playlist_image_uris=[_string('') for id_ in playlists],
+            total_tracks=totals['track'],
+            total_albums=totals['album'],
+            total_artists=totals['artist'],
+            total_playlists=totals['playlist'])
+
+    def sp_toplistbrowse_create(
+            self, sp_session, toplist_type, region, username, callback,
+            userdata):
+        key = '%s:%s' % (toplist_type, region)
+        if username != ffi.NULL:
+            key += ':' + utils.to_unicode(ffi.string(username))
+        lists = {'tracks': [], 'albums': [], 'artists': []}
+        attr = _TOPLIST_ATTRS[toplist_type]
+        lists[attr] = self._make_ids(
+            attr[:-1], key, 0, _TOPLIST_SIZE, _TOPLIST_SIZE)
+        return self._request('toplistbrowse', callback, userdata, **lists)
+
+    def sp_albumbrowse_create(self, sp_session, sp_album, callback, userdata):
+        album = self._get(sp_album)
+        return self._request(
+            'albumbrowse', callback, userdata,
+            album=album.id,
+            artist=album.artist,
+            tracks=album.tracks,
+            copyrights=[_string('(C) %s' % album.year)],
+            review=_string(''))
+
+    def sp_albumbrowse_album(self, sp_albumbrowse):
+        return self._entity('album', self._get(sp_albumbrowse).album).ptr
+
+    def sp_albumbrowse_artist(self, sp_albumbrowse):
+        return self._entity('artist', self._get(sp_albumbrowse).artist).ptr
+
+    def sp_artistbrowse_create(
+            self, sp_session, sp_artist, browse_type, callback, userdata):
+        artist = self._get(sp_artist)
+        full = browse_type == int(spotify.ArtistBrowserType.FULL)
+        return self._request(
+            'artistbrowse', callback, userdata,
+            artist=artist.id,
+            portraits=[self._image_id(artist.portrait)],
+            tracks=self._make_ids(
+                'track', artist.id, 0, _ARTIST_SIZE if full else 0,
+                _ARTIST_SIZE),
+            tophit_tracks=self._make_ids(
+                'track', artist.id, 0, _ARTIST_TOPHITS, _ARTIST_TOPHITS),
+            albums=self._make_ids(
+                'album', artist.id, 0, _ARTIST_ALBUMS, _ARTIST_ALBUMS),
+            similar_artists=self._make_ids(
+                'artist', artist.id, 0, _ARTIST_SIMILAR, _ARTIST_SIMILAR),
+            biography=_string(''))
+
+    def sp_artistbrowse_artist(self, sp_artistbrowse):
+        return self._entity('artist', self._get(sp_artistbrowse).artist).ptr
+
+    # Images
+
+    def sp_image_create(self, sp_session, image_id):
+        image = self._entity('image', _hex(ffi.buffer(image_id, 20)[:]))
+        return image.ptr
+
+    def sp_image_create_from_link(self, sp_session, sp_link):
+        link = self._get(sp_link)
+        if link.link_type != int(spotify.LinkType.IMAGE):
+            return ffi.NULL
+        return self._entity('image', link.id).ptr
+
+    def sp_image_add_load_callback(self, sp_image, callback, userdata):
+        image = self._get(sp_image)
+        image.load_callbacks.append((callback, userdata))
+        return _OK
+
+    def sp_image_remove_load_callback(self, sp_image, callback, userdata):
+        image = self._get(sp_image)
+        for i, (other_callback, other_userdata) in enumerate(
+                image.load_callbacks):
+            if other_callback == callback and other_userdata == userdata:
+                del image.load_callbacks[i]
+                return _OK
+        return int(spotify.ErrorType.INVALID_INDATA)
+
+    def sp_image_data(self, sp_image, data_size_ptr):
+        image = self._get(sp_image)
+        if not image.is_loaded:
+            data_size_ptr[0] = 0
+            return ffi.NULL
+        data_size_ptr[0] = image.data_size
+        return image.data
+
+    # Links
+
+    def sp_link_create_from_string(self, link):
+        try:
+            parsed = spotify.uri.parse_uri(utils.to_unicode(link))
+        except ValueError:
+            return ffi.NULL
+        return self._link(utils.to_unicode(link), parsed)
+
+    def _link(self, uri, parsed=None):
+        if parsed is None:
+            parsed = spotify.uri.parse_uri(uri)
+        return self._new(
+            'link', refs=1, uri=utils.to_bytes(uri),
+            link_type=int(parsed.type), id=parsed.id, user=parsed.user,
+            offset=parsed.offset).ptr
+
+    def sp_link_create_from_track(self, sp_track, offset):
+        uri = 'spotify:track:%s' % self._get(sp_track).id
+        if offset:
+            uri += '#%d:%02d' % divmod(offset // 1000, 60)
+        return self._link(uri)
+
+    def sp_link_create_from_album(self, sp_album):
+        return self._link('spotify:album:%s' % self._get(sp_album).id)
+
+    def sp_link_create_from_album_cover(self, sp_album, image_size):
+        return self._link(
+            'spotify:image:%s' % _hex(self._get(sp_album).cover))
+
+    def sp_link_create_from_artist(self, sp_artist):
+        return self._link('spotify:artist:%s' % self._get(sp_artist).id)
+
+    def sp_link_create_from_artist_portrait(self, sp_artist, image_size):
+        return self._link(
+            'spotify:image:%s' % _hex(self._get(sp_artist).portrait))
+
+    def sp_link_create_from_playlist(self, sp_playlist):
+        playlist = self._get(sp_playlist)
+        if not playlist.is_loaded:
+            return ffi.NULL
+        return self._link(playlist.uri)
+
+    def sp_link_create_from_user(self, sp_user):
+        return self._link('spotify:user:%s' % self._get(sp_user).id)
+
+    def sp_link_create_from_image(self, sp_image):
+        return self._link('spotify:image:%s' % self._get(sp_image).id)
+
+    def sp_link_create_from_search(self, sp_search):
+        query = utils.to_unicode(self._get(sp_search).query)
+        return self._link('spotify:search:%s' % query)
+
+    def sp_link_as_string(self, sp_link, buffer_, buffer_size):
+        return _write_string(self._get(sp_link).uri, buffer_, buffer_size)
+
+    def sp_link_as_track(self, sp_link):
+        link = self._get(sp_link)
+        if link.link_type != int(spotify.LinkType.TRACK):
+            return ffi.NULL
+        return self._entity('track', link.id).ptr
+
+    def sp_link_as_track_and_offset(self, sp_link, offset):
+        offset[0] = self._get(sp_link).offset or 0
+        return self.sp_link_as_track(sp_link)
+
+    def sp_link_as_album(self, sp_link):
+        link = self._get(sp_link)
+        if link.link_type != int(spotify.LinkType.ALBUM):
+            return ffi.NULL
+        return self._entity('album', link.id).ptr
+
+    def sp_link_as_artist(self, sp_link):
+        link = self._get(sp_link)
+        if link.link_type != int(spotify.LinkType.ARTIST):
+            return ffi.NULL
+        return self._entity('artist', link.id).ptr
+
+    def sp_link_as_user(self, sp_link):
+        link = self._get(sp_link)
+        if link.link_type != int(spotify.LinkType.PROFILE):
+            return ffi.NULL
+        return self._entity('user', link.user).ptr
+
+
+class _Object(object):
+    """A simulated libspotify object."""
+
+    def __init__(self, kind, **attrs):
+        self.kind = kind
+        self.refs = 0
+        self.is_loaded = False
+        self.error = int(spotify.ErrorType.IS_LOADING)
+        self.on_loaded = None
+        self.__dict__.update(attrs)
+
+
+def _string(value):
+    return ffi.new('char[]', utils.to_bytes(value))
+
+
+def _hex(image_id):
+    return utils.to_unicode(binascii.hexlify(image_id))
+
+
+def _write_string(value, buffer_, buffer_size):
+    data = utils.to_bytes(value)
+    length = min(len(data), buffer_size - 1)
+    ffi.buffer(buffer_, length)[:] = data[:length]
+    buffer_[length] = b'\0'
+    return len(data)
+
+
+_OK = 0
+
+_FAKE_ADDRESS = 0x100000
+
+# Milliseconds until process_events() must be called again if nothing is
+# loading
+_IDLE_TIMEOUT = 1000
+
+_SAMPLE_RATE = 44100
+_CHANNELS = 2
+_FRAMES_PER_DELIVERY = 2048
+_DELIVERY_RETRY_DELAY = 0.01
+
+_IMAGE_SIZE = 4096
+_SEARCH_MAX_TOTAL = 1000
+_TOPLIST_SIZE = 100
+_ARTIST_SIZE = 50
+_ARTIST_TOPHITS = 10
+_ARTIST_ALBUMS = 10
+_ARTIST_SIMILAR = 10
+
+_TOPLIST_ATTRS = {
+    0: 'artists',
+    1: 'albums',
+    2: 'tracks',
+}
+
+_METADATA_KINDS = (
+    'track', 'album', 'artist', 'user', 'playlist', 'playlistcontainer')
+
+# Kinds of objects that are forgotten when their last reference is released.
+# Metadata and images stay in the catalog, like in libspotify's cache.
+_TRANSIENT_KINDS = (
+    'link', 'search', 'toplistbrowse', 'albumbrowse', 'artistbrowse')
+
+# Functions that don't need a session, and can use the real libspotify
+_PASSTHROUGH = ('sp_build_id', 'sp_error_message')
+
+_GETTERS = dict(
+    [('sp_%s_is_loaded' % kind, 'is_loaded') for kind in (
+        'track', 'album', 'artist', 'user', 'playlist', 'playlistcontainer',
+        'search', 'toplistbrowse', 'albumbrowse', 'artistbrowse', 'image')] +
+    [('sp_%s_error' % kind, 'error') for kind in (
+        'track', 'search', 'toplistbrowse', 'albumbrowse', 'artistbrowse',
+        'image')] +
+    [('sp_%s_backend_request_duration' % kind, 'backend_request_duration')
+        for kind in ('toplistbrowse', 'albumbrowse', 'artistbrowse')] +
+    [
+        ('sp_track_name', 'name'),
+        ('sp_track_duration', 'duration'),
+        ('sp_track_popularity', 'popularity'),
+        ('sp_track_disc', 'disc'),
+        ('sp_track_index', 'index'),
+        ('sp_track_is_starred', 'starred'),
+        ('sp_album_name', 'name'),
+        ('sp_album_year', 'year'),
+        ('sp_artist_name', 'name'),
+        ('sp_user_canonical_name', 'canonical_name'),
+        ('sp_user_display_name', 'display_name'),
+        ('sp_playlist_name', 'name'),
+        ('sp_playlist_get_description', 'description'),
+        ('sp_search_query', 'query'),
+        ('sp_search_did_you_mean', 'did_you_mean'),
+        ('sp_search_total_tracks', 'total_tracks'),
+        ('sp_search_total_albums', 'total_albums'),
+        ('sp_search_total_artists', 'total_artists'),
+        ('sp_search_total_playlists', 'total_playlists'),
+        ('sp_albumbrowse_review', 'review'),
+        ('sp_artistbrowse_biography', 'biography'),
+        ('sp_image_image_id', 'image_id'),
+        ('sp_link_type', 'link_type'),
+    ])
+
+_COUNTS = {
+    'sp_track_num_artists': 'artists',
+    'sp_playlist_num_tracks': 'tracks',
+    'sp_playlistcontainer_num_playlists': 'playlists',
+    'sp_search_num_tracks': 'tracks',
+    'sp_search_num_albums': 'albums',
+    'sp_search_num_artists': 'artists',
+    'sp_search_num_playlists': 'playlist_names',
+    'sp_toplistbrowse_num_tracks': 'tracks',
+    'sp_toplistbrowse_num_albums': 'albums',
+    'sp_toplistbrowse_num_artists': 'artists',
+    'sp_albumbrowse_num_tracks': 'tracks',
+    'sp_albumbrowse_num_copyrights': 'copyrights',
+    'sp_artistbrowse_num_portraits': 'portraits',
+    'sp_artistbrowse_num_tracks': 'tracks',
+    'sp_artistbrowse_num_tophit_tracks': 'tophit_tracks',
+    'sp_artistbrowse_num_albums': 'albums',
+    'sp_artistbrowse_num_similar_artists': 'similar_artists',
+}
+
+_ITEMS = {
+    'sp_track_artist': ('artists', 'artist'),
+    'sp_playlist_track': ('tracks', 'track'),
+    'sp_search_track': ('tracks', 'track'),
+    'sp_search_album': ('albums', 'album'),
+    'sp_search_artist': ('artists', 'artist'),
+    'sp_search_playlist_name': ('playlist_names', None),
+    'sp_search_playlist_uri': ('playlist_uris', None),
+    'sp_search_playlist_image_uri': ('playlist_image_uris', None),
+    'sp_toplistbrowse_track': ('tracks', 'track'),
+    'sp_toplistbrowse_album': ('albums', 'album'),
+    'sp_toplistbrowse_artist': ('artists', 'artist'),
+    'sp_albumbrowse_track': ('tracks', 'track'),
+    'sp_albumbrowse_copyright': ('copyrights', None),
+    'sp_artistbrowse_portrait': ('portraits', None),
+    'sp_artistbrowse_track': ('tracks', 'track'),
+    'sp_artistbrowse_tophit_track': ('tophit_tracks', 'track'),
+    'sp_artistbrowse_album': ('albums', 'album'),
+    'sp_artistbrowse_similar_artist': ('similar_artists', 'artist'),
+}
+
+_CONSTANTS = {
+    'sp_track_offline_get_status': 0,
+    'sp_track_get_availability': 1,
+    'sp_track_is_local': False,
+    'sp_track_is_autolinked': False,
+    'sp_track_is_placeholder': False,
+    'sp_album_is_available': True,
+    'sp_album_type': 0,
+    'sp_image_format': 0,
+    'sp_playlist_is_collaborative': False,
+    'sp_playlist_has_pending_changes': False,
+    'sp_playlist_is_in_ram': True,
+    'sp_playlist_num_subscribers': 0,
+    'sp_playlist_get_offline_status': 0,
+    'sp_playlist_get_offline_download_completed': 0,
+    'sp_playlist_get_image': False,
+    'sp_playlistcontainer_playlist_type': 0,
+    'sp_session_get_volume_normalization': False,
+    'sp_session_is_private_session': False,
+    'sp_offline_tracks_to_sync': 0,
+    'sp_offline_num_playlists': 0,
+    'sp_offline_sync_get_status': False,
+    'sp_offline_time_left': 0,
+}
+
+_NO_OPS = (
+    'sp_playlist_set_in_ram',
+    'sp_playlist_set_autolink_tracks',
+    'sp_session_flush_caches',
+    'sp_session_player_prefetch',
+    'sp_session_preferred_bitrate',
+    'sp_session_preferred_offline_bitrate',
+    'sp_session_set_cache_size',
+    'sp_session_set_connection_rules',
+    'sp_session_set_connection_type',
+    'sp_session_set_private_session',
+    'sp_session_set_volume_normalization',
+)
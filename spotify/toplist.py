@@ -81,6 +81,7 @@ class Toplist(object):
             # the callback is called?
             self._callback_handles.add(handle)
 
+            self._requested_at = spotify.metrics._request_started('Toplist')
             sp_toplistbrowse = lib.sp_toplistbrowse_create(
                 spotify.session_instance._sp_session,
                 int(type), region, canonical_username,
@@ -97,6 +98,8 @@ class Toplist(object):
     completed.
     """
 
+    _requested_at = None
+
     def __repr__(self):
         return 'Toplist(type=%r, region=%r, canonical_username=%r)' % (
             self.type, self.region, self.canonical_username)
@@ -211,6 +214,7 @@ def _toplistbrowse_complete_callback(sp_toplistbrowse, handle):
         return
     (callback, toplist) = ffi.from_handle(handle)
     toplist._callback_handles.remove(handle)
+    spotify.metrics._request_completed('Toplist', toplist._requested_at)
     toplist.complete_event.set()
     if callback is not None:
         callback(toplist)
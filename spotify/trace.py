@@ -0,0 +1,368 @@
+from __future__ import unicode_literals
+
+import collections
+import functools
+import io
+import json
+import numbers
+import threading
+import time
+
+import spotify
+from spotify import ffi, utils
+
+
+__all__ = [
+    'TraceReplay',
+    'Tracer',
+    'read_trace',
+]
+
+
+class Tracer(object):
+    """Records calls to libspotify and session callbacks from libspotify.
+
+    The trace is written to ``file``, a path or a file object opened for
+    writing text, as JSON, one call or callback per line::
+
+        >>> with spotify.Tracer('session.trace'):
+        ...     session.login('alice', 's3cret')
+        ...     while session.connection_state != ...:
+        ...         session.process_events()
+
+    Each line is a JSON object with:
+
+    - ``call``, the name of the libspotify function called, or ``callback``,
+      the name of the :class:`Session` callback called.
+    - ``t``, the time in seconds since the tracer was started.
+    - ``us``, the duration of the call in microseconds. Only for calls.
+    - ``args``, the shape of the arguments.
+    - ``result``, the shape of the return value.
+    - ``callbacks``, the callbacks called while the call was in progress,
+      e.g. from :meth:`Session.process_events`. Only for calls, and left out
+      if there were none.
+
+    A shape is the value itself for :class:`None`, numbers, and booleans. For
+    strings and C data, it is an object describing the type and size, but
+    never the content, so traces do not include user data like credentials
+    or search queries. Pointers to libspotify objects are given an ``id``,
+    which is the same for all calls with the same object.
+
+    Tracing is started with :meth:`start` or by entering the tracer as a
+    context manager. Only one tracer can be active at a time.
+    """
+
+    def __init__(self, file):
+        if isinstance(file, utils.string_types):
+            file = io.open(file, 'w', encoding='utf-8')
+        self._file = file
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._ids = {}
+        self._started_at = None
+
+    def start(self):
+        """Start tracing."""
+        self._started_at = time.time()
+        spotify._tracer = self
+        return self
+
+    def stop(self):
+        """Stop tracing and flush the trace to the file."""
+        if spotify._tracer is self:
+            spotify._tracer = None
+        with self._lock:
+            self._file.flush()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.stop()
+
+    def _trace_call(self, func, args, kwargs):
+        callbacks = self._callback_stack()
+        callbacks.append([])
+        started_at = time.time()
+        try:
+            result = func(*args, **kwargs)
+        finally:
+            nested_callbacks = callbacks.pop()
+        record = collections.OrderedDict([
+            ('call', func.__name__),
+            ('t', round(started_at - self._started_at, 6)),
+            ('us', int((time.time() - started_at) * 1000000)),
+            # Taken after the call, to include values written to out args
+            ('args', [self._shape(arg, out=True) for arg in args]),
+            ('result', self._shape(result)),
+        ])
+        if nested_callbacks:
+            record['callbacks'] = nested_callbacks
+        self._write(record)
+        return result
+
+    def _trace_callback(self, func, args):
+        record = collections.OrderedDict([
+            ('callback', func.__name__),
+            ('t', round(time.time() - self._started_at, 6)),
+            ('args', [self._shape(arg) for arg in args]),
+        ])
+        result = func(*args)
+        record['result'] = self._shape(result)
+        callbacks = self._callback_stack()
+        if callbacks:
+            callbacks[-1].append(record)
+        else:
+            # Called from one of libspotify's own threads
+            self._write(record)
+        return result
+
+    def _callback_stack(self):
+        stack = getattr(self._local, 'stack', None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    def _write(self, record):
+        line = json.dumps(record, separators=(',', ':'))
+        with self._lock:
+            self._file.write(utils.to_unicode(line) + '\n')
+
+    def _shape(self, value, out=False):
+        if value is None or isinstance(value, numbers.Number):
+            return value
+        if isinstance(value, (utils.text_type, utils.binary_type)):
+            return {'bytes': len(utils.to_bytes(value))}
+        if not isinstance(value, ffi.CData):
+            return {'type': value.__class__.__name__}
+        ctype = ffi.typeof(value)
+        if ctype.kind in ('primitive', 'enum'):
+            return int(value)
+        shape = collections.OrderedDict([('cdata', ctype.cname)])
+        if ctype.kind == 'array':
+            shape['size'] = len(value)
+            if ctype.item.cname == 'char':
+                shape['filled'] = len(ffi.string(value))
+        elif ctype.kind == 'pointer':
+            item = ctype.item
+            if value == ffi.NULL:
+                shape['null'] = True
+            elif item.cname == 'char':
+                shape['len'] = len(ffi.string(value))
+            elif item.kind == 'struct' and item.fields:
+                shape['fields'] = collections.OrderedDict(
+                    (name, getattr(value, name)) for name, field in item.fields
+                    if field.type.kind in ('primitive', 'enum'))
+            elif item.kind == 'struct':
+                shape['id'] = self._id(value)
+            elif out and item.kind in ('primitive', 'pointer'):
+                shape['out'] = self._shape(value[0])
+        return shape
+
+    def _id(self, value):
+        address = int(ffi.cast('uintptr_t', value))
+        with self._lock:
+            return self._ids.setdefault(address, len(self._ids) + 1)
+
+
+def traced_callback(func):
+    """Decorator for tracing a :class:`Session` callback from libspotify.
+
+    Internal function.
+    """
+    @functools.wraps(func)
+    def wrapper(*args):
+        tracer = spotify._tracer
+        if tracer is None:
+            return func(*args)
+        return tracer._trace_callback(func, args)
+    return wrapper
+
+
+def read_trace(file):
+    """Read the records of a trace written by :class:`Tracer`.
+
+    ``file`` is a path or a file object opened for reading text. Returns a
+    list of dicts.
+    """
+    if isinstance(file, utils.string_types):
+        with io.open(file, encoding='utf-8') as f:
+            return read_trace(f)
+    return [json.loads(line) for line in file if line.strip()]
+
+
+class TraceReplay(object):
+    """Replays a trace recorded by :class:`Tracer` in place of libspotify.
+
+    ``records`` is a list of records, as returned by :func:`read_trace`.
+
+    The replay works like :attr:`spotify.lib`. Each call to a libspotify
+    function returns the result recorded for the next call to the same
+    function in the trace, and writes the recorded values to any out
+    arguments. Session callbacks recorded while a call was in progress are
+    called before the call returns. Callbacks recorded from libspotify's own
+    threads are called before the call recorded right after them.
+
+    Strings are replayed as strings of the recorded length, and pointers to
+    libspotify objects as fake pointers, the same for each ``id``. The fake
+    pointers must never be passed to the real libspotify.
+
+    To run code against the replay, e.g. to run a production workload in a
+    test and measure pyspotify's overhead, install it in :attr:`spotify.lib`::
+
+        >>> replay = spotify.TraceReplay(spotify.read_trace('session.trace'))
+        >>> with replay:
+        ...     run_workload()
+        >>> replay.missing
+        0
+
+    Calls not found in the trace return ``NULL`` or ``0``, and are counted
+    in :attr:`missing`.
+    """
+
+    def __init__(self, records):
+        self.calls = 0
+        self.missing = 0
+
+        self._records = collections.defaultdict(collections.deque)
+        self._trailing_callbacks = []
+        self._pointers = {}
+        self._out_values = []
+        self._void_buffer = None
+        self._originals = {}
+
+        pending_callbacks = []
+        for record in records:
+            if 'callback' in record:
+                pending_callbacks.append(record)
+                continue
+            record = dict(record)
+            record['callbacks'] = (
+                pending_callbacks + record.get('callbacks', []))
+            pending_callbacks = []
+            self._records[record['call']].append(record)
+        self._trailing_callbacks = pending_callbacks
+
+    calls = None
+    """Number of calls replayed from the trace."""
+
+    missing = None
+    """Number of calls that wasn't found in the trace."""
+
+    def __getattr__(self, name):
+        if not name.startswith('sp_'):
+            raise AttributeError(name)
+
+        def replay(*args):
+            return self._replay(name, args)
+        replay.__name__ = str(name)
+        return replay
+
+    def install(self):
+        """Replace the libspotify functions in :attr:`spotify.lib` with the
+        replay."""
+        for name in dir(spotify.lib):
+            if name.startswith('sp_') and name not in self._originals:
+                self._originals[name] = getattr(spotify.lib, name)
+                setattr(spotify.lib, name, getattr(self, name))
+        return self
+
+    def uninstall(self):
+        """Restore the original libspotify functions in :attr:`spotify.lib`.
+
+        Callbacks recorded after the last call in the trace are called
+        first.
+        """
+        self._call_callbacks(self._trailing_callbacks)
+        self._trailing_callbacks = []
+        for name, func in self._originals.items():
+            setattr(spotify.lib, name, func)
+        self._originals = {}
+
+    def __enter__(self):
+        return self.install()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.uninstall()
+
+    def _replay(self, name, args):
+        records = self._records.get(name)
+        if not records:
+            self.missing += 1
+            return self._default_result(name)
+        record = records.popleft()
+        self.calls += 1
+        for arg, shape in zip(args, record['args']):
+            self._write_out_arg(arg, shape)
+        self._call_callbacks(record['callbacks'])
+        return self._value(record['result'])
+
+    def _call_callbacks(self, records):
+        callbacks = spotify.session._SessionCallbacks
+        for record in records:
+            func = getattr(callbacks, record['callback'])
+            func(*[self._value(shape) for shape in record['args']])
+
+    def _default_result(self, name):
+        original = self._originals.get(name)
+        if original is not None:
+            # Unwrap the function wrapped by serialize_access_to_library()
+            original = getattr(original, '__wrapped__', original)
+            try:
+                if ffi.typeof(original).result.kind == 'pointer':
+                    return ffi.NULL
+            except TypeError:
+                pass
+        return 0
+
+    def _write_out_arg(self, arg, shape):
+        if not isinstance(shape, dict) or not isinstance(arg, ffi.CData):
+            return
+        if 'filled' in shape:
+            length = min(shape['filled'], len(arg) - 1)
+            ffi.buffer(arg, length)[:] = b'x' * length
+            arg[length] = b'\0'
+        elif 'out' in shape:
+            value = self._value(shape['out'])
+            # The C data written to an out arg must outlive the call
+            self._out_values.append(value)
+            arg[0] = value
+
+    def _value(self, shape):
+        if not isinstance(shape, dict):
+            return shape
+        if 'bytes' in shape:
+            return b'x' * shape['bytes']
+        if 'cdata' not in shape:
+            return None
+        cname = shape['cdata']
+        if shape.get('null'):
+            return ffi.NULL
+        if 'len' in shape:
+            return ffi.new('char[]', b'x' * shape['len'])
+        if 'size' in shape:
+            value = ffi.new('char[]', shape['size'])
+            self._write_out_arg(value, shape)
+            return value
+        if 'fields' in shape:
+            value = ffi.new(cname)
+            for name, field_value in shape['fields'].items():
+                setattr(value, name, field_value)
+            return value
+        if cname.startswith('void'):
+            if self._void_buffer is None:
+                self._void_buffer = ffi.new('char[]', _VOID_BUFFER_SIZE)
+            return ffi.cast(cname, self._void_buffer)
+        return self._pointer(cname, shape.get('id', 0))
+
+    def _pointer(self, cname, id_):
+        key = (cname, id_)
+        if key not in self._pointers:
+            self._pointers[key] = ffi.cast(cname, _FAKE_ADDRESS + 16 * id_)
+        return self._pointers[key]
+
+
+# Room for the audio frames of any music_delivery callback
+_VOID_BUFFER_SIZE = 1 << 20
+
+_FAKE_ADDRESS = 0x10000
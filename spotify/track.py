@@ -29,7 +29,7 @@ class Track(object):
     def __init__(self, uri=None, sp_track=None, add_ref=True):
         assert uri or sp_track, 'uri or sp_track is required'
         if uri is not None:
-            track = spotify.Link(uri).as_track()
+            track = spotify.link._resolve(uri, 'track')
             if track is None:
                 raise ValueError(
                     'Failed to get track from Spotify URI: %r' % uri)
@@ -42,9 +42,13 @@ class Track(object):
     def __repr__(self):
         return 'Track(%r)' % self.link.uri
 
+    _loaded_ok = False
+
     @property
     def is_loaded(self):
         """Whether the track's data is loaded."""
+        if self._loaded_ok:
+            return True
         return bool(lib.sp_track_is_loaded(self._sp_track))
 
     @property
@@ -53,8 +57,47 @@ class Track(object):
 
         Check to see if there was problems loading the track.
         """
+        if self._loaded_ok:
+            return spotify.ErrorType.OK
         return spotify.ErrorType(lib.sp_track_error(self._sp_track))
 
+    def _check_loaded(self, ignores=None):
+        """Raise :exc:`LibError` if the track has an error that isn't in
+        ``ignores``, and return whether the track is loaded.
+
+        A loaded track without errors stays that way, so once we've seen it,
+        we skip the library calls on later checks.
+        """
+        if self._loaded_ok:
+            return True
+        error = self.error
+        spotify.Error.maybe_raise(error, ignores=ignores)
+        is_loaded = self.is_loaded
+        if is_loaded and error is spotify.ErrorType.OK:
+            self._loaded_ok = True
+        return is_loaded
+
+    def _get_until_metadata_updated(self, attr, func):
+        """Get a value that may change when the session emits
+        :attr:`~SessionEvent.METADATA_UPDATED`.
+
+        The value returned by ``func`` is cached in the attribute ``attr``
+        until the next metadata update.
+        """
+        generation = getattr(
+            spotify.session_instance, '_metadata_generation', None)
+        if generation is None:
+            return func()
+        cached = getattr(self, attr)
+        if cached is not None and cached[0] == generation:
+            return cached[1]
+        value = func()
+        setattr(self, attr, (generation, value))
+        return value
+
+    _offline_status = None
+    _availability = None
+
     def load(self, timeout=None):
         """Block until the track's data is loaded.
 
@@ -74,12 +117,11 @@ class Track(object):
 
         Will always return :class:`None` if the track isn't loaded.
         """
-        spotify.Error.maybe_raise(
-            self.error, ignores=[spotify.ErrorType.IS_LOADING])
-        if not self.is_loaded:
+        if not self._check_loaded(ignores=[spotify.ErrorType.IS_LOADING]):
             return None
-        return TrackOfflineStatus(
-            lib.sp_track_offline_get_status(self._sp_track))
+        return self._get_until_metadata_updated(
+            '_offline_status', lambda: TrackOfflineStatus(
+                lib.sp_track_offline_get_status(self._sp_track)))
 
     @property
     def availability(self):
@@ -89,12 +131,12 @@ class Track(object):
         """
         if spotify.session_instance is None:
             raise RuntimeError('Session must be initialized')
-        spotify.Error.maybe_raise(
-            self.error, ignores=[spotify.ErrorType.IS_LOADING])
-        if not self.is_loaded:
+        if not self._check_loaded(ignores=[spotify.ErrorType.IS_LOADING]):
             return None
-        return TrackAvailability(lib.sp_track_get_availability(
-            spotify.session_instance._sp_session, self._sp_track))
+        return self._get_until_metadata_updated(
+            '_availability', lambda: TrackAvailability(
+                lib.sp_track_get_availability(
+                    spotify.session_instance._sp_session, self._sp_track)))
 
     @property
     def is_local(self):
@@ -104,8 +146,7 @@ class Track(object):
         """
         if spotify.session_instance is None:
             raise RuntimeError('Session must be initialized')
-        spotify.Error.maybe_raise(self.error)
-        if not self.is_loaded:
+        if not self._check_loaded():
             return None
         return bool(lib.sp_track_is_local(
             spotify.session_instance._sp_session, self._sp_track))
@@ -120,8 +161,7 @@ class Track(object):
         """
         if spotify.session_instance is None:
             raise RuntimeError('Session must be initialized')
-        spotify.Error.maybe_raise(self.error)
-        if not self.is_loaded:
+        if not self._check_loaded():
             return None
         return bool(lib.sp_track_is_autolinked(
             spotify.session_instance._sp_session, self._sp_track))
@@ -136,9 +176,7 @@ class Track(object):
         """
         if spotify.session_instance is None:
             raise RuntimeError('Session must be initialized')
-        spotify.Error.maybe_raise(
-            self.error, ignores=[spotify.ErrorType.IS_LOADING])
-        if not self.is_loaded:
+        if not self._check_loaded(ignores=[spotify.ErrorType.IS_LOADING]):
             return None
         return Track(sp_track=lib.sp_track_get_playable(
             spotify.session_instance._sp_session, self._sp_track))
@@ -160,17 +198,14 @@ class Track(object):
 
         Will always return :class:`None` if the track isn't loaded.
         """
-        spotify.Error.maybe_raise(
-            self.error, ignores=[spotify.ErrorType.IS_LOADING])
-        if not self.is_loaded:
+        if not self._check_loaded(ignores=[spotify.ErrorType.IS_LOADING]):
             return None
         return bool(lib.sp_track_is_placeholder(self._sp_track))
 
     def is_starred(self):
         if spotify.session_instance is None:
             raise RuntimeError('Session must be initialized')
-        spotify.Error.maybe_raise(self.error)
-        if not self.is_loaded:
+        if not self._check_loaded():
             return None
         return bool(lib.sp_track_is_starred(
             spotify.session_instance._sp_session, self._sp_track))
@@ -197,8 +232,7 @@ class Track(object):
 
         Will always return :class:`None` if the track isn't loaded.
         """
-        spotify.Error.maybe_raise(self.error)
-        if not self.is_loaded:
+        if not self._check_loaded():
             return []
 
         def get_artist(sp_track, key):
@@ -218,7 +252,7 @@ class Track(object):
 
         Will always return :class:`None` if the track isn't loaded.
         """
-        spotify.Error.maybe_raise(self.error)
+        self._check_loaded()
         sp_album = lib.sp_track_album(self._sp_track)
         return spotify.Album(sp_album=sp_album) if sp_album else None
 
@@ -228,7 +262,7 @@ class Track(object):
 
         Will always return :class:`None` if the track isn't loaded.
         """
-        spotify.Error.maybe_raise(self.error)
+        self._check_loaded()
         name = utils.to_unicode(lib.sp_track_name(self._sp_track))
         return name if name else None
 
@@ -238,7 +272,7 @@ class Track(object):
 
         Will always return :class:`None` if the track isn't loaded.
         """
-        spotify.Error.maybe_raise(self.error)
+        self._check_loaded()
         duration = lib.sp_track_duration(self._sp_track)
         return duration if duration else None
 
@@ -248,8 +282,7 @@ class Track(object):
 
         Will always return :class:`None` if the track isn't loaded.
         """
-        spotify.Error.maybe_raise(self.error)
-        if not self.is_loaded:
+        if not self._check_loaded():
             return None
         return lib.sp_track_popularity(self._sp_track)
 
@@ -260,7 +293,7 @@ class Track(object):
         Will always return :class:`None` if the track isn't part of an album or
         artist browser.
         """
-        spotify.Error.maybe_raise(self.error)
+        self._check_loaded()
         disc = lib.sp_track_disc(self._sp_track)
         return disc if disc else None
 
@@ -271,7 +304,7 @@ class Track(object):
         Will always return :class:`None` if the track isn't part of an album or
         artist browser.
         """
-        spotify.Error.maybe_raise(self.error)
+        self._check_loaded()
         index = lib.sp_track_index(self._sp_track)
         return index if index else None
 
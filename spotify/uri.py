@@ -0,0 +1,240 @@
+from __future__ import unicode_literals
+
+import binascii
+import collections
+import re
+
+import spotify
+from spotify import utils
+
+
+__all__ = [
+    'ParsedUri',
+    'bytes_to_id',
+    'bytes_to_ids',
+    'id_to_bytes',
+    'ids_to_bytes',
+    'is_valid_uri',
+    'parse_uri',
+    'parse_uris',
+    'uri_type',
+]
+
+_ID_LENGTH = 22
+_BINARY_ID_LENGTH = 16
+_BASE62 = '0123456789abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ'
+_BASE62_VALUES = dict((char, value) for value, char in enumerate(_BASE62))
+_MAX_ID_VALUE = 2 ** (_BINARY_ID_LENGTH * 8)
+
+_ID_RE = re.compile(r'^[0-9a-zA-Z]{22}$')
+_IMAGE_ID_RE = re.compile(r'^[0-9a-f]{40}$')
+_OFFSET_RE = re.compile(r'^(\d+):([0-5]\d)$')
+
+_ID_TYPES = {
+    'track': 'TRACK',
+    'album': 'ALBUM',
+    'artist': 'ARTIST',
+    'playlist': 'PLAYLIST',
+}
+
+_URL_PREFIXES = (
+    'http://open.spotify.com/',
+    'https://open.spotify.com/',
+    'http://play.spotify.com/',
+    'https://play.spotify.com/',
+)
+
+
+class ParsedUri(collections.namedtuple(
+        'ParsedUri', ['type', 'id', 'user', 'offset'])):
+    """A Spotify URI parsed by :func:`parse_uri`.
+
+    ``type`` is the URI's :class:`LinkType`.
+
+    ``id`` is the base62 encoded ID of tracks, albums, artists and playlists,
+    the hex encoded ID of images, the query of searches, and the
+    ``artist:album:title:duration`` part of local tracks. It is
+    :class:`None` for user profiles and starred lists.
+
+    ``user`` is the username of user profiles, starred lists and playlists
+    with an owner in the URI, otherwise :class:`None`.
+
+    ``offset`` is the offset in milliseconds of track URIs ending with
+    ``#mm:ss``, otherwise :class:`None`.
+    """
+    pass
+
+
+def parse_uri(uri):
+    """Parse a Spotify URI without using libspotify.
+
+    Returns a :class:`ParsedUri`. Raises :exc:`ValueError` if ``uri`` isn't
+    a valid track, album, artist, user, playlist, starred, image, search or
+    local track URI.
+
+    Example::
+
+        >>> spotify.parse_uri('spotify:track:2Foc5Q5nqNiosCNqttzHof')
+        ParsedUri(type=<LinkType.TRACK: 1>, id=u'2Foc5Q5nqNiosCNqttzHof',
+        user=None, offset=None)
+    """
+    parsed = _parse(uri)
+    if parsed is None:
+        raise ValueError('Invalid Spotify URI: %r' % uri)
+    return parsed
+
+
+def parse_uris(uris):
+    """Parse many Spotify URIs at once.
+
+    Returns a list with a :class:`ParsedUri`, or :class:`None` if the URI is
+    invalid, for each URI in ``uris``.
+    """
+    parse = _parse
+    return [parse(uri) for uri in uris]
+
+
+def is_valid_uri(uri):
+    """Whether ``uri`` is a valid Spotify URI, as understood by
+    :func:`parse_uri`."""
+    return _parse(uri) is not None
+
+
+def uri_type(uri):
+    """Get the :class:`LinkType` of ``uri``.
+
+    Returns :attr:`LinkType.INVALID` if ``uri`` isn't a valid Spotify URI.
+    """
+    parsed = _parse(uri)
+    if parsed is None:
+        return spotify.LinkType.INVALID
+    return parsed.type
+
+
+def id_to_bytes(id):
+    """Convert a 22 character base62 encoded Spotify ID to its 16 byte
+    binary form.
+
+    Raises :exc:`ValueError` if ``id`` isn't a valid base62 encoded ID.
+    """
+    id = utils.to_unicode(id)
+    if len(id) != _ID_LENGTH:
+        raise ValueError('Invalid Spotify ID: %r' % id)
+    value = 0
+    try:
+        for char in id:
+            value = value * 62 + _BASE62_VALUES[char]
+    except KeyError:
+        raise ValueError('Invalid Spotify ID: %r' % id)
+    if value >= _MAX_ID_VALUE:
+        raise ValueError('Invalid Spotify ID: %r' % id)
+    return binascii.unhexlify('%032x' % value)
+
+
+def bytes_to_id(data):
+    """Convert a 16 byte binary Spotify ID to its 22 character base62
+    encoded form."""
+    if len(data) != _BINARY_ID_LENGTH:
+        raise ValueError(
+            'Binary Spotify IDs must be %d bytes, got %d' %
+            (_BINARY_ID_LENGTH, len(data)))
+    return _encode(int(binascii.hexlify(data), 16))
+
+
+def ids_to_bytes(ids):
+    """Convert many base62 encoded Spotify IDs to a single :class:`bytes`
+    string of 16 byte binary IDs.
+
+    This is useful for compact storage of large numbers of IDs. Use
+    :func:`bytes_to_ids` to convert the data back to base62 encoded IDs.
+    """
+    return b''.join([id_to_bytes(id) for id in ids])
+
+
+def bytes_to_ids(data):
+    """Convert a :class:`bytes` string of 16 byte binary Spotify IDs, as
+    made by :func:`ids_to_bytes`, to a list of base62 encoded IDs."""
+    if len(data) % _BINARY_ID_LENGTH:
+        raise ValueError(
+            'Length of data must be a multiple of %d, got %d' %
+            (_BINARY_ID_LENGTH, len(data)))
+    hex_data = binascii.hexlify(data)
+    step = _BINARY_ID_LENGTH * 2
+    encode = _encode
+    return [
+        encode(int(hex_data[i:i + step], 16))
+        for i in range(0, len(hex_data), step)]
+
+
+def _encode(value):
+    chars = [None] * _ID_LENGTH
+    for i in range(_ID_LENGTH - 1, -1, -1):
+        value, remainder = divmod(value, 62)
+        chars[i] = _BASE62[remainder]
+    return ''.join(chars)
+
+
+def _could_be_uri(uri):
+    """Cheap check used by :class:`Link` to reject strings that libspotify
+    will never accept, without calling into libspotify.
+
+    This is deliberately lenient, as libspotify is the authority on what
+    URIs it accepts. Strings that start like a Spotify URI or a Spotify web
+    URL pass.
+    """
+    uri = utils.to_unicode(uri)
+    if uri.startswith(_URL_PREFIXES):
+        return True
+    parts = uri.split(':', 2)
+    return (
+        len(parts) == 3 and parts[0] == 'spotify' and
+        (parts[1] in _ID_TYPES or
+            parts[1] in ('user', 'image', 'search', 'local')) and
+        parts[2] != '')
+
+
+def _parse(uri):
+    uri = utils.to_unicode(uri)
+    if not uri.startswith('spotify:'):
+        return None
+
+    offset = None
+    if uri.startswith('spotify:track:') and '#' in uri:
+        uri, _, offset = uri.partition('#')
+        match = _OFFSET_RE.match(offset)
+        if match is None:
+            return None
+        offset = (int(match.group(1)) * 60 + int(match.group(2))) * 1000
+
+    parts = uri.split(':')
+    kind = parts[1]
+    link_type = spotify.LinkType
+
+    if kind in _ID_TYPES:
+        if len(parts) != 3 or not _ID_RE.match(parts[2]):
+            return None
+        return ParsedUri(
+            getattr(link_type, _ID_TYPES[kind]), parts[2], None, offset)
+    elif kind == 'user':
+        if len(parts) < 3 or parts[2] == '':
+            return None
+        user = parts[2]
+        if len(parts) == 3:
+            return ParsedUri(link_type.PROFILE, None, user, None)
+        elif len(parts) == 4 and parts[3] == 'starred':
+            return ParsedUri(link_type.STARRED, None, user, None)
+        elif (len(parts) == 5 and parts[3] == 'playlist' and
+                _ID_RE.match(parts[4])):
+            return ParsedUri(link_type.PLAYLIST, parts[4], user, None)
+    elif kind == 'image':
+        if len(parts) == 3 and _IMAGE_ID_RE.match(parts[2]):
+            return ParsedUri(link_type.IMAGE, parts[2], None, None)
+    elif kind == 'search':
+        query = ':'.join(parts[2:])
+        if query:
+            return ParsedUri(link_type.SEARCH, query, None, None)
+    elif kind == 'local':
+        if len(parts) == 6 and parts[5].isdigit():
+            return ParsedUri(
+                link_type.LOCALTRACK, ':'.join(parts[2:]), None, None)
+    return None
@@ -24,7 +24,7 @@ class User(object):
         assert uri or sp_user, 'uri or sp_user is required'
 
         if uri is not None:
-            user = spotify.Link(uri).as_user()
+            user = spotify.link._resolve(uri, 'user')
             if user is None:
                 raise ValueError(
                     'Failed to get user from Spotify URI: %r' % uri)
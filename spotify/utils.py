@@ -1,10 +1,12 @@
 from __future__ import unicode_literals
 
 import collections
-import functools
 import pprint
 import sys
+import threading
 import time
+import types
+import weakref
 
 import spotify
 from spotify import ffi, lib
@@ -26,7 +28,12 @@ class EventEmitter(object):
     """Mixin for adding event emitter functionality to a class."""
 
     def __init__(self):
-        self._listeners = collections.defaultdict(list)
+        # Maps events to tuples of listeners. The tuples are never modified,
+        # but replaced when listeners are added or removed, so emit() can
+        # iterate over them without copying or locking. Changes are made
+        # with the lock held, so concurrent changes aren't lost.
+        self._listeners = {}
+        self._listeners_lock = threading.Lock()
 
     def on(self, event, listener, *user_args):
         """Register a ``listener`` to be called on ``event``.
@@ -38,8 +45,25 @@ class EventEmitter(object):
         If the listener function returns :class:`False`, it is removed and will
         not be called the next time the ``event`` is emitted.
         """
-        self._listeners[event].append(
-            _Listener(callback=listener, user_args=user_args))
+        self._add_listener(
+            event, _Listener(callback=listener, user_args=user_args))
+
+    def on_weak(self, event, listener, *user_args):
+        """Register a ``listener`` to be called on ``event``, without keeping
+        the listener alive.
+
+        Works like :meth:`on`, except that the emitter only keeps a weak
+        reference to ``listener``. If ``listener`` is a bound method, the
+        reference is to the object the method is bound to. When the listener
+        is garbage collected, it is removed from the ``event``.
+        """
+        self._add_listener(
+            event, _WeakListener(callback=listener, user_args=user_args))
+
+    def _add_listener(self, event, listener):
+        with self._listeners_lock:
+            self._listeners[event] = (
+                self._listeners.get(event, ()) + (listener,))
 
     def off(self, event=None, listener=None):
         """Remove a ``listener`` that was to be called on ``event``.
@@ -50,17 +74,31 @@ class EventEmitter(object):
         If ``event`` is :class:`None`, all listeners for all events on this
         object will be removed.
         """
-        if event is None:
-            events = self._listeners.keys()
-        else:
-            events = [event]
-        for event in events:
-            if listener is None:
-                self._listeners[event] = []
+        with self._listeners_lock:
+            if event is None:
+                events = list(self._listeners.keys())
             else:
-                self._listeners[event] = [
-                    l for l in self._listeners[event]
-                    if l.callback is not listener]
+                events = [event]
+            for event in events:
+                if listener is None:
+                    self._listeners.pop(event, None)
+                else:
+                    self._set_listeners(event, [
+                        item for item in self._listeners.get(event, ())
+                        if item.callback != listener])
+
+    def _set_listeners(self, event, listeners):
+        # Must be called with the listeners lock held
+        if listeners:
+            self._listeners[event] = tuple(listeners)
+        else:
+            self._listeners.pop(event, None)
+
+    def _remove_dead_listeners(self, event):
+        with self._listeners_lock:
+            self._set_listeners(event, [
+                item for item in self._listeners.get(event, ())
+                if item.callback is not None])
 
     def emit(self, event, *event_args):
         """Call the registered listeners for ``event``.
@@ -68,15 +106,27 @@ class EventEmitter(object):
         The listeners will be called with any extra arguments passed to
         :meth:`emit` first, and then the extra arguments passed to :meth:`on`
         """
-        for listener in self._listeners[event]:
-            args = list(event_args) + list(listener.user_args)
-            result = listener.callback(*args)
+        listeners = self._listeners.get(event)
+        if not listeners:
+            return
+        for listener in listeners:
+            callback = listener.callback
+            if callback is None:
+                self._remove_dead_listeners(event)
+                continue
+            if listener.user_args:
+                result = callback(*(event_args + listener.user_args))
+            else:
+                result = callback(*event_args)
             if result is False:
-                self.off(event, listener.callback)
+                self.off(event, callback)
 
     def num_listeners(self, event):
         """Return the number of listeners for ``event``."""
-        return len(self._listeners[event])
+        listeners = self._listeners.get(event)
+        if not listeners:
+            return 0
+        return len([item for item in listeners if item.callback is not None])
 
     def call(self, event, *event_args):
         """Call the single registered listener for ``event``.
@@ -87,9 +137,10 @@ class EventEmitter(object):
         assert self.num_listeners(event) == 1, (
             'Expected exactly 1 event listener, found %d listeners' %
             self.num_listeners(event))
-        listener = self._listeners[event][0]
-        args = list(event_args) + list(listener.user_args)
-        return listener.callback(*args)
+        for listener in self._listeners[event]:
+            callback = listener.callback
+            if callback is not None:
+                return callback(*(event_args + listener.user_args))
 
 
 class _Listener(collections.namedtuple(
@@ -97,6 +148,32 @@ class _Listener(collections.namedtuple(
     """An listener of events from an :class:`EventEmitter`"""
 
 
+class _WeakListener(object):
+    """A listener of events from an :class:`EventEmitter` that is only weakly
+    referenced.
+
+    :attr:`callback` is :class:`None` once the listener is garbage collected.
+    """
+
+    def __init__(self, callback, user_args):
+        self.user_args = user_args
+        if getattr(callback, '__self__', None) is not None:
+            # Bound methods are created on attribute access and die at once,
+            # so we keep the function and a weak reference to the object.
+            self._ref = weakref.ref(callback.__self__)
+            self._func = callback.__func__
+        else:
+            self._ref = weakref.ref(callback)
+            self._func = None
+
+    @property
+    def callback(self):
+        obj = self._ref()
+        if obj is None or self._func is None:
+            return obj
+        return types.MethodType(self._func, obj)
+
+
 class IntEnum(int):
     """An enum type for values mapping to integers.
 
@@ -105,10 +182,14 @@ class IntEnum(int):
     """
 
     def __new__(cls, value):
-        if not hasattr(cls, '_values'):
+        # Fast path for values we've seen before, which is nearly all of them
+        try:
+            return cls._values[value]
+        except AttributeError:
             cls._values = {}
-        if value not in cls._values:
-            cls._values[value] = int.__new__(cls, value)
+        except KeyError:
+            pass
+        cls._values[value] = int.__new__(cls, value)
         return cls._values[value]
 
     def __repr__(self):
@@ -134,14 +215,32 @@ def make_enum(lib_prefix, enum_prefix=''):
     """
 
     def wrapper(cls):
-        for attr in dir(lib):
+        for attr, value in _get_lib_constants():
             if attr.startswith(lib_prefix):
                 name = attr.replace(lib_prefix, enum_prefix)
-                cls.add(name, getattr(lib, attr))
+                cls.add(name, value)
         return cls
     return wrapper
 
 
+_lib_constants = None
+
+
+def _get_lib_constants():
+    """Get the names and values of all ``SP_*`` constants in
+    :attr:`spotify.lib`.
+
+    The library has hundreds of names, so it's only scanned the first time,
+    instead of once for each enum class.
+    """
+    global _lib_constants
+    if _lib_constants is None:
+        _lib_constants = [
+            (attr, getattr(lib, attr))
+            for attr in dir(lib) if attr.startswith('SP_')]
+    return _lib_constants
+
+
 def get_with_fixed_buffer(buffer_length, func, *args):
     """Get a unicode string from a C function that takes a fixed-size buffer.
 
@@ -150,10 +249,9 @@ def get_with_fixed_buffer(buffer_length, func, *args):
 
     Returns the buffer's value decoded from UTF-8 to a unicode string.
     """
-    func = functools.partial(func, *args)
-    buffer_ = ffi.new('char[]', buffer_length)
-    func(buffer_, buffer_length)
-    return to_unicode(buffer_)
+    buffer_ = _get_scratch_buffer(buffer_length)
+    func(*(args + (buffer_, buffer_length)))
+    return ffi.string(buffer_, buffer_length).decode('utf-8')
 
 
 def get_with_growing_buffer(func, *args):
@@ -161,31 +259,71 @@ def get_with_growing_buffer(func, *args):
     needed to return the full string.
 
     The C function ``func`` is called with any arguments given in ``args``, a
-    buffer of fixed size, and the buffer size. If the C function returns a
-    size that is larger than the buffer already filled, the C function is
-    called again with a buffer large enough to get the full string from the C
-    function.
+    buffer, and the buffer size. If the C function returns a size that is
+    larger than the buffer already filled, the C function is called again
+    with a buffer large enough to get the full string from the C function.
+
+    The first buffer is large enough for the longest string ``func`` has
+    returned before, so the C function is usually only called once.
 
     Returns the buffer's value decoded from UTF-8 to a unicode string.
     """
-    func = functools.partial(func, *args)
-    actual_length = 10
-    buffer_length = actual_length
-    while actual_length >= buffer_length:
+    buffer_length = _buffer_lengths.get(func, _INITIAL_BUFFER_LENGTH)
+    while True:
+        buffer_ = _get_scratch_buffer(buffer_length)
+        buffer_length = len(buffer_)
+        actual_length = func(*(args + (buffer_, buffer_length)))
+        if actual_length == -1:
+            return None
+        if actual_length < buffer_length:
+            break
         buffer_length = actual_length + 1
-        buffer_ = ffi.new('char[]', buffer_length)
-        actual_length = func(buffer_, buffer_length)
-    if actual_length == -1:
-        return None
-    return to_unicode(buffer_)
+    if actual_length >= _buffer_lengths.get(func, 0):
+        _buffer_lengths[func] = actual_length + 1
+    return ffi.string(buffer_, actual_length).decode('utf-8')
+
 
+_INITIAL_BUFFER_LENGTH = 64
+_MAX_SCRATCH_BUFFER_LENGTH = 4096
 
-def load(obj, timeout=None):
+# The longest string + 1 returned by each function passed to
+# get_with_growing_buffer(), used as the initial buffer length next time.
+_buffer_lengths = {}
+
+_scratch = threading.local()
+
+
+def _get_scratch_buffer(length):
+    """Get a ``char[]`` buffer with room for at least ``length`` chars.
+
+    Buffers up to a few kilobytes are reused by all calls from the same
+    thread, instead of allocating a new buffer each time. The contents of a
+    reused buffer are not cleared, so callers must only read what the C
+    function wrote to it.
+    """
+    if length > _MAX_SCRATCH_BUFFER_LENGTH:
+        return ffi.new('char[]', length)
+    buffer_ = getattr(_scratch, 'buffer', None)
+    if buffer_ is None or len(buffer_) < length:
+        size = _INITIAL_BUFFER_LENGTH
+        while size < length:
+            size *= 2
+        buffer_ = _scratch.buffer = ffi.new('char[]', size)
+    buffer_[0] = b'\0'
+    return buffer_
+
+
+def load(obj, timeout=None, event=None):
     """Block until the object's data is loaded.
 
     The ``obj`` must at least have the :attr:`is_loaded` attribute. If it also
     has an :meth:`error` method, it will be checked for errors to raise.
 
+    If ``event`` is a :class:`threading.Event` that is set when the object is
+    done loading, we wait on the event between each round of event processing
+    instead of sleeping, so that we return as soon as the object is loaded by
+    another thread processing events.
+
     After ``timeout`` seconds with no results :exc:`~spotify.Timeout` is
     raised.
 
@@ -201,18 +339,29 @@ def load(obj, timeout=None):
         raise RuntimeError('Session must be logged in to load objects')
     if timeout is None:
         timeout = 10
-    deadline = time.time() + timeout
-    while not obj.is_loaded:
-        # TODO Consider sleeping for the time returned by process_events()
-        # instead of making a tight loop.
-        spotify.session_instance.process_events()
+    kind = obj.__class__.__name__
+    spotify.metrics._increment('loads.pending.' + kind)
+    try:
+        deadline = time.time() + timeout
+        while not obj.is_loaded:
+            # TODO Consider sleeping for the time returned by
+            # process_events() instead of making a tight loop.
+            spotify.session_instance.process_events()
+            spotify.Error.maybe_raise(
+                getattr(obj, 'error', 0),
+                ignores=[spotify.ErrorType.IS_LOADING])
+            if time.time() > deadline:
+                spotify.metrics._increment('loads.timeouts.' + kind)
+                raise spotify.Timeout(timeout)
+            if event is None:
+                time.sleep(0.001)
+            else:
+                event.wait(0.01)
         spotify.Error.maybe_raise(
             getattr(obj, 'error', 0), ignores=[spotify.ErrorType.IS_LOADING])
-        if time.time() > deadline:
-            raise spotify.Timeout(timeout)
-        time.sleep(0.001)
-    spotify.Error.maybe_raise(
-        getattr(obj, 'error', 0), ignores=[spotify.ErrorType.IS_LOADING])
+    finally:
+        spotify.metrics._increment('loads.pending.' + kind, -1)
+    spotify.metrics._increment('loads.completed.' + kind)
     return obj
 
 
@@ -237,7 +386,9 @@ class Sequence(collections.Sequence):
 
     def __getitem__(self, key):
         if isinstance(key, slice):
-            return list(self).__getitem__(key)
+            return [
+                self._getitem_func(self._sp_obj, i)
+                for i in range(*key.indices(self.__len__()))]
         if not isinstance(key, int):
             raise TypeError(
                 'list indices must be int or slice, not %s' %
@@ -246,6 +397,12 @@ class Sequence(collections.Sequence):
             raise IndexError('list index out of range')
         return self._getitem_func(self._sp_obj, key)
 
+    def __iter__(self):
+        # collections.Sequence's __iter__() goes through __getitem__(), which
+        # gets the length from libspotify once per item.
+        for i in range(self.__len__()):
+            yield self._getitem_func(self._sp_obj, i)
+
     def __repr__(self):
         return pprint.pformat(list(self))
 
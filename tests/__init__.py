@@ -1,5 +1,7 @@
 from __future__ import unicode_literals
 
+import collections
+import contextlib
 import gc
 import platform
 
@@ -28,6 +30,10 @@ def buffer_writer(string):
         for i in range(length):
             buffer_[i] = string[i].encode('utf-8')
 
+        # Terminate the string, as the buffer may be reused and hold
+        # leftovers from earlier calls.
+        buffer_[length] = b'\0'
+
         return len(string)
 
     return func
@@ -43,3 +49,28 @@ def gc_collect():
         [gc.collect() for _ in range(10)]
     else:
         gc.collect()
+
+
+@contextlib.contextmanager
+def lib_call_budget(budget, *lib_mocks):
+    """Assert that at most ``budget`` libspotify functions are called on the
+    given ``lib`` mocks within the ``with`` block.
+
+    Only calls to the ``sp_*`` attributes of the mocks are counted, so
+    functions replaced with something other than a mock, like a
+    :func:`buffer_writer`, are not counted.
+    """
+    starts = [len(lib_mock.mock_calls) for lib_mock in lib_mocks]
+
+    yield
+
+    calls = collections.Counter()
+    for lib_mock, start in zip(lib_mocks, starts):
+        for name, args, kwargs in lib_mock.mock_calls[start:]:
+            if name.startswith('sp_') and '.' not in name and '(' not in name:
+                calls[name] += 1
+    total = sum(calls.values())
+    assert total <= budget, (
+        'Expected at most %d libspotify calls, got %d: %s' % (
+            budget, total, ', '.join(
+                '%s=%d' % item for item in sorted(calls.items()))))
@@ -85,6 +85,18 @@ class AlbumTest(unittest.TestCase):
         lib_mock.sp_album_is_loaded.assert_called_once_with(sp_album)
         self.assertTrue(result)
 
+    def test_is_loaded_is_remembered_once_loaded(self, lib_mock):
+        lib_mock.sp_album_is_loaded.return_value = 0
+        sp_album = spotify.ffi.new('int *')
+        album = spotify.Album(sp_album=sp_album)
+
+        self.assertFalse(album.is_loaded)
+        lib_mock.sp_album_is_loaded.return_value = 1
+        self.assertTrue(album.is_loaded)
+        self.assertTrue(album.is_loaded)
+
+        self.assertEqual(lib_mock.sp_album_is_loaded.call_count, 2)
+
     @mock.patch('spotify.utils.load')
     def test_load(self, load_mock, lib_mock):
         sp_album = spotify.ffi.new('int *')
@@ -554,6 +566,21 @@ class AlbumBrowserTest(unittest.TestCase):
         lib_mock.sp_albumbrowse_track.assert_called_with(sp_albumbrowse, 0)
         track_lib_mock.sp_track_add_ref.assert_called_with(sp_track)
 
+    @mock.patch('spotify.track.lib', spec=spotify.lib)
+    def test_iterating_tracks_call_budget(self, track_lib_mock, lib_mock):
+        sp_track = spotify.ffi.cast('sp_track *', spotify.ffi.new('int *'))
+        lib_mock.sp_albumbrowse_num_tracks.return_value = 1000
+        lib_mock.sp_albumbrowse_track.return_value = sp_track
+        sp_albumbrowse = spotify.ffi.new('int *')
+        browser = spotify.AlbumBrowser(sp_albumbrowse=sp_albumbrowse)
+
+        # is_loaded, add_ref, num_tracks, and track() and the track's
+        # add_ref() per track
+        with tests.lib_call_budget(2003, lib_mock, track_lib_mock):
+            result = [track for track in browser.tracks]
+
+        self.assertEqual(len(result), 1000)
+
     def test_tracks_if_no_tracks(self, lib_mock):
         lib_mock.sp_albumbrowse_num_tracks.return_value = 0
         sp_albumbrowse = spotify.ffi.new('int *')
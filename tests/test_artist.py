@@ -108,6 +108,18 @@ class ArtistTest(unittest.TestCase):
         lib_mock.sp_artist_is_loaded.assert_called_once_with(sp_artist)
         self.assertTrue(result)
 
+    def test_is_loaded_is_remembered_once_loaded(self, lib_mock):
+        lib_mock.sp_artist_is_loaded.return_value = 0
+        sp_artist = spotify.ffi.new('int *')
+        artist = spotify.Artist(sp_artist=sp_artist)
+
+        self.assertFalse(artist.is_loaded)
+        lib_mock.sp_artist_is_loaded.return_value = 1
+        self.assertTrue(artist.is_loaded)
+        self.assertTrue(artist.is_loaded)
+
+        self.assertEqual(lib_mock.sp_artist_is_loaded.call_count, 2)
+
     @mock.patch('spotify.utils.load')
     def test_load(self, load_mock, lib_mock):
         sp_artist = spotify.ffi.new('int *')
@@ -244,6 +256,88 @@ class ArtistBrowserTest(unittest.TestCase):
         result.complete_event.wait(3)
         callback.assert_called_with(result)
 
+    def test_create_from_artist_with_fields(self, lib_mock):
+        session = self.create_session(lib_mock)
+        sp_artist = spotify.ffi.new('int *')
+        artist = spotify.Artist(sp_artist=sp_artist)
+        sp_artistbrowse = spotify.ffi.cast(
+            'sp_artistbrowse *', spotify.ffi.new('int *'))
+        lib_mock.sp_artistbrowse_create.return_value = sp_artistbrowse
+
+        artist.browse(fields=['biography', 'similar_artists'])
+
+        lib_mock.sp_artistbrowse_create.assert_called_with(
+            session._sp_session, sp_artist,
+            int(spotify.ArtistBrowserType.NO_ALBUMS), mock.ANY, mock.ANY)
+
+        artist.browse(fields=['similar_artists', 'albums'])
+
+        lib_mock.sp_artistbrowse_create.assert_called_with(
+            session._sp_session, sp_artist,
+            int(spotify.ArtistBrowserType.NO_TRACKS), mock.ANY, mock.ANY)
+
+        artist.browse(fields=['albums', 'tracks'])
+
+        lib_mock.sp_artistbrowse_create.assert_called_with(
+            session._sp_session, sp_artist,
+            int(spotify.ArtistBrowserType.FULL), mock.ANY, mock.ANY)
+
+    def test_create_from_artist_with_unknown_field_fails(self, lib_mock):
+        self.create_session(lib_mock)
+        sp_artist = spotify.ffi.new('int *')
+        artist = spotify.Artist(sp_artist=sp_artist)
+
+        with self.assertRaises(ValueError):
+            artist.browse(fields=['albums', 'foo'])
+
+        self.assertEqual(lib_mock.sp_artistbrowse_create.call_count, 0)
+
+    @mock.patch('spotify.utils.load')
+    def test_albums_upgrades_browser_created_with_fields(
+            self, load_mock, lib_mock):
+        session = self.create_session(lib_mock)
+        sp_artist = spotify.ffi.new('int *')
+        artist = spotify.Artist(sp_artist=sp_artist)
+        sp_artistbrowse1 = spotify.ffi.cast(
+            'sp_artistbrowse *', spotify.ffi.new('int *'))
+        sp_artistbrowse2 = spotify.ffi.cast(
+            'sp_artistbrowse *', spotify.ffi.new('int *'))
+        lib_mock.sp_artistbrowse_create.side_effect = [
+            sp_artistbrowse1, sp_artistbrowse2]
+        lib_mock.sp_artistbrowse_num_albums.return_value = 0
+        browser = artist.browse(fields=['biography'])
+
+        result = browser.albums
+
+        self.assertEqual(len(result), 0)
+        lib_mock.sp_artistbrowse_create.assert_called_with(
+            session._sp_session, sp_artist,
+            int(spotify.ArtistBrowserType.NO_TRACKS), mock.ANY, mock.ANY)
+        self.assertEqual(load_mock.call_count, 1)
+        self.assertEqual(browser._sp_artistbrowse, sp_artistbrowse2)
+        lib_mock.sp_artistbrowse_num_albums.assert_called_with(
+            sp_artistbrowse2)
+
+        browser.albums
+
+        self.assertEqual(lib_mock.sp_artistbrowse_create.call_count, 2)
+
+    def test_tracks_does_not_upgrade_browser_created_with_type(
+            self, lib_mock):
+        self.create_session(lib_mock)
+        sp_artist = spotify.ffi.new('int *')
+        artist = spotify.Artist(sp_artist=sp_artist)
+        sp_artistbrowse = spotify.ffi.cast(
+            'sp_artistbrowse *', spotify.ffi.new('int *'))
+        lib_mock.sp_artistbrowse_create.return_value = sp_artistbrowse
+        lib_mock.sp_artistbrowse_num_tracks.return_value = 0
+        browser = artist.browse(type=spotify.ArtistBrowserType.NO_ALBUMS)
+
+        result = browser.tracks
+
+        self.assertEqual(len(result), 0)
+        self.assertEqual(lib_mock.sp_artistbrowse_create.call_count, 1)
+
     def test_browser_is_gone_before_callback_is_called(self, lib_mock):
         self.create_session(lib_mock)
         sp_artist = spotify.ffi.new('int *')
@@ -461,6 +555,21 @@ class ArtistBrowserTest(unittest.TestCase):
         lib_mock.sp_artistbrowse_track.assert_called_with(sp_artistbrowse, 0)
         track_lib_mock.sp_track_add_ref.assert_called_with(sp_track)
 
+    @mock.patch('spotify.track.lib', spec=spotify.lib)
+    def test_iterating_tracks_call_budget(self, track_lib_mock, lib_mock):
+        sp_track = spotify.ffi.cast('sp_track *', spotify.ffi.new('int *'))
+        lib_mock.sp_artistbrowse_num_tracks.return_value = 1000
+        lib_mock.sp_artistbrowse_track.return_value = sp_track
+        sp_artistbrowse = spotify.ffi.new('int *')
+        browser = spotify.ArtistBrowser(sp_artistbrowse=sp_artistbrowse)
+
+        # is_loaded, add_ref, num_tracks, and track() and the track's
+        # add_ref() per track
+        with tests.lib_call_budget(2003, lib_mock, track_lib_mock):
+            result = [track for track in browser.tracks]
+
+        self.assertEqual(len(result), 1000)
+
     def test_tracks_if_no_tracks(self, lib_mock):
         lib_mock.sp_artistbrowse_num_tracks.return_value = 0
         sp_artistbrowse = spotify.ffi.new('int *')
@@ -1,5 +1,6 @@
 from __future__ import unicode_literals
 
+import mock
 import unittest
 
 import spotify
@@ -18,6 +19,132 @@ class AudioBufferStatsTest(unittest.TestCase):
         self.assertEqual(stats.stutter, 5)
 
 
+@mock.patch('spotify.audio.time')
+class BitrateControllerTest(unittest.TestCase):
+
+    def create_controller(self, time_mock, **kwargs):
+        time_mock.time.return_value = 0
+        kwargs.setdefault('stutter_threshold', 3)
+        kwargs.setdefault('window', 30)
+        kwargs.setdefault('upgrade_after', 120)
+        return spotify.BitrateController(**kwargs)
+
+    def play(self, controller, time_mock, seconds, samples=44100, stutter=0):
+        # Deliver audio in real time, querying the buffer stats every second
+        for _ in range(seconds):
+            time_mock.time.return_value += 1
+            controller.music_delivered(44100, 44100)
+            controller.buffer_stats(spotify.AudioBufferStats(samples, stutter))
+
+    def test_starts_with_highest_bitrate(self, time_mock):
+        controller = self.create_controller(time_mock)
+
+        self.assertEqual(controller.bitrate, spotify.Bitrate.BITRATE_320k)
+
+    def test_starts_with_initial_bitrate(self, time_mock):
+        controller = self.create_controller(
+            time_mock, initial=spotify.Bitrate.BITRATE_160k)
+
+        self.assertEqual(controller.bitrate, spotify.Bitrate.BITRATE_160k)
+
+    def test_steps_down_when_stutters_reach_threshold(self, time_mock):
+        controller = self.create_controller(time_mock)
+
+        self.play(controller, time_mock, 2, stutter=1)
+        self.assertEqual(controller.bitrate, spotify.Bitrate.BITRATE_320k)
+        self.play(controller, time_mock, 1, stutter=1)
+
+        self.assertEqual(controller.bitrate, spotify.Bitrate.BITRATE_160k)
+
+    def test_stutters_outside_window_are_forgotten(self, time_mock):
+        controller = self.create_controller(time_mock)
+
+        self.play(controller, time_mock, 2, stutter=1)
+        self.play(controller, time_mock, 30)
+        self.play(controller, time_mock, 1, stutter=1)
+
+        self.assertEqual(controller.bitrate, spotify.Bitrate.BITRATE_320k)
+
+    def test_steps_down_on_streaming_error(self, time_mock):
+        controller = self.create_controller(time_mock)
+
+        controller.streaming_error(spotify.ErrorType.NO_STREAM_AVAILABLE)
+
+        self.assertEqual(controller.bitrate, spotify.Bitrate.BITRATE_160k)
+
+    def test_does_not_step_below_lowest_bitrate(self, time_mock):
+        controller = self.create_controller(
+            time_mock, initial=spotify.Bitrate.BITRATE_96k)
+
+        controller.streaming_error(spotify.ErrorType.NO_STREAM_AVAILABLE)
+
+        self.assertEqual(controller.bitrate, spotify.Bitrate.BITRATE_96k)
+
+    def test_steps_up_after_sustained_headroom(self, time_mock):
+        controller = self.create_controller(time_mock)
+        controller.streaming_error(spotify.ErrorType.NO_STREAM_AVAILABLE)
+
+        self.play(controller, time_mock, 119)
+        self.assertEqual(controller.bitrate, spotify.Bitrate.BITRATE_160k)
+        self.play(controller, time_mock, 1)
+
+        self.assertEqual(controller.bitrate, spotify.Bitrate.BITRATE_320k)
+
+    def test_does_not_step_up_if_buffer_runs_low(self, time_mock):
+        controller = self.create_controller(time_mock)
+        controller.streaming_error(spotify.ErrorType.NO_STREAM_AVAILABLE)
+
+        self.play(controller, time_mock, 60)
+        self.play(controller, time_mock, 1, samples=100)
+        self.play(controller, time_mock, 60)
+
+        self.assertEqual(controller.bitrate, spotify.Bitrate.BITRATE_160k)
+
+    def test_does_not_step_up_if_delivery_is_slower_than_playback(
+            self, time_mock):
+        controller = self.create_controller(time_mock)
+        controller.streaming_error(spotify.ErrorType.NO_STREAM_AVAILABLE)
+
+        for _ in range(120):
+            time_mock.time.return_value += 1
+            controller.music_delivered(22050, 44100)
+            controller.buffer_stats(spotify.AudioBufferStats(44100, 0))
+
+        self.assertEqual(controller.bitrate, spotify.Bitrate.BITRATE_160k)
+
+    def test_stutter_below_threshold_restarts_headroom(self, time_mock):
+        controller = self.create_controller(time_mock)
+        controller.streaming_error(spotify.ErrorType.NO_STREAM_AVAILABLE)
+
+        self.play(controller, time_mock, 119)
+        self.play(controller, time_mock, 1, stutter=1)
+        self.play(controller, time_mock, 119)
+
+        self.assertEqual(controller.bitrate, spotify.Bitrate.BITRATE_160k)
+
+        self.play(controller, time_mock, 1)
+
+        self.assertEqual(controller.bitrate, spotify.Bitrate.BITRATE_320k)
+
+    def test_applies_changed_bitrate_to_session(self, time_mock):
+        controller = self.create_controller(time_mock)
+        session = mock.Mock()
+
+        controller._maybe_apply(session)
+        controller._maybe_apply(session)
+        controller.streaming_error(spotify.ErrorType.NO_STREAM_AVAILABLE)
+        controller._maybe_apply(session)
+
+        self.assertEqual(session.preferred_bitrate.mock_calls, [
+            mock.call(spotify.Bitrate.BITRATE_320k),
+            mock.call(spotify.Bitrate.BITRATE_160k),
+        ])
+
+    def test_fails_without_bitrates(self, time_mock):
+        with self.assertRaises(ValueError):
+            self.create_controller(time_mock, bitrates=[])
+
+
 class AudioFormatTest(unittest.TestCase):
 
     def setUp(self):
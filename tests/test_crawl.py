@@ -0,0 +1,290 @@
+from __future__ import unicode_literals
+
+import json
+import mock
+import os
+import shutil
+import tempfile
+import unittest
+
+import spotify
+
+
+GRAPH = {
+    'spotify:artist:a': ['spotify:artist:b', 'spotify:artist:c'],
+    'spotify:artist:b': ['spotify:artist:a', 'spotify:artist:d'],
+    'spotify:artist:c': ['spotify:artist:d'],
+    'spotify:artist:d': ['spotify:artist:e'],
+    'spotify:artist:e': [],
+}
+
+ALBUMS = {
+    'spotify:artist:a': ['spotify:album:x'],
+    'spotify:artist:b': ['spotify:album:x', 'spotify:album:y'],
+}
+
+TRACKS = {
+    'spotify:album:x': ['spotify:track:1', 'spotify:track:2'],
+    'spotify:album:y': ['spotify:track:3'],
+}
+
+
+def create_item(uri):
+    item = mock.Mock()
+    item.link.uri = uri
+    item.name = uri.split(':')[-1]
+    return item
+
+
+@mock.patch('spotify.Album')
+@mock.patch('spotify.Artist')
+class ArtistGraphCrawlerTest(unittest.TestCase):
+
+    def setUp(self):
+        self.session = mock.Mock()
+        self.session.process_events.side_effect = self.process_events
+        self.pending = []
+        self.browsed = []
+        self.max_pending = 0
+        self.records = []
+        self.browse_kwargs = {}
+
+    def process_events(self):
+        pending, self.pending = self.pending, []
+        for callback, browser in pending:
+            callback(browser)
+
+    def fake_browse(self, uri, callback, error=spotify.ErrorType.OK):
+        browser = mock.Mock()
+        browser.error = error
+        browser.artist = create_item(uri)
+        browser.similar_artists = [create_item(u) for u in GRAPH.get(uri, [])]
+        browser.albums = [create_item(u) for u in ALBUMS.get(uri, [])]
+        browser.tracks = [create_item(u) for u in TRACKS.get(uri, [])]
+        self.browsed.append(uri)
+        self.pending.append((callback, browser))
+        self.max_pending = max(self.max_pending, len(self.pending))
+        return browser
+
+    def fake_items(self, item_mock, errors=()):
+        def create(uri):
+            def browse(callback, **kwargs):
+                self.browse_kwargs[uri] = kwargs
+                return self.fake_browse(
+                    uri, callback,
+                    spotify.ErrorType.OTHER_PERMANENT if uri in errors
+                    else spotify.ErrorType.OK)
+
+            item = create_item(uri)
+            item.browse.side_effect = browse
+            return item
+        item_mock.side_effect = create
+
+    def nodes(self, type):
+        return [
+            record['uri'] for record in self.records
+            if record['kind'] == 'node' and record['type'] == type]
+
+    def edges(self, type):
+        return [
+            (record['from'], record['to']) for record in self.records
+            if record['kind'] == 'edge' and record['type'] == type]
+
+    def test_max_in_flight_must_be_positive(self, artist_mock, album_mock):
+        with self.assertRaises(ValueError):
+            spotify.ArtistGraphCrawler(self.session, max_in_flight=0)
+
+    def test_crawls_breadth_first_to_max_depth(self, artist_mock, album_mock):
+        self.fake_items(artist_mock)
+        crawler = spotify.ArtistGraphCrawler(
+            self.session, max_depth=2, callback=self.records.append)
+
+        crawler.crawl(['spotify:artist:a'])
+
+        self.assertEqual(self.nodes('artist'), [
+            'spotify:artist:a', 'spotify:artist:b', 'spotify:artist:c',
+            'spotify:artist:d'])
+        self.assertEqual(
+            [r['depth'] for r in self.records if r['kind'] == 'node'],
+            [0, 1, 1, 2])
+        self.assertEqual(self.edges('similar'), [
+            ('spotify:artist:a', 'spotify:artist:b'),
+            ('spotify:artist:a', 'spotify:artist:c'),
+            ('spotify:artist:b', 'spotify:artist:a'),
+            ('spotify:artist:b', 'spotify:artist:d'),
+            ('spotify:artist:c', 'spotify:artist:d'),
+            ('spotify:artist:d', 'spotify:artist:e'),
+        ])
+        self.assertEqual(crawler.artists, 4)
+        self.assertEqual(len(self.browsed), 4)
+        self.assertEqual(
+            self.browse_kwargs['spotify:artist:a'],
+            {'fields': ['artist', 'similar_artists']})
+
+    def test_accepts_artist_objects_as_seeds(self, artist_mock, album_mock):
+        self.fake_items(artist_mock)
+        crawler = spotify.ArtistGraphCrawler(
+            self.session, max_depth=0, callback=self.records.append)
+
+        crawler.crawl([create_item('spotify:artist:c')])
+
+        self.assertEqual(self.nodes('artist'), ['spotify:artist:c'])
+
+    def test_stops_at_max_artists(self, artist_mock, album_mock):
+        self.fake_items(artist_mock)
+        crawler = spotify.ArtistGraphCrawler(
+            self.session, max_depth=10, max_artists=2,
+            callback=self.records.append)
+
+        crawler.crawl(['spotify:artist:a'])
+
+        self.assertEqual(
+            self.nodes('artist'), ['spotify:artist:a', 'spotify:artist:b'])
+
+    def test_caps_browses_in_flight(self, artist_mock, album_mock):
+        self.fake_items(artist_mock)
+        crawler = spotify.ArtistGraphCrawler(
+            self.session, max_depth=10, max_in_flight=1)
+
+        crawler.crawl(['spotify:artist:a'])
+
+        self.assertEqual(len(self.browsed), 5)
+        self.assertEqual(self.max_pending, 1)
+
+    @mock.patch('spotify.crawl.time')
+    def test_limits_rate_of_browses(self, time_mock, artist_mock, album_mock):
+        self.fake_items(artist_mock)
+        time_mock.time.return_value = 0
+        start_times = []
+
+        def process_events():
+            start_times.extend([time_mock.time.return_value] * len(
+                self.pending))
+            self.process_events()
+            time_mock.time.return_value += 0.25
+
+        self.session.process_events.side_effect = process_events
+        crawler = spotify.ArtistGraphCrawler(
+            self.session, max_depth=10, max_rate=2)
+
+        crawler.crawl(['spotify:artist:a'])
+
+        self.assertEqual(start_times, [0, 0.5, 1.0, 1.5, 2.0])
+
+    def test_failed_browses_are_counted(self, artist_mock, album_mock):
+        self.fake_items(artist_mock, errors=['spotify:artist:b'])
+        crawler = spotify.ArtistGraphCrawler(
+            self.session, max_depth=10, callback=self.records.append)
+
+        crawler.crawl(['spotify:artist:a'])
+
+        self.assertNotIn('spotify:artist:b', self.nodes('artist'))
+        self.assertEqual(crawler.errors, 1)
+
+    def test_expands_albums_and_tracks(self, artist_mock, album_mock):
+        self.fake_items(artist_mock)
+        self.fake_items(album_mock)
+        crawler = spotify.ArtistGraphCrawler(
+            self.session, max_depth=1, expand_tracks=True,
+            callback=self.records.append)
+
+        crawler.crawl(['spotify:artist:a'])
+
+        self.assertEqual(
+            self.browse_kwargs['spotify:artist:a'],
+            {'fields': ['artist', 'similar_artists', 'albums']})
+        self.assertEqual(
+            self.nodes('album'), ['spotify:album:x', 'spotify:album:y'])
+        self.assertEqual(self.edges('album'), [
+            ('spotify:artist:a', 'spotify:album:x'),
+            ('spotify:artist:b', 'spotify:album:x'),
+            ('spotify:artist:b', 'spotify:album:y'),
+        ])
+        self.assertEqual(self.nodes('track'), [
+            'spotify:track:1', 'spotify:track:2', 'spotify:track:3'])
+        self.assertEqual(
+            self.edges('track')[0], ('spotify:album:x', 'spotify:track:1'))
+        self.assertEqual(crawler.albums, 2)
+        self.assertEqual(self.browsed.count('spotify:album:x'), 1)
+
+    def test_writes_records_as_json_lines(self, artist_mock, album_mock):
+        self.fake_items(artist_mock)
+        tmpdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmpdir)
+        path = os.path.join(tmpdir, 'graph.jsonl')
+        crawler = spotify.ArtistGraphCrawler(
+            self.session, max_depth=0, output=path)
+
+        crawler.crawl(['spotify:artist:c'])
+
+        with open(path) as fh:
+            records = [json.loads(line) for line in fh]
+        self.assertEqual(records, [
+            {'kind': 'node', 'type': 'artist', 'uri': 'spotify:artist:c',
+             'name': 'c', 'depth': 0},
+            {'kind': 'edge', 'type': 'similar', 'from': 'spotify:artist:c',
+             'to': 'spotify:artist:d'},
+        ])
+
+    def test_resumes_crawl_from_checkpoint(self, artist_mock, album_mock):
+        self.fake_items(artist_mock)
+        tmpdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmpdir)
+        path = os.path.join(tmpdir, 'checkpoint.json')
+
+        def interrupt(record):
+            if record['uri' if 'uri' in record else 'from'] == (
+                    'spotify:artist:b'):
+                raise KeyboardInterrupt
+            self.records.append(record)
+
+        crawler = spotify.ArtistGraphCrawler(
+            self.session, max_depth=10, callback=interrupt)
+        with self.assertRaises(KeyboardInterrupt):
+            crawler.crawl(['spotify:artist:a'])
+        crawler.save_checkpoint(path)
+
+        self.assertEqual(self.nodes('artist'), ['spotify:artist:a'])
+        self.records = []
+        crawler = spotify.ArtistGraphCrawler(
+            self.session, max_depth=10, callback=self.records.append)
+        crawler.load_checkpoint(path)
+        crawler.crawl()
+
+        self.assertEqual(sorted(self.nodes('artist')), [
+            'spotify:artist:b', 'spotify:artist:c', 'spotify:artist:d',
+            'spotify:artist:e'])
+        self.assertEqual(crawler.artists, 5)
+
+    def test_saves_checkpoints_while_crawling(self, artist_mock, album_mock):
+        self.fake_items(artist_mock)
+        tmpdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmpdir)
+        path = os.path.join(tmpdir, 'checkpoint.json')
+        crawler = spotify.ArtistGraphCrawler(
+            self.session, max_depth=10, checkpoint_path=path,
+            checkpoint_interval=2)
+
+        with mock.patch.object(
+                crawler, 'save_checkpoint',
+                wraps=crawler.save_checkpoint) as save_mock:
+            crawler.crawl(['spotify:artist:a'])
+
+        self.assertEqual(save_mock.call_count, 3)
+        with open(path) as fh:
+            checkpoint = json.load(fh)
+        self.assertEqual(checkpoint['artists'], 5)
+        self.assertEqual(checkpoint['artist_queue'], [])
+        self.assertEqual(len(checkpoint['seen_artists']), 5)
+
+    def test_load_checkpoint_with_unknown_version_fails(
+            self, artist_mock, album_mock):
+        tmpdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmpdir)
+        path = os.path.join(tmpdir, 'checkpoint.json')
+        with open(path, 'w') as fh:
+            fh.write('{"version": 2}')
+        crawler = spotify.ArtistGraphCrawler(self.session)
+
+        with self.assertRaises(ValueError):
+            crawler.load_checkpoint(path)
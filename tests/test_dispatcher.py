@@ -0,0 +1,189 @@
+from __future__ import unicode_literals
+
+import mock
+import threading
+import unittest
+
+import spotify
+
+
+class EventDispatcherTest(unittest.TestCase):
+
+    def setUp(self):
+        self.calls = []
+
+    def tearDown(self):
+        if hasattr(self, 'dispatcher'):
+            self.dispatcher.stop(timeout=1)
+
+    def func(self, event, *args):
+        self.calls.append((event, args))
+
+    def create_dispatcher(self, **kwargs):
+        self.dispatcher = spotify.EventDispatcher(**kwargs)
+        return self.dispatcher
+
+    def test_max_size_must_be_positive(self):
+        with self.assertRaises(ValueError):
+            spotify.EventDispatcher(max_size=0)
+
+    def test_overflow_policy_must_be_known(self):
+        with self.assertRaises(ValueError):
+            spotify.EventDispatcher(overflow='foo')
+
+    def test_delivers_events_in_order_from_worker_thread(self):
+        threads = []
+
+        def func(event, *args):
+            threads.append(threading.current_thread())
+            self.func(event, *args)
+
+        dispatcher = self.create_dispatcher()
+        dispatcher.start()
+
+        dispatcher.put('foo', func, (1, 2))
+        dispatcher.put('bar', func, ())
+
+        self.assertTrue(dispatcher.flush(timeout=1))
+        self.assertEqual(self.calls, [('foo', (1, 2)), ('bar', ())])
+        self.assertNotIn(threading.current_thread(), threads)
+        self.assertEqual(dispatcher.delivered, 2)
+        self.assertEqual(dispatcher.queue_depth, 0)
+
+    def test_queues_events_until_started(self):
+        dispatcher = self.create_dispatcher()
+
+        dispatcher.put('foo', self.func, ())
+
+        self.assertEqual(dispatcher.queue_depth, 1)
+        self.assertEqual(self.calls, [])
+
+        dispatcher.start()
+
+        self.assertTrue(dispatcher.flush(timeout=1))
+        self.assertEqual(self.calls, [('foo', ())])
+
+    def test_drop_oldest_drops_oldest_event_when_full(self):
+        dispatcher = self.create_dispatcher(
+            max_size=2, overflow=spotify.OverflowPolicy.DROP_OLDEST)
+
+        dispatcher.put('foo', self.func, (1,))
+        dispatcher.put('bar', self.func, (2,))
+        dispatcher.put('baz', self.func, (3,))
+        dispatcher.start()
+
+        self.assertTrue(dispatcher.flush(timeout=1))
+        self.assertEqual(self.calls, [('bar', (2,)), ('baz', (3,))])
+        self.assertEqual(dispatcher.dropped, 1)
+        self.assertEqual(dispatcher.max_queue_depth, 2)
+
+    def test_coalesce_drops_new_event_if_same_event_is_queued(self):
+        dispatcher = self.create_dispatcher(
+            max_size=2, overflow=spotify.OverflowPolicy.COALESCE)
+
+        dispatcher.put('foo', self.func, (1,))
+        dispatcher.put('bar', self.func, (2,))
+        dispatcher.put('foo', self.func, (3,))
+        dispatcher.put('baz', self.func, (4,))
+        dispatcher.start()
+
+        self.assertTrue(dispatcher.flush(timeout=1))
+        self.assertEqual(self.calls, [('bar', (2,)), ('baz', (4,))])
+        self.assertEqual(dispatcher.coalesced, 1)
+        self.assertEqual(dispatcher.dropped, 1)
+
+    def test_block_waits_for_room_in_the_queue(self):
+        release = threading.Event()
+
+        def slow_func(event, *args):
+            release.wait(1)
+            self.func(event, *args)
+
+        dispatcher = self.create_dispatcher(
+            max_size=1, overflow=spotify.OverflowPolicy.BLOCK)
+        dispatcher.start()
+        dispatcher.put('foo', slow_func, ())
+        dispatcher.put('bar', slow_func, ())
+        putter = threading.Thread(
+            target=dispatcher.put, args=('baz', slow_func, ()))
+        putter.start()
+
+        putter.join(0.2)
+        self.assertTrue(putter.is_alive())
+
+        release.set()
+        putter.join(1)
+        self.assertFalse(putter.is_alive())
+        self.assertTrue(dispatcher.flush(timeout=1))
+        self.assertEqual(
+            [event for event, args in self.calls], ['foo', 'bar', 'baz'])
+        self.assertEqual(dispatcher.dropped, 0)
+
+    def test_block_drops_oldest_if_emitter_is_in_a_libspotify_call(self):
+        def lib_func(event, *args):
+            spotify.serialized(self.func)(event, *args)
+
+        dispatcher = self.create_dispatcher(
+            max_size=1, overflow=spotify.OverflowPolicy.BLOCK)
+
+        @spotify.serialized
+        def sp_session_process_events():
+            # Like session callbacks called from process_events()
+            dispatcher.put('foo', lib_func, ())
+            dispatcher.start()
+            dispatcher.put('bar', lib_func, ())
+            dispatcher.put('baz', lib_func, ())
+
+        emitter = threading.Thread(target=sp_session_process_events)
+        emitter.daemon = True
+        emitter.start()
+        emitter.join(1)
+
+        self.assertFalse(emitter.is_alive())
+        self.assertTrue(dispatcher.flush(timeout=1))
+        self.assertGreaterEqual(dispatcher.dropped, 1)
+        self.assertEqual(self.calls[-1], ('baz', ()))
+
+    def test_failing_listener_does_not_stop_worker(self):
+        def failing_func(event, *args):
+            raise Exception('foo')
+
+        dispatcher = self.create_dispatcher()
+        dispatcher.start()
+
+        with mock.patch('spotify.dispatcher.logger') as logger_mock:
+            dispatcher.put('foo', failing_func, ())
+            dispatcher.put('bar', self.func, ())
+            self.assertTrue(dispatcher.flush(timeout=1))
+
+        self.assertEqual(self.calls, [('bar', ())])
+        self.assertEqual(logger_mock.exception.call_count, 1)
+
+    def test_flush_times_out_if_not_started(self):
+        dispatcher = self.create_dispatcher()
+        dispatcher.put('foo', self.func, ())
+
+        self.assertFalse(dispatcher.flush(timeout=0.01))
+
+    def test_stop_delivers_queued_events_and_stops_worker(self):
+        dispatcher = self.create_dispatcher()
+        dispatcher.put('foo', self.func, ())
+        dispatcher.start()
+
+        dispatcher.stop(timeout=1)
+
+        self.assertFalse(dispatcher.is_running)
+        self.assertEqual(self.calls, [('foo', ())])
+
+    def test_latency_percentiles(self):
+        dispatcher = self.create_dispatcher()
+
+        self.assertEqual(
+            dispatcher.latency_percentiles(), {50: None, 90: None, 99: None})
+
+        dispatcher.put('foo', self.func, ())
+        dispatcher.start()
+        dispatcher.flush(timeout=1)
+
+        result = dispatcher.latency_percentiles(percentiles=[50])
+        self.assertGreaterEqual(result[50], 0)
@@ -29,6 +29,12 @@ class ErrorTest(unittest.TestCase):
             spotify.ErrorType.BAD_API_VERSION,
             ignores=(spotify.ErrorType.BAD_API_VERSION,))
 
+    def test_maybe_raise_with_plain_int(self):
+        spotify.Error.maybe_raise(0)
+
+        with self.assertRaises(spotify.LibError):
+            spotify.Error.maybe_raise(1, ignores=[2])
+
 
 class LibErrorTest(unittest.TestCase):
 
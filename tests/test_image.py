@@ -1,6 +1,10 @@
 from __future__ import unicode_literals
 
+import io
 import mock
+import os
+import shutil
+import tempfile
 import unittest
 
 import spotify
@@ -81,67 +85,111 @@ class ImageTest(unittest.TestCase):
 
         self.assertFalse(image.load_event.is_set())
 
-    def test_add_and_call_load_callback(self, lib_mock):
+    def test_add_load_callback_registers_one_native_callback(
+            self, lib_mock):
+        lib_mock.sp_image_add_load_callback.return_value = int(
+            spotify.ErrorType.OK)
+        lib_mock.sp_image_is_loaded.return_value = 0
+        sp_image = spotify.ffi.cast('sp_image *', spotify.ffi.new('int *'))
+        image = spotify.Image(sp_image=sp_image)
+
+        image.add_load_callback(mock.Mock())
+        image.add_load_callback(mock.Mock())
+
+        lib_mock.sp_image_add_load_callback.assert_called_once_with(
+            sp_image, mock.ANY, mock.ANY)
+
+    def test_load_callback_sets_load_event_and_calls_callbacks(
+            self, lib_mock):
         lib_mock.sp_image_add_load_callback.return_value = int(
             spotify.ErrorType.OK)
         lib_mock.sp_image_remove_load_callback.return_value = int(
             spotify.ErrorType.OK)
+        lib_mock.sp_image_is_loaded.return_value = 0
         sp_image = spotify.ffi.cast('sp_image *', spotify.ffi.new('int *'))
         image = spotify.Image(sp_image=sp_image)
-        callback = mock.Mock()
+        callback1 = mock.Mock()
+        callback2 = mock.Mock()
+        image.add_load_callback(callback1)
+        image.add_load_callback(callback2)
+        image_load_cb = lib_mock.sp_image_add_load_callback.call_args[0][1]
+        userdata = lib_mock.sp_image_add_load_callback.call_args[0][2]
 
-        # Add
-        callback_handle = image.add_load_callback(callback)
-        lib_mock.sp_image_add_load_callback.assert_called_with(
-            sp_image, mock.ANY, callback_handle)
+        self.assertEqual(callback1.call_count, 0)
+        image_load_cb(sp_image, userdata)
+
+        self.assertTrue(image.load_event.is_set())
+        callback1.assert_called_once_with(image)
+        callback2.assert_called_once_with(image)
+        lib_mock.sp_image_remove_load_callback.assert_called_with(
+            sp_image, image_load_cb, userdata)
+
+    def test_callback_added_after_load_is_called_immediately_once(
+            self, lib_mock):
+        lib_mock.sp_image_add_load_callback.return_value = int(
+            spotify.ErrorType.OK)
+        lib_mock.sp_image_remove_load_callback.return_value = int(
+            spotify.ErrorType.OK)
+        lib_mock.sp_image_is_loaded.return_value = 0
+        sp_image = spotify.ffi.cast('sp_image *', spotify.ffi.new('int *'))
+        image = spotify.Image(sp_image=sp_image)
+        image.add_load_callback(mock.Mock())
         image_load_cb = lib_mock.sp_image_add_load_callback.call_args[0][1]
+        userdata = lib_mock.sp_image_add_load_callback.call_args[0][2]
+        image_load_cb(sp_image, userdata)
+        callback = mock.Mock()
+
+        image.add_load_callback(callback)
+
+        callback.assert_called_once_with(image)
+
+        image_load_cb(sp_image, userdata)
 
-        # Call
-        self.assertEqual(callback.call_count, 0)
-        image_load_cb(sp_image, callback_handle)
         self.assertEqual(callback.call_count, 1)
+        self.assertEqual(lib_mock.sp_image_add_load_callback.call_count, 1)
+
+    def test_callback_added_to_loaded_image_is_called_immediately(
+            self, lib_mock):
+        lib_mock.sp_image_is_loaded.return_value = 1
+        sp_image = spotify.ffi.new('int *')
+        image = spotify.Image(sp_image=sp_image)
+        callback = mock.Mock()
+
+        image.add_load_callback(callback)
+
+        callback.assert_called_once_with(image)
+        self.assertTrue(image.load_event.is_set())
+        self.assertEqual(lib_mock.sp_image_add_load_callback.call_count, 0)
 
     def test_add_and_remove_load_callback(self, lib_mock):
         lib_mock.sp_image_add_load_callback.return_value = int(
             spotify.ErrorType.OK)
         lib_mock.sp_image_remove_load_callback.return_value = int(
             spotify.ErrorType.OK)
+        lib_mock.sp_image_is_loaded.return_value = 0
         sp_image = spotify.ffi.cast('sp_image *', spotify.ffi.new('int *'))
         image = spotify.Image(sp_image=sp_image)
         callback = mock.Mock()
-
-        # Add
         callback_handle = image.add_load_callback(callback)
-        lib_mock.sp_image_add_load_callback.assert_called_with(
-            sp_image, mock.ANY, callback_handle)
         image_load_cb = lib_mock.sp_image_add_load_callback.call_args[0][1]
+        userdata = lib_mock.sp_image_add_load_callback.call_args[0][2]
 
-        # Remove
         image.remove_load_callback(callback_handle)
-        lib_mock.sp_image_remove_load_callback.assert_called_with(
-            sp_image, image_load_cb, callback_handle)
+        image_load_cb(sp_image, userdata)
+
+        self.assertEqual(callback.call_count, 0)
+        self.assertTrue(image.load_event.is_set())
 
     def test_add_load_callback_fails_if_error(self, lib_mock):
         lib_mock.sp_image_add_load_callback.return_value = int(
             spotify.ErrorType.BAD_API_VERSION)
+        lib_mock.sp_image_is_loaded.return_value = 0
         sp_image = spotify.ffi.new('int *')
         image = spotify.Image(sp_image=sp_image)
 
         with self.assertRaises(spotify.Error):
             image.add_load_callback(None)
 
-    def test_remove_load_callback_fails_if_error(self, lib_mock):
-        lib_mock.sp_image_add_load_callback.return_value = int(
-            spotify.ErrorType.OK)
-        lib_mock.sp_image_remove_load_callback.return_value = int(
-            spotify.ErrorType.BAD_API_VERSION)
-        sp_image = spotify.ffi.new('int *')
-        image = spotify.Image(sp_image=sp_image)
-        callback_id = image.add_load_callback(None)
-
-        with self.assertRaises(spotify.Error):
-            image.remove_load_callback(callback_id)
-
     def test_remove_load_callback_fails_if_unknown_callback(self, lib_mock):
         sp_image = spotify.ffi.new('int *')
         image = spotify.Image(sp_image=sp_image)
@@ -172,12 +220,17 @@ class ImageTest(unittest.TestCase):
 
     @mock.patch('spotify.utils.load')
     def test_load(self, load_mock, lib_mock):
+        lib_mock.sp_image_add_load_callback.return_value = int(
+            spotify.ErrorType.OK)
+        lib_mock.sp_image_is_loaded.return_value = 0
         sp_image = spotify.ffi.new('int *')
         image = spotify.Image(sp_image=sp_image)
 
         image.load(10)
 
-        load_mock.assert_called_with(image, timeout=10)
+        load_mock.assert_called_with(
+            image, timeout=10, event=image.load_event)
+        self.assertEqual(lib_mock.sp_image_add_load_callback.call_count, 1)
 
     def test_format(self, lib_mock):
         lib_mock.sp_image_is_loaded.return_value = 1
@@ -220,6 +273,92 @@ class ImageTest(unittest.TestCase):
         lib_mock.sp_image_data.assert_called_with(sp_image, mock.ANY)
         self.assertEqual(result[:5], b'abc\x00\x00')
 
+    def create_data(self, lib_mock, value):
+        data = spotify.ffi.new('char[]', value)
+        self.data_owners = [data]
+        data_void_ptr = spotify.ffi.cast('void *', data)
+
+        def func(sp_image_ptr, data_size_ptr):
+            data_size_ptr[0] = len(value)
+            return data_void_ptr
+
+        lib_mock.sp_image_data.side_effect = func
+
+    def test_data_view(self, lib_mock):
+        lib_mock.sp_image_is_loaded.return_value = 1
+        self.create_data(lib_mock, b'abc\x00def')
+        sp_image = spotify.ffi.new('int *')
+        image = spotify.Image(sp_image=sp_image)
+
+        result = image.data_view
+
+        lib_mock.sp_image_data.assert_called_with(sp_image, mock.ANY)
+        self.assertIsInstance(result, memoryview)
+        self.assertEqual(len(result), 7)
+        self.assertEqual(result.tobytes(), b'abc\x00def')
+
+    def test_data_view_keeps_image_alive(self, lib_mock):
+        lib_mock.sp_image_is_loaded.return_value = 1
+        self.create_data(lib_mock, b'abc')
+        sp_image = spotify.ffi.new('int *')
+        image = spotify.Image(sp_image=sp_image)
+
+        result = image.data_view
+        # The recorded calls hold references to the image's sp_image
+        lib_mock.reset_mock()
+        image = None  # noqa
+        tests.gc_collect()
+
+        self.assertEqual(lib_mock.sp_image_release.call_count, 0)
+
+        result = None  # noqa
+        tests.gc_collect()
+
+        lib_mock.sp_image_release.assert_called_with(sp_image)
+
+    def test_data_view_is_none_if_unloaded(self, lib_mock):
+        lib_mock.sp_image_is_loaded.return_value = 0
+        sp_image = spotify.ffi.new('int *')
+        image = spotify.Image(sp_image=sp_image)
+
+        result = image.data_view
+
+        self.assertIsNone(result)
+
+    def test_write_to_file_object(self, lib_mock):
+        lib_mock.sp_image_is_loaded.return_value = 1
+        self.create_data(lib_mock, b'abc\x00def')
+        sp_image = spotify.ffi.new('int *')
+        image = spotify.Image(sp_image=sp_image)
+        fileobj = io.BytesIO()
+
+        result = image.write_to(fileobj)
+
+        self.assertEqual(result, 7)
+        self.assertEqual(fileobj.getvalue(), b'abc\x00def')
+
+    def test_write_to_path(self, lib_mock):
+        lib_mock.sp_image_is_loaded.return_value = 1
+        self.create_data(lib_mock, b'abc\x00def')
+        sp_image = spotify.ffi.new('int *')
+        image = spotify.Image(sp_image=sp_image)
+        tmpdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, tmpdir)
+        path = os.path.join(tmpdir, 'cover.jpg')
+
+        image.write_to(path)
+
+        with open(path, 'rb') as fh:
+            self.assertEqual(fh.read(), b'abc\x00def')
+
+    def test_write_to_fails_if_unloaded(self, lib_mock):
+        lib_mock.sp_image_is_loaded.return_value = 0
+        sp_image = spotify.ffi.new('int *')
+        image = spotify.Image(sp_image=sp_image)
+
+        with self.assertRaises(RuntimeError):
+            image.write_to(io.BytesIO())
+
     def test_data_is_none_if_unloaded(self, lib_mock):
         lib_mock.sp_image_is_loaded.return_value = 0
         sp_image = spotify.ffi.new('int *')
@@ -235,14 +374,29 @@ class ImageTest(unittest.TestCase):
         sp_image = spotify.ffi.new('int *')
 
         prop_mock = mock.PropertyMock()
-        with mock.patch.object(spotify.Image, 'data', prop_mock):
+        with mock.patch.object(spotify.Image, 'data_view', prop_mock):
             image = spotify.Image(sp_image=sp_image)
-            prop_mock.return_value = b'01234\x006789'
+            prop_mock.return_value = memoryview(b'01234\x006789')
 
             result = image.data_uri
 
         self.assertEqual(result, 'data:image/jpeg;base64,MDEyMzQANjc4OQ==')
 
+    def test_data_uri_is_cached(self, lib_mock):
+        lib_mock.sp_image_format.return_value = int(spotify.ImageFormat.JPEG)
+        sp_image = spotify.ffi.new('int *')
+
+        prop_mock = mock.PropertyMock()
+        with mock.patch.object(spotify.Image, 'data_view', prop_mock):
+            image = spotify.Image(sp_image=sp_image)
+            prop_mock.return_value = memoryview(b'01234\x006789')
+
+            result1 = image.data_uri
+            result2 = image.data_uri
+
+        self.assertEqual(result1, result2)
+        self.assertEqual(prop_mock.call_count, 1)
+
     def test_data_uri_is_none_if_unloaded(self, lib_mock):
         lib_mock.sp_image_is_loaded.return_value = 0
         sp_image = spotify.ffi.new('int *')
@@ -0,0 +1,308 @@
+from __future__ import unicode_literals
+
+import mock
+import os
+import shutil
+import tempfile
+import unittest
+
+import spotify
+
+
+IMAGE_ID_1 = b'\x01' * 20
+IMAGE_ID_2 = b'\x02' * 20
+IMAGE_ID_3 = b'\x03' * 20
+IMAGE_URI_1 = 'spotify:image:%s' % ('01' * 20)
+IMAGE_URI_2 = 'spotify:image:%s' % ('02' * 20)
+IMAGE_URI_3 = 'spotify:image:%s' % ('03' * 20)
+
+
+class ImageCacheTest(unittest.TestCase):
+
+    def setUp(self):
+        self.path = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.path)
+
+    def test_get_returns_none_if_not_cached(self):
+        cache = spotify.ImageCache(self.path)
+
+        self.assertIsNone(cache.get(IMAGE_ID_1))
+        self.assertEqual(cache.misses, 1)
+
+    def test_put_and_get(self):
+        cache = spotify.ImageCache(self.path)
+
+        cache.put(IMAGE_ID_1, b'foo')
+
+        self.assertEqual(cache.get(IMAGE_ID_1), b'foo')
+        self.assertEqual(cache.hits, 1)
+        self.assertIn(IMAGE_ID_1, cache)
+        self.assertEqual(len(cache), 1)
+        self.assertEqual(cache.size, 3)
+        self.assertTrue(os.path.isfile(
+            os.path.join(self.path, '01', '01' * 20)))
+
+    def test_put_replaces_existing_image(self):
+        cache = spotify.ImageCache(self.path)
+        cache.put(IMAGE_ID_1, b'foo')
+
+        cache.put(IMAGE_ID_1, b'foobar')
+
+        self.assertEqual(cache.get(IMAGE_ID_1), b'foobar')
+        self.assertEqual(cache.size, 6)
+
+    def test_images_survive_restart(self):
+        spotify.ImageCache(self.path).put(IMAGE_ID_1, b'foo')
+
+        cache = spotify.ImageCache(self.path)
+
+        self.assertEqual(cache.get(IMAGE_ID_1), b'foo')
+        self.assertEqual(cache.size, 3)
+
+    def test_evicts_least_recently_used_images(self):
+        cache = spotify.ImageCache(self.path, max_bytes=8)
+        cache.put(IMAGE_ID_1, b'1111')
+        cache.put(IMAGE_ID_2, b'2222')
+        cache.get(IMAGE_ID_1)
+
+        cache.put(IMAGE_ID_3, b'3333')
+
+        self.assertIn(IMAGE_ID_1, cache)
+        self.assertNotIn(IMAGE_ID_2, cache)
+        self.assertIn(IMAGE_ID_3, cache)
+        self.assertEqual(cache.size, 8)
+        self.assertFalse(os.path.exists(
+            os.path.join(self.path, '02', '02' * 20)))
+
+    def test_evicts_by_modification_time_on_restart(self):
+        cache = spotify.ImageCache(self.path)
+        cache.put(IMAGE_ID_1, b'1111')
+        cache.put(IMAGE_ID_2, b'2222')
+        os.utime(os.path.join(self.path, '01', '01' * 20), (2000, 2000))
+        os.utime(os.path.join(self.path, '02', '02' * 20), (1000, 1000))
+
+        cache = spotify.ImageCache(self.path, max_bytes=4)
+
+        self.assertIn(IMAGE_ID_1, cache)
+        self.assertNotIn(IMAGE_ID_2, cache)
+
+    def test_clear(self):
+        cache = spotify.ImageCache(self.path)
+        cache.put(IMAGE_ID_1, b'foo')
+
+        cache.clear()
+
+        self.assertEqual(len(cache), 0)
+        self.assertEqual(cache.size, 0)
+        self.assertIsNone(spotify.ImageCache(self.path).get(IMAGE_ID_1))
+
+
+@mock.patch('spotify.imagecache.lib', spec=spotify.lib)
+class ImagePipelineTest(unittest.TestCase):
+
+    def setUp(self):
+        self.session = mock.Mock()
+        self.session._sp_session = mock.sentinel.sp_session
+        self.session.process_events.side_effect = self.process_events
+        self.images = {}
+        self.pending = []
+        self.max_pending = 0
+        self.errors = {}
+
+    def process_events(self):
+        pending, self.pending = self.pending, []
+        for image_id, callback in pending:
+            image = self.images[image_id]
+            image.error = self.errors.get(image_id, spotify.ErrorType.OK)
+            image.is_loaded = image.error == spotify.ErrorType.OK
+            image.data = b'data:' + image_id if image.is_loaded else None
+            callback(image)
+
+    def create_image(self, image_id):
+        image = mock.Mock()
+        image.is_loaded = False
+        image.error = spotify.ErrorType.IS_LOADING
+        image.add_load_callback.side_effect = lambda callback: (
+            self.pending.append((image_id, callback)))
+        self.images[image_id] = image
+        self.max_pending = max(self.max_pending, len([
+            i for i in self.images.values()
+            if i.error == spotify.ErrorType.IS_LOADING]))
+        return image
+
+    def create_pipeline(self, cache=None, **kwargs):
+        pipeline = spotify.ImagePipeline(self.session, cache=cache, **kwargs)
+        pipeline._create_image = mock.Mock(side_effect=self.create_image)
+        return pipeline
+
+    def test_max_in_flight_must_be_positive(self, lib_mock):
+        with self.assertRaises(ValueError):
+            spotify.ImagePipeline(self.session, max_in_flight=0)
+
+    def test_create_image(self, lib_mock):
+        sp_image = spotify.ffi.cast('sp_image *', spotify.ffi.new('int *'))
+        lib_mock.sp_image_create.return_value = sp_image
+        pipeline = spotify.ImagePipeline(self.session)
+
+        with mock.patch('spotify.image.lib', spec=spotify.lib):
+            result = pipeline._create_image(IMAGE_ID_1)
+
+        self.assertIsInstance(result, spotify.Image)
+        self.assertEqual(result._sp_image, sp_image)
+        self.assertEqual(
+            lib_mock.sp_image_create.call_args[0][0],
+            mock.sentinel.sp_session)
+        self.assertEqual(
+            spotify.ffi.buffer(lib_mock.sp_image_create.call_args[0][1])[:],
+            IMAGE_ID_1)
+
+    def test_fetches_image_uris(self, lib_mock):
+        pipeline = self.create_pipeline()
+
+        result = list(pipeline.fetch([IMAGE_URI_1, IMAGE_URI_2]))
+
+        self.assertEqual(result, [
+            (IMAGE_URI_1, b'data:' + IMAGE_ID_1),
+            (IMAGE_URI_2, b'data:' + IMAGE_ID_2),
+        ])
+        self.assertEqual(pipeline._create_image.call_count, 2)
+
+    def test_caps_images_in_flight(self, lib_mock):
+        pipeline = self.create_pipeline(max_in_flight=1)
+
+        result = list(pipeline.fetch([IMAGE_URI_1, IMAGE_URI_2, IMAGE_URI_3]))
+
+        self.assertEqual(len(result), 3)
+        self.assertEqual(self.max_pending, 1)
+        self.assertEqual(self.session.process_events.call_count, 3)
+
+    def test_duplicate_images_are_loaded_once(self, lib_mock):
+        pipeline = self.create_pipeline()
+
+        result = list(pipeline.fetch([IMAGE_URI_1] * 2))
+
+        self.assertEqual(result, [
+            (IMAGE_URI_1, b'data:' + IMAGE_ID_1),
+            (IMAGE_URI_1, b'data:' + IMAGE_ID_1),
+        ])
+        self.assertEqual(pipeline._create_image.call_count, 1)
+
+    def test_images_in_cache_are_not_loaded(self, lib_mock):
+        cache = mock.Mock()
+        cache.get.side_effect = lambda image_id: (
+            b'cached' if image_id == IMAGE_ID_1 else None)
+        pipeline = self.create_pipeline(cache=cache)
+
+        result = list(pipeline.fetch([IMAGE_URI_1, IMAGE_URI_2]))
+
+        self.assertEqual(result, [
+            (IMAGE_URI_1, b'cached'),
+            (IMAGE_URI_2, b'data:' + IMAGE_ID_2),
+        ])
+        pipeline._create_image.assert_called_once_with(IMAGE_ID_2)
+        cache.put.assert_called_once_with(IMAGE_ID_2, b'data:' + IMAGE_ID_2)
+
+    def test_failed_images_yield_none_and_are_not_cached(self, lib_mock):
+        cache = mock.Mock()
+        cache.get.return_value = None
+        self.errors[IMAGE_ID_1] = spotify.ErrorType.OTHER_PERMANENT
+        pipeline = self.create_pipeline(cache=cache)
+
+        result = list(pipeline.fetch([IMAGE_URI_1]))
+
+        self.assertEqual(result, [(IMAGE_URI_1, None)])
+        self.assertEqual(cache.put.call_count, 0)
+
+    def test_polls_images_loaded_without_callback(self, lib_mock):
+        pipeline = self.create_pipeline()
+
+        def process_events():
+            image = self.images[IMAGE_ID_1]
+            image.is_loaded = True
+            image.error = spotify.ErrorType.OK
+            image.data = b'polled'
+
+        self.session.process_events.side_effect = process_events
+
+        result = list(pipeline.fetch([IMAGE_URI_1]))
+
+        self.assertEqual(result, [(IMAGE_URI_1, b'polled')])
+
+    def test_fetches_album_covers(self, lib_mock):
+        album = mock.Mock(spec=spotify.Album)
+        album._sp_album = mock.sentinel.sp_album
+        album.is_loaded = False
+        no_cover_album = mock.Mock(spec=spotify.Album)
+        no_cover_album._sp_album = mock.sentinel.no_cover_sp_album
+        no_cover_album.is_loaded = True
+        cover_id_array = spotify.ffi.new(
+            'byte[]', list(bytearray(IMAGE_ID_1)))
+        cover_id = spotify.ffi.cast('byte *', cover_id_array)
+        lib_mock.sp_album_cover.side_effect = lambda sp_album, size: (
+            cover_id if sp_album is mock.sentinel.sp_album
+            else spotify.ffi.NULL)
+        pipeline = self.create_pipeline()
+
+        def process_events():
+            album.is_loaded = True
+            self.process_events()
+
+        self.session.process_events.side_effect = process_events
+
+        result = list(pipeline.fetch([album, no_cover_album]))
+
+        self.assertEqual(result, [
+            (no_cover_album, None),
+            (album, b'data:' + IMAGE_ID_1),
+        ])
+        lib_mock.sp_album_cover.assert_called_with(
+            mock.sentinel.sp_album, int(spotify.ImageSize.NORMAL))
+
+    def test_fetches_artist_portraits(self, lib_mock):
+        artist = mock.Mock(spec=spotify.Artist)
+        artist._sp_artist = mock.sentinel.sp_artist
+        artist.is_loaded = True
+        portrait_id_array = spotify.ffi.new(
+            'byte[]', list(bytearray(IMAGE_ID_2)))
+        lib_mock.sp_artist_portrait.return_value = spotify.ffi.cast(
+            'byte *', portrait_id_array)
+        pipeline = self.create_pipeline(
+            image_size=spotify.ImageSize.LARGE)
+
+        result = list(pipeline.fetch([artist]))
+
+        self.assertEqual(result, [(artist, b'data:' + IMAGE_ID_2)])
+        lib_mock.sp_artist_portrait.assert_called_with(
+            mock.sentinel.sp_artist, int(spotify.ImageSize.LARGE))
+
+    @mock.patch('spotify.imagecache.time')
+    def test_yields_none_for_images_not_loaded_before_timeout(
+            self, time_mock, lib_mock):
+        time_mock.time.return_value = 0
+        pipeline = self.create_pipeline(max_in_flight=1)
+
+        def process_events():
+            time_mock.time.return_value += 6
+
+        self.session.process_events.side_effect = process_events
+
+        result = list(pipeline.fetch([IMAGE_URI_1, IMAGE_URI_2], timeout=10))
+
+        self.assertEqual(result, [(IMAGE_URI_1, None), (IMAGE_URI_2, None)])
+        self.assertEqual(self.session.process_events.call_count, 2)
+
+    def test_fetch_with_invalid_uri_fails(self, lib_mock):
+        pipeline = self.create_pipeline()
+
+        with self.assertRaises(ValueError):
+            pipeline.fetch(['spotify:image:foo'])
+        with self.assertRaises(ValueError):
+            pipeline.fetch(['spotify:track:foo'])
+
+    def test_fetch_with_unknown_item_fails(self, lib_mock):
+        pipeline = self.create_pipeline()
+
+        with self.assertRaises(TypeError):
+            pipeline.fetch([123])
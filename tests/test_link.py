@@ -56,7 +56,22 @@ class LinkTest(unittest.TestCase):
         lib_mock.sp_link_create_from_string.return_value = spotify.ffi.NULL
 
         with self.assertRaises(ValueError):
-            spotify.Link('invalid link string')
+            spotify.Link('spotify:track:invalid link string')
+
+    def test_rejects_non_uris_without_calling_libspotify(self, lib_mock):
+        for string in ['invalid link string', 'spotify:foo:bar', 'spotify:']:
+            with self.assertRaises(ValueError):
+                spotify.Link(string)
+
+        self.assertEqual(lib_mock.sp_link_create_from_string.call_count, 0)
+
+    def test_accepts_spotify_web_urls(self, lib_mock):
+        sp_link = spotify.ffi.new('int *')
+        lib_mock.sp_link_create_from_string.return_value = sp_link
+
+        spotify.Link('http://open.spotify.com/track/foo')
+
+        self.assertEqual(lib_mock.sp_link_create_from_string.call_count, 1)
 
     def test_releases_sp_link_when_link_dies(self, lib_mock):
         sp_link = spotify.ffi.new('int *')
@@ -74,7 +89,7 @@ class LinkTest(unittest.TestCase):
         string = 'foo'
 
         lib_mock.sp_link_as_string.side_effect = tests.buffer_writer(string)
-        link = spotify.Link(string)
+        link = spotify.Link('spotify:track:foo')
 
         result = repr(link)
 
@@ -86,17 +101,29 @@ class LinkTest(unittest.TestCase):
         string = 'foo'
 
         lib_mock.sp_link_as_string.side_effect = tests.buffer_writer(string)
-        link = spotify.Link(string)
+        link = spotify.Link('spotify:track:foo')
 
         self.assertEqual(str(link), link.uri)
 
+    def test_uri_call_budget(self, lib_mock):
+        sp_link = spotify.ffi.new('int *')
+        lib_mock.sp_link_create_from_string.return_value = sp_link
+        lib_mock.sp_link_as_string.side_effect = tests.buffer_writer(
+            'spotify:track:foo')
+        link = spotify.Link('spotify:track:foo')
+
+        with tests.lib_call_budget(1, lib_mock):
+            result = link.uri
+
+        self.assertEqual(result, 'spotify:track:foo')
+
     def test_uri_grows_buffer_to_fit_link(self, lib_mock):
         sp_link = spotify.ffi.new('int *')
         lib_mock.sp_link_create_from_string.return_value = sp_link
         string = 'foo' * 100
 
         lib_mock.sp_link_as_string.side_effect = tests.buffer_writer(string)
-        link = spotify.Link(string)
+        link = spotify.Link('spotify:track:foo')
 
         result = link.uri
 
@@ -308,3 +335,99 @@ class LinkTypeTest(unittest.TestCase):
         self.assertEqual(spotify.LinkType.INVALID, 0)
         self.assertEqual(spotify.LinkType.TRACK, 1)
         self.assertEqual(spotify.LinkType.ALBUM, 2)
+
+
+@mock.patch('spotify.Link', spec=spotify.Link)
+class UriCacheTest(unittest.TestCase):
+
+    def setUp(self):
+        spotify.session_instance = mock.sentinel.session
+
+    def tearDown(self):
+        spotify.session_instance = None
+
+    def test_first_lookup_is_a_miss(self, link_mock):
+        link_mock.return_value.as_track.return_value = mock.sentinel.track
+        cache = spotify.UriCache()
+
+        result = cache.resolve('spotify:track:foo', 'track')
+
+        self.assertIs(result, mock.sentinel.track)
+        link_mock.assert_called_once_with('spotify:track:foo')
+        self.assertEqual(cache.misses, 1)
+        self.assertEqual(len(cache), 1)
+
+    def test_second_lookup_is_a_hit(self, link_mock):
+        link_mock.return_value.as_track.return_value = mock.sentinel.track
+        cache = spotify.UriCache()
+        cache.resolve('spotify:track:foo', 'track')
+
+        result = cache.resolve('spotify:track:foo', 'track')
+
+        self.assertIs(result, mock.sentinel.track)
+        self.assertEqual(link_mock.call_count, 1)
+        self.assertEqual(cache.hits, 1)
+
+    def test_same_uri_with_other_type_is_a_miss(self, link_mock):
+        cache = spotify.UriCache()
+        cache.resolve('spotify:track:foo', 'track')
+
+        cache.resolve('spotify:track:foo', 'album')
+
+        self.assertEqual(cache.misses, 2)
+        link_mock.return_value.as_album.assert_called_once_with()
+
+    def test_failed_lookups_are_not_cached(self, link_mock):
+        link_mock.return_value.as_track.return_value = None
+        cache = spotify.UriCache()
+
+        self.assertIsNone(cache.resolve('spotify:track:foo', 'track'))
+        self.assertIsNone(cache.resolve('spotify:track:foo', 'track'))
+
+        self.assertEqual(cache.misses, 2)
+        self.assertEqual(len(cache), 0)
+
+    def test_drops_least_recently_used_object_when_full(self, link_mock):
+        link_mock.return_value.as_track.side_effect = (
+            lambda: mock.Mock())
+        cache = spotify.UriCache(max_size=2)
+        cache.resolve('spotify:track:a', 'track')
+        cache.resolve('spotify:track:b', 'track')
+        cache.resolve('spotify:track:a', 'track')
+
+        cache.resolve('spotify:track:c', 'track')
+        cache.resolve('spotify:track:a', 'track')
+        cache.resolve('spotify:track:b', 'track')
+
+        self.assertEqual(len(cache), 2)
+        self.assertEqual(cache.hits, 2)
+        self.assertEqual(cache.misses, 4)
+
+    def test_clear(self, link_mock):
+        cache = spotify.UriCache()
+        cache.resolve('spotify:track:foo', 'track')
+
+        cache.clear()
+
+        self.assertEqual(len(cache), 0)
+
+    def test_objects_created_from_uri_use_session_uri_cache(self, link_mock):
+        session = mock.Mock()
+        session.uri_cache = mock.Mock(spec=spotify.UriCache)
+        session.uri_cache.resolve.return_value = mock.sentinel.track
+        spotify.session_instance = session
+
+        result = spotify.link._resolve('spotify:track:foo', 'track')
+
+        self.assertIs(result, mock.sentinel.track)
+        session.uri_cache.resolve.assert_called_once_with(
+            'spotify:track:foo', 'track')
+        self.assertEqual(link_mock.call_count, 0)
+
+    def test_objects_created_from_uri_without_cache(self, link_mock):
+        link_mock.return_value.as_track.return_value = mock.sentinel.track
+
+        result = spotify.link._resolve('spotify:track:foo', 'track')
+
+        self.assertIs(result, mock.sentinel.track)
+        link_mock.assert_called_once_with('spotify:track:foo')
@@ -64,6 +64,19 @@ class LoadableTest(unittest.TestCase):
         self.assertEqual(session_mock.process_events.call_count, 2)
         self.assertEqual(time_mock.sleep.call_count, 2)
 
+    def test_load_waits_on_event_instead_of_sleeping(
+            self, is_loaded_mock, session_mock, time_mock):
+        is_loaded_mock.side_effect = [False, False, True]
+        time_mock.time.side_effect = time.time
+        event = mock.Mock()
+
+        foo = Foo()
+        load(foo, event=event)
+
+        self.assertEqual(session_mock.process_events.call_count, 2)
+        self.assertEqual(time_mock.sleep.call_count, 0)
+        self.assertEqual(event.wait.call_count, 2)
+
     def test_load_raises_exception_on_error(
             self, is_loaded_mock, session_mock, time_mock):
         is_loaded_mock.side_effect = [False, False, True]
@@ -99,6 +112,31 @@ class LoadableTest(unittest.TestCase):
         self.assertEqual(session_mock.process_events.call_count, 2)
         self.assertEqual(time_mock.sleep.call_count, 2)
 
+    def test_load_counts_completed_loads_by_type(
+            self, is_loaded_mock, session_mock, time_mock):
+        is_loaded_mock.return_value = True
+        session_mock._metrics = spotify.Metrics()
+
+        Foo().load()
+
+        counters = session_mock._metrics.snapshot()['counters']
+        self.assertEqual(counters['loads.pending.Foo'], 0)
+        self.assertEqual(counters['loads.completed.Foo'], 1)
+
+    def test_load_counts_timeouts_by_type(
+            self, is_loaded_mock, session_mock, time_mock):
+        is_loaded_mock.return_value = False
+        time_mock.time.side_effect = time.time
+        session_mock._metrics = spotify.Metrics()
+
+        with self.assertRaises(spotify.Timeout):
+            Foo().load(timeout=0)
+
+        counters = session_mock._metrics.snapshot()['counters']
+        self.assertEqual(counters['loads.pending.Foo'], 0)
+        self.assertEqual(counters['loads.timeouts.Foo'], 1)
+        self.assertNotIn('loads.completed.Foo', counters)
+
     def test_load_returns_self(
             self, is_loaded_mock, session_mock, time_mock):
         is_loaded_mock.return_value = True
@@ -0,0 +1,281 @@
+from __future__ import unicode_literals
+
+import mock
+import os
+import shutil
+import tempfile
+import unittest
+
+import spotify
+
+
+FOO_URI = 'spotify:track:%s' % ('a' * 22)
+BAR_URI = 'spotify:track:%s' % ('b' * 22)
+
+
+def create_obj(cls, uri, is_loaded=True, **attrs):
+    obj = mock.Mock(spec=cls)
+    obj.link.uri = uri
+    obj.is_loaded = is_loaded
+    for name, value in attrs.items():
+        setattr(obj, name, value)
+    return obj
+
+
+def create_track(uri='spotify:track:foo', **attrs):
+    artist = create_obj(spotify.Artist, 'spotify:artist:bar')
+    album = create_obj(spotify.Album, 'spotify:album:baz')
+    defaults = dict(
+        name='Foo', duration=180000, popularity=50, disc=1, index=3,
+        artists=[artist], album=album)
+    defaults.update(attrs)
+    return create_obj(spotify.Track, uri, **defaults)
+
+
+@mock.patch('spotify.metadatastore.time')
+class MetadataStoreTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.path = os.path.join(self.tmpdir, 'metadata.db')
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def create_store(self, **kwargs):
+        store = spotify.MetadataStore(self.path, **kwargs)
+        self.addCleanup(store.close)
+        return store
+
+    def test_uses_wal_journal_mode(self, time_mock):
+        store = self.create_store()
+
+        result = store._connection.execute('PRAGMA journal_mode').fetchone()
+
+        self.assertEqual(result[0], 'wal')
+
+    def test_put_and_get_track(self, time_mock):
+        time_mock.time.return_value = 1000
+        store = self.create_store()
+
+        store.put(create_track())
+        result = store.get('spotify:track:foo')
+
+        self.assertEqual(result, {
+            'uri': 'spotify:track:foo',
+            'type': 'track',
+            'fetched': 1000,
+            'name': 'Foo',
+            'duration': 180000,
+            'popularity': 50,
+            'disc': 1,
+            'index': 3,
+            'artists': ['spotify:artist:bar'],
+            'album': 'spotify:album:baz',
+        })
+
+    def test_put_and_get_album(self, time_mock):
+        time_mock.time.return_value = 1000
+        store = self.create_store()
+        album = create_obj(
+            spotify.Album, 'spotify:album:foo', name='Foo', year=2013,
+            type=spotify.AlbumType.ALBUM, is_available=True,
+            artist=create_obj(spotify.Artist, 'spotify:artist:bar'))
+
+        store.put(album)
+        result = store.get('spotify:album:foo')
+
+        self.assertEqual(result['type'], 'album')
+        self.assertEqual(result['year'], 2013)
+        self.assertEqual(result['album_type'], int(spotify.AlbumType.ALBUM))
+        self.assertEqual(result['artist'], 'spotify:artist:bar')
+
+    def test_put_and_get_artist_and_user(self, time_mock):
+        time_mock.time.return_value = 1000
+        store = self.create_store()
+
+        store.put(create_obj(spotify.Artist, 'spotify:artist:a', name='A'))
+        store.put(create_obj(
+            spotify.User, 'spotify:user:alice', canonical_name='alice',
+            display_name='Alice'))
+
+        self.assertEqual(store.get('spotify:artist:a')['name'], 'A')
+        self.assertEqual(
+            store.get('spotify:user:alice')['display_name'], 'Alice')
+
+    def test_put_fails_if_not_loaded(self, time_mock):
+        store = self.create_store()
+
+        with self.assertRaises(ValueError):
+            store.put(create_track(is_loaded=False))
+
+    def test_put_fails_for_unsupported_objects(self, time_mock):
+        store = self.create_store()
+
+        with self.assertRaises(TypeError):
+            store.put(create_obj(
+                spotify.Playlist, 'spotify:user:a:playlist:b'))
+
+    def test_get_returns_none_if_unknown(self, time_mock):
+        store = self.create_store()
+
+        self.assertIsNone(store.get('spotify:track:foo'))
+
+    def test_writes_are_batched(self, time_mock):
+        time_mock.time.return_value = 1000
+        store = self.create_store(batch_size=2)
+
+        store.put(create_track('spotify:track:1'))
+
+        count = store._connection.execute(
+            'SELECT COUNT(*) FROM metadata').fetchone()[0]
+        self.assertEqual(count, 0)
+
+        store.put(create_track('spotify:track:2'))
+
+        count = store._connection.execute(
+            'SELECT COUNT(*) FROM metadata').fetchone()[0]
+        self.assertEqual(count, 2)
+
+    def test_snapshots_survive_restart(self, time_mock):
+        time_mock.time.return_value = 1000
+        store = spotify.MetadataStore(self.path)
+        store.put(create_track())
+        store.close()
+
+        store = self.create_store()
+
+        self.assertEqual(store.get('spotify:track:foo')['name'], 'Foo')
+
+    def test_get_many(self, time_mock):
+        time_mock.time.return_value = 1000
+        store = self.create_store(batch_size=1000)
+        uris = ['spotify:track:%d' % i for i in range(1200)]
+        for uri in uris[:600]:
+            store.put(create_track(uri))
+        store.flush()
+        for uri in uris[600:1100]:
+            store.put(create_track(uri))
+
+        result = store.get_many(uris, revalidate=False)
+
+        self.assertEqual(len(result), 1100)
+        self.assertEqual(result['spotify:track:0']['uri'], 'spotify:track:0')
+        self.assertEqual(
+            result['spotify:track:1099']['uri'], 'spotify:track:1099')
+
+    def test_is_stale(self, time_mock):
+        store = self.create_store(ttl=60)
+        time_mock.time.return_value = 1060
+
+        self.assertFalse(store.is_stale({'fetched': 1000}))
+        self.assertTrue(store.is_stale({'fetched': 999}))
+
+    @mock.patch('spotify.link._resolve')
+    def test_get_many_revalidates_missing_and_stale_snapshots(
+            self, resolve_mock, time_mock):
+        time_mock.time.return_value = 1000
+        store = self.create_store(ttl=60)
+        store.put(create_track('spotify:track:fresh', name='Fresh'))
+        store.put(create_track(FOO_URI, name='Old'))
+        store._pending_writes[FOO_URI]['fetched'] = 900
+        new_track = create_track(FOO_URI, is_loaded=False, name='New')
+        missing_track = create_track(BAR_URI, name='Missing')
+        tracks = {FOO_URI: new_track, BAR_URI: missing_track}
+        resolve_mock.side_effect = lambda uri, type: tracks[uri]
+
+        result = store.get_many(['spotify:track:fresh', FOO_URI, BAR_URI])
+
+        self.assertEqual(set(result), set(['spotify:track:fresh', FOO_URI]))
+        self.assertEqual(result[FOO_URI]['name'], 'Old')
+        resolve_mock.assert_any_call(FOO_URI, 'track')
+        resolve_mock.assert_any_call(BAR_URI, 'track')
+        self.assertEqual(resolve_mock.call_count, 2)
+        self.assertEqual(store.get(BAR_URI)['name'], 'Missing')
+        self.assertEqual(store.get(FOO_URI)['name'], 'Old')
+
+        new_track.is_loaded = True
+        result = store.process()
+
+        self.assertEqual(result, 0)
+        self.assertEqual(store.get(FOO_URI)['name'], 'New')
+        self.assertEqual(store.get(FOO_URI)['fetched'], 1000)
+
+    @mock.patch('spotify.link._resolve')
+    def test_revalidate_skips_unsupported_uris(self, resolve_mock, time_mock):
+        store = self.create_store()
+
+        store.revalidate([
+            'spotify:user:alice:playlist:%s' % ('a' * 22), 'foo'])
+
+        self.assertEqual(resolve_mock.call_count, 0)
+        self.assertEqual(store.process(), 0)
+
+    @mock.patch('spotify.link._resolve')
+    def test_revalidate_does_not_hold_the_store_lock_while_resolving(
+            self, resolve_mock, time_mock):
+        time_mock.time.return_value = 1000
+        store = self.create_store()
+        store._lock = mock.MagicMock(wraps=store._lock)
+
+        def resolve(uri, type):
+            # Only a release per acquire so far
+            self.assertEqual(
+                store._lock.__enter__.call_count,
+                store._lock.__exit__.call_count)
+            return create_track(uri, is_loaded=False)
+        resolve_mock.side_effect = resolve
+
+        store.revalidate([FOO_URI])
+
+        self.assertEqual(resolve_mock.call_count, 1)
+        self.assertEqual(store.process(), 1)
+
+    @mock.patch('spotify.link._resolve')
+    def test_gives_up_on_objects_not_loaded_in_time(
+            self, resolve_mock, time_mock):
+        time_mock.time.return_value = 1000
+        store = self.create_store(revalidate_timeout=60)
+        resolve_mock.return_value = create_track(FOO_URI, is_loaded=False)
+
+        store.revalidate([FOO_URI])
+        time_mock.time.return_value = 1060
+        self.assertEqual(store.process(), 1)
+        time_mock.time.return_value = 1061
+        self.assertEqual(store.process(), 0)
+
+        store.revalidate([FOO_URI])
+        self.assertEqual(store.process(), 1)
+
+    @mock.patch('spotify.link._resolve')
+    def test_objects_failing_to_load_do_not_stop_processing(
+            self, resolve_mock, time_mock):
+        time_mock.time.return_value = 1000
+        store = self.create_store()
+        failing_track = create_track(FOO_URI)
+        type(failing_track).name = mock.PropertyMock(
+            side_effect=spotify.LibError(spotify.ErrorType.OTHER_PERMANENT))
+        tracks = {FOO_URI: failing_track, BAR_URI: create_track(BAR_URI)}
+        resolve_mock.side_effect = lambda uri, type: tracks[uri]
+
+        store.revalidate([FOO_URI, BAR_URI])
+
+        self.assertEqual(store.process(), 0)
+        self.assertIsNone(store.get(FOO_URI))
+        self.assertEqual(store.get(BAR_URI)['name'], 'Foo')
+
+    def test_processes_revalidations_on_metadata_updated(self, time_mock):
+        time_mock.time.return_value = 1000
+        session = mock.Mock()
+        store = self.create_store(session=session)
+
+        session.on.assert_called_once_with(
+            spotify.SessionEvent.METADATA_UPDATED, mock.ANY)
+
+        track = create_track(is_loaded=False)
+        store._revalidating['spotify:track:foo'] = (track, 1000)
+        track.is_loaded = True
+        listener = session.on.call_args[0][1]
+        listener(session)
+
+        self.assertEqual(store.get('spotify:track:foo')['name'], 'Foo')
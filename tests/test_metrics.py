@@ -0,0 +1,157 @@
+from __future__ import unicode_literals
+
+import mock
+import unittest
+
+import spotify
+
+
+class HistogramTest(unittest.TestCase):
+
+    def test_counts_values_in_first_bucket_with_larger_bound(self):
+        histogram = spotify.Histogram(buckets=[1, 10, 100])
+
+        histogram.observe(0.5)
+        histogram.observe(1)
+        histogram.observe(5)
+        histogram.observe(500)
+
+        self.assertEqual(histogram.counts, [2, 1, 0])
+        self.assertEqual(histogram.count, 4)
+        self.assertEqual(histogram.sum, 506.5)
+
+    def test_snapshot(self):
+        histogram = spotify.Histogram(buckets=[1, 10])
+        histogram.observe(2)
+
+        self.assertEqual(histogram.snapshot(), {
+            'buckets': [(1, 0), (10, 1)],
+            'count': 1,
+            'sum': 2,
+        })
+
+
+@mock.patch('spotify.metrics.time')
+class MetricsTest(unittest.TestCase):
+
+    def tearDown(self):
+        spotify.session_instance = None
+
+    def test_increment_and_decrement_counters(self, time_mock):
+        metrics = spotify.Metrics()
+
+        metrics.increment('foo')
+        metrics.increment('foo', 4)
+        metrics.decrement('foo')
+        metrics.decrement('bar')
+
+        self.assertEqual(
+            metrics.snapshot()['counters'], {'foo': 4, 'bar': -1})
+
+    def test_observe_creates_histogram_with_buckets(self, time_mock):
+        metrics = spotify.Metrics()
+
+        metrics.observe('foo', 3, buckets=[1, 5])
+        metrics.observe('foo', 4, buckets=[1, 100])
+
+        self.assertEqual(
+            metrics.snapshot()['histograms']['foo']['buckets'],
+            [(1, 0), (5, 2)])
+
+    def test_timer_observes_time_spent_in_block(self, time_mock):
+        time_mock.time.side_effect = [100, 100, 100.25, 101]
+        metrics = spotify.Metrics()
+
+        with metrics.timer('foo'):
+            pass
+
+        histogram = metrics.snapshot()['histograms']['foo']
+        self.assertEqual(histogram['count'], 1)
+        self.assertEqual(histogram['sum'], 0.25)
+
+    def test_snapshot_includes_time_and_uptime(self, time_mock):
+        time_mock.time.return_value = 100
+        metrics = spotify.Metrics()
+        time_mock.time.return_value = 160
+
+        snapshot = metrics.snapshot()
+
+        self.assertEqual(snapshot['time'], 160)
+        self.assertEqual(snapshot['uptime'], 60)
+
+    def test_snapshot_is_a_copy(self, time_mock):
+        metrics = spotify.Metrics()
+        metrics.increment('foo')
+
+        snapshot = metrics.snapshot()
+        metrics.increment('foo')
+
+        self.assertEqual(snapshot['counters']['foo'], 1)
+
+    def test_reset(self, time_mock):
+        metrics = spotify.Metrics()
+        metrics.increment('foo')
+        metrics.observe('bar', 1)
+
+        metrics.reset()
+
+        snapshot = metrics.snapshot()
+        self.assertEqual(snapshot['counters'], {})
+        self.assertEqual(snapshot['histograms'], {})
+
+    def test_maybe_export_respects_interval(self, time_mock):
+        exporter = mock.Mock()
+        time_mock.time.return_value = 100
+        metrics = spotify.Metrics()
+
+        time_mock.time.return_value = 105
+        metrics._maybe_export(exporter, 10)
+        self.assertEqual(exporter.call_count, 0)
+
+        time_mock.time.return_value = 110
+        metrics._maybe_export(exporter, 10)
+        self.assertEqual(exporter.call_count, 1)
+
+        time_mock.time.return_value = 115
+        metrics._maybe_export(exporter, 10)
+        self.assertEqual(exporter.call_count, 1)
+
+    def test_requests_are_tracked_on_the_session(self, time_mock):
+        time_mock.time.return_value = 100
+        session = mock.Mock()
+        session._metrics = spotify.Metrics()
+        spotify.session_instance = session
+
+        started_at = spotify.metrics._request_started('Search')
+        self.assertEqual(
+            session._metrics.snapshot()['counters'],
+            {'requests.in_flight.Search': 1})
+
+        time_mock.time.return_value = 102
+        spotify.metrics._request_completed('Search', started_at)
+
+        snapshot = session._metrics.snapshot()
+        self.assertEqual(
+            snapshot['counters'], {'requests.in_flight.Search': 0})
+        self.assertEqual(
+            snapshot['histograms']['requests.latency.Search']['sum'], 2)
+
+    def test_cancelled_requests_are_not_in_flight(self, time_mock):
+        time_mock.time.return_value = 100
+        session = mock.Mock()
+        session._metrics = spotify.Metrics()
+        spotify.session_instance = session
+
+        started_at = spotify.metrics._request_started('Search')
+        spotify.metrics._request_cancelled('Search', started_at)
+
+        snapshot = session._metrics.snapshot()
+        self.assertEqual(
+            snapshot['counters'], {'requests.in_flight.Search': 0})
+        self.assertNotIn('requests.latency.Search', snapshot['histograms'])
+
+    def test_requests_are_ignored_without_session(self, time_mock):
+        spotify.session_instance = None
+
+        started_at = spotify.metrics._request_started('Search')
+        spotify.metrics._request_completed('Search', started_at)
@@ -138,6 +138,21 @@ class PlaylistTest(unittest.TestCase):
         lib_mock.sp_playlist_track.assert_called_with(sp_playlist, 0)
         track_lib_mock.sp_track_add_ref.assert_called_with(sp_track)
 
+    @mock.patch('spotify.track.lib', spec=spotify.lib)
+    def test_iterating_tracks_call_budget(self, track_lib_mock, lib_mock):
+        sp_track = spotify.ffi.cast('sp_track *', spotify.ffi.new('int *'))
+        lib_mock.sp_playlist_num_tracks.return_value = 1000
+        lib_mock.sp_playlist_track.return_value = sp_track
+        sp_playlist = spotify.ffi.new('int *')
+        playlist = spotify.Playlist(sp_playlist=sp_playlist)
+
+        # is_loaded, add_ref, num_tracks, and track() and the track's
+        # add_ref() per track
+        with tests.lib_call_budget(2003, lib_mock, track_lib_mock):
+            result = [track for track in playlist.tracks]
+
+        self.assertEqual(len(result), 1000)
+
     def test_tracks_if_no_tracks(self, lib_mock):
         lib_mock.sp_playlist_num_tracks.return_value = 0
         sp_playlist = spotify.ffi.new('int *')
@@ -873,9 +888,9 @@ class PlaylistContainerTest(unittest.TestCase):
 
         result = playlist_container[0:2]
 
-        # Entire collection of length 3 is created as a list
-        self.assertEqual(lib_mock.sp_playlistcontainer_playlist.call_count, 3)
-        self.assertEqual(lib_mock.sp_playlist_add_ref.call_count, 3)
+        # Only the items in the slice are created
+        self.assertEqual(lib_mock.sp_playlistcontainer_playlist.call_count, 2)
+        self.assertEqual(lib_mock.sp_playlist_add_ref.call_count, 2)
 
         # Only a subslice of length 2 is returned
         self.assertIsInstance(result, list)
@@ -883,6 +898,23 @@ class PlaylistContainerTest(unittest.TestCase):
         self.assertEqual(result[0]._sp_playlist, sp_playlist)
         self.assertEqual(result[1]._sp_playlist, sp_playlist)
 
+    def test_iter_call_budget(self, lib_mock):
+        lib_mock.sp_playlistcontainer_num_playlists.return_value = 1000
+        sp_playlist = spotify.ffi.new('int *')
+        lib_mock.sp_playlistcontainer_playlist_type.return_value = int(
+            spotify.PlaylistType.PLAYLIST)
+        lib_mock.sp_playlistcontainer_playlist.return_value = sp_playlist
+        sp_playlistcontainer = spotify.ffi.new('int *')
+        playlist_container = spotify.PlaylistContainer(
+            sp_playlistcontainer=sp_playlistcontainer)
+
+        # num_playlists, and playlist_type(), playlist() and add_ref() per
+        # playlist
+        with tests.lib_call_budget(3001, lib_mock):
+            result = [playlist for playlist in playlist_container]
+
+        self.assertEqual(len(result), 1000)
+
     def test_getitem_with_folder(self, lib_mock):
         folder_name = 'foobar'
 
@@ -1542,6 +1574,32 @@ class PlaylistContainerTest(unittest.TestCase):
             mock.call(sp_playlistcontainer, 0),
         ], any_order=False)
 
+    def test_remove_folder_call_budget(self, lib_mock):
+        sp_playlistcontainer = spotify.ffi.new('int *')
+        playlist_container = spotify.PlaylistContainer(
+            sp_playlistcontainer=sp_playlistcontainer)
+        lib_mock.sp_playlistcontainer_num_playlists.return_value = 1000
+        folders = {
+            0: int(spotify.PlaylistType.START_FOLDER),
+            1: int(spotify.PlaylistType.END_FOLDER),
+        }
+        lib_mock.sp_playlistcontainer_playlist_type.side_effect = (
+            lambda sp_pc, i: folders.get(i, spotify.PlaylistType.PLAYLIST))
+        lib_mock.sp_playlistcontainer_playlist_folder_id.return_value = 173
+        lib_mock.sp_playlistcontainer_remove_playlist.return_value = int(
+            spotify.ErrorType.OK)
+
+        # Getting the folder to remove, then only the type of each item and
+        # the ID of each folder, and two removals. No playlists are created.
+        with tests.lib_call_budget(1009, lib_mock):
+            playlist_container.remove_playlist(0)
+
+        self.assertEqual(lib_mock.sp_playlistcontainer_playlist.call_count, 0)
+        lib_mock.sp_playlistcontainer_remove_playlist.assert_has_calls([
+            mock.call(sp_playlistcontainer, 1),
+            mock.call(sp_playlistcontainer, 0),
+        ], any_order=False)
+
     def test_find_folder_indexes(self, lib_mock):
         sp_playlist = spotify.ffi.new('int *')
         playlist = spotify.Playlist(sp_playlist=sp_playlist)
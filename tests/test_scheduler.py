@@ -0,0 +1,299 @@
+from __future__ import unicode_literals
+
+import mock
+import unittest
+
+import spotify
+
+
+@mock.patch('spotify.scheduler.time')
+@mock.patch('spotify.ArtistBrowser', spec=spotify.ArtistBrowser)
+@mock.patch('spotify.AlbumBrowser', spec=spotify.AlbumBrowser)
+class BrowseSchedulerTest(unittest.TestCase):
+
+    def setUp(self):
+        self.callbacks = []
+
+    def create_item(self, uri):
+        item = mock.Mock()
+        item.link.uri = uri
+        return item
+
+    def fake_browsers(self, browser_mock):
+        def create(callback, **kwargs):
+            browser = mock.Mock()
+            browser.error = spotify.ErrorType.OK
+            browser.backend_request_duration = 100
+            browser.kwargs = kwargs
+            self.callbacks.append((browser, callback))
+            return browser
+        browser_mock.side_effect = create
+
+    def complete(self, index, error=spotify.ErrorType.OK, duration=100):
+        browser, callback = self.callbacks[index]
+        browser.error = error
+        browser.backend_request_duration = duration
+        callback(browser)
+
+    def test_max_in_flight_must_be_positive(
+            self, album_browser_mock, artist_browser_mock, time_mock):
+        with self.assertRaises(ValueError):
+            spotify.BrowseScheduler(max_in_flight=0)
+
+    def test_caps_number_of_browses_in_flight(
+            self, album_browser_mock, artist_browser_mock, time_mock):
+        self.fake_browsers(album_browser_mock)
+        time_mock.time.return_value = 0
+        scheduler = spotify.BrowseScheduler(max_in_flight=2)
+
+        requests = [
+            scheduler.browse_album(self.create_item('spotify:album:%d' % i))
+            for i in range(3)]
+
+        self.assertEqual(album_browser_mock.call_count, 2)
+        self.assertEqual(scheduler.in_flight, 2)
+        self.assertEqual(scheduler.queue_depth, 1)
+        self.assertIsNone(requests[2].browser)
+        self.assertEqual(requests[2].error, spotify.ErrorType.IS_LOADING)
+
+        self.complete(0)
+
+        self.assertEqual(album_browser_mock.call_count, 3)
+        self.assertEqual(scheduler.queue_depth, 0)
+        self.assertEqual(scheduler.max_queue_depth, 1)
+        self.assertTrue(requests[0].complete_event.is_set())
+        self.assertFalse(requests[2].complete_event.is_set())
+        self.assertEqual(requests[2].browser, self.callbacks[2][0])
+
+    def test_starts_queued_browses_in_priority_order(
+            self, album_browser_mock, artist_browser_mock, time_mock):
+        self.fake_browsers(album_browser_mock)
+        time_mock.time.return_value = 0
+        scheduler = spotify.BrowseScheduler(max_in_flight=1)
+        first = self.create_item('spotify:album:first')
+        low = self.create_item('spotify:album:low')
+        high = self.create_item('spotify:album:high')
+        scheduler.browse_album(first)
+        scheduler.browse_album(low, priority=0)
+        scheduler.browse_album(high, priority=10)
+
+        self.complete(0)
+
+        self.assertEqual(self.callbacks[1][0].kwargs['album'], high)
+
+        self.complete(1)
+
+        self.assertEqual(self.callbacks[2][0].kwargs['album'], low)
+
+    def test_duplicate_request_bumps_priority_of_queued_request(
+            self, album_browser_mock, artist_browser_mock, time_mock):
+        self.fake_browsers(album_browser_mock)
+        time_mock.time.return_value = 0
+        scheduler = spotify.BrowseScheduler(max_in_flight=1)
+        first = self.create_item('spotify:album:first')
+        bg = self.create_item('spotify:album:bg')
+        crawled = self.create_item('spotify:album:crawled')
+        scheduler.browse_album(first)
+        scheduler.browse_album(bg, priority=1)
+        request = scheduler.browse_album(crawled, priority=0)
+
+        result = scheduler.browse_album(crawled, priority=10)
+
+        self.assertIs(result, request)
+        self.assertEqual(request.priority, 10)
+        self.assertEqual(scheduler.queue_depth, 2)
+
+        self.complete(0)
+        self.complete(1)
+        self.complete(2)
+
+        self.assertEqual(album_browser_mock.call_count, 3)
+        self.assertEqual(self.callbacks[1][0].kwargs['album'], crawled)
+        self.assertEqual(self.callbacks[2][0].kwargs['album'], bg)
+
+    def test_duplicate_requests_share_one_browse(
+            self, album_browser_mock, artist_browser_mock, time_mock):
+        self.fake_browsers(album_browser_mock)
+        time_mock.time.return_value = 0
+        scheduler = spotify.BrowseScheduler()
+        album = self.create_item('spotify:album:foo')
+        callback1 = mock.Mock()
+        callback2 = mock.Mock()
+
+        request1 = scheduler.browse_album(album, callback=callback1)
+        request2 = scheduler.browse_album(album, callback=callback2)
+
+        self.assertIs(request1, request2)
+        self.assertEqual(album_browser_mock.call_count, 1)
+
+        self.complete(0)
+
+        browser = self.callbacks[0][0]
+        callback1.assert_called_once_with(browser)
+        callback2.assert_called_once_with(browser)
+
+    def test_completed_browser_is_served_from_cache(
+            self, album_browser_mock, artist_browser_mock, time_mock):
+        self.fake_browsers(album_browser_mock)
+        time_mock.time.return_value = 0
+        scheduler = spotify.BrowseScheduler(ttl=60)
+        album = self.create_item('spotify:album:foo')
+        scheduler.browse_album(album)
+        self.complete(0)
+        callback = mock.Mock()
+        time_mock.time.return_value = 60
+
+        request = scheduler.browse_album(album, callback=callback)
+
+        self.assertEqual(album_browser_mock.call_count, 1)
+        self.assertEqual(request.browser, self.callbacks[0][0])
+        self.assertTrue(request.complete_event.is_set())
+        callback.assert_called_once_with(self.callbacks[0][0])
+        self.assertEqual(scheduler.hits, 1)
+        self.assertEqual(scheduler.misses, 1)
+
+    def test_expired_browser_is_browsed_again(
+            self, album_browser_mock, artist_browser_mock, time_mock):
+        self.fake_browsers(album_browser_mock)
+        time_mock.time.return_value = 0
+        scheduler = spotify.BrowseScheduler(ttl=60)
+        album = self.create_item('spotify:album:foo')
+        scheduler.browse_album(album)
+        self.complete(0)
+        time_mock.time.return_value = 61
+
+        scheduler.browse_album(album)
+
+        self.assertEqual(album_browser_mock.call_count, 2)
+        self.assertEqual(scheduler.hits, 0)
+
+    def test_cache_evicts_least_recently_used_browser(
+            self, album_browser_mock, artist_browser_mock, time_mock):
+        self.fake_browsers(album_browser_mock)
+        time_mock.time.return_value = 0
+        scheduler = spotify.BrowseScheduler(max_cache_size=2)
+        albums = [
+            self.create_item('spotify:album:%d' % i) for i in range(3)]
+        for i in range(2):
+            scheduler.browse_album(albums[i])
+            self.complete(i)
+        scheduler.browse_album(albums[0])  # Hit, makes album 1 the oldest
+        scheduler.browse_album(albums[2])
+        self.complete(2)
+
+        scheduler.browse_album(albums[0])
+        scheduler.browse_album(albums[1])
+
+        self.assertEqual(scheduler.hits, 2)
+        self.assertEqual(album_browser_mock.call_count, 4)
+
+    def test_failed_browser_is_not_cached(
+            self, album_browser_mock, artist_browser_mock, time_mock):
+        self.fake_browsers(album_browser_mock)
+        time_mock.time.return_value = 0
+        scheduler = spotify.BrowseScheduler()
+        album = self.create_item('spotify:album:foo')
+        scheduler.browse_album(album)
+        self.complete(0, error=spotify.ErrorType.OTHER_TRANSIENT)
+
+        scheduler.browse_album(album)
+
+        self.assertEqual(album_browser_mock.call_count, 2)
+
+    def test_failing_to_create_browser_frees_its_slot(
+            self, album_browser_mock, artist_browser_mock, time_mock):
+        self.fake_browsers(album_browser_mock)
+        create = album_browser_mock.side_effect
+
+        def create_or_fail(callback, album):
+            if album.link.uri == 'spotify:album:bad':
+                raise spotify.LibError(spotify.ErrorType.INVALID_INDATA)
+            return create(callback, album=album)
+
+        album_browser_mock.side_effect = create_or_fail
+        time_mock.time.return_value = 0
+        scheduler = spotify.BrowseScheduler(max_in_flight=1)
+        callback = mock.Mock()
+
+        with mock.patch('spotify.scheduler.logger'):
+            failed = scheduler.browse_album(
+                self.create_item('spotify:album:bad'), callback=callback)
+        request = scheduler.browse_album(self.create_item('spotify:album:foo'))
+
+        callback.assert_called_once_with(None)
+        self.assertTrue(failed.complete_event.is_set())
+        self.assertEqual(failed.error, spotify.ErrorType.INVALID_INDATA)
+        self.assertEqual(scheduler.in_flight, 1)
+        self.assertEqual(request.browser, self.callbacks[0][0])
+
+    def test_browse_artist_is_cached_per_browser_type(
+            self, album_browser_mock, artist_browser_mock, time_mock):
+        self.fake_browsers(artist_browser_mock)
+        time_mock.time.return_value = 0
+        scheduler = spotify.BrowseScheduler()
+        artist = self.create_item('spotify:artist:foo')
+        scheduler.browse_artist(artist)
+        self.complete(0)
+
+        scheduler.browse_artist(artist)
+        scheduler.browse_artist(
+            artist, type=spotify.ArtistBrowserType.NO_TRACKS)
+
+        self.assertEqual(artist_browser_mock.call_count, 2)
+        self.assertEqual(
+            self.callbacks[0][0].kwargs['type'],
+            spotify.ArtistBrowserType.FULL)
+        self.assertEqual(
+            self.callbacks[1][0].kwargs['type'],
+            spotify.ArtistBrowserType.NO_TRACKS)
+
+    def test_percentiles(
+            self, album_browser_mock, artist_browser_mock, time_mock):
+        self.fake_browsers(album_browser_mock)
+        scheduler = spotify.BrowseScheduler(max_in_flight=10)
+        self.assertEqual(
+            scheduler.latency_percentiles(), {50: None, 90: None, 99: None})
+        for i in range(10):
+            time_mock.time.return_value = 0
+            scheduler.browse_album(self.create_item('spotify:album:%d' % i))
+            time_mock.time.return_value = i + 1
+            # Browsers served from libspotify's cache reports -1
+            self.complete(i, duration=-1 if i == 9 else (i + 1) * 100)
+
+        self.assertEqual(
+            scheduler.latency_percentiles((50, 100)), {50: 6, 100: 10})
+        self.assertEqual(
+            scheduler.backend_request_duration_percentiles((0, 50, 100)),
+            {0: 100, 50: 500, 100: 900})
+
+
+class BrowseRequestTest(unittest.TestCase):
+
+    def test_repr(self):
+        request = spotify.BrowseRequest(('album', 'spotify:album:foo'), 3)
+
+        self.assertEqual(
+            repr(request),
+            'BrowseRequest(%r, priority=3)' % 'spotify:album:foo')
+
+    def test_is_loaded_is_false_while_queued(self):
+        request = spotify.BrowseRequest(('album', 'spotify:album:foo'), 0)
+
+        self.assertFalse(request.is_loaded)
+
+    def test_is_loaded_delegates_to_browser(self):
+        request = spotify.BrowseRequest(('album', 'spotify:album:foo'), 0)
+        request.browser = mock.Mock()
+        request.browser.is_loaded = True
+        request.browser.error = spotify.ErrorType.OK
+
+        self.assertTrue(request.is_loaded)
+        self.assertEqual(request.error, spotify.ErrorType.OK)
+
+    @mock.patch('spotify.utils.load')
+    def test_load(self, load_mock):
+        request = spotify.BrowseRequest(('album', 'spotify:album:foo'), 0)
+
+        request.load(10)
+
+        load_mock.assert_called_with(request, timeout=10)
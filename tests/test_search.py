@@ -179,6 +179,38 @@ class SearchTest(unittest.TestCase):
         lib_mock.sp_search_track.assert_called_with(sp_search, 0)
         track_lib_mock.sp_track_add_ref.assert_called_with(sp_track)
 
+    @mock.patch('spotify.track.lib', spec=spotify.lib)
+    def test_iterating_tracks_call_budget(self, track_lib_mock, lib_mock):
+        lib_mock.sp_search_error.return_value = spotify.ErrorType.OK
+        sp_track = spotify.ffi.cast('sp_track *', spotify.ffi.new('int *'))
+        lib_mock.sp_search_num_tracks.return_value = 1000
+        lib_mock.sp_search_track.return_value = sp_track
+        sp_search = spotify.ffi.new('int *')
+        search = spotify.Search(sp_search=sp_search)
+
+        # error, is_loaded, add_ref, num_tracks, and track() and the track's
+        # add_ref() per track
+        with tests.lib_call_budget(2004, lib_mock, track_lib_mock):
+            result = [track for track in search.tracks]
+
+        self.assertEqual(len(result), 1000)
+
+    @mock.patch('spotify.album.lib', spec=spotify.lib)
+    def test_iterating_albums_call_budget(self, album_lib_mock, lib_mock):
+        lib_mock.sp_search_error.return_value = spotify.ErrorType.OK
+        sp_album = spotify.ffi.cast('sp_album *', spotify.ffi.new('int *'))
+        lib_mock.sp_search_num_albums.return_value = 1000
+        lib_mock.sp_search_album.return_value = sp_album
+        sp_search = spotify.ffi.new('int *')
+        search = spotify.Search(sp_search=sp_search)
+
+        # error, is_loaded, add_ref, num_albums, and album() and the album's
+        # add_ref() per album
+        with tests.lib_call_budget(2004, lib_mock, album_lib_mock):
+            result = [album for album in search.albums]
+
+        self.assertEqual(len(result), 1000)
+
     def test_tracks_if_no_tracks(self, lib_mock):
         lib_mock.sp_search_error.return_value = spotify.ErrorType.OK
         lib_mock.sp_search_num_tracks.return_value = 0
@@ -514,6 +546,169 @@ class SearchTest(unittest.TestCase):
         self.assertIsInstance(result, spotify.Search)
         self.assertEqual(result._sp_search, sp_search2)
 
+    def test_search_with_want_only_requests_wanted_results(self, lib_mock):
+        self.create_session(lib_mock)
+        sp_search = spotify.ffi.cast('sp_search *', spotify.ffi.new('int *'))
+        lib_mock.sp_search_create.return_value = sp_search
+
+        result = spotify.Search('alice', want=['tracks', 'playlists'])
+
+        lib_mock.sp_search_create.assert_called_with(
+            mock.ANY, mock.ANY,
+            0, 20, 0, 0, 0, 0, 0, 20,
+            int(spotify.SearchType.STANDARD), mock.ANY, mock.ANY)
+        self.assertEqual(result.want, ('tracks', 'playlists'))
+        self.assertEqual(result.album_count, 0)
+
+    def test_search_with_unknown_want_fails(self, lib_mock):
+        self.create_session(lib_mock)
+
+        with self.assertRaises(ValueError):
+            spotify.Search('alice', want=['tracks', 'podcasts'])
+
+        self.assertEqual(lib_mock.sp_search_create.call_count, 0)
+
+    def test_more_keeps_want(self, lib_mock):
+        self.create_session(lib_mock)
+        sp_search = spotify.ffi.cast('sp_search *', spotify.ffi.new('int *'))
+        lib_mock.sp_search_create.return_value = sp_search
+
+        result = spotify.Search('alice', want=['albums']).more(
+            track_count=30, album_count=30)
+
+        lib_mock.sp_search_create.assert_called_with(
+            mock.ANY, mock.ANY,
+            0, 0, 20, 30, 0, 0, 0, 0,
+            int(spotify.SearchType.STANDARD), mock.ANY, mock.ANY)
+        self.assertEqual(result.want, ('albums',))
+
+    def test_more_with_other_want(self, lib_mock):
+        self.create_session(lib_mock)
+        sp_search = spotify.ffi.cast('sp_search *', spotify.ffi.new('int *'))
+        lib_mock.sp_search_create.return_value = sp_search
+
+        spotify.Search('alice').more(want=['artists'])
+
+        lib_mock.sp_search_create.assert_called_with(
+            mock.ANY, mock.ANY,
+            20, 0, 20, 0, 20, 20, 20, 0,
+            int(spotify.SearchType.STANDARD), mock.ANY, mock.ANY)
+
+    def test_more_does_not_require_search_to_be_loaded(self, lib_mock):
+        self.create_session(lib_mock)
+        sp_search = spotify.ffi.cast('sp_search *', spotify.ffi.new('int *'))
+        lib_mock.sp_search_create.return_value = sp_search
+        lib_mock.sp_search_error.return_value = spotify.ErrorType.IS_LOADING
+
+        result = spotify.Search('alice').more()
+
+        self.assertEqual(lib_mock.sp_search_query.call_count, 0)
+        self.assertEqual(
+            spotify.ffi.string(lib_mock.sp_search_create.call_args[0][1]),
+            b'alice')
+        self.assertIsInstance(result, spotify.Search)
+
+    def setup_pages(self, lib_mock, track_lib_mock, load_mock, num_tracks):
+        self.create_session(lib_mock)
+        self.sp_ints = [spotify.ffi.new('int *') for _ in num_tracks]
+        sp_searches = [
+            spotify.ffi.cast('sp_search *', sp_int) for sp_int in self.sp_ints]
+        lib_mock.sp_search_create.side_effect = sp_searches
+        lib_mock.sp_search_error.return_value = spotify.ErrorType.OK
+        lib_mock.sp_search_is_loaded.return_value = 1
+        lib_mock.sp_search_total_tracks.return_value = sum(num_tracks)
+        lib_mock.sp_search_num_tracks.side_effect = (
+            lambda sp_search: num_tracks[sp_searches.index(sp_search)])
+        self.sp_track = spotify.ffi.cast(
+            'sp_track *', spotify.ffi.new('int *'))
+        lib_mock.sp_search_track.return_value = self.sp_track
+        load_mock.side_effect = lambda obj, timeout: obj
+
+    @mock.patch('spotify.track.lib', spec=spotify.lib)
+    @mock.patch('spotify.utils.load')
+    def test_iter_tracks_requests_next_page_while_consuming(
+            self, load_mock, track_lib_mock, lib_mock):
+        self.setup_pages(lib_mock, track_lib_mock, load_mock, [2, 1])
+        search = spotify.Search('alice', track_count=2)
+
+        tracks = search.iter_tracks()
+        first = next(tracks)
+
+        self.assertIsInstance(first, spotify.Track)
+        self.assertEqual(lib_mock.sp_search_create.call_count, 2)
+        lib_mock.sp_search_create.assert_called_with(
+            mock.ANY, mock.ANY,
+            2, 2, 20, 0, 20, 0, 20, 0,
+            int(spotify.SearchType.STANDARD), mock.ANY, mock.ANY)
+
+        rest = list(tracks)
+
+        self.assertEqual(len(rest), 2)
+        self.assertEqual(lib_mock.sp_search_create.call_count, 2)
+
+    @mock.patch('spotify.track.lib', spec=spotify.lib)
+    @mock.patch('spotify.utils.load')
+    def test_iter_tracks_without_prefetch(
+            self, load_mock, track_lib_mock, lib_mock):
+        self.setup_pages(lib_mock, track_lib_mock, load_mock, [2, 2, 1])
+        search = spotify.Search('alice', track_count=2)
+
+        tracks = search.iter_tracks(prefetch=0)
+        next(tracks)
+        next(tracks)
+
+        self.assertEqual(lib_mock.sp_search_create.call_count, 1)
+
+        next(tracks)
+
+        self.assertEqual(lib_mock.sp_search_create.call_count, 2)
+        self.assertEqual(len(list(tracks)), 2)
+        self.assertEqual(lib_mock.sp_search_create.call_count, 3)
+
+    @mock.patch('spotify.track.lib', spec=spotify.lib)
+    @mock.patch('spotify.utils.load')
+    def test_iter_tracks_with_page_size_and_deep_prefetch(
+            self, load_mock, track_lib_mock, lib_mock):
+        self.setup_pages(lib_mock, track_lib_mock, load_mock, [2, 5, 1])
+        search = spotify.Search('alice', track_count=2)
+
+        tracks = search.iter_tracks(page_size=5, prefetch=2)
+        next(tracks)
+
+        self.assertEqual(lib_mock.sp_search_create.call_count, 3)
+        self.assertEqual(
+            lib_mock.sp_search_create.call_args_list[1][0][2:4], (2, 5))
+        self.assertEqual(
+            lib_mock.sp_search_create.call_args_list[2][0][2:4], (7, 5))
+        self.assertEqual(len(list(tracks)), 7)
+
+    @mock.patch('spotify.track.lib', spec=spotify.lib)
+    @mock.patch('spotify.utils.load')
+    def test_iter_tracks_stops_on_empty_page(
+            self, load_mock, track_lib_mock, lib_mock):
+        self.setup_pages(lib_mock, track_lib_mock, load_mock, [2, 0, 0])
+        lib_mock.sp_search_total_tracks.return_value = 10
+        search = spotify.Search('alice', track_count=2)
+
+        result = list(search.iter_tracks())
+
+        self.assertEqual(len(result), 2)
+        self.assertEqual(lib_mock.sp_search_create.call_count, 3)
+
+    def test_iter_tracks_fails_if_prefetch_is_negative(self, lib_mock):
+        sp_search = spotify.ffi.new('int *')
+        search = spotify.Search(sp_search=sp_search)
+
+        with self.assertRaises(ValueError):
+            search.iter_tracks(prefetch=-1)
+
+    def test_iter_albums_fails_if_page_size_is_zero(self, lib_mock):
+        sp_search = spotify.ffi.new('int *')
+        search = spotify.Search(sp_search=sp_search)
+
+        with self.assertRaises(ValueError):
+            search.iter_albums(page_size=0)
+
     @mock.patch('spotify.Link', spec=spotify.Link)
     def test_link_creates_link_to_search(self, link_mock, lib_mock):
         sp_search = spotify.ffi.new('int *')
@@ -528,6 +723,350 @@ class SearchTest(unittest.TestCase):
         self.assertEqual(result, mock.sentinel.link)
 
 
+@mock.patch('spotify.search.time')
+@mock.patch('spotify.search.lib', spec=spotify.lib)
+class SearchCacheTest(unittest.TestCase):
+
+    def setUp(self):
+        session = mock.sentinel.session
+        session._sp_session = mock.sentinel.sp_session
+        spotify.session_instance = session
+        self.sp_ints = [spotify.ffi.new('int *') for _ in range(3)]
+        self.sp_searches = [
+            spotify.ffi.cast('sp_search *', sp_int) for sp_int in self.sp_ints]
+
+    def tearDown(self):
+        spotify.session_instance = None
+
+    def complete(self, lib_mock, call_index=-1):
+        args = lib_mock.sp_search_create.call_args_list[call_index][0]
+        search_complete_cb, userdata = args[11], args[12]
+        search_complete_cb(self.sp_searches[call_index], userdata)
+
+    def test_first_search_is_a_miss(self, lib_mock, time_mock):
+        lib_mock.sp_search_create.side_effect = self.sp_searches
+        cache = spotify.SearchCache()
+
+        result = cache.search('alice')
+
+        self.assertIsInstance(result, spotify.Search)
+        self.assertEqual(lib_mock.sp_search_create.call_count, 1)
+        self.assertEqual(cache.misses, 1)
+        self.assertEqual(len(cache), 1)
+
+    def test_identical_search_in_progress_is_shared(self, lib_mock, time_mock):
+        lib_mock.sp_search_create.side_effect = self.sp_searches
+        lib_mock.sp_search_error.return_value = spotify.ErrorType.OK
+        time_mock.time.return_value = 0
+        callback1 = mock.Mock()
+        callback2 = mock.Mock()
+        cache = spotify.SearchCache()
+
+        search1 = cache.search('alice', callback=callback1)
+        search2 = cache.search('alice', callback=callback2)
+
+        self.assertIs(search1, search2)
+        self.assertEqual(lib_mock.sp_search_create.call_count, 1)
+        self.assertEqual(cache.coalesced, 1)
+        self.assertEqual(callback1.call_count, 0)
+        self.assertEqual(callback2.call_count, 0)
+
+        self.complete(lib_mock)
+
+        callback1.assert_called_once_with(search1)
+        callback2.assert_called_once_with(search1)
+
+    def test_callback_is_not_reused_by_more(self, lib_mock, time_mock):
+        lib_mock.sp_search_create.side_effect = self.sp_searches
+        lib_mock.sp_search_error.return_value = spotify.ErrorType.OK
+        time_mock.time.return_value = 0
+        callback = mock.Mock()
+        cache = spotify.SearchCache()
+        search = cache.search('alice', callback=callback)
+        self.complete(lib_mock)
+
+        more = cache.search('alice').more()
+        self.complete(lib_mock)
+
+        self.assertIsNone(search.callback)
+        self.assertIsNone(more.callback)
+        callback.assert_called_once_with(search)
+
+    def test_completed_search_is_a_hit(self, lib_mock, time_mock):
+        lib_mock.sp_search_create.side_effect = self.sp_searches
+        lib_mock.sp_search_error.return_value = spotify.ErrorType.OK
+        time_mock.time.return_value = 0
+        callback = mock.Mock()
+        cache = spotify.SearchCache()
+        search1 = cache.search('alice')
+        self.complete(lib_mock)
+
+        search2 = cache.search('alice', callback=callback)
+
+        self.assertIs(search1, search2)
+        self.assertEqual(cache.hits, 1)
+        callback.assert_called_once_with(search1)
+
+    def test_searches_with_other_arguments_are_not_shared(
+            self, lib_mock, time_mock):
+        lib_mock.sp_search_create.side_effect = self.sp_searches
+        time_mock.time.return_value = 0
+        cache = spotify.SearchCache()
+
+        search1 = cache.search('alice')
+        search2 = cache.search('alice', track_offset=20)
+        search3 = cache.search(
+            'alice', search_type=spotify.SearchType.SUGGEST)
+
+        self.assertIsNot(search1, search2)
+        self.assertIsNot(search1, search3)
+        self.assertEqual(cache.misses, 3)
+
+    def test_want_is_part_of_the_cache_key(self, lib_mock, time_mock):
+        lib_mock.sp_search_create.side_effect = self.sp_searches
+        time_mock.time.return_value = 0
+        cache = spotify.SearchCache()
+
+        search1 = cache.search('alice', want=['tracks'])
+        search2 = cache.search('alice')
+        search3 = cache.search(
+            'alice', album_count=0, artist_count=0, playlist_count=0)
+
+        self.assertIsNot(search1, search2)
+        self.assertIs(search1, search3)
+        self.assertEqual(search1.want, ('tracks',))
+
+    def test_expired_search_is_replaced(self, lib_mock, time_mock):
+        lib_mock.sp_search_create.side_effect = self.sp_searches
+        time_mock.time.return_value = 0
+        cache = spotify.SearchCache(ttl=60)
+        search1 = cache.search('alice')
+
+        time_mock.time.return_value = 61
+        search2 = cache.search('alice')
+
+        self.assertIsNot(search1, search2)
+        self.assertEqual(cache.misses, 2)
+        self.assertEqual(len(cache), 1)
+
+    def test_least_recently_used_search_is_evicted(self, lib_mock, time_mock):
+        lib_mock.sp_search_create.side_effect = self.sp_searches
+        time_mock.time.return_value = 0
+        cache = spotify.SearchCache(max_size=2)
+        alice = cache.search('alice')
+        cache.search('bob')
+        cache.search('alice')
+
+        cache.search('carol')
+
+        self.assertEqual(len(cache), 2)
+        self.assertIs(cache.search('alice'), alice)
+        self.assertEqual(cache.misses, 3)
+        self.assertEqual(cache.coalesced, 2)
+
+    def test_failed_search_is_removed(self, lib_mock, time_mock):
+        lib_mock.sp_search_create.side_effect = self.sp_searches
+        lib_mock.sp_search_error.return_value = (
+            spotify.ErrorType.OTHER_PERMANENT)
+        time_mock.time.return_value = 0
+        cache = spotify.SearchCache()
+        search1 = cache.search('alice')
+
+        self.complete(lib_mock)
+
+        self.assertEqual(len(cache), 0)
+        self.assertIsNot(cache.search('alice'), search1)
+
+    def test_clear(self, lib_mock, time_mock):
+        lib_mock.sp_search_create.side_effect = self.sp_searches
+        time_mock.time.return_value = 0
+        cache = spotify.SearchCache()
+        cache.search('alice')
+
+        cache.clear()
+
+        self.assertEqual(len(cache), 0)
+
+    def test_discard_removes_only_the_given_search(
+            self, lib_mock, time_mock):
+        lib_mock.sp_search_create.side_effect = self.sp_searches
+        time_mock.time.return_value = 0
+        cache = spotify.SearchCache()
+        search1 = cache.search('alice')
+        search2 = cache.search('bob')
+
+        cache._discard(search1)
+
+        self.assertEqual(len(cache), 1)
+        self.assertIsNot(cache.search('alice'), search1)
+        self.assertIs(cache.search('bob'), search2)
+
+
+@mock.patch('spotify.search.lib', spec=spotify.lib)
+class SuggesterTest(unittest.TestCase):
+
+    def setUp(self):
+        session = mock.sentinel.session
+        session._sp_session = mock.sentinel.sp_session
+        spotify.session_instance = session
+        self.sp_ints = [spotify.ffi.new('int *') for _ in range(3)]
+        self.sp_searches = [
+            spotify.ffi.cast('sp_search *', sp_int) for sp_int in self.sp_ints]
+        self.suggester = spotify.search._Suggester()
+        self.callback = mock.Mock()
+
+    def tearDown(self):
+        spotify.session_instance = None
+
+    def suggest(self, prefix, delay=0, reuse=True, **kwargs):
+        self.suggester.suggest(
+            'input-1', prefix, self.callback, delay, reuse, kwargs)
+
+    def complete(self, lib_mock, call_index=-1):
+        args = lib_mock.sp_search_create.call_args_list[call_index][0]
+        search_complete_cb, userdata = args[11], args[12]
+        search_complete_cb(self.sp_searches[call_index], userdata)
+
+    def test_suggest_searches_for_prefix(self, lib_mock):
+        lib_mock.sp_search_create.side_effect = self.sp_searches
+        lib_mock.sp_search_error.return_value = spotify.ErrorType.OK
+
+        self.suggest('bea', track_count=5)
+
+        lib_mock.sp_search_create.assert_called_with(
+            mock.ANY, mock.ANY, 0, 5, 0, 20, 0, 20, 0, 20,
+            int(spotify.SearchType.SUGGEST), mock.ANY, mock.ANY)
+        self.assertEqual(
+            spotify.ffi.string(lib_mock.sp_search_create.call_args[0][1]),
+            b'bea')
+
+        self.complete(lib_mock)
+
+        self.assertEqual(self.callback.call_count, 1)
+        result = self.callback.call_args[0][0]
+        self.assertEqual(result._sp_search, self.sp_searches[0])
+
+    def test_new_prefix_cancels_search_in_progress(self, lib_mock):
+        lib_mock.sp_search_create.side_effect = self.sp_searches
+        lib_mock.sp_search_error.return_value = spotify.ErrorType.OK
+        self.suggest('bea')
+
+        self.suggest('beat')
+        tests.gc_collect()
+
+        lib_mock.sp_search_release.assert_called_with(self.sp_searches[0])
+        self.complete(lib_mock, call_index=0)
+        self.assertEqual(self.callback.call_count, 0)
+        self.complete(lib_mock, call_index=1)
+        self.assertEqual(self.callback.call_count, 1)
+
+    def test_cancelled_searches_are_not_in_flight(self, lib_mock):
+        lib_mock.sp_search_create.side_effect = self.sp_searches
+        lib_mock.sp_search_error.return_value = spotify.ErrorType.OK
+        session = mock.Mock()
+        session._metrics = spotify.Metrics()
+        spotify.session_instance = session
+        self.suggest('bea')
+
+        self.suggest('beat')
+
+        self.assertEqual(
+            session._metrics.snapshot()['counters'],
+            {'requests.in_flight.Search': 1})
+
+        # libspotify may still complete the cancelled search
+        self.complete(lib_mock, call_index=0)
+        self.complete(lib_mock, call_index=1)
+
+        self.assertEqual(
+            session._metrics.snapshot()['counters'],
+            {'requests.in_flight.Search': 0})
+
+    def test_suggest_forgets_keys_without_pending_searches(self, lib_mock):
+        lib_mock.sp_search_create.side_effect = self.sp_searches
+        lib_mock.sp_search_error.return_value = spotify.ErrorType.OK
+        self.suggest('bea')
+        self.assertEqual(len(self.suggester._states), 1)
+
+        self.complete(lib_mock)
+
+        self.assertEqual(len(self.suggester._states), 0)
+
+        self.suggest('bea')
+
+        self.assertEqual(self.callback.call_count, 2)
+        self.assertEqual(len(self.suggester._states), 0)
+
+    @mock.patch('spotify.search.threading.Timer')
+    def test_suggest_debounces_prefixes(self, timer_mock, lib_mock):
+        lib_mock.sp_search_create.side_effect = self.sp_searches
+        timer1 = mock.Mock()
+        timer2 = mock.Mock()
+        timer_mock.side_effect = [timer1, timer2]
+
+        self.suggest('bea', delay=0.1)
+        self.suggest('beat', delay=0.1)
+
+        self.assertEqual(timer_mock.call_count, 2)
+        timer1.cancel.assert_called_once_with()
+        timer2.start.assert_called_once_with()
+        self.assertEqual(lib_mock.sp_search_create.call_count, 0)
+
+        # The first timer fires anyway, e.g. if it was already running
+        func, args = timer_mock.call_args_list[0][0][1:]
+        func(*args)
+        self.assertEqual(lib_mock.sp_search_create.call_count, 0)
+
+        func, args = timer_mock.call_args_list[1][0][1:]
+        func(*args)
+        self.assertEqual(lib_mock.sp_search_create.call_count, 1)
+        self.assertEqual(
+            spotify.ffi.string(lib_mock.sp_search_create.call_args[0][1]),
+            b'beat')
+
+    def test_suggest_reuses_result_for_same_prefix(self, lib_mock):
+        lib_mock.sp_search_create.side_effect = self.sp_searches
+        lib_mock.sp_search_error.return_value = spotify.ErrorType.OK
+        self.suggest('bea')
+        self.complete(lib_mock)
+        result = self.callback.call_args[0][0]
+
+        self.suggest('bea')
+
+        self.assertEqual(lib_mock.sp_search_create.call_count, 1)
+        self.assertEqual(self.callback.call_count, 2)
+        self.assertIs(self.callback.call_args[0][0], result)
+
+    def test_suggest_without_reuse_searches_again(self, lib_mock):
+        lib_mock.sp_search_create.side_effect = self.sp_searches
+        lib_mock.sp_search_error.return_value = spotify.ErrorType.OK
+        self.suggest('bea')
+        self.complete(lib_mock)
+
+        self.suggest('bea', reuse=False)
+
+        self.assertEqual(lib_mock.sp_search_create.call_count, 2)
+        self.assertEqual(self.callback.call_count, 1)
+
+    def test_suggest_reuses_result_for_longer_prefix(self, lib_mock):
+        lib_mock.sp_search_create.side_effect = self.sp_searches
+        lib_mock.sp_search_error.return_value = spotify.ErrorType.OK
+        self.suggest('beat')
+        self.complete(lib_mock)
+        longer_result = self.callback.call_args[0][0]
+
+        self.suggest('bea')
+
+        self.assertEqual(self.callback.call_count, 2)
+        self.assertIs(self.callback.call_args[0][0], longer_result)
+        self.assertEqual(lib_mock.sp_search_create.call_count, 2)
+
+        self.complete(lib_mock)
+
+        self.assertEqual(self.callback.call_count, 3)
+        self.assertIsNot(self.callback.call_args[0][0], longer_result)
+
+
 class SearchPlaylistTest(unittest.TestCase):
 
     @mock.patch('spotify.Playlist', spec=spotify.Playlist)
@@ -2,8 +2,10 @@
 
 from __future__ import unicode_literals
 
+import itertools
 import mock
 import tempfile
+import threading
 import unittest
 
 import spotify
@@ -422,6 +424,57 @@ class SessionTest(unittest.TestCase):
 
         self.assertEqual(timeout, 5500)
 
+    def test_process_events_is_counted_and_timed(self, lib_mock):
+        lib_mock.sp_session_process_events.return_value = (
+            spotify.ErrorType.OK)
+        session = self.create_session(lib_mock)
+
+        session.process_events()
+        session.process_events()
+
+        metrics = session.metrics()
+        self.assertEqual(metrics['counters']['process_events.calls'], 2)
+        self.assertEqual(
+            metrics['histograms']['process_events.duration']['count'], 2)
+
+    def test_process_events_exports_metrics_if_exporter_is_set(
+            self, lib_mock):
+        lib_mock.sp_session_process_events.return_value = (
+            spotify.ErrorType.OK)
+        session = self.create_session(lib_mock)
+        session.metrics_exporter = mock.Mock()
+        session.metrics_export_interval = 0
+
+        session.process_events()
+
+        self.assertEqual(session.metrics_exporter.call_count, 1)
+        metrics = session.metrics_exporter.call_args[0][0]
+        self.assertEqual(metrics['counters']['process_events.calls'], 1)
+
+    def test_process_events_applies_bitrate_controller(self, lib_mock):
+        lib_mock.sp_session_process_events.return_value = (
+            spotify.ErrorType.OK)
+        lib_mock.sp_session_preferred_bitrate.return_value = (
+            spotify.ErrorType.OK)
+        session = self.create_session(lib_mock)
+        session.bitrate_controller = spotify.BitrateController(
+            initial=spotify.Bitrate.BITRATE_160k)
+
+        session.process_events()
+        session.process_events()
+
+        lib_mock.sp_session_preferred_bitrate.assert_called_once_with(
+            session._sp_session, spotify.Bitrate.BITRATE_160k)
+
+    def test_metrics_counts_emitted_events(self, lib_mock):
+        session = self.create_session(lib_mock)
+
+        session.emit(spotify.SessionEvent.LOGGED_OUT, session)
+        session.emit(spotify.SessionEvent.LOGGED_OUT, session)
+
+        self.assertEqual(
+            session.metrics()['counters']['events.logged_out'], 2)
+
     def test_process_events_fail_raises_error(self, lib_mock):
         lib_mock.sp_session_process_events.return_value = (
             spotify.ErrorType.BAD_API_VERSION)
@@ -687,7 +740,236 @@ class SessionTest(unittest.TestCase):
             album_offset=0, album_count=20,
             artist_offset=0, artist_count=20,
             playlist_offset=0, playlist_count=20,
-            search_type=None)
+            search_type=None, want=None)
+
+    def test_search_uses_search_cache_if_set(self, lib_mock):
+        session = self.create_session(lib_mock)
+        session.search_cache = mock.Mock(spec=spotify.SearchCache)
+        session.search_cache.search.return_value = mock.sentinel.search
+
+        result = session.search('alice', track_count=10)
+
+        self.assertIs(result, mock.sentinel.search)
+        session.search_cache.search.assert_called_with(
+            query='alice', callback=None,
+            track_offset=0, track_count=10,
+            album_offset=0, album_count=20,
+            artist_offset=0, artist_count=20,
+            playlist_offset=0, playlist_count=20,
+            search_type=None, want=None)
+
+    @mock.patch('spotify.Link', spec=spotify.Link)
+    def test_resolve_many(self, link_mock, lib_mock):
+        session = self.create_session(lib_mock)
+        link_mock.return_value.as_track.return_value = mock.sentinel.track
+        link_mock.return_value.as_user.return_value = mock.sentinel.user
+        track_uri = 'spotify:track:2Foc5Q5nqNiosCNqttzHof'
+
+        result = session.resolve_many(
+            [track_uri, 'spotify:user:alice', 'spotify:track:foo'])
+
+        self.assertEqual(
+            result, [mock.sentinel.track, mock.sentinel.user, None])
+        self.assertEqual(link_mock.call_count, 2)
+
+    @mock.patch('spotify.Link', spec=spotify.Link)
+    def test_resolve_many_uses_uri_cache_if_set(self, link_mock, lib_mock):
+        session = self.create_session(lib_mock)
+        session.uri_cache = spotify.UriCache()
+        track_uri = 'spotify:track:2Foc5Q5nqNiosCNqttzHof'
+
+        result = session.resolve_many([track_uri, track_uri])
+
+        self.assertIs(result[0], result[1])
+        self.assertEqual(link_mock.call_count, 1)
+        self.assertEqual(session.uri_cache.hits, 1)
+
+    def test_emit_calls_listeners_right_away_without_dispatcher(
+            self, lib_mock):
+        listener = mock.Mock()
+        session = self.create_session(lib_mock)
+        session.on('some_event', listener, 'x')
+
+        session.emit('some_event', 'abc')
+
+        listener.assert_called_once_with('abc', 'x')
+
+    def test_emit_puts_event_in_dispatcher_queue_if_set(self, lib_mock):
+        listener = mock.Mock()
+        session = self.create_session(lib_mock)
+        session.dispatcher = mock.Mock(spec=spotify.EventDispatcher)
+        session.on('some_event', listener, 'x')
+
+        session.emit('some_event', 'abc')
+
+        self.assertEqual(listener.call_count, 0)
+        self.assertEqual(session.dispatcher.put.call_count, 1)
+        event, func, args = session.dispatcher.put.call_args[0]
+        self.assertEqual(event, 'some_event')
+        self.assertEqual(args, ('abc',))
+
+        func(event, *args)
+
+        listener.assert_called_once_with('abc', 'x')
+
+    def test_emit_skips_dispatcher_if_no_listeners(self, lib_mock):
+        session = self.create_session(lib_mock)
+        session.dispatcher = mock.Mock(spec=spotify.EventDispatcher)
+
+        session.emit('some_event', 'abc')
+
+        self.assertEqual(session.dispatcher.put.call_count, 0)
+
+    def test_call_is_not_dispatched(self, lib_mock):
+        listener = mock.Mock()
+        session = self.create_session(lib_mock)
+        session.dispatcher = mock.Mock(spec=spotify.EventDispatcher)
+        session.on('some_event', listener)
+
+        result = session.call('some_event', 'abc')
+
+        self.assertIs(result, listener.return_value)
+        self.assertEqual(session.dispatcher.put.call_count, 0)
+
+    def fake_searches(self, session, errors=None, completion_order=None):
+        searches = []
+        errors = list(errors or [])
+        completion_order = list(completion_order or [])
+
+        def search(query, callback=None, **kwargs):
+            result = mock.Mock()
+            result.query = query
+            result.callback = callback
+            result.complete_event = threading.Event()
+            result.error = (
+                errors.pop(0) if errors else spotify.ErrorType.OK)
+            searches.append(result)
+            return result
+
+        def process_events():
+            if completion_order:
+                result = searches[completion_order.pop(0)]
+                result.complete_event.set()
+                result.callback(result)
+
+        session.search = mock.Mock(side_effect=search)
+        session.process_events = mock.Mock(side_effect=process_events)
+        patcher = mock.patch('spotify.Search', side_effect=search)
+        self.search_class_mock = patcher.start()
+        self.addCleanup(patcher.stop)
+        return searches
+
+    @mock.patch('spotify.session.time')
+    def test_search_many_yields_in_completion_order(self, time_mock, lib_mock):
+        session = self.create_session(lib_mock)
+        searches = self.fake_searches(session, completion_order=[1, 0, 2])
+
+        results = session.search_many(
+            iter(['alice', 'bob', 'carol']), max_in_flight=2,
+            track_count=5)
+
+        self.assertEqual(next(results), ('bob', searches[1]))
+        self.assertEqual(session.search.call_count, 2)
+        session.search.assert_called_with(
+            'bob', callback=mock.ANY, track_count=5)
+        self.assertEqual(
+            list(results), [('alice', searches[0]), ('carol', searches[2])])
+        self.assertEqual(session.search.call_count, 3)
+
+    @mock.patch('spotify.session.time')
+    def test_search_many_retries_failed_searches(self, time_mock, lib_mock):
+        session = self.create_session(lib_mock)
+        searches = self.fake_searches(
+            session, errors=[spotify.ErrorType.OTHER_TRANSIENT],
+            completion_order=[0, 1])
+
+        results = list(session.search_many(['alice'], retries=1))
+
+        self.assertEqual(results, [('alice', searches[1])])
+        self.assertEqual(session.search.call_count, 1)
+        self.search_class_mock.assert_called_once_with(
+            query='alice', callback=mock.ANY)
+
+    @mock.patch('spotify.session.time')
+    def test_search_many_yields_failed_search_when_out_of_retries(
+            self, time_mock, lib_mock):
+        session = self.create_session(lib_mock)
+        searches = self.fake_searches(
+            session, errors=[spotify.ErrorType.OTHER_TRANSIENT],
+            completion_order=[0])
+
+        results = list(session.search_many(['alice'], retries=0))
+
+        self.assertEqual(results, [('alice', searches[0])])
+        self.assertEqual(
+            results[0][1].error, spotify.ErrorType.OTHER_TRANSIENT)
+
+    @mock.patch('spotify.session.time')
+    def test_search_many_yields_none_on_timeout(self, time_mock, lib_mock):
+        time_mock.time.side_effect = itertools.count(0, 3)
+        session = self.create_session(lib_mock)
+        self.fake_searches(session)
+
+        results = list(
+            session.search_many(['alice'], retries=0, timeout=5))
+
+        self.assertEqual(results, [('alice', None)])
+
+    @mock.patch('spotify.session.time')
+    def test_search_many_retries_on_timeout(self, time_mock, lib_mock):
+        time_mock.time.side_effect = itertools.count(0, 3)
+        session = self.create_session(lib_mock)
+        searches = self.fake_searches(session)
+
+        results = session.search_many(['alice'], retries=1, timeout=5)
+        self.assertEqual(next(results), ('alice', None))
+
+        self.assertEqual(session.search.call_count, 1)
+        self.assertEqual(self.search_class_mock.call_count, 1)
+        self.assertIsNot(searches[0], searches[1])
+        searches[0]._cancel.assert_called_once_with()
+        searches[1]._cancel.assert_called_once_with()
+
+    @mock.patch('spotify.session.time')
+    def test_search_many_retry_on_timeout_bypasses_search_cache(
+            self, time_mock, lib_mock):
+        time_mock.time.side_effect = itertools.chain(
+            [0, 6], itertools.repeat(6))
+        session = self.create_session(lib_mock)
+        session.search_cache = mock.Mock(spec=spotify.SearchCache)
+        # The timed out search completes late, twice, as it is shared
+        # through the search cache
+        searches = self.fake_searches(session, completion_order=[0, 0, 1])
+
+        results = list(
+            session.search_many(['alice'], retries=1, timeout=5))
+
+        self.assertEqual(results, [('alice', searches[1])])
+        self.assertEqual(session.search.call_count, 1)
+        self.assertEqual(self.search_class_mock.call_count, 1)
+        session.search_cache._discard.assert_called_once_with(searches[0])
+        self.assertEqual(searches[0]._cancel.call_count, 0)
+
+    @mock.patch('spotify.search._Suggester')
+    def test_suggest(self, suggester_mock, lib_mock):
+        session = self.create_session(lib_mock)
+        callback = mock.Mock()
+
+        session.suggest('input-1', 'bea', callback, track_count=5)
+        session.suggest('input-1', 'beat', callback, delay=0)
+
+        self.assertEqual(suggester_mock.call_count, 1)
+        suggester = suggester_mock.return_value
+        suggester.suggest.assert_any_call(
+            'input-1', 'bea', callback, 0.1, True, {'track_count': 5})
+        suggester.suggest.assert_called_with(
+            'input-1', 'beat', callback, 0, True, {})
+
+    def test_search_many_fails_if_max_in_flight_is_zero(self, lib_mock):
+        session = self.create_session(lib_mock)
+
+        with self.assertRaises(ValueError):
+            session.search_many(['alice'], max_in_flight=0)
 
 
 @mock.patch('spotify.session.lib', spec=spotify.lib)
@@ -1112,6 +1394,15 @@ class SessionCallbacksTest(unittest.TestCase):
 
         callback.assert_called_once_with(session)
 
+    def test_metadata_updated_callback_invalidates_cached_metadata(
+            self, lib_mock):
+        session = self.create_session(lib_mock)
+        generation = session._metadata_generation
+
+        SessionCallbacks.metadata_updated(session._sp_session)
+
+        self.assertEqual(session._metadata_generation, generation + 1)
+
     def test_connection_error_callback(self, lib_mock):
         callback = mock.Mock()
         session = self.create_session(lib_mock)
@@ -1166,6 +1457,27 @@ class SessionCallbacksTest(unittest.TestCase):
             callback.call_args[0][1]._sp_audioformat, sp_audioformat)
         self.assertEqual(callback.call_args[0][2][:5], b'abc\x00\x00')
         self.assertEqual(result, num_frames)
+        counters = session.metrics()['counters']
+        self.assertEqual(counters['music_delivery.frames'], num_frames)
+        self.assertEqual(counters['music_delivery.bytes'], frames_size)
+
+    def test_music_delivery_is_passed_to_bitrate_controller(self, lib_mock):
+        sp_audioformat = spotify.ffi.new('sp_audioformat *')
+        sp_audioformat.channels = 2
+        sp_audioformat.sample_rate = 44100
+        frames = spotify.ffi.new('char[]', 40)
+        frames_void_ptr = spotify.ffi.cast('void *', frames)
+        callback = mock.Mock()
+        callback.return_value = 8
+        session = self.create_session(lib_mock)
+        session.on('music_delivery', callback)
+        session.bitrate_controller = mock.Mock()
+
+        SessionCallbacks.music_delivery(
+            session._sp_session, sp_audioformat, frames_void_ptr, 10)
+
+        session.bitrate_controller.music_delivered.assert_called_once_with(
+            8, 44100)
 
     def test_music_delivery_without_callback_does_not_consume(self, lib_mock):
         session = self.create_session(lib_mock)
@@ -1199,6 +1511,46 @@ class SessionCallbacksTest(unittest.TestCase):
 
         callback.assert_called_once_with(session, 'a log message')
 
+    @mock.patch('spotify.session.logger')
+    def test_log_message_callback_without_listeners_does_nothing(
+            self, logger_mock, lib_mock):
+        logger_mock.isEnabledFor.return_value = False
+        session = self.create_session(lib_mock)
+        data = spotify.ffi.new('char[]', b'a log message\n')
+
+        SessionCallbacks.log_message(session._sp_session, data)
+
+        self.assertEqual(logger_mock.debug.call_count, 0)
+
+    @mock.patch('spotify.session.logger')
+    def test_frequent_events_without_listeners_are_counted(
+            self, logger_mock, lib_mock):
+        logger_mock.isEnabledFor.return_value = False
+        session = self.create_session(lib_mock)
+        data = spotify.ffi.new('char[]', b'a log message\n')
+
+        SessionCallbacks.metadata_updated(session._sp_session)
+        SessionCallbacks.metadata_updated(session._sp_session)
+        SessionCallbacks.notify_main_thread(session._sp_session)
+        SessionCallbacks.log_message(session._sp_session, data)
+
+        counters = session.metrics()['counters']
+        self.assertEqual(counters['events.metadata_updated'], 2)
+        self.assertEqual(counters['events.notify_main_thread'], 1)
+        self.assertEqual(counters['events.log_message'], 1)
+
+    @mock.patch('spotify.session.logger')
+    def test_log_message_callback_without_listeners_logs_if_debugging(
+            self, logger_mock, lib_mock):
+        logger_mock.isEnabledFor.return_value = True
+        session = self.create_session(lib_mock)
+        data = spotify.ffi.new('char[]', b'a log message\n')
+
+        SessionCallbacks.log_message(session._sp_session, data)
+
+        logger_mock.debug.assert_called_once_with(
+            'Log message from Spotify: %s', 'a log message')
+
     def test_end_of_track_callback(self, lib_mock):
         callback = mock.Mock()
         session = self.create_session(lib_mock)
@@ -1219,6 +1571,16 @@ class SessionCallbacksTest(unittest.TestCase):
         callback.assert_called_once_with(
             session, spotify.ErrorType.NO_STREAM_AVAILABLE)
 
+    def test_streaming_error_is_passed_to_bitrate_controller(self, lib_mock):
+        session = self.create_session(lib_mock)
+        session.bitrate_controller = mock.Mock()
+
+        SessionCallbacks.streaming_error(
+            session._sp_session, int(spotify.ErrorType.NO_STREAM_AVAILABLE))
+
+        session.bitrate_controller.streaming_error.assert_called_once_with(
+            spotify.ErrorType.NO_STREAM_AVAILABLE)
+
     def test_user_info_updated_callback(self, lib_mock):
         callback = mock.Mock()
         session = self.create_session(lib_mock)
@@ -1260,6 +1622,21 @@ class SessionCallbacksTest(unittest.TestCase):
         self.assertEqual(sp_audio_buffer_stats.samples, 100)
         self.assertEqual(sp_audio_buffer_stats.stutter, 5)
 
+    def test_get_audio_buffer_stats_are_passed_to_bitrate_controller(
+            self, lib_mock):
+        callback = mock.Mock()
+        callback.return_value = spotify.AudioBufferStats(100, 5)
+        session = self.create_session(lib_mock)
+        session.on(spotify.SessionEvent.GET_AUDIO_BUFFER_STATS, callback)
+        session.bitrate_controller = mock.Mock()
+        sp_audio_buffer_stats = spotify.ffi.new('sp_audio_buffer_stats *')
+
+        SessionCallbacks.get_audio_buffer_stats(
+            session._sp_session, sp_audio_buffer_stats)
+
+        session.bitrate_controller.buffer_stats.assert_called_once_with(
+            spotify.AudioBufferStats(100, 5))
+
     def test_offline_status_updated_callback(self, lib_mock):
         callback = mock.Mock()
         session = self.create_session(lib_mock)
@@ -1281,6 +1658,8 @@ class SessionCallbacksTest(unittest.TestCase):
         callback.assert_called_once_with(session, b'a credentials blob')
 
     def test_connection_state_updated_callback(self, lib_mock):
+        lib_mock.sp_session_connectionstate.return_value = int(
+            spotify.ConnectionState.LOGGED_IN)
         callback = mock.Mock()
         session = self.create_session(lib_mock)
         session.on(spotify.SessionEvent.CONNECTION_STATE_UPDATED, callback)
@@ -1289,6 +1668,22 @@ class SessionCallbacksTest(unittest.TestCase):
 
         callback.assert_called_once_with(session)
 
+    def test_connection_state_updated_callback_counts_transitions(
+            self, lib_mock):
+        session = self.create_session(lib_mock)
+
+        for state in ['LOGGED_IN', 'DISCONNECTED', 'LOGGED_IN']:
+            lib_mock.sp_session_connectionstate.return_value = int(
+                getattr(spotify.ConnectionState, state))
+            SessionCallbacks.connection_state_updated(session._sp_session)
+
+        counters = session.metrics()['counters']
+        self.assertEqual(counters['connection_state.None->LOGGED_IN'], 1)
+        self.assertEqual(
+            counters['connection_state.LOGGED_IN->DISCONNECTED'], 1)
+        self.assertEqual(
+            counters['connection_state.DISCONNECTED->LOGGED_IN'], 1)
+
     def test_scrobble_error_callback(self, lib_mock):
         callback = mock.Mock()
         session = self.create_session(lib_mock)
@@ -0,0 +1,214 @@
+from __future__ import unicode_literals
+
+import mock
+import threading
+import time
+import unittest
+
+import spotify
+from spotify import ffi
+
+
+class SimulatedLibTest(unittest.TestCase):
+
+    def setUp(self):
+        self.calls = []
+        self.notified = threading.Event()
+        self.end_of_track = threading.Event()
+        self.frames = []
+
+    def tearDown(self):
+        if hasattr(self, 'lib'):
+            self.lib.uninstall()
+
+    def create_lib(self, **kwargs):
+        kwargs.setdefault('latency', 0)
+        self.lib = spotify.SimulatedLib(**kwargs)
+        self.callbacks = [
+            ffi.callback('void(sp_session *, sp_error)', self.logged_in),
+            ffi.callback('void(sp_session *)', self.metadata_updated),
+            ffi.callback('void(sp_session *)', self.notify_main_thread),
+            ffi.callback(
+                'int(sp_session *, const sp_audioformat *, const void *, '
+                'int)', self.music_delivery),
+            ffi.callback('void(sp_session *)', self.end_of_track_callback),
+        ]
+        sp_session_callbacks = ffi.new('sp_session_callbacks *', dict(zip(
+            ['logged_in', 'metadata_updated', 'notify_main_thread',
+             'music_delivery', 'end_of_track'],
+            self.callbacks)))
+        sp_session_config = ffi.new('sp_session_config *', {
+            'callbacks': sp_session_callbacks,
+        })
+        sp_session_ptr = ffi.new('sp_session **')
+        self.lib.sp_session_create(sp_session_config, sp_session_ptr)
+        self.sp_session = sp_session_ptr[0]
+        self.keep_alive = [sp_session_callbacks, sp_session_config]
+        return self.lib
+
+    def logged_in(self, sp_session, sp_error):
+        self.calls.append(('logged_in', sp_error))
+
+    def metadata_updated(self, sp_session):
+        self.calls.append(('metadata_updated',))
+
+    def notify_main_thread(self, sp_session):
+        self.notified.set()
+
+    def music_delivery(self, sp_session, sp_audioformat, frames, num_frames):
+        self.frames.append((sp_audioformat.sample_rate, num_frames))
+        return num_frames
+
+    def end_of_track_callback(self, sp_session):
+        self.end_of_track.set()
+
+    def process_events(self):
+        next_timeout = ffi.new('int *')
+        self.lib.sp_session_process_events(self.sp_session, next_timeout)
+        return next_timeout[0]
+
+    def create_track(self, lib, uri='spotify:track:2Foc5Q5nqNiosCNqttzHof'):
+        sp_link = lib.sp_link_create_from_string(uri.encode('ascii'))
+        return lib.sp_link_as_track(sp_link)
+
+    def test_links_are_parsed_and_formatted(self):
+        lib = self.create_lib()
+        uri = 'spotify:user:alice:playlist:2Foc5Q5nqNiosCNqttzHof'
+
+        sp_link = lib.sp_link_create_from_string(uri.encode('ascii'))
+        buffer_ = ffi.new('char[]', 100)
+
+        self.assertEqual(lib.sp_link_type(sp_link), spotify.LinkType.PLAYLIST)
+        self.assertEqual(
+            lib.sp_link_as_string(sp_link, buffer_, 100), len(uri))
+        self.assertEqual(ffi.string(buffer_), uri.encode('ascii'))
+
+    def test_invalid_uri_gives_null_link(self):
+        lib = self.create_lib()
+
+        self.assertEqual(lib.sp_link_create_from_string(b'foo'), ffi.NULL)
+
+    def test_objects_are_loaded_by_process_events_after_latency(self):
+        lib = self.create_lib(latency=0.05)
+        sp_track = self.create_track(lib)
+
+        self.process_events()
+        self.assertFalse(lib.sp_track_is_loaded(sp_track))
+        self.assertEqual(
+            lib.sp_track_error(sp_track), spotify.ErrorType.IS_LOADING)
+
+        time.sleep(0.1)
+        self.process_events()
+
+        self.assertTrue(lib.sp_track_is_loaded(sp_track))
+        self.assertEqual(lib.sp_track_error(sp_track), spotify.ErrorType.OK)
+        self.assertIn(('metadata_updated',), self.calls)
+
+    def test_notify_main_thread_is_called_when_objects_are_ready(self):
+        lib = self.create_lib(latency=0.01)
+
+        self.create_track(lib)
+
+        self.assertTrue(self.notified.wait(1))
+
+    def test_next_timeout_is_time_until_next_load(self):
+        lib = self.create_lib(latency=10)
+        self.create_track(lib)
+
+        self.assertGreater(self.process_events(), 4000)
+
+    def test_failed_loads_set_error(self):
+        lib = self.create_lib(failure_rate=1)
+        sp_track = self.create_track(lib)
+
+        self.process_events()
+
+        self.assertFalse(lib.sp_track_is_loaded(sp_track))
+        self.assertEqual(
+            lib.sp_track_error(sp_track), spotify.ErrorType.OTHER_PERMANENT)
+
+    def test_data_is_the_same_for_the_same_seed(self):
+        lib1 = spotify.SimulatedLib(seed=1)
+        lib2 = spotify.SimulatedLib(seed=1)
+
+        sp_track1 = self.create_track(lib1)
+        sp_track2 = self.create_track(lib2)
+
+        self.assertEqual(
+            ffi.string(lib1.sp_track_name(sp_track1)),
+            ffi.string(lib2.sp_track_name(sp_track2)))
+        self.assertEqual(
+            lib1.sp_track_duration(sp_track1),
+            lib2.sp_track_duration(sp_track2))
+
+    def test_same_uri_gives_same_object(self):
+        lib = self.create_lib()
+
+        self.assertEqual(self.create_track(lib), self.create_track(lib))
+
+    def test_login_calls_logged_in(self):
+        lib = self.create_lib()
+
+        lib.sp_session_login(self.sp_session, b'alice', b'secret', 0, None)
+        self.process_events()
+
+        self.assertIn(('logged_in', spotify.ErrorType.OK), self.calls)
+        self.assertEqual(
+            lib.sp_session_connectionstate(self.sp_session),
+            spotify.ConnectionState.LOGGED_IN)
+        self.assertEqual(
+            ffi.string(lib.sp_session_user_name(self.sp_session)), b'alice')
+
+    def test_search_calls_complete_callback(self):
+        lib = self.create_lib()
+        callback_mock = mock.Mock(return_value=None)
+        callback = ffi.callback('void(sp_search *, void *)', callback_mock)
+        userdata = ffi.new_handle(self)
+
+        sp_search = lib.sp_search_create(
+            self.sp_session, b'abba', 0, 5, 0, 5, 0, 5, 0, 5,
+            int(spotify.SearchType.STANDARD), callback, userdata)
+        self.process_events()
+
+        self.assertTrue(lib.sp_search_is_loaded(sp_search))
+        self.assertEqual(callback_mock.call_count, 1)
+        self.assertIs(ffi.from_handle(callback_mock.call_args[0][1]), self)
+        self.assertEqual(lib.sp_search_num_tracks(sp_search), 5)
+
+    def test_released_links_are_forgotten(self):
+        lib = self.create_lib()
+        sp_link = lib.sp_link_create_from_string(b'spotify:user:alice')
+
+        lib.sp_link_release(sp_link)
+
+        with self.assertRaises(KeyError):
+            lib.sp_link_type(sp_link)
+
+    def test_music_is_delivered_until_end_of_track(self):
+        lib = self.create_lib()
+        sp_track = self.create_track(lib)
+        self.process_events()
+        duration = lib.sp_track_duration(sp_track)
+
+        lib.sp_session_player_load(self.sp_session, sp_track)
+        lib.sp_session_player_seek(self.sp_session, duration - 100)
+        lib.sp_session_player_play(self.sp_session, 1)
+
+        self.assertTrue(self.end_of_track.wait(1))
+        self.assertEqual(sum(num for rate, num in self.frames), 4410)
+        self.assertEqual(self.frames[0][0], 44100)
+
+    def test_install_replaces_lib_functions_until_uninstalled(self):
+        lib_mock = mock.Mock(spec=['sp_foo', 'sp_link_type'])
+        original = lib_mock.sp_link_type
+
+        with mock.patch('spotify.lib', lib_mock):
+            with spotify.SimulatedLib() as lib:
+                sp_link = lib.sp_link_create_from_string(b'spotify:user:bob')
+                self.assertEqual(
+                    spotify.lib.sp_link_type(sp_link),
+                    spotify.LinkType.PROFILE)
+                with self.assertRaises(NotImplementedError):
+                    spotify.lib.sp_foo()
+            self.assertIs(spotify.lib.sp_link_type, original)
+        self.assertEqual(lib.calls, 1)
@@ -0,0 +1,263 @@
+# encoding: utf-8
+
+from __future__ import unicode_literals
+
+import io
+import mock
+import unittest
+
+import spotify
+from spotify import ffi
+
+
+def sp_foo(*args):
+    return 7
+
+
+def sp_fill(int_ptr, buffer_):
+    int_ptr[0] = 5500
+    buffer_[0:3] = [b'a', b'b', b'c']
+    buffer_[3] = b'\0'
+    return 3
+
+
+class TracerTest(unittest.TestCase):
+
+    def setUp(self):
+        self.file = io.StringIO()
+        self.tracer = spotify.Tracer(self.file)
+
+    def tearDown(self):
+        self.tracer.stop()
+
+    def records(self):
+        self.file.seek(0)
+        return spotify.read_trace(self.file)
+
+    def test_start_and_stop_sets_the_active_tracer(self):
+        with self.tracer:
+            self.assertIs(spotify._tracer, self.tracer)
+
+        self.assertIsNone(spotify._tracer)
+
+    def test_does_not_trace_if_not_started(self):
+        spotify.serialized(sp_foo)(1)
+
+        self.assertEqual(self.records(), [])
+
+    def test_serialized_functions_keep_the_wrapped_function(self):
+        # TraceReplay looks at the wrapped function to find the result type
+        self.assertIs(spotify.serialized(sp_foo).__wrapped__, sp_foo)
+
+    def test_serialized_functions_record_the_lock_owner(self):
+        def sp_fail():
+            self.assertEqual(spotify._lock_owner.depth, 1)
+            raise ValueError('foo')
+
+        with self.assertRaises(ValueError):
+            spotify.serialized(sp_fail)()
+
+        self.assertEqual(spotify._lock_owner.depth, 0)
+
+    def test_traces_calls_to_serialized_functions(self):
+        with self.tracer:
+            result = spotify.serialized(sp_foo)(1, b'abc', 'æ', None)
+
+        self.assertEqual(result, 7)
+        record = self.records()[0]
+        self.assertEqual(record['call'], 'sp_foo')
+        self.assertEqual(
+            record['args'], [1, {'bytes': 3}, {'bytes': 2}, None])
+        self.assertEqual(record['result'], 7)
+        self.assertIn('t', record)
+        self.assertIn('us', record)
+        self.assertNotIn('callbacks', record)
+
+    def test_traces_values_written_to_out_args(self):
+        with self.tracer:
+            spotify.serialized(sp_fill)(
+                ffi.new('int *'), ffi.new('char[]', 10))
+
+        self.assertEqual(self.records()[0]['args'], [
+            {'cdata': 'int *', 'out': 5500},
+            {'cdata': 'char[]', 'size': 10, 'filled': 3},
+        ])
+
+    def test_shapes_of_pointers(self):
+        sp_session1 = ffi.cast('sp_session *', 0x1000)
+        sp_session2 = ffi.cast('sp_session *', 0x2000)
+        sp_audioformat = ffi.new('sp_audioformat *')
+        sp_audioformat.channels = 2
+        sp_audioformat.sample_rate = 44100
+
+        with self.tracer:
+            spotify.serialized(sp_foo)(
+                sp_session1, sp_session2, sp_session1,
+                ffi.cast('sp_session *', 0), ffi.new('char[]', b'abcd'),
+                sp_audioformat)
+
+        args = self.records()[0]['args']
+        self.assertEqual(args[0], {'cdata': 'sp_session *', 'id': 1})
+        self.assertEqual(args[1], {'cdata': 'sp_session *', 'id': 2})
+        self.assertEqual(args[2], {'cdata': 'sp_session *', 'id': 1})
+        self.assertEqual(args[3], {'cdata': 'sp_session *', 'null': True})
+        self.assertEqual(
+            args[4], {'cdata': 'char[]', 'size': 5, 'filled': 4})
+        self.assertEqual(args[5], {
+            'cdata': 'sp_audioformat *',
+            'fields': {'sample_type': 0, 'sample_rate': 44100, 'channels': 2},
+        })
+
+    def test_callbacks_during_a_call_are_part_of_the_call(self):
+        @spotify.trace.traced_callback
+        def metadata_updated(sp_session):
+            pass
+
+        def sp_session_process_events(sp_session):
+            metadata_updated(sp_session)
+            return 0
+
+        with self.tracer:
+            spotify.serialized(sp_session_process_events)(ffi.NULL)
+
+        records = self.records()
+        self.assertEqual(len(records), 1)
+        self.assertEqual(records[0]['callbacks'], [{
+            'callback': 'metadata_updated',
+            't': mock.ANY,
+            'args': [{'cdata': 'void *', 'null': True}],
+            'result': None,
+        }])
+
+    def test_callbacks_outside_calls_are_written_right_away(self):
+        @spotify.trace.traced_callback
+        def music_delivery(sp_session, num_frames):
+            return num_frames
+
+        with self.tracer:
+            result = music_delivery(ffi.NULL, 10)
+
+        self.assertEqual(result, 10)
+        record = self.records()[0]
+        self.assertEqual(record['callback'], 'music_delivery')
+        self.assertEqual(record['args'][1], 10)
+        self.assertEqual(record['result'], 10)
+
+
+class TraceReplayTest(unittest.TestCase):
+
+    def test_replays_results_in_order_for_each_function(self):
+        replay = spotify.TraceReplay([
+            {'call': 'sp_foo', 'args': [], 'result': 3},
+            {'call': 'sp_bar', 'args': [], 'result': 5},
+            {'call': 'sp_foo', 'args': [], 'result': 4},
+        ])
+
+        self.assertEqual(replay.sp_foo(), 3)
+        self.assertEqual(replay.sp_foo(), 4)
+        self.assertEqual(replay.sp_bar(), 5)
+        self.assertEqual(replay.calls, 3)
+
+    def test_calls_missing_from_trace_return_zero(self):
+        replay = spotify.TraceReplay([])
+
+        self.assertEqual(replay.sp_foo(), 0)
+        self.assertEqual(replay.missing, 1)
+
+    def test_replays_pointers(self):
+        replay = spotify.TraceReplay([
+            {'call': 'sp_foo', 'args': [],
+             'result': {'cdata': 'sp_track *', 'id': 1}},
+            {'call': 'sp_foo', 'args': [],
+             'result': {'cdata': 'sp_track *', 'id': 1}},
+            {'call': 'sp_foo', 'args': [],
+             'result': {'cdata': 'sp_track *', 'null': True}},
+        ])
+
+        first = replay.sp_foo()
+        self.assertEqual(ffi.typeof(first).cname, 'sp_track *')
+        self.assertNotEqual(first, ffi.NULL)
+        self.assertEqual(replay.sp_foo(), first)
+        self.assertIs(replay.sp_foo(), ffi.NULL)
+
+    def test_replays_strings_with_the_recorded_length(self):
+        replay = spotify.TraceReplay([
+            {'call': 'sp_foo', 'args': [],
+             'result': {'cdata': 'char *', 'len': 3}},
+        ])
+
+        self.assertEqual(ffi.string(replay.sp_foo()), b'xxx')
+
+    def test_writes_recorded_values_to_out_args(self):
+        replay = spotify.TraceReplay([
+            {'call': 'sp_fill', 'args': [
+                {'cdata': 'int *', 'out': 5500},
+                {'cdata': 'char[]', 'size': 10, 'filled': 3},
+            ], 'result': 3},
+        ])
+        int_ptr = ffi.new('int *')
+        buffer_ = ffi.new('char[]', 10)
+
+        replay.sp_fill(int_ptr, buffer_)
+
+        self.assertEqual(int_ptr[0], 5500)
+        self.assertEqual(ffi.string(buffer_), b'xxx')
+
+    @mock.patch.object(spotify.session._SessionCallbacks, 'metadata_updated')
+    def test_calls_callbacks_recorded_during_a_call(self, callback_mock):
+        replay = spotify.TraceReplay([
+            {'call': 'sp_session_process_events', 'args': [], 'result': 0,
+             'callbacks': [{
+                 'callback': 'metadata_updated',
+                 'args': [{'cdata': 'sp_session *', 'id': 1}]}]},
+        ])
+
+        replay.sp_session_process_events()
+
+        self.assertEqual(callback_mock.call_count, 1)
+        self.assertEqual(
+            ffi.typeof(callback_mock.call_args[0][0]).cname, 'sp_session *')
+
+    @mock.patch.object(spotify.session._SessionCallbacks, 'notify_main_thread')
+    def test_calls_thread_callbacks_before_the_next_call(self, callback_mock):
+        replay = spotify.TraceReplay([
+            {'call': 'sp_foo', 'args': [], 'result': 0},
+            {'callback': 'notify_main_thread', 'args': [None]},
+            {'call': 'sp_bar', 'args': [], 'result': 0},
+            {'callback': 'notify_main_thread', 'args': [None]},
+        ])
+
+        replay.sp_foo()
+        self.assertEqual(callback_mock.call_count, 0)
+        replay.sp_bar()
+        self.assertEqual(callback_mock.call_count, 1)
+        replay.uninstall()
+        self.assertEqual(callback_mock.call_count, 2)
+
+    def test_install_replaces_lib_functions_until_uninstalled(self):
+        lib_mock = mock.Mock(spec=['sp_foo'])
+        original = lib_mock.sp_foo
+        replay = spotify.TraceReplay([
+            {'call': 'sp_foo', 'args': [], 'result': 3},
+        ])
+
+        with mock.patch('spotify.lib', lib_mock):
+            with replay:
+                self.assertEqual(spotify.lib.sp_foo(), 3)
+            self.assertIs(spotify.lib.sp_foo, original)
+
+    def test_replays_what_the_tracer_recorded(self):
+        def sp_track_name(sp_track):
+            return ffi.new('char[]', b'Foo')
+
+        file = io.StringIO()
+        sp_track = ffi.cast('sp_track *', 0x1000)
+        with spotify.Tracer(file):
+            spotify.serialized(sp_track_name)(sp_track)
+        file.seek(0)
+        replay = spotify.TraceReplay(spotify.read_trace(file))
+
+        result = replay.sp_track_name(sp_track)
+
+        self.assertEqual(ffi.string(result), b'xxx')
+        self.assertEqual(replay.missing, 0)
@@ -122,6 +122,57 @@ class TrackTest(unittest.TestCase):
 
         load_mock.assert_called_with(track, timeout=10)
 
+    def test_loaded_without_error_is_remembered(self, lib_mock):
+        lib_mock.sp_track_error.return_value = spotify.ErrorType.OK
+        lib_mock.sp_track_is_loaded.return_value = 1
+        lib_mock.sp_track_name.return_value = spotify.ffi.new(
+            'char[]', b'Foo')
+        sp_track = spotify.ffi.new('int *')
+        track = spotify.Track(sp_track=sp_track)
+
+        self.assertEqual(track.name, 'Foo')
+        self.assertEqual(track.name, 'Foo')
+        self.assertTrue(track.is_loaded)
+        self.assertIs(track.error, spotify.ErrorType.OK)
+
+        self.assertEqual(lib_mock.sp_track_error.call_count, 1)
+        self.assertEqual(lib_mock.sp_track_is_loaded.call_count, 1)
+        self.assertEqual(lib_mock.sp_track_name.call_count, 2)
+
+    def test_loading_state_is_not_remembered(self, lib_mock):
+        lib_mock.sp_track_error.return_value = spotify.ErrorType.IS_LOADING
+        lib_mock.sp_track_is_loaded.return_value = 0
+        sp_track = spotify.ffi.new('int *')
+        track = spotify.Track(sp_track=sp_track)
+
+        self.assertIsNone(track.offline_status)
+        lib_mock.sp_track_error.return_value = spotify.ErrorType.OK
+        lib_mock.sp_track_is_loaded.return_value = 1
+        lib_mock.sp_track_offline_get_status.return_value = 2
+
+        self.assertIs(
+            track.offline_status, spotify.TrackOfflineStatus.DOWNLOADING)
+        self.assertEqual(lib_mock.sp_track_error.call_count, 2)
+
+    def test_availability_is_cached_until_metadata_updated(self, lib_mock):
+        session = mock.Mock()
+        session._metadata_generation = 0
+        spotify.session_instance = session
+        lib_mock.sp_track_error.return_value = spotify.ErrorType.OK
+        lib_mock.sp_track_is_loaded.return_value = 1
+        lib_mock.sp_track_get_availability.return_value = 1
+        sp_track = spotify.ffi.new('int *')
+        track = spotify.Track(sp_track=sp_track)
+
+        self.assertIs(track.availability, spotify.TrackAvailability.AVAILABLE)
+        lib_mock.sp_track_get_availability.return_value = 0
+        self.assertIs(track.availability, spotify.TrackAvailability.AVAILABLE)
+        session._metadata_generation += 1
+        self.assertIs(
+            track.availability, spotify.TrackAvailability.UNAVAILABLE)
+
+        self.assertEqual(lib_mock.sp_track_get_availability.call_count, 2)
+
     def test_offline_status(self, lib_mock):
         lib_mock.sp_track_error.return_value = spotify.ErrorType.OK
         lib_mock.sp_track_offline_get_status.return_value = 2
@@ -450,6 +501,28 @@ class TrackTest(unittest.TestCase):
         lib_mock.sp_track_name.assert_called_once_with(sp_track)
         self.assertEqual(result, 'Foo Bar Baz')
 
+    def test_reading_properties_call_budget(self, lib_mock):
+        lib_mock.sp_track_error.return_value = spotify.ErrorType.OK
+        lib_mock.sp_track_is_loaded.return_value = 1
+        lib_mock.sp_track_name.return_value = spotify.ffi.new(
+            'char[]', b'Foo Bar Baz')
+        lib_mock.sp_track_duration.return_value = 60000
+        lib_mock.sp_track_popularity.return_value = 50
+        lib_mock.sp_track_disc.return_value = 1
+        lib_mock.sp_track_index.return_value = 1
+        sp_track = spotify.ffi.new('int *')
+        track = spotify.Track(sp_track=sp_track)
+
+        # error and is_loaded once, as a loaded track stays loaded, and one
+        # call per property read
+        with tests.lib_call_budget(52, lib_mock):
+            for _ in range(10):
+                track.name
+                track.duration
+                track.popularity
+                track.disc
+                track.index
+
     def test_name_is_none_if_unloaded(self, lib_mock):
         lib_mock.sp_track_error.return_value = spotify.ErrorType.OK
         lib_mock.sp_track_name.return_value = spotify.ffi.new('char[]', b'')
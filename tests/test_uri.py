@@ -0,0 +1,153 @@
+from __future__ import unicode_literals
+
+import unittest
+
+import spotify
+
+
+TRACK_ID = '2Foc5Q5nqNiosCNqttzHof'
+IMAGE_ID = '01' * 20
+
+
+class ParseUriTest(unittest.TestCase):
+
+    def assertParsed(self, uri, type, id=None, user=None, offset=None):
+        self.assertEqual(
+            spotify.parse_uri(uri),
+            spotify.ParsedUri(type=type, id=id, user=user, offset=offset))
+
+    def test_parses_track_album_and_artist_uris(self):
+        self.assertParsed(
+            'spotify:track:%s' % TRACK_ID, spotify.LinkType.TRACK, TRACK_ID)
+        self.assertParsed(
+            'spotify:album:%s' % TRACK_ID, spotify.LinkType.ALBUM, TRACK_ID)
+        self.assertParsed(
+            'spotify:artist:%s' % TRACK_ID, spotify.LinkType.ARTIST, TRACK_ID)
+
+    def test_parses_track_uri_with_offset(self):
+        self.assertParsed(
+            'spotify:track:%s#1:23' % TRACK_ID, spotify.LinkType.TRACK,
+            TRACK_ID, offset=83000)
+
+    def test_parses_user_uris(self):
+        self.assertParsed(
+            'spotify:user:alice', spotify.LinkType.PROFILE, user='alice')
+        self.assertParsed(
+            'spotify:user:alice:starred', spotify.LinkType.STARRED,
+            user='alice')
+        self.assertParsed(
+            'spotify:user:alice:playlist:%s' % TRACK_ID,
+            spotify.LinkType.PLAYLIST, TRACK_ID, user='alice')
+        self.assertParsed(
+            'spotify:playlist:%s' % TRACK_ID, spotify.LinkType.PLAYLIST,
+            TRACK_ID)
+
+    def test_parses_image_search_and_local_uris(self):
+        self.assertParsed(
+            'spotify:image:%s' % IMAGE_ID, spotify.LinkType.IMAGE, IMAGE_ID)
+        self.assertParsed(
+            'spotify:search:artist:daft#punk', spotify.LinkType.SEARCH,
+            'artist:daft#punk')
+        self.assertParsed(
+            'spotify:local:Foo:Bar:Baz:123', spotify.LinkType.LOCALTRACK,
+            'Foo:Bar:Baz:123')
+
+    def test_parses_bytes(self):
+        self.assertParsed(
+            b'spotify:track:' + TRACK_ID.encode('ascii'),
+            spotify.LinkType.TRACK, TRACK_ID)
+
+    def test_rejects_invalid_uris(self):
+        uris = [
+            '',
+            'foo',
+            'spotify:',
+            'spotify:track:foo',
+            'spotify:track:%s:' % TRACK_ID,
+            'spotify:track:%s#1:99' % TRACK_ID,
+            'spotify:album:%s#1:23' % TRACK_ID,
+            'spotify:user:',
+            'spotify:user:alice:playlist:foo',
+            'spotify:user:alice:foo',
+            'spotify:image:%s' % TRACK_ID,
+            'spotify:search:',
+            'spotify:local:Foo:Bar:Baz:abc',
+            'spotify:foo:%s' % TRACK_ID,
+            'http://open.spotify.com/track/%s' % TRACK_ID,
+        ]
+
+        for uri in uris:
+            with self.assertRaises(ValueError):
+                spotify.parse_uri(uri)
+            self.assertFalse(spotify.is_valid_uri(uri))
+            self.assertIs(spotify.uri_type(uri), spotify.LinkType.INVALID)
+
+    def test_uri_type(self):
+        self.assertIs(
+            spotify.uri_type('spotify:user:alice'), spotify.LinkType.PROFILE)
+
+    def test_parse_uris(self):
+        result = spotify.parse_uris(['spotify:track:%s' % TRACK_ID, 'foo'])
+
+        self.assertEqual(result, [
+            spotify.ParsedUri(spotify.LinkType.TRACK, TRACK_ID, None, None),
+            None,
+        ])
+
+    def test_could_be_uri_is_lenient(self):
+        self.assertTrue(spotify.uri._could_be_uri('spotify:track:foo'))
+        self.assertTrue(spotify.uri._could_be_uri(
+            'https://open.spotify.com/track/foo'))
+        self.assertFalse(spotify.uri._could_be_uri('foo'))
+        self.assertFalse(spotify.uri._could_be_uri('spotify:foo:bar'))
+        self.assertFalse(spotify.uri._could_be_uri('spotify:track:'))
+
+
+class IdCodecTest(unittest.TestCase):
+
+    def test_id_to_bytes(self):
+        self.assertEqual(spotify.id_to_bytes('0' * 22), b'\x00' * 16)
+        self.assertEqual(
+            spotify.id_to_bytes('0' * 21 + '1'), b'\x00' * 15 + b'\x01')
+        self.assertEqual(
+            spotify.id_to_bytes('0' * 21 + 'Z'), b'\x00' * 15 + b'=')
+
+    def test_bytes_to_id(self):
+        self.assertEqual(spotify.bytes_to_id(b'\x00' * 16), '0' * 22)
+        self.assertEqual(
+            spotify.bytes_to_id(b'\x00' * 15 + b'>'), '0' * 20 + '10')
+
+    def test_round_trip(self):
+        for id in [TRACK_ID, '7zzzzzzzzzzzzzzzzzzzzz', '0' * 22]:
+            data = spotify.id_to_bytes(id)
+
+            self.assertEqual(len(data), 16)
+            self.assertEqual(spotify.bytes_to_id(data), id)
+
+        data = b'\xff' * 16
+        self.assertEqual(spotify.id_to_bytes(spotify.bytes_to_id(data)), data)
+
+    def test_id_to_bytes_rejects_invalid_ids(self):
+        for id in ['foo', '0' * 23, '0' * 21 + '-', 'z' * 22]:
+            with self.assertRaises(ValueError):
+                spotify.id_to_bytes(id)
+
+    def test_bytes_to_id_rejects_wrong_length(self):
+        with self.assertRaises(ValueError):
+            spotify.bytes_to_id(b'\x00' * 15)
+
+    def test_batch_round_trip(self):
+        ids = [TRACK_ID, '0' * 22, '1' * 22]
+
+        data = spotify.ids_to_bytes(ids)
+
+        self.assertEqual(len(data), 48)
+        self.assertEqual(data[16:32], b'\x00' * 16)
+        self.assertEqual(spotify.bytes_to_ids(data), ids)
+
+    def test_bytes_to_ids_with_no_data(self):
+        self.assertEqual(spotify.bytes_to_ids(b''), [])
+
+    def test_bytes_to_ids_rejects_partial_ids(self):
+        with self.assertRaises(ValueError):
+            spotify.bytes_to_ids(b'\x00' * 17)
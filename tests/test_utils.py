@@ -3,6 +3,7 @@
 from __future__ import unicode_literals
 
 import mock
+import threading
 import unittest
 
 import spotify
@@ -96,6 +97,26 @@ class EventEmitterTest(unittest.TestCase):
         self.assertEqual(listener_mock1.call_count, 1)
         self.assertEqual(listener_mock2.call_count, 2)
 
+    def test_concurrent_changes_to_listeners_are_not_lost(self):
+        emitter = utils.EventEmitter()
+
+        def add_and_remove_listeners():
+            for _ in range(200):
+                listener = mock.Mock()
+                emitter.on('some_event', listener)
+                emitter.on('some_event', lambda: False)
+                emitter.off('some_event', listener)
+
+        threads = [
+            threading.Thread(target=add_and_remove_listeners)
+            for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(emitter.num_listeners('some_event'), 8 * 200)
+
     def test_num_listeners_returns_number_of_listeners_for_event(self):
         listener_mock1 = mock.Mock()
         listener_mock2 = mock.Mock()
@@ -137,6 +158,96 @@ class EventEmitterTest(unittest.TestCase):
         listener_mock.assert_called_with('abc', 1, 2, 3)
         self.assertEqual(result, listener_mock.return_value)
 
+    def test_listener_removed_while_emitting_is_called_this_time(self):
+        emitter = utils.EventEmitter()
+        listener_mock2 = mock.Mock()
+
+        def listener1():
+            emitter.off('some_event', listener_mock2)
+
+        emitter.on('some_event', listener1)
+        emitter.on('some_event', listener_mock2)
+        emitter.emit('some_event')
+        emitter.emit('some_event')
+
+        self.assertEqual(listener_mock2.call_count, 1)
+
+    def test_removing_a_bound_method_listener(self):
+        class Foo(object):
+            def bar(self):
+                pass
+
+        foo = Foo()
+        emitter = utils.EventEmitter()
+        emitter.on('some_event', foo.bar)
+
+        emitter.off('some_event', foo.bar)
+
+        self.assertEqual(emitter.num_listeners('some_event'), 0)
+
+    def test_weak_listener_receives_both_user_and_event_args(self):
+        listener_mock = mock.Mock()
+        emitter = utils.EventEmitter()
+
+        emitter.on_weak('some_event', listener_mock, 1, 2, 3)
+        emitter.emit('some_event', 'abc')
+
+        listener_mock.assert_called_with('abc', 1, 2, 3)
+
+    def test_weak_listener_is_removed_when_garbage_collected(self):
+        listener_mock = mock.Mock()
+        emitter = utils.EventEmitter()
+        emitter.on_weak('some_event', listener_mock)
+        self.assertEqual(emitter.num_listeners('some_event'), 1)
+
+        listener_mock = None  # noqa
+        tests.gc_collect()
+        emitter.emit('some_event')
+
+        self.assertEqual(emitter.num_listeners('some_event'), 0)
+        self.assertNotIn('some_event', emitter._listeners)
+
+    def test_weak_bound_method_listener_lives_as_long_as_its_object(self):
+        calls = []
+
+        class Foo(object):
+            def bar(self, *args):
+                calls.append(args)
+
+        foo = Foo()
+        emitter = utils.EventEmitter()
+        emitter.on_weak('some_event', foo.bar, 'x')
+
+        tests.gc_collect()
+        emitter.emit('some_event', 'abc')
+        self.assertEqual(calls, [('abc', 'x')])
+
+        foo = None  # noqa
+        tests.gc_collect()
+        emitter.emit('some_event', 'abc')
+        self.assertEqual(calls, [('abc', 'x')])
+        self.assertEqual(emitter.num_listeners('some_event'), 0)
+
+    def test_removing_a_weak_listener(self):
+        listener_mock = mock.Mock()
+        emitter = utils.EventEmitter()
+        emitter.on_weak('some_event', listener_mock)
+
+        emitter.off('some_event', listener_mock)
+        emitter.emit('some_event')
+
+        self.assertEqual(listener_mock.call_count, 0)
+
+    def test_call_calls_a_single_weak_listener(self):
+        listener_mock = mock.Mock()
+        emitter = utils.EventEmitter()
+
+        emitter.on_weak('some_event', listener_mock, 1)
+        result = emitter.call('some_event', 'abc')
+
+        listener_mock.assert_called_with('abc', 1)
+        self.assertEqual(result, listener_mock.return_value)
+
 
 class IntEnumTest(unittest.TestCase):
 
@@ -163,6 +274,56 @@ class IntEnumTest(unittest.TestCase):
         self.assertIsNot(self.Foo(2), self.Foo.bar)
         self.assertIsNot(self.Foo(1), self.Foo.baz)
 
+    def test_unknown_values_are_created_once(self):
+        result = self.Foo(3)
+
+        self.assertEqual(result, 3)
+        self.assertIs(self.Foo(3), result)
+        self.assertEqual(repr(result), '<Unknown Foo: 3>')
+
+
+class MakeEnumTest(unittest.TestCase):
+
+    def setUp(self):
+        utils._lib_constants = None
+
+    def tearDown(self):
+        utils._lib_constants = None
+
+    @mock.patch('spotify.utils.lib')
+    def test_adds_lib_constants_with_prefix(self, lib_mock):
+        lib_mock.SP_FOO_BAR = 1
+        lib_mock.SP_FOO_BAZ = 2
+        lib_mock.SP_QUX = 3
+
+        @utils.make_enum('SP_FOO_', 'FOO_')
+        class Foo(utils.IntEnum):
+            pass
+
+        self.assertIs(Foo.FOO_BAR, Foo(1))
+        self.assertEqual(Foo.FOO_BAZ, 2)
+        self.assertFalse(hasattr(Foo, 'QUX'))
+
+    @mock.patch('spotify.utils.lib')
+    def test_scans_lib_only_once(self, lib_mock):
+        lib_mock.SP_FOO_BAR = 1
+        lib_mock.SP_QUX_BAR = 2
+
+        with mock.patch('spotify.utils.dir', create=True) as dir_mock:
+            dir_mock.return_value = ['SP_FOO_BAR', 'SP_QUX_BAR', 'sp_foo']
+
+            @utils.make_enum('SP_FOO_')
+            class Foo(utils.IntEnum):
+                pass
+
+            @utils.make_enum('SP_QUX_')
+            class Qux(utils.IntEnum):
+                pass
+
+        self.assertEqual(dir_mock.call_count, 1)
+        self.assertEqual(Foo.BAR, 1)
+        self.assertEqual(Qux.BAR, 2)
+
 
 @mock.patch('spotify.search.lib', spec=spotify.lib)
 class SequenceTest(unittest.TestCase):
@@ -241,8 +402,8 @@ class SequenceTest(unittest.TestCase):
 
         result = seq[0:2]
 
-        # Entire collection of length 3 is created as a list
-        self.assertEqual(getitem_func.call_count, 3)
+        # Only the items in the slice are created
+        self.assertEqual(getitem_func.call_count, 2)
 
         # Only a subslice of length 2 is returned
         self.assertIsInstance(result, list)
@@ -286,6 +447,39 @@ class SequenceTest(unittest.TestCase):
         with self.assertRaises(TypeError):
             seq['abc']
 
+    def test_iter_gets_len_once(self, lib_mock):
+        sp_search = spotify.ffi.new('int *')
+        lib_mock.sp_search_num_tracks.return_value = 1000
+        seq = utils.Sequence(
+            sp_obj=sp_search,
+            add_ref_func=lib_mock.sp_search_add_ref,
+            release_func=lib_mock.sp_search_release,
+            len_func=lib_mock.sp_search_num_tracks,
+            getitem_func=lib_mock.sp_search_track)
+
+        # list() would get the length too, to size the list
+        with tests.lib_call_budget(1001, lib_mock):
+            result = [item for item in seq]
+
+        self.assertEqual(len(result), 1000)
+        self.assertEqual(lib_mock.sp_search_num_tracks.call_count, 1)
+
+    def test_getitem_with_slice_only_gets_items_in_slice(self, lib_mock):
+        sp_search = spotify.ffi.new('int *')
+        lib_mock.sp_search_num_tracks.return_value = 1000
+        seq = utils.Sequence(
+            sp_obj=sp_search,
+            add_ref_func=lib_mock.sp_search_add_ref,
+            release_func=lib_mock.sp_search_release,
+            len_func=lib_mock.sp_search_num_tracks,
+            getitem_func=lib_mock.sp_search_track)
+
+        with tests.lib_call_budget(11, lib_mock):
+            result = seq[-10:]
+
+        self.assertEqual(len(result), 10)
+        lib_mock.sp_search_track.assert_called_with(sp_search, 999)
+
     def test_repr(self, lib_mock):
         sp_search = spotify.ffi.new('int *')
         seq = utils.Sequence(
@@ -300,6 +494,101 @@ class SequenceTest(unittest.TestCase):
         self.assertEqual(result, '[123]')
 
 
+class GetWithFixedBufferTest(unittest.TestCase):
+
+    def setUp(self):
+        utils._scratch.buffer = None
+
+    def test_get_with_fixed_buffer(self):
+        func = mock.Mock(side_effect=tests.buffer_writer('foo'))
+
+        result = utils.get_with_fixed_buffer(100, func, 'a', 'b')
+
+        self.assertEqual(result, 'foo')
+        func.assert_called_once_with('a', 'b', mock.ANY, 100)
+
+    def test_reuses_buffer(self):
+        func = mock.Mock(side_effect=tests.buffer_writer('foobar'))
+        utils.get_with_fixed_buffer(100, func)
+        func.side_effect = tests.buffer_writer('baz')
+
+        result = utils.get_with_fixed_buffer(100, func)
+
+        self.assertEqual(result, 'baz')
+        self.assertEqual(
+            func.call_args_list[0][0][0], func.call_args_list[1][0][0])
+
+    def test_truncates_to_buffer_length(self):
+        func = mock.Mock(side_effect=tests.buffer_writer('foobar'))
+
+        result = utils.get_with_fixed_buffer(4, func)
+
+        self.assertEqual(result, 'foo')
+
+
+class GetWithGrowingBufferTest(unittest.TestCase):
+
+    def setUp(self):
+        utils._scratch.buffer = None
+
+    def test_get_with_growing_buffer(self):
+        func = mock.Mock(side_effect=tests.buffer_writer('foo'))
+
+        result = utils.get_with_growing_buffer(func, 'a')
+
+        self.assertEqual(result, 'foo')
+        func.assert_called_once_with('a', mock.ANY, mock.ANY)
+
+    def test_grows_buffer_to_fit_string(self):
+        string = 'foo' * 100
+        func = mock.Mock(side_effect=tests.buffer_writer(string))
+
+        result = utils.get_with_growing_buffer(func)
+
+        self.assertEqual(result, string)
+        self.assertEqual(func.call_count, 2)
+        self.assertGreater(func.call_args[0][1], len(string))
+
+    def test_starts_with_buffer_large_enough_for_earlier_strings(self):
+        string = 'foo' * 100
+        func = mock.Mock(side_effect=tests.buffer_writer(string))
+        utils.get_with_growing_buffer(func)
+        func.reset_mock()
+
+        result = utils.get_with_growing_buffer(func)
+
+        self.assertEqual(result, string)
+        self.assertEqual(func.call_count, 1)
+
+    def test_strings_larger_than_scratch_buffer(self):
+        string = 'foo' * 2000
+        func = mock.Mock(side_effect=tests.buffer_writer(string))
+
+        result = utils.get_with_growing_buffer(func)
+
+        self.assertEqual(result, string)
+
+    def test_returns_none_on_error(self):
+        func = mock.Mock(return_value=-1)
+
+        result = utils.get_with_growing_buffer(func)
+
+        self.assertIsNone(result)
+
+    def test_scratch_buffers_are_per_thread(self):
+        buffers = []
+
+        def get_buffer():
+            buffers.append(utils._get_scratch_buffer(10))
+
+        thread = threading.Thread(target=get_buffer)
+        thread.start()
+        thread.join()
+        get_buffer()
+
+        self.assertIsNot(buffers[0], buffers[1])
+
+
 class ToBytesTest(unittest.TestCase):
 
     def test_unicode_to_bytes_is_encoded_as_utf8(self):